@@ -1,9 +1,35 @@
 """Pacote principal da plataforma vrHouse."""
-from .core import AssetReference, PipelineError, SceneSpecification, VRScene
+from __future__ import annotations
+
+import importlib
+from typing import Any
+
+# Re-exported lazily (PEP 562) so ``import vrhouse.cli`` does not pay for NumPy.
+_CORE_EXPORTS = frozenset(
+    {
+        "AssetReference",
+        "MeshData",
+        "NodeView",
+        "PipelineError",
+        "SceneGraph",
+        "SceneSpecification",
+        "VRScene",
+    }
+)
+
+
+def __getattr__(name: str) -> Any:
+    if name in _CORE_EXPORTS:
+        return getattr(importlib.import_module("vrhouse.core"), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "AssetReference",
+    "MeshData",
+    "NodeView",
     "PipelineError",
+    "SceneGraph",
     "SceneSpecification",
     "VRScene",
 ]
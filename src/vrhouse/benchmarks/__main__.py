@@ -0,0 +1,124 @@
+"""Command line entry point: ``python -m vrhouse.benchmarks {run,generate,compare}``."""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+from vrhouse.benchmarks.suite import (
+    BENCHMARKS,
+    FORMAT_SUFFIXES,
+    BenchmarkResult,
+    BenchmarkSuite,
+    compare_results,
+    format_comparison,
+    format_results,
+    load_results,
+    write_results,
+)
+from vrhouse.benchmarks.synthetic import SCALES, generate_house, house_spec
+
+
+def _names(value: str) -> list[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m vrhouse.benchmarks",
+        description="Benchmark the conversion pipeline on deterministic synthetic houses",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the benchmarks and write a JSON results file")
+    run.add_argument("--scale", type=_names, default=["small"], help=f"Comma-separated scales: {', '.join(SCALES)}")
+    run.add_argument(
+        "--format", type=_names, default=["obj", "gltf", "ifc"], help=f"Comma-separated formats: {', '.join(FORMAT_SUFFIXES)}"
+    )
+    run.add_argument(
+        "--only", type=_names, default=list(BENCHMARKS), help=f"Comma-separated benchmarks: {', '.join(BENCHMARKS)}"
+    )
+    run.add_argument("--repeat", type=int, default=3, help="Timed repetitions per benchmark")
+    run.add_argument("--warmup", type=int, default=1, help="Untimed repetitions before timing")
+    run.add_argument("--seed", type=int, default=7)
+    run.add_argument("--workers", type=int, default=None, help="Cap the process/thread pools used by stages")
+    run.add_argument(
+        "--output",
+        type=Path,
+        default=Path("benchmark-results") / "results.json",
+        help="Results file (default benchmark-results/results.json, ignored by git)",
+    )
+    run.add_argument("--baseline", type=Path, default=None, help="Results file to compare against")
+    run.add_argument(
+        "--threshold", type=float, default=0.10, help="Slowdown fraction reported as a regression (default 0.10)"
+    )
+
+    generate = commands.add_parser("generate", help="Write one synthetic house model")
+    generate.add_argument("output", type=Path, help="Target file (.obj, .gltf, .glb or .ifc)")
+    generate.add_argument("--scale", choices=sorted(SCALES), default="small")
+    generate.add_argument("--seed", type=int, default=7)
+    generate.add_argument("--detail", type=int, default=None, help="Override subdivisions per box edge")
+    generate.add_argument(
+        "--texture-size", type=int, default=None, help="Override the edge of each material texture (0 disables textures)"
+    )
+
+    compare = commands.add_parser("compare", help="Compare two results files")
+    compare.add_argument("baseline", type=Path)
+    compare.add_argument("current", type=Path)
+    compare.add_argument("--threshold", type=float, default=0.10)
+    return parser
+
+
+def _compare(current: dict, baseline_path: Path, threshold: float) -> int:
+    comparisons = compare_results(current, load_results(baseline_path), threshold=threshold)
+    print(format_comparison(comparisons))
+    regressions = [item.name for item in comparisons if item.status == "regression"]
+    if regressions:
+        print(f"{len(regressions)} regression(s) above {threshold:.0%}: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.command == "generate":
+        overrides = {"seed": args.seed, **({"detail": args.detail} if args.detail else {})}
+        if args.texture_size is not None:
+            overrides["texture_size"] = args.texture_size
+        house = generate_house(house_spec(args.scale, **overrides), args.output)
+        print(f"{house.path}: {house.parts} parts, {house.furniture} furniture, {house.triangles} triangles")
+        return 0
+
+    if args.command == "compare":
+        return _compare(load_results(args.current), args.baseline, args.threshold)
+
+    unknown = sorted(set(args.only) - set(BENCHMARKS)) + sorted(set(args.format) - set(FORMAT_SUFFIXES))
+    if unknown:
+        parser.error(f"unknown benchmark or format: {', '.join(unknown)}")
+
+    def show(result: BenchmarkResult) -> None:
+        print(f"{result.name:<32} {result.median:.4f}s", file=sys.stderr, flush=True)
+
+    suite = BenchmarkSuite(
+        scales=args.scale,
+        formats=args.format,
+        benchmarks=args.only,
+        repeats=args.repeat,
+        warmup=args.warmup,
+        seed=args.seed,
+        max_workers=args.workers,
+        on_result=show,
+    )
+    results = suite.run()
+    write_results(results, args.output)
+    print(format_results(results["results"]))
+    print(f"Results written to {args.output}")
+    if args.baseline is not None:
+        return _compare(results, args.baseline, args.threshold)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,345 @@
+"""Per-stage and end-to-end pipeline benchmarks with JSON results and baseline comparison."""
+from __future__ import annotations
+
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from vrhouse.benchmarks.synthetic import generate_house, house_spec
+from vrhouse.core import BVH, SceneGraph, SceneSpecification
+from vrhouse.pipeline.ai.physics_model import PhysicsInferenceModel
+from vrhouse.pipeline.exporters.vr_scene_builder import VRSceneBuilder
+from vrhouse.pipeline.importers.multi_importer import MultiFormatImporter
+from vrhouse.pipeline.processors.batching import MaterialBatcher
+from vrhouse.pipeline.processors.colliders import ColliderGenerator
+from vrhouse.pipeline.processors.geometry_optimizer import GeometryOptimizer
+from vrhouse.pipeline.processors.material_enhancer import MaterialEnhancer
+from vrhouse.pipeline.processors.visibility import VisibilityBaker
+from vrhouse.pipeline.runner import run_conversion
+
+RESULTS_VERSION = 1
+BENCHMARKS = (
+    "startup", "import", "bvh", "visibility", "geometry", "materials", "batching", "physics", "colliders", "export",
+    "end-to-end",
+)
+FORMAT_SUFFIXES: Dict[str, str] = {"obj": ".obj", "gltf": ".gltf", "glb": ".glb", "ifc": ".ifc"}
+# Differences below this many seconds are treated as noise whatever the ratio.
+MIN_SIGNIFICANT_SECONDS = 0.005
+# Modules the ``startup`` benchmark reports when a cold ``import vrhouse.cli`` loads them.
+HEAVY_MODULES = ("numpy", "cryptography", "zstandard", "tkinter", "asyncio")
+_STARTUP_PROBE = (
+    "import json, sys, time\n"
+    "started = time.perf_counter()\n"
+    "import {module}\n"
+    "seconds = time.perf_counter() - started\n"
+    "print(json.dumps({{'seconds': seconds, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))\n"
+)
+
+
+@dataclass
+class BenchmarkResult:
+    """Timings of one benchmark on one generated model; ``seconds`` holds every repeat."""
+
+    name: str
+    benchmark: str
+    format: str
+    scale: str
+    seconds: List[float]
+    triangles: int = 0
+    nodes: int = 0
+    loaded_modules: List[str] = field(default_factory=list)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.seconds)
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            **asdict(self),
+            "median": self.median,
+            "min": min(self.seconds),
+            "stdev": statistics.stdev(self.seconds) if len(self.seconds) > 1 else 0.0,
+        }
+
+
+@dataclass
+class Comparison:
+    name: str
+    status: str
+    baseline: Optional[float] = None
+    current: Optional[float] = None
+    ratio: Optional[float] = None
+
+
+@dataclass
+class BenchmarkSuite:
+    """Generate synthetic houses and time each pipeline stage on them.
+
+    Stage inputs are produced once per model outside the timed region (import
+    output feeds geometry, geometry output feeds materials, ...), so every
+    benchmark times a single stage call. ``warmup`` untimed calls precede the
+    ``repeats`` timed ones.
+    """
+
+    scales: Sequence[str] = ("small",)
+    formats: Sequence[str] = ("obj", "gltf", "ifc")
+    benchmarks: Sequence[str] = BENCHMARKS
+    repeats: int = 3
+    warmup: int = 1
+    seed: int = 7
+    max_workers: Optional[int] = None
+    workdir: Optional[Path] = None
+    on_result: Optional[Callable[[BenchmarkResult], None]] = None
+    results: List[BenchmarkResult] = field(default_factory=list)
+
+    def _measure(self, call: Callable[[], object]) -> List[float]:
+        for _ in range(self.warmup):
+            call()
+        seconds = []
+        for _ in range(max(1, self.repeats)):
+            gc.collect()
+            started = time.perf_counter()
+            call()
+            seconds.append(time.perf_counter() - started)
+        return seconds
+
+    def _record(self, benchmark: str, format_name: str, scale: str, seconds: List[float], graph: SceneGraph) -> None:
+        result = BenchmarkResult(
+            name=f"{benchmark}[{format_name}/{scale}]",
+            benchmark=benchmark,
+            format=format_name,
+            scale=scale,
+            seconds=[round(value, 6) for value in seconds],
+            triangles=graph.triangle_count,
+            nodes=len(graph),
+        )
+        self.results.append(result)
+        if self.on_result is not None:
+            self.on_result(result)
+
+    def _run_startup(self, module: str = "vrhouse.cli") -> None:
+        """Time ``import module`` in fresh interpreters, the cost every CLI call pays first."""
+
+        package_root = str(Path(__file__).resolve().parents[2])
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [package_root, env.get("PYTHONPATH")]))
+        probe = _STARTUP_PROBE.format(module=module, heavy=HEAVY_MODULES)
+        samples = []
+        for _ in range(self.warmup + max(1, self.repeats)):
+            output = subprocess.run(
+                [sys.executable, "-c", probe], env=env, capture_output=True, text=True, check=True
+            ).stdout
+            samples.append(json.loads(output))
+        samples = samples[self.warmup :]
+        result = BenchmarkResult(
+            name=f"startup[{module}]",
+            benchmark="startup",
+            format="-",
+            scale="-",
+            seconds=[round(sample["seconds"], 6) for sample in samples],
+            loaded_modules=samples[-1]["loaded"],
+        )
+        self.results.append(result)
+        if self.on_result is not None:
+            self.on_result(result)
+
+    def _run_model(self, source: Path, format_name: str, scale: str, workdir: Path) -> None:
+        specification = SceneSpecification(project_name=f"bench-{scale}", source_file=source)
+        wanted = set(self.benchmarks)
+        importer = MultiFormatImporter()
+        imported = importer.load(specification)
+        if "import" in wanted:
+            self._record("import", format_name, scale, self._measure(lambda: importer.load(specification)), imported)
+        if "bvh" in wanted:
+            self._record("bvh", format_name, scale, self._measure(lambda: BVH.from_scene(imported)), imported)
+        if "visibility" in wanted:
+            baker = VisibilityBaker(max_workers=self.max_workers)
+            self._record("visibility", format_name, scale, self._measure(lambda: baker.bake(imported)), imported)
+
+        optimizer = GeometryOptimizer(max_workers=self.max_workers)
+        optimized = optimizer.optimize(imported) if wanted & {"geometry", "materials", "batching", "export"} else imported
+        if "geometry" in wanted:
+            self._record("geometry", format_name, scale, self._measure(lambda: optimizer.optimize(imported)), imported)
+
+        enhancer = MaterialEnhancer()
+        enhanced = enhancer.enhance(optimized)
+        if "materials" in wanted:
+            self._record("materials", format_name, scale, self._measure(lambda: enhancer.enhance(optimized)), optimized)
+
+        batcher = MaterialBatcher()
+        batched = batcher.batch(enhanced)
+        if "batching" in wanted:
+            self._record("batching", format_name, scale, self._measure(lambda: batcher.batch(enhanced)), enhanced)
+
+        if wanted & {"physics", "colliders"}:
+            model = PhysicsInferenceModel()
+            objects = model.predict_objects(imported)
+        if "physics" in wanted:
+            self._record(
+                "physics", format_name, scale, self._measure(lambda: model.predict_objects(imported)), imported
+            )
+        if "colliders" in wanted:
+            generator = ColliderGenerator(max_workers=self.max_workers)
+            self._record(
+                "colliders", format_name, scale, self._measure(lambda: generator.generate(imported, objects)), imported
+            )
+
+        if "export" in wanted:
+            exporter = VRSceneBuilder(max_workers=self.max_workers)
+            scene = exporter.build(specification, batched, {})
+            target = workdir / "export"
+            self._record(
+                "export", format_name, scale, self._measure(lambda: exporter.export_package(scene, target)), batched
+            )
+
+        if "end-to-end" in wanted:
+            target = workdir / "end-to-end"
+            self._record(
+                "end-to-end",
+                format_name,
+                scale,
+                self._measure(lambda: run_conversion(specification, target, max_workers=self.max_workers)),
+                imported,
+            )
+
+    def run(self) -> Dict[str, object]:
+        """Run every benchmark on every (scale, format) pair and return the results document."""
+
+        self.results = []
+        started = time.perf_counter()
+        with tempfile.TemporaryDirectory(prefix="vrhouse-bench-", dir=self.workdir) as temporary:
+            root = Path(temporary)
+            if "startup" in self.benchmarks:
+                self._run_startup()
+            for scale in self.scales:
+                spec = house_spec(scale, seed=self.seed)
+                for format_name in self.formats:
+                    model_dir = root / f"{scale}-{format_name}"
+                    house = generate_house(spec, model_dir / f"house{FORMAT_SUFFIXES[format_name]}")
+                    self._run_model(house.path, format_name, scale, model_dir)
+        return {
+            "version": RESULTS_VERSION,
+            "environment": environment(),
+            "settings": {
+                "scales": list(self.scales),
+                "formats": list(self.formats),
+                "benchmarks": list(self.benchmarks),
+                "repeats": self.repeats,
+                "warmup": self.warmup,
+                "seed": self.seed,
+                "max_workers": self.max_workers,
+            },
+            "wall_seconds": round(time.perf_counter() - started, 3),
+            "results": [result.to_dict() for result in self.results],
+        }
+
+
+def environment() -> Dict[str, object]:
+    """Machine and code identity stored with results, so baselines are compared like for like."""
+
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            capture_output=True,
+            text=True,
+            timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        revision = None
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "revision": revision,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def write_results(results: Dict[str, object], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+def load_results(path: Path) -> Dict[str, object]:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def compare_results(
+    current: Dict[str, object], baseline: Dict[str, object], *, threshold: float = 0.10
+) -> List[Comparison]:
+    """Compare median timings by benchmark name.
+
+    A benchmark regresses when its median is more than ``threshold`` (a fraction)
+    slower than the baseline and the difference exceeds ``MIN_SIGNIFICANT_SECONDS``;
+    improvements are reported symmetrically. Benchmarks present on only one side
+    are reported as ``new`` or ``missing``.
+    """
+
+    before = {entry["name"]: float(entry["median"]) for entry in baseline.get("results", [])}
+    after = {entry["name"]: float(entry["median"]) for entry in current.get("results", [])}
+    comparisons: List[Comparison] = []
+    for name in list(after) + [name for name in before if name not in after]:
+        if name not in before:
+            comparisons.append(Comparison(name, "new", current=after[name]))
+            continue
+        if name not in after:
+            comparisons.append(Comparison(name, "missing", baseline=before[name]))
+            continue
+        old, new = before[name], after[name]
+        ratio = new / old if old > 0 else float("inf")
+        status = "unchanged"
+        if abs(new - old) >= MIN_SIGNIFICANT_SECONDS:
+            if ratio > 1.0 + threshold:
+                status = "regression"
+            elif ratio < 1.0 - threshold:
+                status = "improvement"
+        comparisons.append(Comparison(name, status, old, new, round(ratio, 4)))
+    return comparisons
+
+
+def format_results(results: Iterable[Dict[str, object]]) -> str:
+    header = f"{'benchmark':<32}{'median s':>11}{'min s':>11}{'triangles':>12}"
+    lines = [header, "-" * len(header)]
+    for entry in results:
+        lines.append(f"{entry['name']:<32}{entry['median']:>11.4f}{entry['min']:>11.4f}{entry['triangles']:>12}")
+    return "\n".join(lines)
+
+
+def format_comparison(comparisons: Iterable[Comparison]) -> str:
+    header = f"{'benchmark':<32}{'baseline s':>12}{'current s':>12}{'ratio':>8}  status"
+    lines = [header, "-" * (len(header) + 4)]
+    for item in comparisons:
+        baseline = f"{item.baseline:.4f}" if item.baseline is not None else "-"
+        current = f"{item.current:.4f}" if item.current is not None else "-"
+        ratio = f"{item.ratio:.2f}" if item.ratio is not None else "-"
+        lines.append(f"{item.name:<32}{baseline:>12}{current:>12}{ratio:>8}  {item.status}")
+    return "\n".join(lines)
+
+
+__all__ = [
+    "BENCHMARKS",
+    "HEAVY_MODULES",
+    "BenchmarkResult",
+    "BenchmarkSuite",
+    "Comparison",
+    "compare_results",
+    "environment",
+    "format_comparison",
+    "format_results",
+    "load_results",
+    "write_results",
+]
@@ -0,0 +1,611 @@
+"""Deterministic synthetic house models (OBJ, glTF/GLB, IFC) for benchmarks."""
+from __future__ import annotations
+
+import hashlib
+import json
+import struct
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from vrhouse.core import PipelineError
+from vrhouse.pipeline.importers.gltf_importer import Y_UP_TO_Z_UP
+from vrhouse.pipeline.processors.textures import encode_png
+
+# Base colours written to the MTL/glTF material tables.
+MATERIALS: Dict[str, Tuple[float, float, float]] = {
+    "parede": (0.92, 0.90, 0.86),
+    "piso": (0.55, 0.42, 0.30),
+    "madeira": (0.45, 0.30, 0.18),
+    "tecido": (0.30, 0.35, 0.55),
+    "metal": (0.70, 0.70, 0.72),
+}
+FURNITURE = ("mesa", "cadeira", "sofa", "luminaria")
+
+
+@dataclass(frozen=True)
+class HouseSpec:
+    """Size and detail of a generated house.
+
+    Rooms form a ``rooms_x`` x ``rooms_y`` grid on every floor. ``detail`` is the
+    number of subdivisions per box edge (a box has ``12 * detail**2`` triangles)
+    and drives the triangle count of walls and furniture; ``furniture_per_room``
+    instances are drawn from a few shared templates, so the instancing stage has
+    real repetition to find. ``texture_size`` > 0 gives every material a
+    procedural PNG texture of that size (MTL ``map_Kd`` / glTF ``baseColorTexture``).
+    """
+
+    floors: int = 1
+    rooms_x: int = 3
+    rooms_y: int = 3
+    furniture_per_room: int = 4
+    detail: int = 4
+    room_size: float = 4.0
+    floor_height: float = 3.0
+    texture_size: int = 0
+    seed: int = 7
+
+
+SCALES: Dict[str, HouseSpec] = {
+    "tiny": HouseSpec(floors=1, rooms_x=2, rooms_y=2, furniture_per_room=2, detail=2, texture_size=64),
+    "small": HouseSpec(floors=1, rooms_x=3, rooms_y=3, furniture_per_room=4, detail=4, texture_size=256),
+    "medium": HouseSpec(floors=2, rooms_x=4, rooms_y=4, furniture_per_room=6, detail=6, texture_size=1024),
+    "large": HouseSpec(floors=3, rooms_x=6, rooms_y=6, furniture_per_room=8, detail=10, texture_size=2048),
+}
+
+
+def house_spec(scale: str, **overrides: object) -> HouseSpec:
+    """Return the preset ``scale`` with optional field overrides (``seed=``, ``detail=``...)."""
+
+    try:
+        spec = SCALES[scale]
+    except KeyError as exc:
+        raise PipelineError(f"Unknown benchmark scale {scale!r}; expected one of {sorted(SCALES)}") from exc
+    return replace(spec, **overrides) if overrides else spec
+
+
+@dataclass
+class Part:
+    """One mesh of the house in local coordinates plus its world transform."""
+
+    name: str
+    material: str
+    positions: np.ndarray
+    normals: np.ndarray
+    uvs: np.ndarray
+    indices: np.ndarray
+    transform: np.ndarray
+    ifc_class: str = "IFCFURNISHINGELEMENT"
+
+    @property
+    def triangle_count(self) -> int:
+        return int(self.indices.shape[0])
+
+    def world_positions(self) -> np.ndarray:
+        return (self.positions @ self.transform[:3, :3].T + self.transform[:3, 3]).astype(np.float32)
+
+    def world_normals(self) -> np.ndarray:
+        return (self.normals @ self.transform[:3, :3].T).astype(np.float32)
+
+
+@dataclass
+class GeneratedHouse:
+    spec: HouseSpec
+    path: Path
+    files: List[Path] = field(default_factory=list)
+    parts: int = 0
+    triangles: int = 0
+    furniture: int = 0
+
+
+# -- primitive geometry --------------------------------------------------------------------
+_FACES = (
+    # normal axis, sign, (u axis, v axis)
+    (0, 1.0, (1, 2)),
+    (0, -1.0, (2, 1)),
+    (1, 1.0, (2, 0)),
+    (1, -1.0, (0, 2)),
+    (2, 1.0, (0, 1)),
+    (2, -1.0, (1, 0)),
+)
+
+
+def box(size: Tuple[float, float, float], detail: int, center: Tuple[float, float, float] = (0.0, 0.0, 0.0)):
+    """Axis-aligned box with ``detail`` x ``detail`` quads per face (positions, normals, uvs, indices)."""
+
+    detail = max(1, int(detail))
+    half = np.asarray(size, dtype=np.float64) / 2.0
+    steps = np.linspace(-1.0, 1.0, detail + 1)
+    grid_u, grid_v = np.meshgrid(steps, steps, indexing="ij")
+    grid_u, grid_v = grid_u.ravel(), grid_v.ravel()
+    quad = np.arange(detail * (detail + 1)).reshape(detail, detail + 1)[:, :-1].ravel()
+    # Quad corners (u, v), (u+1, v), (u+1, v+1), (u, v+1) in the (detail + 1)^2 vertex grid.
+    a, b, c, d = quad, quad + detail + 1, quad + detail + 2, quad + 1
+    face_triangles = np.concatenate([np.stack([a, b, c], 1), np.stack([a, c, d], 1)])
+
+    positions, normals, uvs, indices = [], [], [], []
+    for axis, sign, (u_axis, v_axis) in _FACES:
+        local = np.zeros((grid_u.size, 3))
+        local[:, axis] = sign
+        local[:, u_axis] = grid_u
+        local[:, v_axis] = grid_v
+        normal = np.zeros(3)
+        normal[axis] = sign
+        offset = sum(block.shape[0] for block in positions)
+        positions.append(local * half + np.asarray(center))
+        normals.append(np.broadcast_to(normal, local.shape))
+        uvs.append(np.stack([(grid_u + 1) / 2, (grid_v + 1) / 2], 1))
+        indices.append(face_triangles + offset)
+    return (
+        np.concatenate(positions).astype(np.float32),
+        np.concatenate(normals).astype(np.float32),
+        np.concatenate(uvs).astype(np.float32),
+        np.concatenate(indices).astype(np.uint32),
+    )
+
+
+def sphere(radius: float, detail: int, center: Tuple[float, float, float] = (0.0, 0.0, 0.0)):
+    """Latitude/longitude sphere with ``4 * detail**2`` quads."""
+
+    rings, segments = max(2, 2 * detail), max(3, 4 * detail)
+    theta = np.linspace(0.0, np.pi, rings + 1)
+    phi = np.linspace(0.0, 2.0 * np.pi, segments + 1)
+    theta_grid, phi_grid = np.meshgrid(theta, phi, indexing="ij")
+    normals = np.stack(
+        [np.sin(theta_grid) * np.cos(phi_grid), np.sin(theta_grid) * np.sin(phi_grid), np.cos(theta_grid)], -1
+    ).reshape(-1, 3)
+    uvs = np.stack([phi_grid / (2 * np.pi), theta_grid / np.pi], -1).reshape(-1, 2)
+    quad = np.arange(rings * (segments + 1)).reshape(rings, segments + 1)[:, :-1].ravel()
+    a, b, c, d = quad, quad + segments + 1, quad + segments + 2, quad + 1
+    indices = np.concatenate([np.stack([a, b, c], 1), np.stack([a, c, d], 1)])
+    return (
+        (normals * radius + np.asarray(center)).astype(np.float32),
+        normals.astype(np.float32),
+        uvs.astype(np.float32),
+        indices.astype(np.uint32),
+    )
+
+
+def _merge(*pieces):
+    positions, normals, uvs, indices = [], [], [], []
+    offset = 0
+    for piece_positions, piece_normals, piece_uvs, piece_indices in pieces:
+        positions.append(piece_positions)
+        normals.append(piece_normals)
+        uvs.append(piece_uvs)
+        indices.append(piece_indices + offset)
+        offset += piece_positions.shape[0]
+    return (
+        np.concatenate(positions),
+        np.concatenate(normals),
+        np.concatenate(uvs),
+        np.concatenate(indices).astype(np.uint32),
+    )
+
+
+def _furniture_templates(detail: int) -> Dict[str, Tuple[str, tuple]]:
+    legs = [(x, y) for x in (-0.55, 0.55) for y in (-0.35, 0.35)]
+    table = _merge(
+        box((1.3, 0.9, 0.05), detail, (0.0, 0.0, 0.75)),
+        *[box((0.06, 0.06, 0.72), max(1, detail // 2), (x, y, 0.36)) for x, y in legs],
+    )
+    chair = _merge(
+        box((0.45, 0.45, 0.05), detail, (0.0, 0.0, 0.45)),
+        box((0.45, 0.05, 0.5), detail, (0.0, 0.2, 0.72)),
+        *[box((0.04, 0.04, 0.43), max(1, detail // 2), (x * 0.35, y * 0.5, 0.215)) for x, y in legs],
+    )
+    sofa = _merge(
+        box((1.9, 0.85, 0.4), detail, (0.0, 0.0, 0.2)),
+        box((1.9, 0.2, 0.45), detail, (0.0, 0.33, 0.62)),
+        *[sphere(0.22, max(1, detail // 2), (x, -0.05, 0.5)) for x in (-0.6, 0.0, 0.6)],
+    )
+    lamp = _merge(
+        box((0.3, 0.3, 0.03), max(1, detail // 2), (0.0, 0.0, 0.015)),
+        box((0.03, 0.03, 1.5), max(1, detail // 2), (0.0, 0.0, 0.78)),
+        sphere(0.18, detail, (0.0, 0.0, 1.6)),
+    )
+    return {
+        "mesa": ("madeira", table),
+        "cadeira": ("madeira", chair),
+        "sofa": ("tecido", sofa),
+        "luminaria": ("metal", lamp),
+    }
+
+
+def _translation(x: float, y: float, z: float, angle: float = 0.0) -> np.ndarray:
+    matrix = np.eye(4)
+    cosine, sine = np.cos(angle), np.sin(angle)
+    matrix[:2, :2] = ((cosine, -sine), (sine, cosine))
+    matrix[:3, 3] = (x, y, z)
+    return matrix
+
+
+def build_house(spec: HouseSpec) -> List[Part]:
+    """Lay out slabs, walls and furniture for ``spec``; the same spec always yields the same parts."""
+
+    rng = np.random.default_rng(spec.seed)
+    templates = _furniture_templates(spec.detail)
+    width, depth = spec.rooms_x * spec.room_size, spec.rooms_y * spec.room_size
+    thickness = 0.15
+    parts: List[Part] = []
+    for floor in range(spec.floors):
+        elevation = floor * spec.floor_height
+        slab = box((width, depth, 0.2), spec.detail)
+        parts.append(
+            Part(f"laje_{floor}", "piso", *slab, _translation(width / 2, depth / 2, elevation - 0.1), "IFCSLAB")
+        )
+        wall_height = spec.floor_height - 0.2
+        for line in range(spec.rooms_x + 1):
+            wall = box((thickness, depth, wall_height), spec.detail)
+            transform = _translation(line * spec.room_size, depth / 2, elevation + wall_height / 2)
+            parts.append(Part(f"parede_{floor}_x{line}", "parede", *wall, transform, "IFCWALL"))
+        for line in range(spec.rooms_y + 1):
+            wall = box((width, thickness, wall_height), spec.detail)
+            transform = _translation(width / 2, line * spec.room_size, elevation + wall_height / 2)
+            parts.append(Part(f"parede_{floor}_y{line}", "parede", *wall, transform, "IFCWALL"))
+        for room_x in range(spec.rooms_x):
+            for room_y in range(spec.rooms_y):
+                for item in range(spec.furniture_per_room):
+                    kind = FURNITURE[int(rng.integers(len(FURNITURE)))]
+                    material, geometry = templates[kind]
+                    margin = 1.0
+                    x = room_x * spec.room_size + margin + rng.random() * (spec.room_size - 2 * margin)
+                    y = room_y * spec.room_size + margin + rng.random() * (spec.room_size - 2 * margin)
+                    angle = float(rng.integers(4)) * np.pi / 2 + rng.normal(0.0, 0.05)
+                    name = f"{kind}_{floor}_{room_x}_{room_y}_{item}"
+                    parts.append(Part(name, material, *geometry, _translation(x, y, elevation, angle)))
+    return parts
+
+
+def material_textures(spec: HouseSpec) -> Dict[str, bytes]:
+    """Deterministic PNG per material: its base colour modulated by planks/noise (empty without ``texture_size``)."""
+
+    size = spec.texture_size
+    if size <= 0:
+        return {}
+    y, x = np.mgrid[0:size, 0:size].astype(np.float32) / size
+    textures = {}
+    for index, (name, color) in enumerate(MATERIALS.items()):
+        noise = np.random.default_rng(spec.seed * 101 + index).random((size, size), dtype=np.float32)
+        grain = 0.85 + 0.1 * np.sin((x * (4 + index) + 0.05 * noise) * 2 * np.pi) + 0.05 * noise
+        rgb = np.clip(np.asarray(color, dtype=np.float32) * grain[..., None], 0.0, 1.0)
+        textures[name] = encode_png(np.rint(rgb * 255).astype(np.uint8))
+    return textures
+
+
+def _texture_file(path: Path, material: str) -> Path:
+    return path.with_name(f"{path.stem}_{material}.png")
+
+
+# -- writers ---------------------------------------------------------------------------------
+def write_obj(parts: List[Part], path: Path, textures: Optional[Dict[str, bytes]] = None) -> List[Path]:
+    """Write world-space geometry as OBJ (one ``o`` group per part) plus its MTL library and textures."""
+
+    library = path.with_suffix(".mtl")
+    files = [path, library]
+    with library.open("w", encoding="utf-8", newline="\n") as handle:
+        for name, (red, green, blue) in MATERIALS.items():
+            handle.write(f"newmtl {name}\nKd {red:.3f} {green:.3f} {blue:.3f}\n")
+            if textures and name in textures:
+                image = _texture_file(path, name)
+                image.write_bytes(textures[name])
+                files.append(image)
+                handle.write(f"map_Kd {image.name}\n")
+            handle.write("\n")
+    with path.open("w", encoding="utf-8", newline="\n") as handle:
+        handle.write(f"# vrhouse synthetic house\nmtllib {library.name}\n")
+        offset = 1
+        for part in parts:
+            handle.write(f"o {part.name}\nusemtl {part.material}\n")
+            np.savetxt(handle, part.world_positions(), fmt="v %.5f %.5f %.5f")
+            np.savetxt(handle, part.uvs, fmt="vt %.4f %.4f")
+            np.savetxt(handle, part.world_normals(), fmt="vn %.4f %.4f %.4f")
+            corners = np.repeat(part.indices.astype(np.int64) + offset, 3, axis=1)
+            np.savetxt(handle, corners, fmt="f %d/%d/%d %d/%d/%d %d/%d/%d")
+            offset += part.positions.shape[0]
+    return files
+
+
+def _gltf_document(parts: List[Part], images: Optional[Dict[str, object]] = None) -> Tuple[dict, bytes]:
+    """glTF JSON and binary buffer; ``images`` maps a material to PNG bytes (embedded) or a URI."""
+
+    material_names = list(MATERIALS)
+    buffer = bytearray()
+    views: List[dict] = []
+    accessors: List[dict] = []
+
+    def add(array: np.ndarray, accessor_type: str, component: int, target: int, bounds: bool = False) -> int:
+        data = np.ascontiguousarray(array).tobytes()
+        buffer.extend(b"\0" * (-len(buffer) % 4))
+        views.append({"buffer": 0, "byteOffset": len(buffer), "byteLength": len(data), "target": target})
+        buffer.extend(data)
+        accessor = {
+            "bufferView": len(views) - 1,
+            "componentType": component,
+            "count": int(array.shape[0]),
+            "type": accessor_type,
+        }
+        if bounds:
+            accessor["min"] = array.min(axis=0).tolist()
+            accessor["max"] = array.max(axis=0).tolist()
+        accessors.append(accessor)
+        return len(accessors) - 1
+
+    meshes, nodes = [], []
+    for part in parts:
+        primitive = {
+            "attributes": {
+                "POSITION": add(part.positions, "VEC3", 5126, 34962, bounds=True),
+                "NORMAL": add(part.normals, "VEC3", 5126, 34962),
+                "TEXCOORD_0": add(part.uvs, "VEC2", 5126, 34962),
+            },
+            "indices": add(part.indices.reshape(-1), "SCALAR", 5125, 34963),
+            "material": material_names.index(part.material),
+            "mode": 4,
+        }
+        meshes.append({"name": part.name, "primitives": [primitive]})
+        # glTF scenes are +Y up, -Z forward: rotate the Z-up house into that frame.
+        matrix = Y_UP_TO_Z_UP.T @ part.transform
+        nodes.append({"name": part.name, "mesh": len(meshes) - 1, "matrix": matrix.T.reshape(-1).tolist()})
+    document = {
+        "asset": {"version": "2.0", "generator": "vrhouse.benchmarks.synthetic"},
+        "scene": 0,
+        "scenes": [{"nodes": list(range(len(nodes)))}],
+        "nodes": nodes,
+        "meshes": meshes,
+        "materials": [
+            {"name": name, "pbrMetallicRoughness": {"baseColorFactor": [*color, 1.0]}}
+            for name, color in MATERIALS.items()
+        ],
+        "accessors": accessors,
+        "bufferViews": views,
+    }
+    if images:
+        document["images"], document["textures"] = [], []
+        for material in document["materials"]:
+            source = images.get(material["name"])
+            if source is None:
+                continue
+            if isinstance(source, bytes):
+                buffer.extend(b"\0" * (-len(buffer) % 4))
+                views.append({"buffer": 0, "byteOffset": len(buffer), "byteLength": len(source)})
+                buffer.extend(source)
+                document["images"].append({"bufferView": len(views) - 1, "mimeType": "image/png"})
+            else:
+                document["images"].append({"uri": str(source)})
+            document["textures"].append({"source": len(document["images"]) - 1})
+            material["pbrMetallicRoughness"]["baseColorTexture"] = {"index": len(document["textures"]) - 1}
+    document["buffers"] = [{"byteLength": len(buffer)}]
+    return document, bytes(buffer)
+
+
+def write_gltf(parts: List[Part], path: Path, textures: Optional[Dict[str, bytes]] = None) -> List[Path]:
+    """Write a ``.glb`` (single binary chunk) or a ``.gltf`` with an external ``.bin``.
+
+    Every part keeps its own mesh and a node matrix, as most BIM exporters do, so
+    identical furniture is repeated geometry rather than shared glTF meshes. Node
+    matrices place the house in glTF's Y-up frame.
+    Textures are embedded in GLB files and written next to ``.gltf`` files.
+    """
+
+    textures = textures or {}
+    binary_format = path.suffix.lower() == ".glb"
+    images: Dict[str, object] = dict(textures) if binary_format else {}
+    image_files = []
+    if not binary_format:
+        for material, data in textures.items():
+            image = _texture_file(path, material)
+            image.write_bytes(data)
+            image_files.append(image)
+            images[material] = image.name
+    document, binary = _gltf_document(parts, images)
+    if binary_format:
+        payload = json.dumps(document, separators=(",", ":")).encode("utf-8")
+        payload += b" " * (-len(payload) % 4)
+        binary += b"\0" * (-len(binary) % 4)
+        with path.open("wb") as handle:
+            handle.write(struct.pack("<III", 0x46546C67, 2, 12 + 8 + len(payload) + 8 + len(binary)))
+            handle.write(struct.pack("<II", len(payload), 0x4E4F534A) + payload)
+            handle.write(struct.pack("<II", len(binary), 0x004E4942) + binary)
+        return [path]
+    external = path.with_suffix(".bin")
+    document["buffers"][0]["uri"] = external.name
+    external.write_bytes(binary)
+    path.write_text(json.dumps(document, separators=(",", ":")), encoding="utf-8")
+    return [path, external, *image_files]
+
+
+def _global_id(seed: int, name: str) -> str:
+    """22-character IFC GlobalId derived from the part name (stable across runs)."""
+
+    alphabet = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz_$"
+    number = int.from_bytes(hashlib.sha256(f"{seed}:{name}".encode()).digest()[:16], "big")
+    characters = []
+    for _ in range(22):
+        number, remainder = divmod(number, 64)
+        characters.append(alphabet[remainder])
+    return "".join(characters)
+
+
+def write_ifc(parts: List[Part], path: Path, spec: Optional[HouseSpec] = None) -> List[Path]:
+    """Write an IFC4 STEP file in millimetres with storeys, spaces and one element per part.
+
+    Walls and slabs are ``IfcExtrudedAreaSolid`` boxes (a BIM authoring tool's
+    12 triangles, whatever ``detail`` says); furniture goes through one
+    ``IfcRepresentationMap`` per template, tables as ``IfcFacetedBrep`` and the
+    rest as ``IfcTriangulatedFaceSet``; spaces are extruded room footprints.
+    Doors and windows only carry placements. Materials are associated with
+    ``IfcRelAssociatesMaterial``.
+    """
+
+    spec = spec or HouseSpec()
+    lines: List[str] = []
+    counter = [0]
+
+    def entity(text: str) -> int:
+        counter[0] += 1
+        lines.append(f"#{counter[0]}={text};")
+        return counter[0]
+
+    def number(value: float) -> str:
+        return f"{float(value):.4f}"
+
+    def length(value: float) -> str:
+        return f"{float(value) * 1000.0:.2f}"
+
+    def point(values: Sequence[float]) -> int:
+        return entity("IFCCARTESIANPOINT(({}))".format(",".join(length(value) for value in values)))
+
+    def placement(matrix: np.ndarray, relative_to: Optional[int]) -> int:
+        origin = point(matrix[:3, 3])
+        axis = entity("IFCDIRECTION(({}))".format(",".join(number(value) for value in matrix[:3, 2])))
+        reference = entity("IFCDIRECTION(({}))".format(",".join(number(value) for value in matrix[:3, 0])))
+        local = entity(f"IFCAXIS2PLACEMENT3D(#{origin},#{axis},#{reference})")
+        parent = f"#{relative_to}" if relative_to is not None else "$"
+        return entity(f"IFCLOCALPLACEMENT({parent},#{local})")
+
+    def body(kind: str, items: Sequence[int]) -> int:
+        return entity(f"IFCSHAPEREPRESENTATION(#{context},'Body','{kind}',({','.join(f'#{item}' for item in items)}))")
+
+    def extruded_box(lower: Sequence[float], upper: Sequence[float]) -> int:
+        centre = entity(f"IFCAXIS2PLACEMENT2D(#{point(((lower[0] + upper[0]) / 2, (lower[1] + upper[1]) / 2))},$)")
+        profile = entity(
+            f"IFCRECTANGLEPROFILEDEF(.AREA.,$,#{centre},{length(upper[0] - lower[0])},{length(upper[1] - lower[1])})"
+        )
+        position = entity(f"IFCAXIS2PLACEMENT3D(#{point((0.0, 0.0, lower[2]))},$,$)")
+        solid = entity(f"IFCEXTRUDEDAREASOLID(#{profile},#{position},#{up},{length(upper[2] - lower[2])})")
+        return body("SweptSolid", [solid])
+
+    def face_set(part: Part) -> int:
+        coordinates = ",".join("({})".format(",".join(length(value) for value in row)) for row in part.positions)
+        points = entity(f"IFCCARTESIANPOINTLIST3D(({coordinates}))")
+        triangles = ",".join("({},{},{})".format(*(int(index) + 1 for index in row)) for row in part.indices)
+        return body("Tessellation", [entity(f"IFCTRIANGULATEDFACESET(#{points},$,.T.,({triangles}),$)")])
+
+    def brep(part: Part) -> int:
+        points = [point(row) for row in part.positions]
+        faces = []
+        for row in part.indices:
+            loop = entity("IFCPOLYLOOP(({}))".format(",".join(f"#{points[int(index)]}" for index in row)))
+            faces.append(entity(f"IFCFACE((#{entity(f'IFCFACEOUTERBOUND(#{loop},.T.)')}))"))
+        shell = entity("IFCCLOSEDSHELL(({}))".format(",".join(f"#{face}" for face in faces)))
+        return body("Brep", [entity(f"IFCFACETEDBREP(#{shell})")])
+
+    def product_shape(representation: int) -> int:
+        return entity(f"IFCPRODUCTDEFINITIONSHAPE($,$,(#{representation}))")
+
+    unit = entity("IFCSIUNIT(*,.LENGTHUNIT.,.MILLI.,.METRE.)")
+    units = entity(f"IFCUNITASSIGNMENT((#{unit}))")
+    up = entity("IFCDIRECTION((0.,0.,1.))")
+    world = entity(f"IFCAXIS2PLACEMENT3D(#{point((0.0, 0.0, 0.0))},$,$)")
+    context = entity(f"IFCGEOMETRICREPRESENTATIONCONTEXT($,'Model',3,1.E-05,#{world},$)")
+    entity(f"IFCPROJECT('{_global_id(spec.seed, 'project')}',$,'Casa sintetica',$,$,$,$,(#{context}),#{units})")
+    site = placement(np.eye(4), None)
+    entity(f"IFCBUILDING('{_global_id(spec.seed, 'building')}',$,'Casa',$,$,#{site},$,$,.ELEMENT.,$,$,$)")
+    storeys: Dict[int, int] = {}
+    wall_height = spec.floor_height - 0.2
+    for floor in range(spec.floors):
+        storey = placement(_translation(0.0, 0.0, floor * spec.floor_height), site)
+        storeys[floor] = storey
+        entity(
+            f"IFCBUILDINGSTOREY('{_global_id(spec.seed, f'storey{floor}')}',$,'Pavimento {floor}',$,$,"
+            f"#{storey},$,$,.ELEMENT.,{length(floor * spec.floor_height)})"
+        )
+        for room_x in range(spec.rooms_x):
+            for room_y in range(spec.rooms_y):
+                room = placement(_translation(room_x * spec.room_size, room_y * spec.room_size, 0.0), storey)
+                name = f"comodo_{floor}_{room_x}_{room_y}"
+                footprint = product_shape(extruded_box((0.0, 0.0, 0.0), (spec.room_size, spec.room_size, wall_height)))
+                entity(
+                    f"IFCSPACE('{_global_id(spec.seed, name)}',$,'{name}',$,$,#{room},#{footprint},$,.ELEMENT.,.INTERNAL.,$)"
+                )
+                door = placement(_translation(spec.room_size / 2, 0.0, 0.0), room)
+                entity(f"IFCDOOR('{_global_id(spec.seed, 'porta_' + name)}',$,'porta_{name}',$,$,#{door},$,$,2.1,0.9,$,$,$)")
+                window = placement(_translation(0.0, spec.room_size / 2, 1.0, np.pi / 2), room)
+                entity(
+                    f"IFCWINDOW('{_global_id(spec.seed, 'janela_' + name)}',$,'janela_{name}',$,$,#{window},$,$,1.2,1.0,$,$,$)"
+                )
+
+    # Furniture of one template shares its geometry arrays, hence one representation map per template.
+    templates: Dict[int, int] = {}
+    members: Dict[str, List[int]] = {}
+    for part in parts:
+        floor = min(int(round(part.transform[2, 3] / spec.floor_height)), spec.floors - 1)
+        local = part.transform.copy()
+        local[2, 3] -= floor * spec.floor_height
+        element = placement(local, storeys.get(floor, site))
+        if part.ifc_class == "IFCFURNISHINGELEMENT":
+            if id(part.positions) not in templates:
+                mapped = brep(part) if part.name.startswith("mesa_") else face_set(part)
+                templates[id(part.positions)] = entity(f"IFCREPRESENTATIONMAP(#{world},#{mapped})")
+            operator = entity(f"IFCCARTESIANTRANSFORMATIONOPERATOR3D($,$,#{point((0.0, 0.0, 0.0))},$,$)")
+            item = entity(f"IFCMAPPEDITEM(#{templates[id(part.positions)]},#{operator})")
+            representation = body("MappedRepresentation", [item])
+        else:
+            representation = extruded_box(part.positions.min(axis=0), part.positions.max(axis=0))
+        shape = product_shape(representation)
+        members.setdefault(part.material, []).append(
+            entity(
+                f"{part.ifc_class}('{_global_id(spec.seed, part.name)}',$,'{part.name}',$,'{part.material}',"
+                f"#{element},#{shape},$)"
+            )
+        )
+    for material, elements in members.items():
+        relating = entity(f"IFCMATERIAL('{material}',$,$)")
+        related = ",".join(f"#{element}" for element in elements)
+        entity(f"IFCRELASSOCIATESMATERIAL('{_global_id(spec.seed, 'material_' + material)}',$,$,$,({related}),#{relating})")
+    header = (
+        "ISO-10303-21;\nHEADER;\nFILE_DESCRIPTION(('ViewDefinition [ReferenceView]'),'2;1');\n"
+        f"FILE_NAME('{path.name}','1970-01-01T00:00:00',('vrhouse'),('vrhouse'),'','vrhouse.benchmarks','');\n"
+        "FILE_SCHEMA(('IFC4'));\nENDSEC;\nDATA;\n"
+    )
+    path.write_text(header + "\n".join(lines) + "\nENDSEC;\nEND-ISO-10303-21;\n", encoding="ascii")
+    return [path]
+
+
+def generate_house(spec: HouseSpec, path: Path) -> GeneratedHouse:
+    """Write the house described by ``spec`` in the format implied by ``path``'s suffix."""
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    parts = build_house(spec)
+    suffix = path.suffix.lower()
+    if suffix == ".obj":
+        files = write_obj(parts, path, material_textures(spec))
+    elif suffix in (".gltf", ".glb"):
+        files = write_gltf(parts, path, material_textures(spec))
+    elif suffix == ".ifc":
+        files = write_ifc(parts, path, spec)
+    else:
+        raise PipelineError(f"Cannot generate a synthetic house as {suffix or path.name}; use .obj, .gltf, .glb or .ifc")
+    triangles = sum(part.triangle_count for part in parts)
+    if suffix == ".ifc":
+        # Walls and slabs are written as extruded boxes, which triangulate to 12 triangles each.
+        triangles = sum(part.triangle_count if part.ifc_class == "IFCFURNISHINGELEMENT" else 12 for part in parts)
+    return GeneratedHouse(
+        spec=spec,
+        path=path,
+        files=files,
+        parts=len(parts),
+        triangles=triangles,
+        furniture=sum(1 for part in parts if part.ifc_class == "IFCFURNISHINGELEMENT"),
+    )
+
+
+__all__ = [
+    "GeneratedHouse",
+    "HouseSpec",
+    "Part",
+    "SCALES",
+    "box",
+    "build_house",
+    "generate_house",
+    "house_spec",
+    "material_textures",
+    "sphere",
+    "write_gltf",
+    "write_ifc",
+    "write_obj",
+]
@@ -2,15 +2,26 @@
 from __future__ import annotations
 
 import argparse
+import sys
+import time
 from pathlib import Path
 
-from vrhouse.core import SceneSpecification
+from vrhouse.pipeline.cache import DEFAULT_MAX_BYTES
 from vrhouse.pipeline.importers.multi_importer import iter_supported_suffixes, validate_source_path
-from vrhouse.pipeline.runner import run_conversion
+
+# The pipeline, batch and service modules (NumPy, cryptography, asyncio) are
+# imported inside the command that needs them, so ``--help`` and argument
+# errors answer without loading any of them.
 
 
 def build_parser() -> argparse.ArgumentParser:
-    parser = argparse.ArgumentParser(description="Convert 3D house plans into VR experiences")
+    parser = argparse.ArgumentParser(
+        description="Convert 3D house plans into VR experiences",
+        epilog=(
+            "Use 'vrhouse batch MANIFEST OUTPUT' to convert many projects at once and "
+            "'vrhouse serve' to run a local conversion service."
+        ),
+    )
     formats = ", ".join(sorted({ext for ext in iter_supported_suffixes()}))
     parser.add_argument("source", type=Path, help=f"Path to the 3D model ({formats})")
     parser.add_argument("project_name", type=str, help="Name of the VR project")
@@ -23,14 +34,223 @@ def build_parser() -> argparse.ArgumentParser:
         default=None,
         help="Base64 key to encrypt the package. A new key is generated if omitted.",
     )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=None,
+        help="Directory for the content-addressed stage cache. Unchanged stages are skipped on reruns.",
+    )
+    parser.add_argument(
+        "--cache-size-mb",
+        type=int,
+        default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        help="Maximum stage cache size in megabytes (least recently used entries are evicted).",
+    )
+    parser.add_argument(
+        "--config",
+        type=Path,
+        default=None,
+        help="YAML configuration (default: config/default.yaml); flags given on the command line win.",
+    )
+    parser.add_argument(
+        "--compress-assets",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help=(
+            "Compress package sections (quantized meshes, delta-encoded indices) before encryption "
+            "(default: export.compress_assets of the configuration)."
+        ),
+    )
+    parser.add_argument(
+        "--compression",
+        choices=("auto", "zstd", "zlib"),
+        default="auto",
+        help="Codec used with --compress-assets (auto picks zstd when installed).",
+    )
+    parser.add_argument(
+        "--compression-level",
+        type=int,
+        default=None,
+        help="Codec level (zstd 1-22, zlib 1-9). Defaults to a size-oriented level.",
+    )
+    parser.add_argument(
+        "--chunks",
+        choices=("floor", "room", "grid"),
+        default=None,
+        help="Split the package into streamable chunks per floor, room or uniform grid cell.",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=float,
+        default=8.0,
+        help="Edge of the grid cells in metres with --chunks grid.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help=(
+            "Record per-stage time, CPU, memory (tracemalloc) and sizes; writes <project>.trace.json "
+            "(Chrome trace) and <project>.metrics.jsonl next to the package and prints a summary."
+        ),
+    )
     return parser
 
 
+def resolve_compress_assets(args: argparse.Namespace) -> bool:
+    """``--compress-assets``/``--no-compress-assets`` when given, else ``export.compress_assets``."""
+
+    if args.compress_assets is not None:
+        return args.compress_assets
+    from vrhouse.config import config_value, load_config
+
+    return bool(config_value(load_config(args.config), "export.compress_assets", False))
+
+
+def build_batch_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="vrhouse batch",
+        description="Convert every project listed in a manifest using a pool of worker processes",
+    )
+    parser.add_argument(
+        "manifest",
+        type=str,
+        help="CSV or JSON manifest (source, project_name, output, ...) or a glob such as 'plans/*.ifc'",
+    )
+    parser.add_argument("output", type=Path, help="Root directory; each job writes to <output>/<project_name>")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument(
+        "--memory-limit-mb",
+        type=int,
+        default=None,
+        help="Address-space limit per worker; jobs exceeding it fail without stopping the batch (POSIX).",
+    )
+    parser.add_argument(
+        "--report",
+        type=Path,
+        default=None,
+        help="Where to write the JSON summary (default: <output>/batch-report.json)",
+    )
+    parser.add_argument("--cache-dir", type=Path, default=None, help="Shared content-addressed stage cache")
+    parser.add_argument("--cache-size-mb", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024))
+    parser.add_argument("--config", type=Path, default=None, help="YAML configuration (default: config/default.yaml)")
+    parser.add_argument(
+        "--compress-assets",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Compress package sections (default: export.compress_assets of the configuration)",
+    )
+    parser.add_argument("--compression", choices=("auto", "zstd", "zlib"), default="auto")
+    parser.add_argument("--compression-level", type=int, default=None)
+    return parser
+
+
+def run_batch_cli(argv: list[str]) -> None:
+    parser = build_batch_parser()
+    args = parser.parse_args(argv)
+    from vrhouse.pipeline.batch import BatchOptions, JobResult, load_manifest, run_batch, write_report
+
+    jobs = load_manifest(args.manifest, args.output)
+    options = BatchOptions(
+        memory_limit_mb=args.memory_limit_mb,
+        cache_dir=args.cache_dir,
+        cache_size_mb=args.cache_size_mb,
+        compress_assets=resolve_compress_assets(args),
+        compression=args.compression,
+        compression_level=args.compression_level,
+    )
+
+    def report_progress(result: JobResult) -> None:
+        status = "ok" if result.status == "ok" else "FALHOU"
+        print(f"[{status}] {result.project_name} ({result.wall_seconds:.1f}s)", file=sys.stderr, flush=True)
+
+    started = time.perf_counter()
+    results = run_batch(jobs, options, max_workers=args.jobs, on_result=report_progress)
+    report_path = args.report or args.output / "batch-report.json"
+    report = write_report(results, report_path, wall_seconds=time.perf_counter() - started)
+
+    parser.exit(
+        status=1 if report["failed"] else 0,
+        message=(
+            "{succeeded}/{jobs} projects converted in {wall_seconds:.1f}s; report written to {path}\n".format(
+                path=report_path, **report
+            )
+        ),
+    )
+
+
+def build_serve_parser() -> argparse.ArgumentParser:
+    from vrhouse.service.server import DEFAULT_HOST, DEFAULT_MAX_UPLOAD_MB, DEFAULT_PORT
+
+    parser = argparse.ArgumentParser(
+        prog="vrhouse serve",
+        description="Run a local HTTP conversion service with a job queue and progress streaming",
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Interface to bind (default: localhost only)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=None, help="Concurrent conversions (default: half the CPUs)")
+    parser.add_argument(
+        "--root",
+        type=Path,
+        default=Path("vrhouse-jobs"),
+        help="Directory for uploads and finished packages (one subdirectory per job)",
+    )
+    parser.add_argument("--max-upload-mb", type=int, default=DEFAULT_MAX_UPLOAD_MB)
+    parser.add_argument("--memory-limit-mb", type=int, default=None, help="Address-space limit per job (POSIX)")
+    parser.add_argument("--cache-dir", type=Path, default=None, help="Shared content-addressed stage cache")
+    parser.add_argument("--cache-size-mb", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024))
+    parser.add_argument("--config", type=Path, default=None, help="YAML configuration (default: config/default.yaml)")
+    parser.add_argument(
+        "--compress-assets",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Compress package sections (default: export.compress_assets of the configuration)",
+    )
+    parser.add_argument("--compression", choices=("auto", "zstd", "zlib"), default="auto")
+    parser.add_argument("--compression-level", type=int, default=None)
+    return parser
+
+
+def run_serve_cli(argv: list[str]) -> None:
+    args = build_serve_parser().parse_args(argv)
+    from vrhouse.pipeline.batch import BatchOptions
+    from vrhouse.service.server import serve
+
+    options = BatchOptions(
+        memory_limit_mb=args.memory_limit_mb,
+        cache_dir=args.cache_dir,
+        cache_size_mb=args.cache_size_mb,
+        compress_assets=resolve_compress_assets(args),
+        compression=args.compression,
+        compression_level=args.compression_level,
+    )
+    serve(
+        args.root,
+        host=args.host,
+        port=args.port,
+        max_workers=args.workers,
+        max_upload_mb=args.max_upload_mb,
+        options=options,
+    )
+
+
 def run_cli(argv: list[str] | None = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "batch":
+        run_batch_cli(argv[1:])
+        return
+    if argv and argv[0] == "serve":
+        run_serve_cli(argv[1:])
+        return
+
     parser = build_parser()
     args = parser.parse_args(argv)
 
     validate_source_path(args.source)
+    from vrhouse.core import SceneSpecification
+    from vrhouse.pipeline.cache import StageCache
+    from vrhouse.pipeline.instrumentation import ChromeTraceObserver, JsonLinesObserver, format_summary
+    from vrhouse.pipeline.registry import EXPORTERS, default_registry
+    from vrhouse.pipeline.runner import run_conversion
 
     specification = SceneSpecification(
         project_name=args.project_name,
@@ -40,7 +260,34 @@ def run_cli(argv: list[str] | None = None) -> None:
         output_encryption_key=args.encryption_key,
     )
 
-    result = run_conversion(specification, args.output)
+    cache = StageCache(args.cache_dir, args.cache_size_mb * 1024 * 1024) if args.cache_dir else None
+    registry = default_registry()
+    exporter = registry.create(
+        EXPORTERS,
+        "vrpkg",
+        compress_assets=resolve_compress_assets(args),
+        compression=args.compression,
+        compression_level=args.compression_level,
+        chunking=args.chunks,
+        chunk_size=args.chunk_size,
+    )
+    observers = []
+    if args.profile:
+        observers = [
+            ChromeTraceObserver(args.output / f"{args.project_name}.trace.json"),
+            JsonLinesObserver(args.output / f"{args.project_name}.metrics.jsonl"),
+        ]
+    result = run_conversion(
+        specification,
+        args.output,
+        cache=cache,
+        exporter=exporter,
+        observers=observers,
+        trace_memory=args.profile,
+        registry=registry,
+    )
+    if args.profile:
+        print(format_summary(result["stage_metrics"]), file=sys.stderr)
 
     parser.exit(
         message=(
@@ -0,0 +1,53 @@
+"""Loading of the YAML pipeline configuration (``config/default.yaml``).
+
+Command line flags override the file: each command reads the configuration
+once and only falls back to it for options the user did not pass.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# ``config/`` sits at the root of the source checkout, next to ``src/``.
+DEFAULT_CONFIG_PATH = Path(__file__).resolve().parents[2] / "config" / "default.yaml"
+
+
+def load_config(path: Optional[Path] = None) -> Dict[str, Any]:
+    """Read the configuration at ``path``, or the default one when omitted.
+
+    A missing default file (e.g. an installed wheel) yields an empty
+    configuration; a missing or malformed explicit ``path`` raises ``PipelineError``.
+    """
+
+    import yaml
+
+    from vrhouse.core import PipelineError
+
+    target = Path(path) if path is not None else DEFAULT_CONFIG_PATH
+    if not target.is_file():
+        if path is None:
+            return {}
+        raise PipelineError(f"Configuration file not found: {target}")
+    try:
+        data = yaml.safe_load(target.read_text(encoding="utf-8"))
+    except yaml.YAMLError as exc:
+        raise PipelineError(f"Invalid configuration file {target}: {exc}") from exc
+    if data is None:
+        return {}
+    if not isinstance(data, dict):
+        raise PipelineError(f"Configuration file {target} must contain a mapping")
+    return data
+
+
+def config_value(config: Dict[str, Any], dotted: str, default: Any = None) -> Any:
+    """Return ``config[a][b]...`` for ``"a.b..."``, or ``default`` when any level is missing."""
+
+    value: Any = config
+    for part in dotted.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return default
+        value = value[part]
+    return value
+
+
+__all__ = ["DEFAULT_CONFIG_PATH", "config_value", "load_config"]
@@ -1,9 +1,17 @@
 """Core data models and utilities for the vrHouse pipeline."""
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from collections.abc import Mapping, MutableMapping
+from dataclasses import dataclass, field, fields
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Scene graphs are right-handed and Z-up (+Y forward), as IFC is; importers of
+# sources with another convention (glTF is Y-up) rotate their nodes into it.
+UP_AXIS = "z"
+AXES = {"x": 0, "y": 1, "z": 2}
 
 
 @dataclass
@@ -15,6 +23,36 @@ class AssetReference:
     metadata: Dict[str, str] = field(default_factory=dict)
 
 
+@dataclass
+class MeshData:
+    """Indexed triangle mesh stored in contiguous NumPy buffers.
+
+    ``positions``/``normals`` are ``(n, 3)`` float32, ``uvs`` is ``(n, 2)`` float32
+    and ``indices`` is ``(m, 3)`` unsigned integers (uint32 unless an importer
+    exposes the source's narrower type zero-copy) referencing rows of the vertex
+    arrays. Arrays may be read-only views over memory-mapped files.
+    """
+
+    positions: np.ndarray
+    indices: np.ndarray
+    normals: Optional[np.ndarray] = None
+    uvs: Optional[np.ndarray] = None
+    material: Optional[str] = None
+
+    @property
+    def vertex_count(self) -> int:
+        return int(self.positions.shape[0])
+
+    @property
+    def triangle_count(self) -> int:
+        return int(self.indices.shape[0])
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.positions, self.indices, self.normals, self.uvs)
+        return sum(int(array.nbytes) for array in arrays if array is not None)
+
+
 @dataclass
 class SceneSpecification:
     """High-level description of the target VR scene."""
@@ -29,14 +67,956 @@ class SceneSpecification:
     output_encryption_key: Optional[str] = None
 
 
+_IDENTITY = np.eye(4, dtype=np.float32)
+_NODE_FIELDS = ("type", "parent", "transform", "mesh", "material")
+
+
+class NodeView(MutableMapping):
+    """Dict-like view of one scene-graph node; reads and writes go to the owning graph.
+
+    Structural keys (``parent``, ``transform``, ``mesh``, ``material``) map onto the
+    graph's arrays, every other key is a free-form node attribute.
+    """
+
+    __slots__ = ("_graph", "index")
+
+    def __init__(self, graph: "SceneGraph", index: int) -> None:
+        self._graph = graph
+        self.index = index
+
+    @property
+    def name(self) -> str:
+        return self._graph.names[self.index]
+
+    @property
+    def parent(self) -> Optional["NodeView"]:
+        parent = int(self._graph.parents[self.index])
+        return None if parent < 0 else NodeView(self._graph, parent)
+
+    @property
+    def transform(self) -> np.ndarray:
+        return self._graph.transforms[self.index]
+
+    @property
+    def mesh(self) -> Optional[MeshData]:
+        mesh_id = int(self._graph.mesh_ids[self.index])
+        return None if mesh_id < 0 else self._graph.meshes[mesh_id]
+
+    @property
+    def material(self) -> Optional[str]:
+        material_id = int(self._graph.material_ids[self.index])
+        return None if material_id < 0 else self._graph.materials[material_id]
+
+    def _keys(self) -> List[str]:
+        keys = list(self._graph.attributes[self.index])
+        if self._graph.parents[self.index] >= 0:
+            keys.append("parent")
+        if not np.array_equal(self._graph.transforms[self.index], _IDENTITY):
+            keys.append("transform")
+        if self._graph.mesh_ids[self.index] >= 0:
+            keys.append("mesh")
+        if self._graph.material_ids[self.index] >= 0:
+            keys.append("material")
+        return keys
+
+    def __getitem__(self, key: str) -> object:
+        if key == "parent":
+            parent = self.parent
+            if parent is None:
+                raise KeyError(key)
+            return parent.name
+        if key == "transform":
+            return self.transform
+        if key in ("mesh", "material"):
+            value = getattr(self, key)
+            if value is None:
+                raise KeyError(key)
+            return value
+        return self._graph.attributes[self.index][key]
+
+    def __setitem__(self, key: str, value: object) -> None:
+        graph = self._graph
+        if key == "parent":
+            graph.set_parent(self.index, graph.index_of(str(value)))
+        elif key == "transform":
+            graph.set_transform(self.index, value)
+        elif key == "mesh":
+            graph.set_mesh(self.index, value)
+        elif key == "material":
+            graph.set_material(self.index, value)
+        else:
+            graph.set_attribute(self.index, key, value)
+
+    def __delitem__(self, key: str) -> None:
+        if key in ("mesh", "material"):
+            self[key] = None
+        elif key == "transform":
+            self[key] = _IDENTITY
+        elif key == "parent":
+            raise KeyError("Nodes cannot be detached from the graph")
+        else:
+            self._graph.set_attribute(self.index, key, None)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys())
+
+    def __len__(self) -> int:
+        return len(self._keys())
+
+    def __repr__(self) -> str:
+        return f"NodeView({self.name!r}, {dict(self)!r})"
+
+
+class SceneGraph(MutableMapping):
+    """Struct-of-arrays scene graph shared between pipeline stages.
+
+    Node ``i`` is described by ``parents[i]`` (``-1`` for the root), a ``4x4``
+    float32 block in ``transforms[i]`` relative to its parent, and indices into
+    ``meshes``/``materials`` (``-1`` when unset). Parents always precede their
+    children. ``copy()`` is O(1): buffers are shared until one side writes, at
+    which point only the touched buffer is duplicated.
+
+    The graph also behaves as ``MutableMapping[str, NodeView]`` so code written
+    against the old ``Dict[str, Dict[str, str]]`` layout keeps working.
+    """
+
+    _COW_FIELDS = (
+        "parents",
+        "transforms",
+        "mesh_ids",
+        "material_ids",
+        "names",
+        "attributes",
+        "meshes",
+        "materials",
+        "material_properties",
+        "metadata",
+        "lods",
+        "textures",
+    )
+
+    def __init__(self, root_attributes: Optional[Dict[str, object]] = None, capacity: int = 16) -> None:
+        capacity = max(capacity, 1)
+        self._count = 0
+        self._parents = np.empty(capacity, dtype=np.int32)
+        self._transforms = np.empty((capacity, 4, 4), dtype=np.float32)
+        self._mesh_ids = np.empty(capacity, dtype=np.int32)
+        self._material_ids = np.empty(capacity, dtype=np.int32)
+        self._names: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._attributes: List[Dict[str, object]] = []
+        self._meshes: List[MeshData] = []
+        self._materials: List[str] = []
+        self._material_index: Dict[str, int] = {}
+        self._material_properties: Dict[str, Dict[str, str]] = {}
+        self._metadata: Dict[str, object] = {}
+        self._lods: Dict[int, List[MeshData]] = {}
+        self._textures: Dict[str, List[np.ndarray]] = {}
+        self._shared: set[str] = set()
+        self._owned_attributes: set[int] = set()
+        self.add_node("root", parent=None, attributes={"type": "scene", **(root_attributes or {})})
+
+    # -- read access -----------------------------------------------------------------
+    @property
+    def parents(self) -> np.ndarray:
+        return self._readonly(self._parents[: self._count])
+
+    @property
+    def transforms(self) -> np.ndarray:
+        return self._readonly(self._transforms[: self._count])
+
+    @property
+    def mesh_ids(self) -> np.ndarray:
+        return self._readonly(self._mesh_ids[: self._count])
+
+    @property
+    def material_ids(self) -> np.ndarray:
+        return self._readonly(self._material_ids[: self._count])
+
+    @property
+    def names(self) -> Sequence[str]:
+        return self._names
+
+    @property
+    def attributes(self) -> Sequence[Dict[str, object]]:
+        return self._attributes
+
+    @property
+    def meshes(self) -> Sequence[MeshData]:
+        return self._meshes
+
+    @property
+    def materials(self) -> Sequence[str]:
+        return self._materials
+
+    @property
+    def material_properties(self) -> Dict[str, Dict[str, str]]:
+        """Material library (e.g. parsed MTL entries); mutate via ``set_material_properties``."""
+
+        return self._material_properties
+
+    @property
+    def metadata(self) -> Dict[str, object]:
+        """Graph-level annotations written by stages; writes mark the dict as owned."""
+
+        self._own("metadata")
+        return self._metadata
+
+    @property
+    def lods(self) -> Mapping[int, Sequence[MeshData]]:
+        """Lower levels of detail per mesh id (the mesh itself is level 0)."""
+
+        return self._lods
+
+    @property
+    def textures(self) -> Mapping[str, Sequence[np.ndarray]]:
+        """Mip chains (uint8 ``(h, w, c)`` levels, largest first) by texture reference."""
+
+        return self._textures
+
+    @property
+    def root(self) -> NodeView:
+        return NodeView(self, 0)
+
+    @staticmethod
+    def _readonly(array: np.ndarray) -> np.ndarray:
+        view = array.view()
+        view.flags.writeable = False
+        return view
+
+    def node(self, index: int) -> NodeView:
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        return NodeView(self, index)
+
+    def index_of(self, name: str) -> int:
+        try:
+            return self._index[name]
+        except KeyError:
+            raise KeyError(name) from None
+
+    def nodes(self) -> Iterator[NodeView]:
+        return (NodeView(self, index) for index in range(self._count))
+
+    def mesh_nodes(self) -> np.ndarray:
+        """Indices of nodes referencing a mesh."""
+
+        return np.flatnonzero(self.mesh_ids >= 0)
+
+    def children(self, index: int) -> np.ndarray:
+        return np.flatnonzero(self.parents == index)
+
+    def world_transforms(self) -> np.ndarray:
+        """Compose local transforms down the hierarchy, one batched matmul per depth level."""
+
+        parents = self.parents
+        depth = np.zeros(self._count, dtype=np.int32)
+        for index in range(1, self._count):
+            depth[index] = depth[parents[index]] + 1 if parents[index] >= 0 else 0
+        world = np.array(self.transforms)
+        for level in range(1, int(depth.max(initial=0)) + 1):
+            nodes = np.flatnonzero(depth == level)
+            world[nodes] = world[parents[nodes]] @ world[nodes]
+        return world
+
+    def node_bounds(self, nodes: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Axis-aligned ``(lower, upper)`` corners of mesh nodes (all by default) in the root's frame.
+
+        Each unique mesh's bounds are read once; the transformed box of node ``i``
+        encloses its mesh's local box under the node's world transform.
+        """
+
+        nodes = self.mesh_nodes() if nodes is None else np.asarray(nodes, dtype=np.int64)
+        used, inverse = np.unique(self.mesh_ids[nodes], return_inverse=True)
+        local = np.zeros((used.size, 2, 3))
+        for slot, mesh_id in enumerate(used.tolist()):
+            positions = self._meshes[mesh_id].positions
+            if len(positions):
+                local[slot] = positions.min(axis=0), positions.max(axis=0)
+        world = self.world_transforms().astype(np.float64)
+        relative = np.linalg.inv(world[0]) @ world[nodes]
+        centre = ((local[:, 0] + local[:, 1]) / 2)[inverse]
+        half = ((local[:, 1] - local[:, 0]) / 2)[inverse]
+        centre = np.einsum("nij,nj->ni", relative[:, :3, :3], centre) + relative[:, :3, 3]
+        half = np.einsum("nij,nj->ni", np.abs(relative[:, :3, :3]), half)
+        return centre - half, centre + half
+
+    @property
+    def triangle_count(self) -> int:
+        mesh_ids = self.mesh_ids
+        counts = np.fromiter((mesh.triangle_count for mesh in self._meshes), dtype=np.int64, count=len(self._meshes))
+        return int(counts[mesh_ids[mesh_ids >= 0]].sum()) if counts.size else 0
+
+    @property
+    def draw_call_count(self) -> int:
+        """Distinct (mesh, material) pairs: one draw, or one instanced draw, each."""
+
+        nodes = self.mesh_nodes()
+        pairs = np.stack((self.mesh_ids[nodes], self.material_ids[nodes]), axis=1)
+        return int(np.unique(pairs, axis=0).shape[0]) if nodes.size else 0
+
+    # -- copy-on-write -----------------------------------------------------------------
+    def copy(self) -> "SceneGraph":
+        """Return a graph sharing every buffer with ``self`` until either side writes."""
+
+        clone = object.__new__(SceneGraph)
+        clone.__dict__.update(self.__dict__)
+        shared = set(self._COW_FIELDS)
+        clone._shared = set(shared)
+        clone._owned_attributes = set()
+        self._shared = shared
+        self._owned_attributes = set()
+        return clone
+
+    def _own(self, field_name: str) -> None:
+        if field_name not in self._shared:
+            return
+        self._shared.discard(field_name)
+        if field_name in ("parents", "transforms", "mesh_ids", "material_ids"):
+            setattr(self, f"_{field_name}", getattr(self, f"_{field_name}").copy())
+        elif field_name == "names":
+            self._names = list(self._names)
+            self._index = dict(self._index)
+        elif field_name == "attributes":
+            self._attributes = list(self._attributes)
+            self._owned_attributes = set()
+        elif field_name == "materials":
+            self._materials = list(self._materials)
+            self._material_index = dict(self._material_index)
+        elif field_name == "meshes":
+            self._meshes = list(self._meshes)
+        elif field_name == "material_properties":
+            self._material_properties = dict(self._material_properties)
+        elif field_name == "metadata":
+            self._metadata = dict(self._metadata)
+        elif field_name == "lods":
+            self._lods = dict(self._lods)
+        elif field_name == "textures":
+            self._textures = dict(self._textures)
+
+    def _grow(self, required: int) -> None:
+        capacity = self._parents.shape[0]
+        if required <= capacity:
+            for name in ("parents", "transforms", "mesh_ids", "material_ids"):
+                self._own(name)
+            return
+        capacity = max(required, capacity * 2)
+        for name in ("parents", "transforms", "mesh_ids", "material_ids"):
+            current = getattr(self, f"_{name}")
+            grown = np.empty((capacity, *current.shape[1:]), dtype=current.dtype)
+            grown[: self._count] = current[: self._count]
+            setattr(self, f"_{name}", grown)
+            self._shared.discard(name)
+
+    # -- mutation ------------------------------------------------------------------------
+    def add_node(
+        self,
+        name: str,
+        *,
+        parent: Optional[int] = 0,
+        transform: Optional[np.ndarray] = None,
+        mesh: Optional[MeshData] | int = None,
+        material: Optional[str] = None,
+        attributes: Optional[Dict[str, object]] = None,
+    ) -> int:
+        if name in self._index:
+            raise KeyError(f"Duplicate scene-graph node: {name}")
+        if parent is not None and not 0 <= parent < self._count:
+            raise IndexError(f"Unknown parent node index: {parent}")
+
+        index = self._count
+        self._grow(index + 1)
+        self._own("names")
+        self._own("attributes")
+        self._parents[index] = -1 if parent is None else parent
+        self._transforms[index] = _IDENTITY if transform is None else np.asarray(transform, dtype=np.float32)
+        self._mesh_ids[index] = self._mesh_id(mesh)
+        self._material_ids[index] = self._material_id(material)
+        self._names.append(name)
+        self._index[name] = index
+        self._attributes.append(dict(attributes or {}))
+        self._owned_attributes.add(index)
+        self._count += 1
+        return index
+
+    def add_mesh(self, mesh: MeshData) -> int:
+        self._own("meshes")
+        self._meshes.append(mesh)
+        return len(self._meshes) - 1
+
+    def _mesh_id(self, mesh: Optional[MeshData] | int) -> int:
+        if mesh is None:
+            return -1
+        if isinstance(mesh, (int, np.integer)):
+            if not 0 <= mesh < len(self._meshes):
+                raise IndexError(f"Unknown mesh id: {mesh}")
+            return int(mesh)
+        return self.add_mesh(mesh)
+
+    def _material_id(self, material: Optional[str]) -> int:
+        if material is None:
+            return -1
+        material_id = self._material_index.get(material)
+        if material_id is None:
+            self._own("materials")
+            material_id = self._material_index[material] = len(self._materials)
+            self._materials.append(material)
+        return material_id
+
+    def set_parent(self, index: int, parent: int) -> None:
+        if index == 0 or not 0 <= parent < self._count:
+            raise IndexError(f"Invalid parent {parent} for node {index}")
+        if parent > index:
+            raise PipelineError("Scene-graph parents must precede their children")
+        self._own("parents")
+        self._parents[index] = parent
+
+    def set_transform(self, index: int, transform: np.ndarray) -> None:
+        self._own("transforms")
+        self._transforms[index] = np.asarray(transform, dtype=np.float32)
+
+    def set_transforms(self, indices: np.ndarray, transforms: np.ndarray) -> None:
+        self._own("transforms")
+        self._transforms[indices] = transforms
+
+    def set_mesh(self, index: int, mesh: Optional[MeshData] | int) -> None:
+        self._own("mesh_ids")
+        self._mesh_ids[index] = self._mesh_id(mesh)
+
+    def replace_mesh(self, mesh_id: int, mesh: MeshData) -> None:
+        """Swap the shared mesh ``mesh_id`` for every node that references it."""
+
+        self._own("meshes")
+        self._meshes[mesh_id] = mesh
+
+    def set_lods(self, mesh_id: int, levels: Sequence[MeshData]) -> None:
+        self._own("lods")
+        if levels:
+            self._lods[mesh_id] = list(levels)
+        else:
+            self._lods.pop(mesh_id, None)
+
+    def set_texture(self, name: str, levels: Sequence[np.ndarray]) -> None:
+        self._own("textures")
+        if levels:
+            self._textures[name] = list(levels)
+        else:
+            self._textures.pop(name, None)
+
+    def set_material(self, index: int, material: Optional[str]) -> None:
+        self._own("material_ids")
+        self._material_ids[index] = self._material_id(material)
+
+    def set_materials(self, indices: np.ndarray, material: Optional[str]) -> None:
+        self._own("material_ids")
+        self._material_ids[indices] = self._material_id(material)
+
+    def set_material_properties(self, material: str, properties: Dict[str, str]) -> None:
+        self._own("material_properties")
+        self._material_properties[material] = dict(properties)
+
+    def set_attribute(self, index: int, key: str, value: object) -> None:
+        """Set (or, with ``None``, remove) a free-form attribute on node ``index``."""
+
+        self._own("attributes")
+        if index not in self._owned_attributes:
+            self._attributes[index] = dict(self._attributes[index])
+            self._owned_attributes.add(index)
+        if value is None:
+            self._attributes[index].pop(key, None)
+        else:
+            self._attributes[index][key] = value
+
+    def compact_meshes(self) -> None:
+        """Drop meshes (and their LODs) no longer referenced by any node, renumbering ids."""
+
+        mesh_ids = self.mesh_ids
+        used = np.unique(mesh_ids[mesh_ids >= 0])
+        if used.size == len(self._meshes):
+            return
+        remap = np.full(len(self._meshes), -1, dtype=np.int32)
+        remap[used] = np.arange(used.size, dtype=np.int32)
+        self._own("mesh_ids")
+        self._own("meshes")
+        self._own("lods")
+        current = self._mesh_ids[: self._count]
+        current[current >= 0] = remap[current[current >= 0]]
+        self._meshes = [self._meshes[int(mesh_id)] for mesh_id in used]
+        self._lods = {int(remap[mesh_id]): levels for mesh_id, levels in self._lods.items() if remap[mesh_id] >= 0}
+
+    def remove_nodes(self, indices: Iterable[int]) -> None:
+        """Drop nodes, re-parenting their children onto the nearest surviving ancestor."""
+
+        doomed = np.zeros(self._count, dtype=bool)
+        doomed[np.fromiter(indices, dtype=np.int64)] = True
+        if doomed[0]:
+            raise PipelineError("The scene-graph root cannot be removed")
+        if not doomed.any():
+            return
+
+        parents = np.array(self.parents)
+        for index in range(1, self._count):
+            parent = parents[index]
+            while doomed[parent]:
+                parent = parents[parent]
+            parents[index] = parent
+        keep = np.flatnonzero(~doomed)
+        remap = np.full(self._count, -1, dtype=np.int32)
+        remap[keep] = np.arange(keep.size, dtype=np.int32)
+
+        new_parents = parents[keep]
+        new_parents[1:] = remap[new_parents[1:]]
+        self._parents = new_parents
+        self._transforms = self._transforms[keep]
+        self._mesh_ids = self._mesh_ids[keep]
+        self._material_ids = self._material_ids[keep]
+        self._names = [self._names[index] for index in keep]
+        self._index = {name: position for position, name in enumerate(self._names)}
+        self._attributes = [self._attributes[index] for index in keep]
+        self._owned_attributes = set()
+        self._count = int(keep.size)
+        self._shared -= {"parents", "transforms", "mesh_ids", "material_ids", "names", "attributes"}
+
+    # -- MutableMapping compatibility ------------------------------------------------
+    def __getitem__(self, name: str) -> NodeView:
+        return NodeView(self, self.index_of(name))
+
+    def __setitem__(self, name: str, node: Mapping[str, object]) -> None:
+        if name in self._index:
+            view = self[name]
+            for key, value in node.items():
+                view[key] = value
+            return
+        parent = node.get("parent", "root")
+        self._add_legacy_node(name, node, self.index_of(str(parent)))
+
+    def __delitem__(self, name: str) -> None:
+        self.remove_nodes([self.index_of(name)])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._names))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._index
+
+    def __repr__(self) -> str:
+        return f"SceneGraph(nodes={self._count}, meshes={len(self._meshes)}, materials={len(self._materials)})"
+
+    def _add_legacy_node(self, name: str, node: Mapping[str, object], parent: int) -> int:
+        mesh = node.get("mesh")
+        return self.add_node(
+            name,
+            parent=parent,
+            transform=node.get("transform"),
+            mesh=mesh if isinstance(mesh, MeshData) else None,
+            material=node.get("material"),  # type: ignore[arg-type]
+            attributes={key: value for key, value in node.items() if key not in _NODE_FIELDS or key == "type"},
+        )
+
+    @classmethod
+    def coerce(cls, scene_graph: "SceneGraph | Mapping[str, Mapping[str, object]]") -> "SceneGraph":
+        return scene_graph if isinstance(scene_graph, SceneGraph) else cls.from_dict(scene_graph)
+
+    @classmethod
+    def from_dict(cls, scene_graph: Mapping[str, Mapping[str, object]]) -> "SceneGraph":
+        """Build a graph from the legacy ``{node_id: {key: value}}`` layout.
+
+        ``MeshData`` objects appearing on several nodes become one shared mesh;
+        the root's ``materials`` and ``metadata`` keys restore the material
+        library and graph metadata.
+        """
+
+        root = dict(scene_graph.get("root", {}))
+        root.pop("children", None)
+        materials = root.pop("materials", None) or {}
+        metadata = root.pop("metadata", None) or {}
+        graph = cls(root_attributes=root, capacity=len(scene_graph) + 1)
+        for material, properties in dict(materials).items():
+            graph.set_material_properties(material, properties)
+        if metadata:
+            graph.metadata.update(metadata)
+
+        mesh_ids: Dict[int, int] = {}
+        pending = [(name, node) for name, node in scene_graph.items() if name != "root"]
+        while pending:
+            deferred = []
+            for name, node in pending:
+                parent = str(node.get("parent", "root"))
+                if parent not in graph._index:
+                    deferred.append((name, node))
+                    continue
+                mesh = node.get("mesh")
+                if isinstance(mesh, MeshData):
+                    if id(mesh) not in mesh_ids:
+                        mesh_ids[id(mesh)] = graph.add_mesh(mesh)
+                    node = {**node, "mesh": None}
+                index = graph._add_legacy_node(name, node, graph._index[parent])
+                if isinstance(mesh, MeshData):
+                    graph._mesh_ids[index] = mesh_ids[id(mesh)]
+            if len(deferred) == len(pending):
+                raise PipelineError(f"Scene graph has nodes with unknown parents: {[n for n, _ in deferred]}")
+            pending = deferred
+        return graph
+
+    def to_dict(self, *, inline_meshes: bool = True) -> Dict[str, Dict[str, object]]:
+        """Materialise the legacy ``{node_id: {key: value}}`` layout.
+
+        With ``inline_meshes=False`` nodes carry integer mesh ids instead of
+        ``MeshData`` objects, so instanced meshes are serialized only once.
+        """
+
+        output: Dict[str, Dict[str, object]] = {}
+        children: Dict[int, List[str]] = {}
+        for index in range(1, self._count):
+            children.setdefault(int(self._parents[index]), []).append(self._names[index])
+        for view in self.nodes():
+            node = dict(view)
+            if "transform" in node:
+                node["transform"] = np.asarray(node["transform"]).tolist()
+            if view.index in children:
+                node["children"] = children[view.index]
+            mesh_id = int(self._mesh_ids[view.index])
+            if not inline_meshes:
+                if mesh_id >= 0:
+                    node["mesh"] = mesh_id
+            elif mesh_id in self._lods:
+                node["lods"] = list(self._lods[mesh_id])
+            output[view.name] = node
+        if self._material_properties:
+            output["root"]["materials"] = dict(self._material_properties)
+        if self._metadata:
+            output["root"]["metadata"] = dict(self._metadata)
+        return output
+
+
+_BVH_BINS = 16
+# Larger nodes are always split, even where the SAH would rather keep a leaf.
+_BVH_MAX_LEAF = 16
+# Candidate (query, item) pairs handled per chunk by ``BVH.raycast``.
+_RAY_CHUNK = 1 << 16
+
+
+@dataclass
+class BVH:
+    """Bounding volume hierarchy over axis-aligned boxes, stored as flat arrays.
+
+    Nodes are laid out depth first: an inner node's left child directly follows
+    it and ``start`` holds its right child; a leaf has ``count > 0`` primitives at
+    ``start:start + count`` of ``items`` (caller ids, e.g. scene-graph nodes or
+    triangles) with their boxes in ``item_lower``/``item_upper``. Every query
+    walks the tree level by level for a whole batch at once, so the work per
+    level is a handful of NumPy operations on ``(query, node)`` pairs.
+    """
+
+    lower: np.ndarray
+    upper: np.ndarray
+    start: np.ndarray
+    count: np.ndarray
+    items: np.ndarray
+    item_lower: np.ndarray
+    item_upper: np.ndarray
+
+    @property
+    def node_count(self) -> int:
+        return int(self.count.size)
+
+    def __len__(self) -> int:
+        return int(self.items.size)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {item.name: getattr(self, item.name) for item in fields(self)}
+
+    @classmethod
+    def from_arrays(cls, arrays: Mapping[str, np.ndarray]) -> "BVH":
+        missing = [item.name for item in fields(cls) if item.name not in arrays]
+        if missing:
+            raise PipelineError(f"BVH is missing {missing}")
+        return cls(**{item.name: np.asarray(arrays[item.name]) for item in fields(cls)})
+
+    @classmethod
+    def build(
+        cls,
+        lower: np.ndarray,
+        upper: np.ndarray,
+        items: Optional[np.ndarray] = None,
+        *,
+        leaf_size: int = 4,
+        bins: int = _BVH_BINS,
+    ) -> "BVH":
+        """Top-down build splitting each node where the binned surface area heuristic is lowest.
+
+        Nodes of up to ``leaf_size`` boxes always become leaves; ``items`` (default
+        ``arange``) are the ids the queries report.
+        """
+
+        lower = np.asarray(lower, dtype=np.float64).reshape(-1, 3)
+        upper = np.asarray(upper, dtype=np.float64).reshape(-1, 3)
+        items = np.arange(len(lower)) if items is None else np.asarray(items)
+        order = np.arange(len(lower))
+        centres = (lower + upper) / 2
+        node_lower: List[np.ndarray] = []
+        node_upper: List[np.ndarray] = []
+        starts: List[int] = []
+        counts: List[int] = []
+        # (first, stop, parent waiting for its right child or -1); left children are popped first.
+        stack = [(0, len(order), -1)] if len(order) else []
+        while stack:
+            first, stop, parent = stack.pop()
+            index = len(counts)
+            if parent >= 0:
+                starts[parent] = index
+            members = order[first:stop]
+            node_lower.append(lower[members].min(axis=0))
+            node_upper.append(upper[members].max(axis=0))
+            split = None
+            if len(members) > leaf_size:
+                split = _sah_split(lower[members], upper[members], centres[members], bins)
+            if split is None:
+                starts.append(first)
+                counts.append(len(members))
+                continue
+            order[first:stop] = np.concatenate((members[split], members[~split]))
+            middle = first + int(np.count_nonzero(split))
+            starts.append(-1)
+            counts.append(0)
+            stack.append((middle, stop, index))
+            stack.append((first, middle, -1))
+        return cls(
+            lower=np.array(node_lower, dtype=np.float32).reshape(-1, 3),
+            upper=np.array(node_upper, dtype=np.float32).reshape(-1, 3),
+            start=np.array(starts, dtype=np.int32),
+            count=np.array(counts, dtype=np.int32),
+            items=items[order].astype(np.int32),
+            item_lower=lower[order].astype(np.float32),
+            item_upper=upper[order].astype(np.float32),
+        )
+
+    @classmethod
+    def from_scene(cls, scene_graph: "SceneGraph | Mapping[str, Mapping[str, object]]", **options: int) -> "BVH":
+        """BVH over the mesh nodes' boxes (root frame); ``items`` are scene-graph node indices."""
+
+        graph = SceneGraph.coerce(scene_graph)
+        nodes = graph.mesh_nodes()
+        lower, upper = graph.node_bounds(nodes)
+        return cls.build(lower, upper, nodes, **options)
+
+    @classmethod
+    def from_triangles(cls, positions: np.ndarray, indices: np.ndarray, **options: int) -> "BVH":
+        """BVH over triangles; ``items`` are triangle indices (see ``raycast``)."""
+
+        triangles = np.asarray(positions, dtype=np.float64)[np.asarray(indices, dtype=np.int64)]
+        return cls.build(triangles.min(axis=1), triangles.max(axis=1), **options)
+
+    def _traverse(
+        self, queries: int, accept: Callable[[np.ndarray, np.ndarray, np.ndarray, bool], np.ndarray]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """``(query, slot)`` pairs for every primitive slot whose box, and every ancestor's, ``accept``s the query.
+
+        ``accept(query, lower, upper, primitives)`` tests paired boxes; ``primitives``
+        is true for item boxes, whose accepted pairs are returned in call order.
+        """
+
+        found_queries: List[np.ndarray] = []
+        found_slots: List[np.ndarray] = []
+        query = np.arange(queries if self.node_count else 0)
+        node = np.zeros(query.size, dtype=np.int64)
+        while query.size:
+            keep = accept(query, self.lower[node], self.upper[node], False)
+            query, node = query[keep], node[keep]
+            leaf = self.count[node] > 0
+            if leaf.any():
+                counts = self.count[node[leaf]]
+                pairs = np.repeat(query[leaf], counts)
+                slots = np.repeat(self.start[node[leaf]] - (np.cumsum(counts) - counts), counts) + np.arange(pairs.size)
+                hit = accept(pairs, self.item_lower[slots], self.item_upper[slots], True)
+                found_queries.append(pairs[hit])
+                found_slots.append(slots[hit])
+            inner = ~leaf
+            query = np.concatenate((query[inner], query[inner]))
+            node = np.concatenate((node[inner] + 1, self.start[node[inner]]))
+        if not found_queries:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.concatenate(found_queries), np.concatenate(found_slots)
+
+    def query_aabb(self, lower: np.ndarray, upper: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """``(query, item)`` pairs for every item overlapping each of the ``(q, 3)`` query boxes."""
+
+        lower = np.asarray(lower, dtype=np.float32).reshape(-1, 3)
+        upper = np.asarray(upper, dtype=np.float32).reshape(-1, 3)
+
+        def overlaps(query: np.ndarray, low: np.ndarray, high: np.ndarray, _: bool) -> np.ndarray:
+            return np.all((low <= upper[query]) & (high >= lower[query]), axis=1)
+
+        query, slots = self._traverse(len(lower), overlaps)
+        return query, self.items[slots]
+
+    def query_frustum(self, planes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """``(frustum, item)`` pairs for items not entirely outside any plane.
+
+        ``planes`` is ``(k, 4)`` or ``(q, k, 4)`` rows ``(a, b, c, d)`` with normals
+        pointing inwards (``a*x + b*y + c*z + d >= 0`` inside). Boxes are tested
+        conservatively against each plane, so items near the corners may pass.
+        """
+
+        planes = np.asarray(planes, dtype=np.float32)
+        planes = planes[None] if planes.ndim == 2 else planes
+        normals, offsets = planes[:, :, :3], planes[:, :, 3]
+
+        def inside(query: np.ndarray, low: np.ndarray, high: np.ndarray, _: bool) -> np.ndarray:
+            # The box corner farthest along each plane's normal.
+            corner = np.where(normals[query] > 0, high[:, None, :], low[:, None, :])
+            return np.all(np.einsum("nkj,nkj->nk", normals[query], corner) + offsets[query] >= 0, axis=1)
+
+        query, slots = self._traverse(len(planes), inside)
+        return query, self.items[slots]
+
+    def intersect_rays(
+        self, origins: np.ndarray, directions: np.ndarray, max_distance: float | np.ndarray = np.inf
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """``(ray, item, distance)`` for every item box each ray enters within ``max_distance``.
+
+        ``distance`` is the entry parameter along the (unnormalised) direction,
+        zero when the origin is inside the box. Results are sorted by ray, then distance.
+        """
+
+        origins = np.asarray(origins, dtype=np.float64).reshape(-1, 3)
+        directions = np.asarray(directions, dtype=np.float64).reshape(-1, 3)
+        limit = np.broadcast_to(np.asarray(max_distance, dtype=np.float64), (len(origins),))
+        with np.errstate(divide="ignore"):
+            inverse = 1.0 / directions
+        entries: List[np.ndarray] = []
+
+        def crosses(ray: np.ndarray, low: np.ndarray, high: np.ndarray, primitives: bool) -> np.ndarray:
+            with np.errstate(invalid="ignore"):
+                near = (low - origins[ray]) * inverse[ray]
+                far = (high - origins[ray]) * inverse[ray]
+            # fmin/fmax skip the NaNs of rays lying exactly on a slab plane.
+            enter = np.maximum(np.fmax.reduce(np.fmin(near, far), axis=1), 0.0)
+            leave = np.fmin.reduce(np.fmax(near, far), axis=1)
+            hit = (enter <= leave) & (enter <= limit[ray])
+            if primitives:
+                entries.append(enter[hit])
+            return hit
+
+        ray, slots = self._traverse(len(origins), crosses)
+        distance = np.concatenate(entries) if entries else np.zeros(0)
+        order = np.lexsort((distance, ray))
+        return ray[order], self.items[slots[order]], distance[order]
+
+    def raycast(
+        self,
+        origins: np.ndarray,
+        directions: np.ndarray,
+        positions: np.ndarray,
+        indices: np.ndarray,
+        max_distance: float | np.ndarray = np.inf,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Nearest triangle hit per ray for a ``from_triangles`` BVH: ``(distance, triangle)``.
+
+        Misses get ``inf`` and ``-1``. Candidate triangles are tested with the
+        Möller–Trumbore algorithm in chunks of pairs to bound memory.
+        """
+
+        origins = np.asarray(origins, dtype=np.float64).reshape(-1, 3)
+        directions = np.asarray(directions, dtype=np.float64).reshape(-1, 3)
+        triangles = np.asarray(positions, dtype=np.float64)[np.asarray(indices, dtype=np.int64)]
+        best = np.full(len(origins), np.inf)
+        nearest = np.full(len(origins), -1, dtype=np.int64)
+        ray, candidates, _ = self.intersect_rays(origins, directions, max_distance)
+        for first in range(0, ray.size, _RAY_CHUNK):
+            rays, hits = ray[first : first + _RAY_CHUNK], candidates[first : first + _RAY_CHUNK]
+            distance = _ray_triangle(origins[rays], directions[rays], triangles[hits])
+            valid = distance <= np.broadcast_to(np.asarray(max_distance, dtype=np.float64), (len(origins),))[rays]
+            rays, hits, distance = rays[valid], hits[valid], distance[valid]
+            closer = distance < best[rays]
+            rays, hits, distance = rays[closer], hits[closer], distance[closer]
+            # Several hits per ray in one chunk: keep the nearest of each.
+            order = np.lexsort((distance, rays))
+            rays, hits, distance = rays[order], hits[order], distance[order]
+            head = np.ones(rays.size, dtype=bool)
+            head[1:] = rays[1:] != rays[:-1]
+            best[rays[head]], nearest[rays[head]] = distance[head], hits[head]
+        return best, nearest
+
+
+def _surface_area(lower: np.ndarray, upper: np.ndarray) -> np.ndarray:
+    extent = np.maximum(upper - lower, 0.0)
+    return 2.0 * (extent[..., 0] * extent[..., 1] + extent[..., 1] * extent[..., 2] + extent[..., 2] * extent[..., 0])
+
+
+def _sah_split(lower: np.ndarray, upper: np.ndarray, centres: np.ndarray, bins: int) -> Optional[np.ndarray]:
+    """Left-side mask of the cheapest binned SAH split, or ``None`` when a leaf is cheaper."""
+
+    count = len(centres)
+    low, high = centres.min(axis=0), centres.max(axis=0)
+    extent = high - low
+    best: Optional[Tuple[float, int, int]] = None
+    for axis in np.flatnonzero(extent > 0).tolist():
+        slot = np.minimum(((centres[:, axis] - low[axis]) / extent[axis] * bins).astype(np.int64), bins - 1)
+        members = np.bincount(slot, minlength=bins)
+        bin_lower = np.full((bins, 3), np.inf)
+        bin_upper = np.full((bins, 3), -np.inf)
+        np.minimum.at(bin_lower, slot, lower)
+        np.maximum.at(bin_upper, slot, upper)
+        left = np.cumsum(members)[:-1]
+        left_area = _surface_area(np.minimum.accumulate(bin_lower)[:-1], np.maximum.accumulate(bin_upper)[:-1])
+        right_area = _surface_area(
+            np.minimum.accumulate(bin_lower[::-1])[::-1][1:], np.maximum.accumulate(bin_upper[::-1])[::-1][1:]
+        )
+        cost = np.where((left > 0) & (left < count), left * left_area + (count - left) * right_area, np.inf)
+        cut = int(np.argmin(cost))
+        if np.isfinite(cost[cut]) and (best is None or cost[cut] < best[0]):
+            best = (float(cost[cut]), axis, cut)
+    if best is None:
+        # Every centre coincides: halve the range so leaves stay small.
+        mask = np.zeros(count, dtype=bool)
+        mask[: count // 2] = True
+        return mask
+    cost, axis, cut = best
+    # One traversal step is taken to cost as much as one primitive test.
+    area = float(_surface_area(lower.min(axis=0), upper.max(axis=0)))
+    if count <= _BVH_MAX_LEAF and area > 0 and 1.0 + cost / area >= count:
+        return None
+    return np.minimum(((centres[:, axis] - low[axis]) / extent[axis] * bins).astype(np.int64), bins - 1) <= cut
+
+
+def _ray_triangle(origins: np.ndarray, directions: np.ndarray, triangles: np.ndarray) -> np.ndarray:
+    """Möller–Trumbore distances for paired rays and triangles; ``inf`` where they miss."""
+
+    a = triangles[:, 0]
+    edge1, edge2 = triangles[:, 1] - a, triangles[:, 2] - a
+    p = np.cross(directions, edge2)
+    determinant = np.einsum("ij,ij->i", edge1, p)
+    valid = np.abs(determinant) > 1e-12
+    inverse = 1.0 / np.where(valid, determinant, 1.0)
+    offset = origins - a
+    u = np.einsum("ij,ij->i", offset, p) * inverse
+    q = np.cross(offset, edge1)
+    v = np.einsum("ij,ij->i", directions, q) * inverse
+    distance = np.einsum("ij,ij->i", edge2, q) * inverse
+    hit = valid & (u >= 0) & (v >= 0) & (u + v <= 1) & (distance >= 0)
+    return np.where(hit, distance, np.inf)
+
+
 @dataclass
 class VRScene:
     """Container for the fully baked VR experience."""
 
     specification: SceneSpecification
-    scene_graph: Dict[str, Dict[str, str]]
+    scene_graph: SceneGraph
     physics_profile: Dict[str, float]
     ai_metadata: Dict[str, str] = field(default_factory=dict)
+    # Per-object rigid-body arrays by field name (see ``pipeline.ai.physics_model.ObjectPhysics``).
+    physics_objects: Dict[str, np.ndarray] = field(default_factory=dict)
+    # Collision shapes by field name (see ``pipeline.processors.colliders.ColliderSet``).
+    colliders: Dict[str, np.ndarray] = field(default_factory=dict)
+    # ``BVH`` arrays by field name, over the mesh nodes of the batched (exported) graph.
+    spatial_index: Dict[str, np.ndarray] = field(default_factory=dict)
+    # Cells, portals and PVS by field name (see ``pipeline.processors.visibility.CellVisibility``).
+    visibility: Dict[str, np.ndarray] = field(default_factory=dict)
 
 
 class PipelineError(RuntimeError):
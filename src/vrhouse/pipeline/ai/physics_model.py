@@ -1,19 +1,352 @@
-"""Placeholder for AI models that predict physics-ready parameters."""
+"""AI-assisted estimation of physics-ready parameters, per project and per object."""
 from __future__ import annotations
 
-from typing import Dict
+from dataclasses import dataclass, fields
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
 
-from vrhouse.core import SceneSpecification
+import numpy as np
 
+from vrhouse.core import MeshData, PipelineError, SceneGraph
 
-class PhysicsInferenceModel:
-    """Estimate physical properties for objects in the virtual house."""
 
-    def predict(self, specification: SceneSpecification) -> Dict[str, float]:
-        """Return basic physics parameters derived from AI models."""
-        # TODO: Integrate with a real ML model (e.g., TensorFlow, PyTorch).
+@dataclass(frozen=True)
+class MaterialPhysics:
+    """Bulk density (kg/m³) and contact coefficients of a material."""
+
+    density: float
+    friction: float
+    restitution: float
+
+
+_CONCRETE = MaterialPhysics(2400.0, 0.7, 0.1)
+_MASONRY = MaterialPhysics(1800.0, 0.7, 0.1)
+_STONE = MaterialPhysics(2600.0, 0.6, 0.15)
+_CERAMIC = MaterialPhysics(2300.0, 0.5, 0.2)
+_WOOD = MaterialPhysics(600.0, 0.5, 0.3)
+_FABRIC = MaterialPhysics(250.0, 0.8, 0.1)
+# Keywords (Portuguese and English) looked up in lower-cased material names, first match wins.
+MATERIAL_DENSITIES: Dict[str, MaterialPhysics] = {
+    "concreto": _CONCRETE,
+    "concrete": _CONCRETE,
+    "tijolo": _MASONRY,
+    "brick": _MASONRY,
+    "parede": _MASONRY,
+    "wall": _MASONRY,
+    "gesso": MaterialPhysics(800.0, 0.6, 0.1),
+    "plaster": MaterialPhysics(800.0, 0.6, 0.1),
+    "drywall": MaterialPhysics(800.0, 0.6, 0.1),
+    "marmore": _STONE,
+    "marble": _STONE,
+    "granito": _STONE,
+    "granite": _STONE,
+    "pedra": _STONE,
+    "stone": _STONE,
+    "ceramica": _CERAMIC,
+    "ceramic": _CERAMIC,
+    "porcelanato": _CERAMIC,
+    "azulejo": _CERAMIC,
+    "tile": _CERAMIC,
+    "piso": _CERAMIC,
+    "floor": _CERAMIC,
+    "vidro": MaterialPhysics(2500.0, 0.4, 0.2),
+    "glass": MaterialPhysics(2500.0, 0.4, 0.2),
+    "aluminio": MaterialPhysics(2700.0, 0.4, 0.25),
+    "aluminum": MaterialPhysics(2700.0, 0.4, 0.25),
+    "aco": MaterialPhysics(7850.0, 0.5, 0.3),
+    "steel": MaterialPhysics(7850.0, 0.5, 0.3),
+    "metal": MaterialPhysics(7850.0, 0.5, 0.3),
+    "madeira": _WOOD,
+    "wood": _WOOD,
+    "couro": MaterialPhysics(860.0, 0.7, 0.2),
+    "leather": MaterialPhysics(860.0, 0.7, 0.2),
+    "tecido": _FABRIC,
+    "fabric": _FABRIC,
+    "estofado": _FABRIC,
+    "plastico": MaterialPhysics(950.0, 0.4, 0.4),
+    "plastic": MaterialPhysics(950.0, 0.4, 0.4),
+    "borracha": MaterialPhysics(1100.0, 0.9, 0.7),
+    "rubber": MaterialPhysics(1100.0, 0.9, 0.7),
+}
+# Fallback by IFC class when the material name says nothing (averaged over typical build-ups).
+IFC_CLASS_DENSITIES: Dict[str, MaterialPhysics] = {
+    "IFCWALL": _MASONRY,
+    "IFCSLAB": _CONCRETE,
+    "IFCROOF": MaterialPhysics(1200.0, 0.6, 0.1),
+    "IFCCOLUMN": _CONCRETE,
+    "IFCBEAM": _CONCRETE,
+    "IFCSTAIR": _CONCRETE,
+    "IFCDOOR": _WOOD,
+    "IFCWINDOW": MaterialPhysics(1200.0, 0.4, 0.2),
+    "IFCFURNISHINGELEMENT": MaterialPhysics(500.0, 0.6, 0.2),
+}
+DEFAULT_MATERIAL_PHYSICS = MaterialPhysics(700.0, 0.6, 0.2)
+
+STATIC, DYNAMIC, KINEMATIC = 0, 1, 2
+BODY_TYPES = ("static", "dynamic", "kinematic")
+# Hinged elements are driven by the runtime; furniture falls and can be picked up. These are
+# also the classes batching never merges into static meshes.
+IFC_CLASS_BODIES: Dict[str, int] = {"IFCDOOR": KINEMATIC, "IFCWINDOW": KINEMATIC, "IFCFURNISHINGELEMENT": DYNAMIC}
+# Columns of the feature matrix handed to a learned model.
+FEATURE_NAMES = (
+    "volume",
+    "surface_area",
+    "extent_x",
+    "extent_y",
+    "extent_z",
+    "closed",
+    "table_density",
+    "table_friction",
+    "table_restitution",
+)
+# Thickness assumed for open, flat meshes (single-sided walls, panes) when falling back to their box.
+MIN_THICKNESS = 0.01
+_CLOSED_TOLERANCE = 1e-3
+
+
+@dataclass
+class ObjectPhysics:
+    """Per-object rigid-body parameters, one row per mesh node of the scene graph.
+
+    ``nodes`` are scene-graph node indices (stable through the geometry and
+    batching stages, which only append nodes). ``centroid`` and ``inertia``
+    (about the centroid, world axes) are in the root's frame; ``closed`` is
+    false where the mesh is open and its bounding box was used instead.
+    """
+
+    nodes: np.ndarray
+    volume: np.ndarray
+    mass: np.ndarray
+    centroid: np.ndarray
+    inertia: np.ndarray
+    density: np.ndarray
+    friction: np.ndarray
+    restitution: np.ndarray
+    closed: np.ndarray
+    body: np.ndarray
+
+    @property
+    def node_count(self) -> int:
+        return int(self.nodes.size)
+
+    def __len__(self) -> int:
+        return self.node_count
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {item.name: getattr(self, item.name) for item in fields(self)}
+
+    @classmethod
+    def from_arrays(cls, arrays: Mapping[str, np.ndarray]) -> "ObjectPhysics":
+        missing = [item.name for item in fields(cls) if item.name not in arrays]
+        if missing:
+            raise PipelineError(f"Object physics is missing {missing}")
+        return cls(**{item.name: np.asarray(arrays[item.name]) for item in fields(cls)})
+
+    def summary(self) -> Dict[str, float]:
+        """Project-wide figures; contact coefficients are averaged weighted by mass."""
+
+        total = float(self.mass.sum())
+        weights = self.mass if total > 0 else None
+        averaged = {}
+        if self.node_count:
+            averaged = {
+                "friction_coefficient": float(np.average(self.friction, weights=weights)),
+                "restitution_coefficient": float(np.average(self.restitution, weights=weights)),
+            }
         return {
-            "gravity_scale": 1.0,
-            "friction_coefficient": 0.8,
-            "mass_distribution": 0.5,
+            "objects": float(self.node_count),
+            "dynamic_objects": float(np.count_nonzero(self.body == DYNAMIC)),
+            "total_mass": total,
+            **averaged,
         }
+
+
+def mesh_moments(
+    meshes: Sequence[MeshData],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Volume, centroid, central second moment, area, bounds and closedness of each mesh.
+
+    Every triangle ``(a, b, c)`` spans a signed tetrahedron with the mesh's
+    reference point; summing their volumes, first and second moments over a
+    closed surface integrates the solid exactly. All triangles of all meshes are
+    processed as one batch and reduced per mesh with ``np.add.reduceat``.
+    Open meshes (their area vectors do not cancel) get their bounding box.
+    """
+
+    count = len(meshes)
+    lower = np.zeros((count, 3))
+    upper = np.zeros((count, 3))
+    corners: List[np.ndarray] = []
+    triangle_counts = np.zeros(count, dtype=np.int64)
+    for index, mesh in enumerate(meshes):
+        positions = np.asarray(mesh.positions, dtype=np.float64)
+        indices = np.asarray(mesh.indices, dtype=np.int64)
+        if not positions.size or not indices.size:
+            continue
+        lower[index], upper[index] = positions.min(axis=0), positions.max(axis=0)
+        # Moments are taken about the box centre to keep float64 sums well conditioned.
+        corners.append(positions[indices] - (lower[index] + upper[index]) / 2)
+        triangle_counts[index] = indices.shape[0]
+
+    volume = np.zeros(count)
+    first = np.zeros((count, 3))
+    second = np.zeros((count, 3, 3))
+    area_vector = np.zeros((count, 3))
+    area = np.zeros(count)
+    populated = np.flatnonzero(triangle_counts)
+    if populated.size:
+        triangles = np.concatenate(corners)
+        a, b, c = triangles[:, 0], triangles[:, 1], triangles[:, 2]
+        cross = np.cross(b - a, c - a)
+        signed = np.einsum("ij,ij->i", a, np.cross(b, c)) / 6.0
+        summed = a + b + c
+        weight = signed / 20.0
+        outer = np.einsum("n,ni,nj->nij", weight, a, a)
+        for vertex in (b, c, summed):
+            outer += np.einsum("n,ni,nj->nij", weight, vertex, vertex)
+        starts = np.concatenate(([0], np.cumsum(triangle_counts[populated])[:-1]))
+        volume[populated] = np.add.reduceat(signed, starts)
+        first[populated] = np.add.reduceat(signed[:, None] * summed / 4.0, starts)
+        second[populated] = np.add.reduceat(outer, starts)
+        area_vector[populated] = np.add.reduceat(cross, starts)
+        area[populated] = np.add.reduceat(np.linalg.norm(cross, axis=1), starts) / 2.0
+
+    extents = upper - lower
+    box_volume = np.prod(np.maximum(extents, MIN_THICKNESS), axis=1)
+    closed = (
+        (np.linalg.norm(area_vector, axis=1) <= _CLOSED_TOLERANCE * 2.0 * np.maximum(area, 1e-12))
+        & (np.abs(volume) > 1e-6 * box_volume)
+    )
+    # Inward-facing windings give negative volumes; flipping the sign fixes every moment at once.
+    sign = np.where(volume < 0, -1.0, 1.0)
+    volume, first, second = volume * sign, first * sign[:, None], second * sign[:, None, None]
+
+    centre = (lower + upper) / 2
+    safe = np.where(closed, volume, 1.0)
+    centroid = np.where(closed[:, None], centre + first / safe[:, None], centre)
+    offset = centroid - centre
+    central = second - safe[:, None, None] * np.einsum("ni,nj->nij", offset, offset)
+
+    box = np.maximum(extents, MIN_THICKNESS)
+    box_central = box_volume[:, None, None] / 12.0 * np.einsum("ni,ij->nij", box**2, np.eye(3))
+    volume = np.where(closed, volume, box_volume)
+    central = np.where(closed[:, None, None], central, box_central)
+    return volume, centroid, central, area, lower, upper, closed
+
+
+class PhysicsInferenceModel:
+    """Estimate physical properties for objects in the virtual house.
+
+    ``predict_objects`` handles a whole scene in one batch: exact mass
+    properties from the meshes (computed once per shared mesh, then moved by
+    each node's transform), density and contact coefficients from
+    ``material_densities`` (keywords in material names) or ``class_densities``
+    (IFC classes), and optionally a learned ``model``: anything with a
+    ``predict(features)`` method, or a callable, mapping the ``FEATURE_NAMES``
+    matrix to ``(n, 3)`` rows of density, friction and restitution in one call.
+    """
+
+    def __init__(
+        self,
+        model: Optional[object] = None,
+        *,
+        material_densities: Optional[Mapping[str, MaterialPhysics]] = None,
+        class_densities: Optional[Mapping[str, MaterialPhysics]] = None,
+    ) -> None:
+        self.model = model
+        self.material_densities = dict(MATERIAL_DENSITIES if material_densities is None else material_densities)
+        self.class_densities = dict(IFC_CLASS_DENSITIES if class_densities is None else class_densities)
+
+    def material_physics(self, material: Optional[str], ifc_class: Optional[str]) -> MaterialPhysics:
+        name = (material or "").lower()
+        for keyword, physics in self.material_densities.items():
+            if keyword in name:
+                return physics
+        return self.class_densities.get((ifc_class or "").upper(), DEFAULT_MATERIAL_PHYSICS)
+
+    def predict_objects(
+        self,
+        scene_graph: SceneGraph | Mapping[str, Dict[str, object]],
+        progress: Optional[Callable[[float], None]] = None,
+    ) -> ObjectPhysics:
+        """Per-object volume, mass, centroid, inertia, contact coefficients and body type."""
+
+        graph = SceneGraph.coerce(scene_graph)
+        nodes = graph.mesh_nodes()
+        node_meshes = graph.mesh_ids[nodes]
+        used, inverse = np.unique(node_meshes, return_inverse=True)
+        volume, centroid, central, area, lower, upper, closed = mesh_moments([graph.meshes[int(m)] for m in used])
+        if progress is not None:
+            progress(0.5)
+
+        world = graph.world_transforms().astype(np.float64)
+        relative = (np.linalg.inv(world[0]) @ world[nodes]) if nodes.size else np.zeros((0, 4, 4))
+        linear, translation = relative[:, :3, :3], relative[:, :3, 3]
+        scale = np.abs(np.linalg.det(linear))
+        node_volume = volume[inverse] * scale
+        node_centroid = np.einsum("nij,nj->ni", linear, centroid[inverse]) + translation
+        node_central = scale[:, None, None] * (linear @ central[inverse] @ linear.transpose(0, 2, 1))
+        # World-axis extents of each node's transformed bounding box.
+        half = (upper - lower)[inverse] / 2
+        extents = 2 * np.einsum("nij,nj->ni", np.abs(linear), half)
+
+        table = np.zeros((nodes.size, 3))
+        body = np.zeros(nodes.size, dtype=np.int8)
+        lookups: Dict[Tuple[Optional[str], str], MaterialPhysics] = {}
+        material_ids = graph.material_ids
+        for row, node in enumerate(nodes.tolist()):
+            attributes = graph.attributes[node]
+            material_id = int(material_ids[node])
+            material = graph.materials[material_id] if material_id >= 0 else graph.meshes[int(node_meshes[row])].material
+            ifc_class = str(attributes.get("ifc_class", "")).upper()
+            key = (material, ifc_class)
+            physics = lookups.get(key)
+            if physics is None:
+                physics = lookups[key] = self.material_physics(material, ifc_class)
+            table[row] = (physics.density, physics.friction, physics.restitution)
+            if "static" in attributes:
+                body[row] = STATIC if attributes["static"] else DYNAMIC
+            else:
+                body[row] = IFC_CLASS_BODIES.get(ifc_class, STATIC)
+
+        if self.model is not None and nodes.size:
+            features = np.column_stack(
+                (node_volume, area[inverse] * scale ** (2 / 3), extents, closed[inverse], table)
+            ).astype(np.float32)
+            predict = getattr(self.model, "predict", self.model)
+            predicted = np.asarray(predict(features), dtype=np.float64)
+            if predicted.shape != (nodes.size, 3):
+                raise PipelineError(f"Physics model returned shape {predicted.shape}, expected {(nodes.size, 3)}")
+            table = predicted
+
+        density = table[:, 0]
+        identity = np.eye(3)
+        trace = np.trace(node_central, axis1=1, axis2=2)
+        inertia = density[:, None, None] * (trace[:, None, None] * identity - node_central)
+        if progress is not None:
+            progress(1.0)
+        return ObjectPhysics(
+            nodes=nodes.astype(np.int32),
+            volume=node_volume.astype(np.float32),
+            mass=(density * node_volume).astype(np.float32),
+            centroid=node_centroid.astype(np.float32),
+            inertia=inertia.astype(np.float32),
+            density=density.astype(np.float32),
+            friction=table[:, 1].astype(np.float32),
+            restitution=table[:, 2].astype(np.float32),
+            closed=closed[inverse].astype(bool),
+            body=body,
+        )
+
+
+__all__ = [
+    "BODY_TYPES",
+    "DEFAULT_MATERIAL_PHYSICS",
+    "FEATURE_NAMES",
+    "IFC_CLASS_BODIES",
+    "IFC_CLASS_DENSITIES",
+    "MATERIAL_DENSITIES",
+    "MaterialPhysics",
+    "ObjectPhysics",
+    "PhysicsInferenceModel",
+    "mesh_moments",
+]
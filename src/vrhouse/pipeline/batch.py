@@ -0,0 +1,351 @@
+"""Convert many projects in one process tree: manifests, a worker pool and a summary report."""
+from __future__ import annotations
+
+import csv
+import glob
+import json
+import multiprocessing
+import os
+import time
+import traceback
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from vrhouse.core import PipelineError, SceneSpecification
+from vrhouse.pipeline.cache import StageCache
+from vrhouse.pipeline.instrumentation import StageMetrics, StageObserver, peak_rss_mb, reset_peak_rss
+from vrhouse.pipeline.registry import EXPORTERS, default_registry
+from vrhouse.pipeline.runner import ProgressCallback, run_conversion
+
+try:  # POSIX only; memory limits are skipped elsewhere
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+# A job whose worker dies this many times (OOM kill, segfault...) is reported as failed.
+MAX_ATTEMPTS = 2
+_TRUE = {"1", "true", "yes", "sim", "on"}
+# Worker side: the queue a shared-pool worker announces each job on before running it.
+_STARTED: Optional["multiprocessing.queues.SimpleQueue"] = None
+
+
+@dataclass
+class BatchJob:
+    """One conversion listed in a manifest."""
+
+    project_name: str
+    source_file: Path
+    output_directory: Path
+    encryption_key: Optional[str] = None
+    enable_physics: bool = True
+    enable_ai_realism: bool = True
+
+
+@dataclass
+class BatchOptions:
+    """Settings shared by every job of a batch run."""
+
+    memory_limit_mb: Optional[int] = None
+    cache_dir: Optional[Path] = None
+    cache_size_mb: Optional[int] = None
+    compress_assets: bool = False
+    compression: str = "auto"
+    compression_level: Optional[int] = None
+    stage_workers: Optional[int] = 1
+
+
+@dataclass
+class JobResult:
+    project_name: str
+    source_file: str
+    status: str
+    package_path: Optional[str] = None
+    error: Optional[str] = None
+    wall_seconds: float = 0.0
+    peak_rss_mb: Optional[float] = None
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+    attempts: int = 1
+
+
+def _flag(value: object, default: bool) -> bool:
+    if value is None or value == "":
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in _TRUE
+
+
+def _job_from_record(record: Dict[str, object], base: Path, output_root: Path) -> BatchJob:
+    source = record.get("source") or record.get("source_file")
+    if not source:
+        raise PipelineError(f"Manifest entry without a 'source': {record}")
+    source_path = Path(str(source)).expanduser()
+    if not source_path.is_absolute():
+        source_path = base / source_path
+    project = str(record.get("project_name") or record.get("project") or source_path.stem)
+    output = record.get("output") or record.get("output_directory")
+    # Relative outputs land under ``output_root``; absolute ones are kept as given.
+    output_path = output_root / str(output) if output else output_root / project
+    return BatchJob(
+        project_name=project,
+        source_file=source_path,
+        output_directory=output_path,
+        encryption_key=str(record["encryption_key"]) if record.get("encryption_key") else None,
+        enable_physics=_flag(record.get("physics", record.get("enable_physics")), True),
+        enable_ai_realism=_flag(record.get("ai", record.get("enable_ai_realism")), True),
+    )
+
+
+def load_manifest(manifest: str | Path, output_root: Path) -> List[BatchJob]:
+    """Read jobs from a CSV or JSON manifest, or expand a glob pattern of source files.
+
+    CSV/JSON entries need ``source`` and may set ``project_name``, ``output``,
+    ``encryption_key``, ``physics`` and ``ai``; relative sources resolve against
+    the manifest's directory. For a glob each match becomes a job named after
+    its file stem.
+    """
+
+    path = Path(manifest)
+    suffix = path.suffix.lower()
+    if suffix == ".csv" and path.is_file():
+        with path.open(newline="", encoding="utf-8-sig") as handle:
+            records = [dict(row) for row in csv.DictReader(handle)]
+    elif suffix == ".json" and path.is_file():
+        data = json.loads(path.read_text(encoding="utf-8"))
+        records = data.get("jobs", []) if isinstance(data, dict) else data
+    else:
+        matches = sorted(glob.glob(str(manifest), recursive=True))
+        if not matches:
+            raise PipelineError(f"Manifest {manifest} is not a CSV/JSON file and matches no files")
+        return [_job_from_record({"source": match}, Path.cwd(), output_root) for match in matches]
+
+    jobs = [_job_from_record(record, path.parent, output_root) for record in records]
+    names = [job.project_name for job in jobs]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise PipelineError(f"Duplicate project names in manifest: {', '.join(duplicates)}")
+    return jobs
+
+
+# -- worker side -------------------------------------------------------------------------
+def limit_memory(limit_mb: Optional[int]) -> None:
+    """Cap this process's address space at ``limit_mb`` megabytes (POSIX; no-op elsewhere)."""
+
+    if not limit_mb or resource is None:
+        return
+    limit = limit_mb * 1024 * 1024
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+class _RunPeakObserver(StageObserver):
+    """Keep the run's peak RSS: stages rewind VmHWM, so reading it afterwards only covers the last one."""
+
+    def __init__(self) -> None:
+        self.peak_rss_mb: Optional[float] = None
+
+    def run_finished(self, metrics: Sequence[StageMetrics], run: Mapping[str, object]) -> None:
+        peak = run.get("peak_rss_mb")
+        self.peak_rss_mb = float(peak) if isinstance(peak, (int, float)) else None
+
+
+def run_job(
+    job: BatchJob, options: BatchOptions, *, progress_callback: Optional[ProgressCallback] = None
+) -> JobResult:
+    """Run one conversion, turning every failure into a ``JobResult`` instead of raising."""
+
+    reset_supported = reset_peak_rss()
+    run_peak = _RunPeakObserver()
+    started = time.perf_counter()
+    result = JobResult(project_name=job.project_name, source_file=str(job.source_file), status="ok")
+    try:
+        cache = None
+        if options.cache_dir is not None:
+            cache = (
+                StageCache(options.cache_dir, options.cache_size_mb * 1024 * 1024)
+                if options.cache_size_mb
+                else StageCache(options.cache_dir)
+            )
+        specification = SceneSpecification(
+            project_name=job.project_name,
+            source_file=job.source_file,
+            enable_physics=job.enable_physics,
+            enable_ai_realism=job.enable_ai_realism,
+            output_encryption_key=job.encryption_key,
+        )
+        registry = default_registry()
+        exporter = registry.create(
+            EXPORTERS,
+            "vrpkg",
+            max_workers=options.stage_workers,
+            compress_assets=options.compress_assets,
+            compression=options.compression,
+            compression_level=options.compression_level,
+        )
+        output = run_conversion(
+            specification,
+            job.output_directory,
+            cache=cache,
+            exporter=exporter,
+            max_workers=options.stage_workers,
+            progress_callback=progress_callback,
+            observers=[run_peak],
+            registry=registry,
+        )
+        result.package_path = str(output["package_path"])
+        result.stage_seconds = {name: round(seconds, 4) for name, seconds in output["stage_seconds"].items()}
+    except MemoryError:
+        result.status = "failed"
+        result.error = f"MemoryError: exceeded the {options.memory_limit_mb} MB job memory limit"
+    except Exception:
+        result.status = "failed"
+        result.error = traceback.format_exc(limit=-3).strip()
+    result.wall_seconds = round(time.perf_counter() - started, 4)
+    result.peak_rss_mb = run_peak.peak_rss_mb if run_peak.peak_rss_mb is not None else peak_rss_mb(reset_supported)
+    return result
+
+
+def _track_starts(limit_mb: Optional[int], started: "multiprocessing.queues.SimpleQueue") -> None:
+    global _STARTED
+    limit_memory(limit_mb)
+    _STARTED = started
+
+
+def _run_tracked(position: int, job: BatchJob, options: BatchOptions) -> JobResult:
+    # SimpleQueue writes straight to the pipe, so the position is out even if the job kills us.
+    if _STARTED is not None:
+        _STARTED.put(position)
+    return run_job(job, options)
+
+
+# -- parent side -------------------------------------------------------------------------
+def run_batch(
+    jobs: Sequence[BatchJob],
+    options: Optional[BatchOptions] = None,
+    *,
+    max_workers: Optional[int] = None,
+    on_result: Optional[Callable[[JobResult], None]] = None,
+) -> List[JobResult]:
+    """Run ``jobs`` on a process pool, continuing past failures; results keep manifest order.
+
+    Workers are reused across jobs so interpreter start-up and imports are paid
+    once per worker. Each worker caps its address space at
+    ``options.memory_limit_mb`` (POSIX). When a worker dies outright every
+    unfinished future of the pool breaks, so no attempt is charged there: jobs
+    that had not started go back to a fresh shared pool, and jobs that had
+    started are rerun one per single-worker pool, where a crash can only be
+    their own. Those isolated crashes count, and a job is reported as failed
+    after ``MAX_ATTEMPTS`` of them.
+    """
+
+    options = options or BatchOptions()
+    workers = max(1, min(max_workers or os.cpu_count() or 1, len(jobs) or 1))
+    results: List[Optional[JobResult]] = [None] * len(jobs)
+    attempts = [0] * len(jobs)
+
+    def finish(position: int, result: JobResult) -> None:
+        result.attempts = attempts[position]
+        results[position] = result
+        if on_result is not None:
+            on_result(result)
+
+    def fail(position: int, error: str) -> None:
+        job = jobs[position]
+        finish(position, JobResult(job.project_name, str(job.source_file), "failed", error=error))
+
+    def isolate(suspects: Sequence[int]) -> None:
+        queue = deque(suspects)
+        running: Dict[Future, Tuple[int, ProcessPoolExecutor]] = {}
+        while queue or running:
+            while queue and len(running) < workers:
+                position = queue.popleft()
+                pool = ProcessPoolExecutor(max_workers=1, initializer=limit_memory, initargs=(options.memory_limit_mb,))
+                attempts[position] += 1
+                running[pool.submit(run_job, jobs[position], options)] = (position, pool)
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                position, pool = running.pop(future)
+                pool.shutdown(wait=True)
+                try:
+                    finish(position, future.result())
+                except BrokenProcessPool:
+                    if attempts[position] >= MAX_ATTEMPTS:
+                        fail(position, "Worker process died (memory limit or crash)")
+                    else:
+                        queue.append(position)
+                except Exception as exc:  # e.g. an unpicklable result
+                    fail(position, repr(exc))
+
+    remaining = list(range(len(jobs)))
+    while remaining:
+        broken: List[int] = []
+        started = multiprocessing.SimpleQueue()
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(remaining)),
+            initializer=_track_starts,
+            initargs=(options.memory_limit_mb, started),
+        ) as pool:
+            futures = {pool.submit(_run_tracked, position, jobs[position], options): position for position in remaining}
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    position = futures[future]
+                    try:
+                        result = future.result()
+                    except BrokenProcessPool:
+                        broken.append(position)
+                        continue
+                    except Exception as exc:  # e.g. an unpicklable result
+                        attempts[position] += 1
+                        fail(position, repr(exc))
+                        continue
+                    attempts[position] += 1
+                    finish(position, result)
+        begun = set()
+        while not started.empty():
+            begun.add(started.get())
+        started.close()
+        # Every started job is a suspect; fall back to all of them if none was announced.
+        suspects = sorted(position for position in broken if position in begun) or sorted(broken)
+        isolate(suspects)
+        remaining = sorted(set(broken) - set(suspects))
+    return [result for result in results if result is not None]
+
+
+def write_report(results: Sequence[JobResult], path: Path, *, wall_seconds: float) -> Dict[str, object]:
+    """Write the JSON summary (totals plus one record per job) and return it."""
+
+    failed = [result for result in results if result.status != "ok"]
+    timings = sorted(result.wall_seconds for result in results)
+    report = {
+        "jobs": len(results),
+        "succeeded": len(results) - len(failed),
+        "failed": len(failed),
+        "wall_seconds": round(wall_seconds, 4),
+        "job_seconds_total": round(sum(timings), 4),
+        "job_seconds_median": timings[len(timings) // 2] if timings else 0.0,
+        "job_seconds_max": timings[-1] if timings else 0.0,
+        "results": [asdict(result) for result in results],
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    return report
+
+
+__all__ = [
+    "BatchJob",
+    "BatchOptions",
+    "JobResult",
+    "limit_memory",
+    "load_manifest",
+    "run_batch",
+    "run_job",
+    "write_report",
+]
@@ -0,0 +1,314 @@
+"""Content-addressed on-disk cache for pipeline stage outputs."""
+from __future__ import annotations
+
+import ast
+import hashlib
+import inspect
+import json
+import mmap
+import os
+import pickle
+import struct
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+CACHE_FORMAT_VERSION = 1
+DEFAULT_MAX_BYTES = 20 * 1024**3
+_MAGIC = b"VRHC"
+_HEADER = struct.Struct("<4sIQQ")
+_ALIGNMENT = 64
+_HASH_CHUNK = 8 * 1024 * 1024
+# Public stage attributes that tune execution but never change a stage's output.
+_RUNTIME_ATTRIBUTES = frozenset({"max_workers", "cache"})
+
+
+def _digest(*parts: bytes | str) -> str:
+    hasher = hashlib.blake2b(digest_size=20)
+    for part in parts:
+        data = part.encode("utf-8") if isinstance(part, str) else part
+        hasher.update(struct.pack("<Q", len(data)))
+        hasher.update(data)
+    return hasher.hexdigest()
+
+
+def _package_version() -> str:
+    try:
+        from importlib.metadata import version
+
+        return version("vrhouse")
+    except Exception:
+        return "0+unknown"
+
+
+_PACKAGE_ROOT = Path(__file__).resolve().parents[1]
+_CODE_VERSIONS: Dict[type, str] = {}
+
+
+def _module_file(name: str) -> Optional[Path]:
+    """Source file of module ``name``: ``vrhouse`` modules by path (nothing is imported), others if loaded."""
+
+    if name == "vrhouse" or name.startswith("vrhouse."):
+        base = _PACKAGE_ROOT.joinpath(*name.split(".")[1:])
+        for candidate in (base.with_suffix(".py"), base / "__init__.py"):
+            if candidate.is_file():
+                return candidate
+        return None
+    module = sys.modules.get(name)
+    location = getattr(module, "__file__", None)
+    return Path(location) if location and location.endswith(".py") else None
+
+
+def _imported_modules(name: str, path: Path, source: bytes) -> Set[str]:
+    """``vrhouse`` modules named by any import statement in ``source``, including function-level ones."""
+
+    package = name if path.name == "__init__.py" else name.rpartition(".")[0]
+    found: Set[str] = set()
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Import):
+            found.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            module = node.module or ""
+            if node.level:
+                parts = package.split(".")
+                base = ".".join(parts[: len(parts) - node.level + 1])
+                module = f"{base}.{module}" if module else base
+            # ``from package import name`` may name a submodule as well as an attribute.
+            found.add(module)
+            found.update(f"{module}.{alias.name}" for alias in node.names)
+    return {module for module in found if module.startswith("vrhouse") and _module_file(module) is not None}
+
+
+def code_version(stage: object) -> str:
+    """Fingerprint the stage's module and every ``vrhouse`` module it imports, transitively.
+
+    Imports are read from the source (including imports inside functions), so a
+    change to a helper such as ``decimation`` invalidates the stages built on it.
+    The package version and cache format are part of the fingerprint too.
+    """
+
+    cls = stage if isinstance(stage, type) else type(stage)
+    cached = _CODE_VERSIONS.get(cls)
+    if cached is None:
+        parts: List[str | bytes] = [_package_version(), str(CACHE_FORMAT_VERSION)]
+        start = _module_file(cls.__module__)
+        if start is None:
+            try:
+                start = Path(inspect.getsourcefile(cls) or "")
+            except TypeError:
+                start = None
+        if start is None or not start.is_file():
+            parts.append(cls.__qualname__)
+        else:
+            sources: Dict[str, bytes] = {}
+            pending = [(cls.__module__, start)]
+            while pending:
+                name, path = pending.pop()
+                if name in sources:
+                    continue
+                sources[name] = path.read_bytes()
+                try:
+                    imported = _imported_modules(name, path, sources[name])
+                except SyntaxError:
+                    imported = set()
+                pending.extend((module, _module_file(module)) for module in imported - sources.keys())
+            for name in sorted(sources):
+                parts.extend((name, sources[name]))
+        cached = _CODE_VERSIONS[cls] = _digest(*parts)
+    return cached
+
+
+def stage_configuration(stage: object) -> str:
+    """Stable JSON rendering of a stage's public constructor state."""
+
+    state = {
+        name: value
+        for name, value in sorted(vars(stage).items())
+        if not name.startswith("_") and not name.startswith("last_") and name not in _RUNTIME_ATTRIBUTES
+    }
+    return json.dumps(state, sort_keys=True, default=repr)
+
+
+class StageCache:
+    """Store stage outputs under keys derived from source hash, stage, config and code version.
+
+    Keys chain: each stage's key includes the key of its input, so a change early
+    in the pipeline invalidates everything downstream while unchanged prefixes are
+    served from disk. Entries use pickle protocol 5 with out-of-band buffers laid
+    out as aligned raw blocks; loading memory-maps the file so NumPy arrays come
+    back as zero-copy views. Total size is capped with least-recently-used eviction
+    (entry mtimes are refreshed on every hit); ``subcache`` opens a nested cache
+    that shares that budget and LRU order.
+
+    Entries are trusted local data written by this process family; do not point
+    the cache at directories other users can write to.
+    """
+
+    def __init__(
+        self, directory: Path, max_bytes: int = DEFAULT_MAX_BYTES, *, parent: Optional["StageCache"] = None
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._parent = parent
+        self.hits = 0
+        self.misses = 0
+
+    def subcache(self, name: str) -> "StageCache":
+        """Cache in ``<directory>/<name>`` whose entries count against this cache's ``max_bytes``."""
+
+        return StageCache(self.directory / name, self.max_bytes, parent=self)
+
+    # -- keys ----------------------------------------------------------------------------
+    def source_digest(self, path: Path) -> str:
+        """Hash a source file, memoised by (path, size, mtime) so unchanged files are not re-read."""
+
+        path = Path(path).resolve()
+        stat = path.stat()
+        memo_file = self.directory / "sources.json"
+        memo_key = str(path)
+        with self._lock:
+            try:
+                memo = json.loads(memo_file.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                memo = {}
+            entry = memo.get(memo_key)
+            if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+                return entry[2]
+
+        hasher = hashlib.blake2b(digest_size=20)
+        with path.open("rb") as handle:
+            for block in iter(lambda: handle.read(_HASH_CHUNK), b""):
+                hasher.update(block)
+        digest = hasher.hexdigest()
+
+        with self._lock:
+            try:
+                memo = json.loads(memo_file.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                memo = {}
+            memo[memo_key] = [stat.st_size, stat.st_mtime_ns, digest]
+            self._atomic_write(memo_file, json.dumps(memo).encode("utf-8"))
+        return digest
+
+    def key(self, stage_name: str, stage: object, upstream_key: str) -> str:
+        return _digest(stage_name, upstream_key, stage_configuration(stage), code_version(stage))
+
+    # -- storage -------------------------------------------------------------------------
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.bin"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        path = self._path(key)
+        try:
+            with path.open("rb") as handle:
+                data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            self.misses += 1
+            return default
+
+        try:
+            value = self._decode(memoryview(data))
+        except Exception:
+            self.misses += 1
+            path.unlink(missing_ok=True)
+            return default
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        from vrhouse.core import SceneGraph
+
+        # Loaded arrays are read-only views over the mapping; hand stages a copy-on-write graph.
+        return value.copy() if isinstance(value, SceneGraph) else value
+
+    def put(self, key: str, value: Any) -> None:
+        buffers: List[pickle.PickleBuffer] = []
+        body = pickle.dumps(value, protocol=5, buffer_callback=buffers.append)
+        raws = [buffer.raw() for buffer in buffers]
+        table = struct.pack(f"<{len(raws)}Q", *(len(raw) for raw in raws))
+
+        chunks: List[bytes | memoryview] = [_HEADER.pack(_MAGIC, CACHE_FORMAT_VERSION, len(body), len(raws)), table, body]
+        offset = sum(len(chunk) for chunk in chunks)
+        for raw in raws:
+            padding = -offset % _ALIGNMENT
+            chunks.append(b"\0" * padding)
+            chunks.append(raw)
+            offset += padding + len(raw)
+
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._atomic_write(path, chunks)
+        self.evict()
+
+    def _decode(self, data: memoryview) -> Any:
+        magic, version, body_length, buffer_count = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC or version != CACHE_FORMAT_VERSION:
+            raise ValueError("Unrecognised cache entry")
+        offset = _HEADER.size
+        sizes = struct.unpack_from(f"<{buffer_count}Q", data, offset)
+        offset += 8 * buffer_count
+        body = data[offset : offset + body_length]
+        offset += body_length
+        buffers = []
+        for size in sizes:
+            offset += -offset % _ALIGNMENT
+            buffers.append(data[offset : offset + size])
+            offset += size
+        return pickle.loads(body, buffers=buffers)
+
+    @staticmethod
+    def _atomic_write(path: Path, chunks: bytes | List[bytes | memoryview]) -> None:
+        descriptor, temporary = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(descriptor, "wb") as handle:
+                for chunk in [chunks] if isinstance(chunks, bytes) else chunks:
+                    handle.write(chunk)
+            os.replace(temporary, path)
+        except BaseException:
+            Path(temporary).unlink(missing_ok=True)
+            raise
+
+    def entries(self) -> List[Tuple[float, int, Path]]:
+        """``(mtime, size, path)`` of every entry, including those of nested caches, oldest first."""
+
+        found = []
+        for path in self.directory.rglob("*.bin"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            found.append((stat.st_mtime, stat.st_size, path))
+        return sorted(found)
+
+    def evict(self) -> None:
+        """Delete least-recently-used entries until the cache fits in ``max_bytes``.
+
+        A nested cache evicts across its parent's whole tree, so all of them
+        share one budget.
+        """
+
+        if self._parent is not None:
+            self._parent.evict()
+            return
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self) -> None:
+        for _, _, path in self.entries():
+            path.unlink(missing_ok=True)
+
+
+__all__ = ["DEFAULT_MAX_BYTES", "StageCache", "code_version", "stage_configuration"]
@@ -0,0 +1,432 @@
+"""Spatially chunked packages: one small manifest plus independently loadable chunk files.
+
+A chunked export writes ``<project>.vrpkg`` as a manifest package (hierarchy
+without geometry, physics, colliders, BVH, PVS and the chunk descriptors) and
+``<project>.chunks/chunk-<n>.vrpkg`` files holding the meshes, LODs and textures
+of one region each (textures several regions use go to ``shared.vrpkg`` once).
+Every file is a complete sectioned container with its own key derivation, so a
+headset decrypts a chunk without touching the others; ``ChunkStreamer`` keeps
+the chunks around the camera resident within a memory budget.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from vrhouse.core import AXES, UP_AXIS, SceneGraph
+from vrhouse.pipeline.exporters.encryption import PackageError
+from vrhouse.pipeline.exporters.package import VRPackage, write_scene_package
+from vrhouse.pipeline.processors.visibility import CellVisibility
+
+CHUNK_STRATEGIES = ("floor", "room", "grid")
+DEFAULT_CHUNK_SIZE = 8.0
+DEFAULT_FLOOR_HEIGHT = 3.0
+DEFAULT_STREAM_RADIUS = 15.0
+DEFAULT_RESIDENT_BYTES = 512 * 1024 * 1024
+
+
+def partition_nodes(
+    scene_graph: SceneGraph,
+    strategy: str = "grid",
+    *,
+    chunk_size: float = DEFAULT_CHUNK_SIZE,
+    floor_height: float = DEFAULT_FLOOR_HEIGHT,
+    up_axis: str = UP_AXIS,
+    visibility: Optional[Mapping[str, np.ndarray]] = None,
+) -> List[np.ndarray]:
+    """Group the mesh nodes of ``scene_graph`` into chunks by the centre of their boxes.
+
+    ``"grid"`` uses cubes of ``chunk_size`` metres; ``"floor"`` bands of
+    ``floor_height`` along ``up_axis`` counted from the lowest object; ``"room"``
+    the cells of ``visibility`` (``CellVisibility`` arrays), with objects outside
+    every cell (walls, slabs) joining the nearest one. Without cells ``"room"``
+    falls back to the grid. Nodes without meshes stay in the manifest only.
+    """
+
+    if strategy not in CHUNK_STRATEGIES:
+        raise ValueError(f"Unknown chunk strategy {strategy!r}; expected one of {CHUNK_STRATEGIES}")
+    graph = SceneGraph.coerce(scene_graph)
+    nodes = graph.mesh_nodes()
+    if not nodes.size:
+        return []
+    lower, upper = graph.node_bounds(nodes)
+    centre = (lower + upper) / 2
+    cells = CellVisibility.from_arrays(visibility) if strategy == "room" and visibility else None
+    if strategy == "floor":
+        up = AXES[up_axis]
+        keys = np.floor((centre[:, up] - lower[:, up].min()) / floor_height)[:, None]
+    elif cells is not None and cells.cell_count:
+        keys = cells.cell_at(centre)
+        outside = np.flatnonzero(keys < 0)
+        if outside.size:
+            bounds = cells.cell_bounds.astype(np.float64)
+            gap = np.maximum(bounds[None, :, 0] - centre[outside, None], centre[outside, None] - bounds[None, :, 1])
+            keys[outside] = np.argmin(np.linalg.norm(np.maximum(gap, 0.0), axis=2), axis=1)
+        keys = keys[:, None]
+    else:
+        keys = np.floor((centre - lower.min(axis=0)) / chunk_size)
+    _, chunk = np.unique(keys, axis=0, return_inverse=True)
+    chunk = chunk.reshape(-1)
+    order = np.argsort(chunk, kind="stable")
+    return np.split(nodes[order], np.cumsum(np.bincount(chunk))[:-1])
+
+
+def _texture_references(properties: Mapping[str, object], textures: Mapping[str, object]) -> List[str]:
+    # Texture keys are the last token of a material property (MTL options come first).
+    found = []
+    for value in properties.values():
+        if isinstance(value, str) and value.strip() and value.split()[-1] in textures:
+            found.append(value.split()[-1])
+    return found
+
+
+def chunk_graph(scene_graph: SceneGraph, nodes: np.ndarray, *, with_meshes: bool = True) -> SceneGraph:
+    """Standalone graph of ``nodes`` placed directly under a copy of the root, in the root's frame.
+
+    With ``with_meshes`` it carries the meshes, LODs, material entries and textures
+    those nodes use; otherwise it keeps only names, transforms, materials and
+    attributes (the manifest's hierarchy, where ``nodes`` should be every node
+    and parents are preserved).
+    """
+
+    graph = SceneGraph.coerce(scene_graph)
+    nodes = np.asarray(nodes, dtype=np.int64)
+    world = graph.world_transforms().astype(np.float64)
+    relative = np.linalg.inv(world[0]) @ world
+    chunk = SceneGraph(root_attributes=graph.attributes[0], capacity=len(nodes) + 1)
+    chunk.set_transform(0, graph.transforms[0])
+    chunk.metadata.update(graph.metadata)
+    materials = graph.materials
+    mesh_slots: Dict[int, int] = {}
+    used_materials = set()
+    for node in nodes.tolist():
+        if node == 0:
+            continue
+        material_id = int(graph.material_ids[node])
+        material = materials[material_id] if material_id >= 0 else None
+        mesh = None
+        mesh_id = int(graph.mesh_ids[node])
+        if with_meshes and mesh_id >= 0:
+            if mesh_id not in mesh_slots:
+                mesh_slots[mesh_id] = chunk.add_mesh(graph.meshes[mesh_id])
+            mesh = mesh_slots[mesh_id]
+        if with_meshes:
+            parent, transform = 0, relative[node]
+        else:
+            parent, transform = int(graph.parents[node]), graph.transforms[node]
+        chunk.add_node(
+            graph.names[node],
+            parent=parent,
+            transform=transform,
+            mesh=mesh,
+            material=material,
+            attributes=graph.attributes[node],
+        )
+        if material is not None:
+            used_materials.add(material)
+        if mesh is not None and graph.meshes[mesh_id].material:
+            used_materials.add(graph.meshes[mesh_id].material)
+    for material, properties in graph.material_properties.items():
+        if with_meshes and material not in used_materials:
+            continue
+        chunk.set_material_properties(material, properties)
+        if with_meshes:
+            for name in _texture_references(properties, graph.textures):
+                chunk.set_texture(name, graph.textures[name])
+    for mesh_id, slot in mesh_slots.items():
+        if mesh_id in graph.lods:
+            chunk.set_lods(slot, graph.lods[mesh_id])
+    return chunk
+
+
+def _texture_bytes(levels: Sequence[np.ndarray]) -> int:
+    return sum(int(level.nbytes) for level in levels)
+
+
+def _resident_bytes(graph: SceneGraph) -> int:
+    """Decoded size of a chunk's meshes, LODs and own textures: what loading it costs in memory."""
+
+    meshes = sum(mesh.nbytes for mesh in graph.meshes)
+    lods = sum(mesh.nbytes for levels in graph.lods.values() for mesh in levels)
+    return int(meshes + lods + sum(_texture_bytes(levels) for levels in graph.textures.values()))
+
+
+def chunk_directory(path: Path) -> Path:
+    return path.with_suffix(".chunks")
+
+
+def write_chunked_package(
+    path: Path,
+    key: str | bytes,
+    *,
+    project: str,
+    scene_graph: SceneGraph,
+    chunks: Sequence[np.ndarray],
+    physics_profile: Mapping[str, float],
+    ai_metadata: Mapping[str, object],
+    physics_objects: Optional[Mapping[str, np.ndarray]] = None,
+    colliders: Optional[Mapping[str, np.ndarray]] = None,
+    spatial_index: Optional[Mapping[str, np.ndarray]] = None,
+    visibility: Optional[Mapping[str, np.ndarray]] = None,
+    **options: object,
+) -> Path:
+    """Write ``chunks`` (node index arrays, see ``partition_nodes``) as chunk files plus the manifest at ``path``.
+
+    Textures used by more than one chunk (atlases, shared materials) are written
+    once to ``shared.vrpkg`` instead of into every chunk. Each chunk descriptor
+    in the manifest records the chunk's file (relative to ``path``), root-frame
+    bounds, node and triangle counts, file size, decoded ``memory``, the shared
+    ``textures`` it needs and, with a PVS, the ``cells`` its bounds overlap.
+    ``options`` are forwarded to ``write_scene_package`` for every file.
+    """
+
+    graph = SceneGraph.coerce(scene_graph)
+    directory = chunk_directory(path)
+    directory.mkdir(parents=True, exist_ok=True)
+    for stale in directory.glob("*.vrpkg"):
+        stale.unlink()
+    cells = CellVisibility.from_arrays(visibility) if visibility else None
+    chunks = [np.asarray(nodes, dtype=np.int64) for nodes in chunks]
+    subgraphs = [chunk_graph(graph, nodes) for nodes in chunks]
+    users: Dict[str, int] = {}
+    for subgraph in subgraphs:
+        for name in subgraph.textures:
+            users[name] = users.get(name, 0) + 1
+    shared = sorted(name for name, count in users.items() if count > 1)
+
+    manifest: Dict[str, object] = {"chunks": []}
+    if shared:
+        holder = SceneGraph(root_attributes=graph.attributes[0], capacity=1)
+        for name in shared:
+            holder.set_texture(name, graph.textures[name])
+        target = directory / "shared.vrpkg"
+        write_scene_package(
+            target, key, project=project, scene_graph=holder, physics_profile={}, ai_metadata=ai_metadata, **options
+        )
+        manifest["shared"] = {
+            "file": f"{directory.name}/{target.name}",
+            "textures": {name: _texture_bytes(graph.textures[name]) for name in shared},
+        }
+    for index, (nodes, subgraph) in enumerate(zip(chunks, subgraphs)):
+        needed = [name for name in shared if name in subgraph.textures]
+        for name in needed:
+            subgraph.set_texture(name, [])
+        target = directory / f"chunk-{index:04d}.vrpkg"
+        write_scene_package(
+            target,
+            key,
+            project=project,
+            scene_graph=subgraph,
+            physics_profile={},
+            ai_metadata={**dict(ai_metadata), "chunk": index},
+            source_nodes=np.concatenate(([0], nodes)).astype(np.int32),
+            **options,  # type: ignore[arg-type]
+        )
+        lower, upper = graph.node_bounds(nodes)
+        lower, upper = lower.min(axis=0), upper.max(axis=0)
+        descriptor: Dict[str, object] = {
+            "file": f"{directory.name}/{target.name}",
+            "lower": lower.tolist(),
+            "upper": upper.tolist(),
+            "nodes": int(nodes.size),
+            "triangles": subgraph.triangle_count,
+            "bytes": target.stat().st_size,
+            "memory": _resident_bytes(subgraph),
+            "textures": needed,
+        }
+        if cells is not None and cells.cell_count:
+            bounds = cells.cell_bounds
+            overlap = np.all((bounds[:, 0] <= upper) & (bounds[:, 1] >= lower), axis=1)
+            descriptor["cells"] = np.flatnonzero(overlap).tolist()
+        manifest["chunks"].append(descriptor)  # type: ignore[union-attr]
+
+    return write_scene_package(
+        path,
+        key,
+        project=project,
+        scene_graph=chunk_graph(graph, np.arange(len(graph)), with_meshes=False),
+        physics_profile=physics_profile,
+        ai_metadata=ai_metadata,
+        physics_objects=physics_objects,
+        colliders=colliders,
+        spatial_index=spatial_index,
+        visibility=visibility,
+        chunk_manifest=manifest,
+        **options,  # type: ignore[arg-type]
+    )
+
+
+class ChunkStreamer:
+    """Stream the chunks of a chunked package around a moving camera, within a memory budget.
+
+    ``update(position)`` wants every chunk whose bounds lie within ``radius`` of
+    the camera, nearest first; with a PVS in the manifest, chunks whose cells
+    cannot be seen from the camera's cell are skipped as well. Missing chunks
+    are decrypted and loaded together with the shared textures they need (kept
+    once, while any resident chunk uses them). When the resident data would
+    exceed ``max_resident_bytes``, the least recently wanted chunks are evicted
+    first, then wanted chunks farther than the one being loaded; chunks that
+    still do not fit wait for a later update. The chunk the camera stands in is
+    always loaded.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        key: str | bytes,
+        *,
+        radius: float = DEFAULT_STREAM_RADIUS,
+        max_resident_bytes: int = DEFAULT_RESIDENT_BYTES,
+        load_textures: bool = True,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        self.path = Path(path)
+        self.radius = radius
+        self.max_resident_bytes = max_resident_bytes
+        self.load_textures = load_textures
+        self.max_workers = max_workers
+        self._key = key
+        self.manifest = VRPackage(self.path, key, max_workers=max_workers)
+        layout = self.manifest.chunk_manifest()
+        self.chunks: List[Dict[str, object]] = list(layout.get("chunks", []))
+        if not self.chunks:
+            self.manifest.close()
+            raise PackageError(f"{self.path} is not a chunked package")
+        self._shared_layout: Dict[str, object] = dict(layout.get("shared", {}))
+        self._shared_package: Optional[VRPackage] = None
+        self.lower = np.array([chunk["lower"] for chunk in self.chunks], dtype=np.float64)
+        self.upper = np.array([chunk["upper"] for chunk in self.chunks], dtype=np.float64)
+        arrays = self.manifest.visibility()
+        self.visibility = CellVisibility.from_arrays(arrays) if arrays else None
+        self._resident: "OrderedDict[int, SceneGraph]" = OrderedDict()
+        self._textures: Dict[str, List[np.ndarray]] = {}
+        self._texture_users: Dict[str, int] = {}
+        self.source_nodes: Dict[int, np.ndarray] = {}
+        self.resident_bytes = 0
+
+    @property
+    def resident(self) -> Mapping[int, SceneGraph]:
+        return dict(self._resident)
+
+    def distances(self, position: np.ndarray) -> np.ndarray:
+        position = np.asarray(position, dtype=np.float64).reshape(3)
+        gap = np.maximum(np.maximum(self.lower - position, position - self.upper), 0.0)
+        return np.linalg.norm(gap, axis=1)
+
+    def wanted(self, position: np.ndarray) -> np.ndarray:
+        """Chunks to have resident at ``position``, nearest first."""
+
+        distance = self.distances(position)
+        candidates = distance <= self.radius
+        if self.visibility is not None and self.visibility.cell_count:
+            cell = int(self.visibility.cell_at(position)[0])
+            if cell >= 0:
+                visible = set(self.visibility.visible_cells(cell).tolist())
+                for index, chunk in enumerate(self.chunks):
+                    if chunk.get("cells") and not visible.intersection(chunk["cells"]):  # type: ignore[arg-type]
+                        candidates[index] = False
+        candidates |= distance == 0.0
+        found = np.flatnonzero(candidates)
+        return found[np.argsort(distance[found], kind="stable")]
+
+    def cost(self, index: int) -> int:
+        """Bytes that loading chunk ``index`` would add, counting shared textures not resident yet."""
+
+        sizes: Mapping[str, int] = self._shared_layout.get("textures", {})  # type: ignore[assignment]
+        textures = [name for name in self.chunks[index].get("textures", []) if name not in self._textures]
+        return int(self.chunks[index]["memory"]) + sum(int(sizes[name]) for name in textures)
+
+    def update(self, position: np.ndarray) -> Tuple[List[int], List[int]]:
+        """Load what ``position`` needs and evict what no longer fits; returns ``(loaded, evicted)``."""
+
+        wanted = self.wanted(position).tolist()
+        keep = set(wanted)
+        loaded: List[int] = []
+        evicted: List[int] = []
+        for rank, index in enumerate(wanted):
+            if index in self._resident:
+                self._resident.move_to_end(index)
+                continue
+            while self.resident_bytes + self.cost(index) > self.max_resident_bytes:
+                victim = next((other for other in self._resident if other not in keep), None)
+                if victim is None:
+                    # Farther wanted chunks make room for nearer ones, farthest first.
+                    victim = next((other for other in reversed(wanted[rank + 1 :]) if other in self._resident), None)
+                if victim is None:
+                    break
+                self.evict(victim)
+                evicted.append(victim)
+            if self._resident and self.resident_bytes + self.cost(index) > self.max_resident_bytes:
+                break
+            self.load(index)
+            loaded.append(index)
+        return loaded, evicted
+
+    def _shared_texture(self, name: str) -> List[np.ndarray]:
+        if name not in self._textures:
+            if self._shared_package is None:
+                shared = self.path.parent / str(self._shared_layout["file"])
+                self._shared_package = VRPackage(shared, self._key, max_workers=self.max_workers)
+            self._textures[name] = self._shared_package.texture(name)
+            self.resident_bytes += _texture_bytes(self._textures[name])
+        self._texture_users[name] = self._texture_users.get(name, 0) + 1
+        return self._textures[name]
+
+    def load(self, index: int) -> SceneGraph:
+        """Decrypt chunk ``index`` (if not resident yet) and return its scene graph, shared textures included."""
+
+        if index in self._resident:
+            self._resident.move_to_end(index)
+            return self._resident[index]
+        descriptor = self.chunks[index]
+        with VRPackage(self.path.parent / str(descriptor["file"]), self._key, max_workers=self.max_workers) as chunk:
+            graph = chunk.scene_graph(load_textures=self.load_textures)
+            self.source_nodes[index] = chunk.source_nodes()
+        if self.load_textures:
+            for name in descriptor.get("textures", []):  # type: ignore[union-attr]
+                graph.set_texture(name, self._shared_texture(name))
+        self._resident[index] = graph
+        self.resident_bytes += int(descriptor["memory"])
+        return graph
+
+    def evict(self, index: int) -> None:
+        if self._resident.pop(index, None) is None:
+            return
+        self.resident_bytes -= int(self.chunks[index]["memory"])
+        self.source_nodes.pop(index, None)
+        for name in self.chunks[index].get("textures", []):  # type: ignore[union-attr]
+            if name not in self._texture_users:
+                continue
+            self._texture_users[name] -= 1
+            if not self._texture_users[name]:
+                del self._texture_users[name]
+                self.resident_bytes -= _texture_bytes(self._textures.pop(name))
+
+    def close(self) -> None:
+        self._resident.clear()
+        self._textures.clear()
+        self._texture_users.clear()
+        self.source_nodes.clear()
+        self.resident_bytes = 0
+        if self._shared_package is not None:
+            self._shared_package.close()
+        self.manifest.close()
+
+    def __enter__(self) -> "ChunkStreamer":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+
+__all__ = [
+    "CHUNK_STRATEGIES",
+    "ChunkStreamer",
+    "chunk_directory",
+    "chunk_graph",
+    "partition_nodes",
+    "write_chunked_package",
+]
@@ -0,0 +1,139 @@
+"""Section codecs (zstd/zlib) and mesh precompression transforms for ``.vrpkg`` containers."""
+from __future__ import annotations
+
+import zlib
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from vrhouse.core import PipelineError
+
+try:  # optional: ``pip install vrhouse[compression]``
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+DEFAULT_LEVELS: Dict[str, int] = {"zstd": 9, "zlib": 6}
+# Sections smaller than this are not worth a codec frame.
+MIN_COMPRESS_SIZE = 256
+
+
+def available_codecs() -> Tuple[str, ...]:
+    return ("zstd", "zlib") if zstandard is not None else ("zlib",)
+
+
+def resolve_codec(codec: str) -> str:
+    """Map ``"auto"`` to the best installed codec and validate explicit choices."""
+
+    if codec == "auto":
+        return available_codecs()[0]
+    if codec not in DEFAULT_LEVELS:
+        raise PipelineError(f"Unknown compression codec {codec!r}; expected one of {sorted(DEFAULT_LEVELS)}")
+    if codec not in available_codecs():
+        raise PipelineError("zstd compression requires the 'zstandard' package (pip install vrhouse[compression])")
+    return codec
+
+
+def compress_bytes(data: bytes | memoryview, codec: str, level: Optional[int] = None) -> bytes:
+    level = DEFAULT_LEVELS[codec] if level is None else level
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    return zlib.compress(data, level)
+
+
+def decompress_bytes(data: bytes | memoryview, codec: str, size: int) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise PipelineError("This package uses zstd sections; install the 'zstandard' package to read it")
+        return zstandard.ZstdDecompressor().decompress(data, max_output_size=size)
+    if codec == "zlib":
+        return zlib.decompress(data, bufsize=max(size, 1))
+    raise PipelineError(f"Unknown compression codec {codec!r}")
+
+
+# -- mesh precompression -------------------------------------------------------------------
+def quantize_positions(positions: np.ndarray, bits: int = 16) -> Tuple[np.ndarray, Dict[str, object]]:
+    """Snap positions onto a ``bits``-per-axis grid spanning the mesh bounding box.
+
+    The worst-case error per axis is half a grid step (``extent / (2**bits - 1) / 2``).
+    """
+
+    positions = np.asarray(positions, dtype=np.float64)
+    if positions.size == 0:
+        return np.zeros(positions.shape, dtype=np.uint16), {"offset": [0.0] * 3, "scale": [1.0] * 3}
+    low = positions.min(axis=0)
+    extent = positions.max(axis=0) - low
+    steps = float((1 << bits) - 1)
+    scale = np.where(extent > 0, extent / steps, 1.0)
+    quantized = np.rint((positions - low) / scale).astype(np.uint16 if bits <= 16 else np.uint32)
+    return quantized, {"offset": low.tolist(), "scale": scale.tolist()}
+
+
+def dequantize_positions(quantized: np.ndarray, parameters: Dict[str, object]) -> np.ndarray:
+    offset = np.asarray(parameters["offset"], dtype=np.float64)
+    scale = np.asarray(parameters["scale"], dtype=np.float64)
+    return (quantized.astype(np.float64) * scale + offset).astype(np.float32)
+
+
+def encode_octahedral(normals: np.ndarray) -> np.ndarray:
+    """Map unit normals onto the octahedron and store them as two snorm16 values."""
+
+    normals = np.asarray(normals, dtype=np.float64)
+    length = np.abs(normals).sum(axis=1, keepdims=True)
+    length[length == 0] = 1.0
+    projected = normals / length
+    x, y, z = projected[:, 0], projected[:, 1], projected[:, 2]
+    folded_x = np.where(z < 0, (1.0 - np.abs(y)) * np.where(x >= 0, 1.0, -1.0), x)
+    folded_y = np.where(z < 0, (1.0 - np.abs(x)) * np.where(y >= 0, 1.0, -1.0), y)
+    return np.rint(np.stack((folded_x, folded_y), axis=1) * 32767.0).astype(np.int16)
+
+
+def decode_octahedral(encoded: np.ndarray) -> np.ndarray:
+    folded = encoded.astype(np.float64) / 32767.0
+    x, y = folded[:, 0], folded[:, 1]
+    z = 1.0 - np.abs(x) - np.abs(y)
+    shift = np.clip(-z, 0.0, None)
+    x = x - np.where(x >= 0, shift, -shift)
+    y = y - np.where(y >= 0, shift, -shift)
+    normals = np.stack((x, y, z), axis=1)
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    lengths[lengths == 0] = 1.0
+    return (normals / lengths).astype(np.float32)
+
+
+def delta_encode_indices(indices: np.ndarray) -> np.ndarray:
+    """Zigzag-encode successive differences of the flat index stream into the narrowest dtype.
+
+    After vertex-cache and fetch reordering consecutive indices are close, so most
+    deltas fit in a byte and the codec sees long runs of small values.
+    """
+
+    flat = np.asarray(indices, dtype=np.int64).reshape(-1)
+    deltas = np.diff(flat, prepend=0)
+    zigzag = (deltas << 1) ^ (deltas >> 63)
+    largest = int(zigzag.max(initial=0))
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if largest <= np.iinfo(dtype).max:
+            return zigzag.astype(dtype)
+    return zigzag.astype(np.uint64)
+
+
+def delta_decode_indices(encoded: np.ndarray, dtype: str, shape: Tuple[int, ...]) -> np.ndarray:
+    zigzag = encoded.astype(np.int64)
+    deltas = (zigzag >> 1) ^ -(zigzag & 1)
+    return np.cumsum(deltas).astype(np.dtype(dtype)).reshape(shape)
+
+
+__all__ = [
+    "DEFAULT_LEVELS",
+    "available_codecs",
+    "compress_bytes",
+    "decode_octahedral",
+    "decompress_bytes",
+    "delta_decode_indices",
+    "delta_encode_indices",
+    "dequantize_positions",
+    "encode_octahedral",
+    "quantize_positions",
+    "resolve_codec",
+]
@@ -0,0 +1,459 @@
+"""Versioned binary ``.vrpkg`` container with a table of contents and per-section encryption.
+
+Layout (all integers little-endian)::
+
+    header    magic "VRPK" | version u16 | flags u16 | segment_size u32 | salt 16B
+              | toc offset u64 | toc size u64 | zero padding to 64 bytes
+    sections  64-byte aligned; raw bytes, or AES-256-GCM segments of ``segment_size``
+              plaintext bytes each followed by their 16-byte tag
+    toc       encrypted JSON list of ``SectionInfo`` records
+
+Every encrypted segment uses the nonce ``section u32 | segment u32 | last u8`` under
+a key derived per file (see ``encryption.derive_key``), with the static header as
+associated data, so sections cannot be swapped, reordered or truncated unnoticed.
+Unencrypted sections are authenticated through the BLAKE2b digest of their stored
+bytes, kept in their (encrypted) TOC entry and checked on every read.
+Readers memory-map the file, decrypt the TOC and then only the sections they ask
+for; unencrypted array sections are returned as zero-copy views of the mapping.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from vrhouse.pipeline.exporters.compression import (
+    MIN_COMPRESS_SIZE,
+    compress_bytes,
+    decompress_bytes,
+    resolve_codec,
+)
+from vrhouse.pipeline.exporters.encryption import (
+    DEFAULT_SEGMENT_SIZE,
+    MAGIC,
+    PackageError,
+    _default_workers,
+    derive_key,
+)
+
+CONTAINER_VERSION = 3
+ALIGNMENT = 64
+_HEADER = struct.Struct("<4sHHI16sQQ")
+_HEADER_SIZE = 64
+_STATIC_HEADER_SIZE = struct.calcsize("<4sHHI16s")
+_NONCE = struct.Struct("<IIBxxx")
+_TAG_SIZE = 16
+_TOC_SECTION = 0xFFFFFFFF
+
+# Section kinds understood by the scene loader; other kinds are carried through untouched.
+METADATA = "metadata"
+SCENE_GRAPH = "scene_graph"
+MESH = "mesh"
+TEXTURE = "texture"
+PHYSICS = "physics"
+COLLIDER = "collider"
+SPATIAL = "spatial"
+VISIBILITY = "visibility"
+
+
+@dataclass
+class SectionInfo:
+    """One TOC entry.
+
+    ``size`` is the decoded size, ``packed_size`` the size after ``codec`` (when the
+    section is compressed) and ``stored_size`` the bytes on disk including tags.
+    ``digest`` authenticates the stored bytes of unencrypted sections.
+    """
+
+    index: int
+    kind: str
+    name: str
+    offset: int
+    size: int
+    stored_size: int
+    encrypted: bool = True
+    dtype: Optional[str] = None
+    shape: Optional[List[int]] = None
+    attributes: Dict[str, object] = field(default_factory=dict)
+    codec: Optional[str] = None
+    packed_size: Optional[int] = None
+    digest: Optional[str] = None
+
+
+def _section_digest(data: bytes | memoryview) -> str:
+    return hashlib.blake2b(data, digest_size=32).hexdigest()
+
+
+def _aligned(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _segment_count(size: int, segment_size: int) -> int:
+    return max(1, -(-size // segment_size))
+
+
+def package_version(path: Path) -> int:
+    """Return 1 for legacy Fernet packages, otherwise the version stored in the header."""
+
+    with Path(path).open("rb") as handle:
+        head = handle.read(6)
+    if head[:4] == MAGIC and len(head) == 6:
+        return struct.unpack("<H", head[4:6])[0]
+    return 1
+
+
+class ContainerWriter:
+    """Write sections into a container, compressing and sealing them on a thread pool.
+
+    Sections are prepared (optionally compressed) concurrently, with at most
+    ``2 * max_workers`` in flight, and written strictly in order; large sections
+    have their AES-GCM segments sealed in parallel as well.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        key: str | bytes,
+        *,
+        segment_size: int = DEFAULT_SEGMENT_SIZE,
+        max_workers: Optional[int] = None,
+        compression: Optional[str] = None,
+        compression_level: Optional[int] = None,
+    ) -> None:
+        if segment_size <= 0:
+            raise ValueError("segment_size must be positive")
+        self.path = Path(path)
+        self.segment_size = segment_size
+        self.compression = None if compression is None else resolve_codec(compression)
+        self.compression_level = compression_level
+        self._salt = os.urandom(16)
+        self._cipher = AESGCM(derive_key(key, self._salt))
+        self._static_header = _HEADER.pack(MAGIC, CONTAINER_VERSION, 0, segment_size, self._salt, 0, 0)[
+            :_STATIC_HEADER_SIZE
+        ]
+        self._workers = max_workers or _default_workers()
+        self._pool = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="vrpkg-seal")
+        self._pending: Deque[Tuple[SectionInfo, Future[bytes] | memoryview]] = deque()
+        self._temporary = self.path.with_name(f".{self.path.name}.partial")
+        self._handle = self._temporary.open("wb")
+        self._handle.write(b"\0" * _HEADER_SIZE)
+        self._written = _HEADER_SIZE
+        self.sections: List[SectionInfo] = []
+        self._closed = False
+
+    # -- adding sections -----------------------------------------------------------------
+    def add_bytes(
+        self,
+        kind: str,
+        name: str,
+        data: bytes | bytearray | memoryview,
+        *,
+        encrypted: bool = True,
+        compress: bool = True,
+        dtype: Optional[str] = None,
+        shape: Optional[Iterable[int]] = None,
+        attributes: Optional[Dict[str, object]] = None,
+    ) -> SectionInfo:
+        """Queue a section; ``compress`` only applies when the writer has a codec."""
+
+        if self._closed:
+            raise ValueError("add to closed ContainerWriter")
+        view = memoryview(data).cast("B")
+        info = SectionInfo(
+            index=len(self.sections),
+            kind=kind,
+            name=name,
+            offset=-1,
+            size=view.nbytes,
+            stored_size=-1,
+            encrypted=encrypted,
+            dtype=dtype,
+            shape=None if shape is None else [int(extent) for extent in shape],
+            attributes=dict(attributes or {}),
+        )
+        self.sections.append(info)
+        payload: Future[bytes] | memoryview = view
+        if compress and self.compression is not None and view.nbytes >= MIN_COMPRESS_SIZE:
+            payload = self._pool.submit(self._compress, info, view)
+        self._pending.append((info, payload))
+        while len(self._pending) > 2 * self._workers:
+            self._drain_one()
+        return info
+
+    def add_array(self, kind: str, name: str, array: np.ndarray, **options: object) -> SectionInfo:
+        array = np.ascontiguousarray(array)
+        return self.add_bytes(kind, name, array.reshape(-1).view(np.uint8), dtype=array.dtype.str, shape=array.shape, **options)
+
+    def add_json(self, kind: str, name: str, value: object, **options: object) -> SectionInfo:
+        return self.add_bytes(kind, name, json.dumps(value, separators=(",", ":")).encode("utf-8"), **options)
+
+    # -- writing -------------------------------------------------------------------------
+    def _compress(self, info: SectionInfo, view: memoryview) -> bytes | memoryview:
+        packed = compress_bytes(view, self.compression, self.compression_level)
+        if len(packed) >= view.nbytes:
+            return view  # incompressible (already quantised/encrypted data): store as is
+        info.codec = self.compression
+        info.packed_size = len(packed)
+        return packed
+
+    def _seal(self, section: int, data: bytes | memoryview) -> Iterator[bytes]:
+        view = memoryview(data).cast("B")
+        count = _segment_count(view.nbytes, self.segment_size)
+        window: Deque[Future[bytes]] = deque()
+        for segment in range(count):
+            chunk = bytes(view[segment * self.segment_size : (segment + 1) * self.segment_size])
+            nonce = _NONCE.pack(section, segment, segment == count - 1)
+            window.append(self._pool.submit(self._cipher.encrypt, nonce, chunk, self._static_header))
+            if len(window) > 2 * self._workers:
+                yield window.popleft().result()
+        while window:
+            yield window.popleft().result()
+
+    def _drain_one(self) -> None:
+        info, payload = self._pending.popleft()
+        data = payload.result() if isinstance(payload, Future) else payload
+        info.offset = _aligned(self._written)
+        self._handle.write(b"\0" * (info.offset - self._written))
+        self._written = info.offset
+        if not info.encrypted:
+            info.digest = _section_digest(data)
+        for chunk in self._seal(info.index, data) if info.encrypted else (data,):
+            self._handle.write(chunk)
+            self._written += len(chunk)
+        info.stored_size = self._written - info.offset
+
+    def close(self) -> Path:
+        """Write the TOC and header, then atomically move the container into place."""
+
+        if self._closed:
+            return self.path
+        self._closed = True
+        try:
+            while self._pending:
+                self._drain_one()
+            toc = json.dumps([asdict(section) for section in self.sections], separators=(",", ":")).encode("utf-8")
+            toc_offset = _aligned(self._written)
+            self._handle.write(b"\0" * (toc_offset - self._written))
+            toc_size = 0
+            for chunk in self._seal(_TOC_SECTION, toc):
+                self._handle.write(chunk)
+                toc_size += len(chunk)
+            self._handle.seek(0)
+            self._handle.write(_HEADER.pack(MAGIC, CONTAINER_VERSION, 0, self.segment_size, self._salt, toc_offset, toc_size))
+            self._handle.close()
+            os.replace(self._temporary, self.path)
+        except BaseException:
+            self.abort()
+            raise
+        finally:
+            self._pool.shutdown(wait=True)
+        return self.path
+
+    def abort(self) -> None:
+        self._closed = True
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        self._handle.close()
+        self._temporary.unlink(missing_ok=True)
+
+    def __enter__(self) -> "ContainerWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class ContainerReader:
+    """Memory-mapped random-access reader; decrypts only the sections requested."""
+
+    def __init__(self, path: Path, key: str | bytes, *, max_workers: Optional[int] = None) -> None:
+        self.path = Path(path)
+        with self.path.open("rb") as handle:
+            try:
+                self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as exc:
+                raise PackageError(f"{self.path} is empty") from exc
+        self._workers = max_workers or _default_workers()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        try:
+            if len(self._map) < _HEADER_SIZE:
+                raise PackageError(f"{self.path} is too short to be a package")
+            magic, version, _, self.segment_size, salt, toc_offset, toc_size = _HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC or version != CONTAINER_VERSION:
+                raise PackageError(f"{self.path} is not a version {CONTAINER_VERSION} package")
+            if self.segment_size <= 0 or toc_offset + toc_size > len(self._map):
+                raise PackageError(f"{self.path} is truncated or has a damaged header")
+            self._static_header = bytes(self._map[:_STATIC_HEADER_SIZE])
+            self._cipher = AESGCM(derive_key(key, salt))
+            toc = self._decrypt_range(_TOC_SECTION, toc_offset, toc_size)
+            self.sections = [SectionInfo(**entry) for entry in json.loads(bytes(toc))]
+        except BaseException:
+            self._map.close()
+            raise
+        self._by_name = {section.name: section for section in self.sections}
+
+    # -- lookup --------------------------------------------------------------------------
+    def find(self, name: str) -> SectionInfo:
+        try:
+            return self._by_name[name]
+        except KeyError:
+            raise PackageError(f"{self.path} has no section {name!r}") from None
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._by_name
+
+    def by_kind(self, kind: str) -> List[SectionInfo]:
+        return [section for section in self.sections if section.kind == kind]
+
+    # -- decryption ----------------------------------------------------------------------
+    def _decrypt_segment(self, section: int, segment: int, last: bool, start: int, end: int, output: memoryview) -> None:
+        try:
+            plain = self._cipher.decrypt(
+                _NONCE.pack(section, segment, last), self._map[start:end], self._static_header
+            )
+        except InvalidTag as exc:
+            raise PackageError(
+                f"Section {section} of {self.path} failed authentication (wrong key or tampered file)"
+            ) from exc
+        output[: len(plain)] = plain
+
+    def _segments(self, section: int, offset: int, stored_size: int, output: memoryview):
+        count = _segment_count(len(output), self.segment_size)
+        if stored_size != len(output) + _TAG_SIZE * count or offset + stored_size > len(self._map):
+            raise PackageError(f"{self.path} has a damaged section table")
+        stride = self.segment_size + _TAG_SIZE
+        for segment in range(count):
+            start = offset + segment * stride
+            end = min(start + stride, offset + stored_size)
+            target = output[segment * self.segment_size : (segment + 1) * self.segment_size]
+            yield (section, segment, segment == count - 1, start, end, target)
+
+    def _decrypt_range(self, section: int, offset: int, stored_size: int) -> bytearray:
+        count = max(1, -(-stored_size // (self.segment_size + _TAG_SIZE)))
+        output = bytearray(stored_size - _TAG_SIZE * count)
+        for job in self._segments(section, offset, stored_size, memoryview(output)):
+            self._decrypt_segment(*job)
+        return output
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="vrpkg-open")
+        return self._pool
+
+    def read_many(self, sections: Iterable[SectionInfo]) -> List[memoryview]:
+        """Return the decoded bytes of several sections, decrypting/decompressing in parallel."""
+
+        sections = list(sections)
+        payloads: List[memoryview] = []
+        jobs = []
+        for section in sections:
+            length = section.size if section.codec is None else int(section.packed_size or 0)
+            if not section.encrypted:
+                if section.offset + length > len(self._map):
+                    raise PackageError(f"{self.path} has a damaged section table")
+                payload = memoryview(self._map)[section.offset : section.offset + length]
+                if section.digest is not None and _section_digest(payload) != section.digest:
+                    raise PackageError(f"Section {section.name!r} of {self.path} failed authentication (tampered file)")
+                payloads.append(payload)
+                continue
+            output = bytearray(length)
+            payloads.append(memoryview(output))
+            jobs.extend(self._segments(section.index, section.offset, section.stored_size, memoryview(output)))
+        parallel = self._workers > 1 and (len(jobs) > 1 or len(sections) > 1)
+        if parallel:
+            for future in [self._executor().submit(self._decrypt_segment, *job) for job in jobs]:
+                future.result()
+        else:
+            for job in jobs:
+                self._decrypt_segment(*job)
+
+        compressed = [position for position, section in enumerate(sections) if section.codec is not None]
+        decoded = (
+            list(self._executor().map(lambda position: self._decompress(sections[position], payloads[position]), compressed))
+            if parallel and len(compressed) > 1
+            else [self._decompress(sections[position], payloads[position]) for position in compressed]
+        )
+        for position, data in zip(compressed, decoded):
+            payloads[position] = data
+        return payloads
+
+    def _decompress(self, section: SectionInfo, payload: memoryview) -> memoryview:
+        try:
+            data = decompress_bytes(payload, str(section.codec), section.size)
+        except Exception as exc:
+            raise PackageError(f"Section {section.name!r} of {self.path} could not be decompressed: {exc}") from exc
+        if len(data) != section.size:
+            raise PackageError(f"Section {section.name!r} of {self.path} decompressed to the wrong size")
+        return memoryview(data)
+
+    def read_bytes(self, section: SectionInfo | str) -> memoryview:
+        if isinstance(section, str):
+            section = self.find(section)
+        return self.read_many([section])[0]
+
+    @staticmethod
+    def _as_array(section: SectionInfo, data: memoryview) -> np.ndarray:
+        if section.dtype is None:
+            raise PackageError(f"Section {section.name!r} does not hold an array")
+        return np.frombuffer(data, dtype=np.dtype(section.dtype)).reshape(section.shape or (-1,))
+
+    def read_array(self, section: SectionInfo | str) -> np.ndarray:
+        """Decode an array section; unencrypted sections are zero-copy, read-only views of the file."""
+
+        if isinstance(section, str):
+            section = self.find(section)
+        return self._as_array(section, self.read_bytes(section))
+
+    def read_arrays(self, sections: Iterable[SectionInfo]) -> List[np.ndarray]:
+        sections = list(sections)
+        return [self._as_array(section, data) for section, data in zip(sections, self.read_many(sections))]
+
+    def read_json(self, section: SectionInfo | str) -> object:
+        return json.loads(bytes(self.read_bytes(section)))
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        try:
+            self._map.close()
+        except BufferError:
+            # Zero-copy arrays still reference the mapping; it is released with them.
+            pass
+
+    def __enter__(self) -> "ContainerReader":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+
+__all__ = [
+    "ALIGNMENT",
+    "COLLIDER",
+    "CONTAINER_VERSION",
+    "ContainerReader",
+    "ContainerWriter",
+    "MESH",
+    "METADATA",
+    "PHYSICS",
+    "SCENE_GRAPH",
+    "SPATIAL",
+    "SectionInfo",
+    "TEXTURE",
+    "VISIBILITY",
+    "package_version",
+]
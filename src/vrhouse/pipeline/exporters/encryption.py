@@ -0,0 +1,70 @@
+"""Key derivation for ``.vrpkg`` containers and the reader for legacy Fernet packages.
+
+New packages are written as sectioned containers (``container``, version 3),
+whose per-file AES-256-GCM key comes from ``derive_key``: HKDF-SHA256 over the
+(unchanged) Fernet-style package key and a per-file salt. Packages exported
+before the container are single Fernet tokens holding the scene JSON (version 1);
+``decrypt_package`` keeps them readable.
+"""
+from __future__ import annotations
+
+import base64
+import os
+from pathlib import Path
+
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+from vrhouse.core import PipelineError
+
+MAGIC = b"VRPK"
+DEFAULT_SEGMENT_SIZE = 4 * 1024 * 1024
+_HKDF_INFO = b"vrhouse-vrpkg-v2"
+# Every Fernet token starts with version byte 0x80, i.e. "gA" once base64-encoded.
+_FERNET_PREFIX = b"gA"
+
+
+class PackageError(PipelineError):
+    """Raised when a package cannot be decrypted or is structurally invalid."""
+
+
+def _default_workers() -> int:
+    return max(1, min(8, os.cpu_count() or 1))
+
+
+def derive_key(key: str | bytes, salt: bytes) -> bytes:
+    """Derive the 256-bit AES-GCM key of one package from its Fernet-style key."""
+
+    key_bytes = key.encode("utf-8") if isinstance(key, str) else key
+    try:
+        material = base64.urlsafe_b64decode(key_bytes)
+    except ValueError as exc:
+        raise PackageError("Encryption key must be 32 url-safe base64-encoded bytes") from exc
+    if len(material) != 32:
+        raise PackageError("Encryption key must be 32 url-safe base64-encoded bytes")
+    return HKDF(algorithm=hashes.SHA256(), length=32, salt=salt, info=_HKDF_INFO).derive(material)
+
+
+def decrypt_package(path: Path, key: str | bytes) -> bytes:
+    """Return the plaintext of a legacy Fernet package (containers are read with ``package.open_package``)."""
+
+    path = Path(path)
+    data = path.read_bytes()
+    if data.startswith(MAGIC):
+        raise PackageError(f"{path} is a sectioned container; open it with open_package")
+    if not data.startswith(_FERNET_PREFIX):
+        raise PackageError(f"{path} is not a vrHouse package")
+    key_bytes = key.encode("utf-8") if isinstance(key, str) else key
+    try:
+        return Fernet(key_bytes).decrypt(data)
+    except (InvalidToken, ValueError) as exc:
+        raise PackageError(f"Could not decrypt legacy package {path} (wrong key or tampered file)") from exc
+
+
+__all__ = [
+    "DEFAULT_SEGMENT_SIZE",
+    "PackageError",
+    "decrypt_package",
+    "derive_key",
+]
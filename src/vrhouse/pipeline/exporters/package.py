@@ -0,0 +1,413 @@
+"""Scene layout on top of the sectioned ``.vrpkg`` container, plus the matching loader."""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from vrhouse.core import BVH, MeshData, SceneGraph
+from vrhouse.pipeline.exporters.container import (
+    COLLIDER,
+    CONTAINER_VERSION,
+    MESH,
+    METADATA,
+    PHYSICS,
+    SCENE_GRAPH,
+    SPATIAL,
+    TEXTURE,
+    VISIBILITY,
+    ContainerReader,
+    ContainerWriter,
+    SectionInfo,
+    package_version,
+)
+from vrhouse.pipeline.exporters.compression import (
+    decode_octahedral,
+    delta_decode_indices,
+    delta_encode_indices,
+    dequantize_positions,
+    encode_octahedral,
+    quantize_positions,
+)
+from vrhouse.pipeline.exporters.encryption import DEFAULT_SEGMENT_SIZE, PackageError, decrypt_package
+
+_MESH_FIELDS = ("positions", "indices", "normals", "uvs")
+_GRAPH_ARRAYS = ("parents", "transforms", "mesh_ids", "material_ids")
+_PHYSICS_OBJECTS = "physics/objects/"
+_COLLIDERS = "colliders/"
+_BVH = "bvh/"
+_VISIBILITY = "visibility/"
+
+
+def _json_default(value: object) -> object:
+    """Serialize NumPy scalars/arrays and paths found in node attributes or metadata."""
+
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, Path):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _to_json(value: object) -> object:
+    return json.loads(json.dumps(value, default=_json_default))
+
+
+def _mesh_prefix(mesh_id: int, lod: Optional[int]) -> str:
+    return f"mesh/{mesh_id}" if lod is None else f"mesh/{mesh_id}/lod{lod}"
+
+
+def _encode_field(name: str, array: np.ndarray) -> Tuple[np.ndarray, Dict[str, object]]:
+    """Precompress one mesh buffer: quantised positions, octahedral normals, delta indices."""
+
+    if name == "positions":
+        quantized, parameters = quantize_positions(array)
+        return quantized, {"encoding": "quantized", **parameters}
+    if name == "normals":
+        return encode_octahedral(array), {"encoding": "octahedral"}
+    if name == "indices":
+        return delta_encode_indices(array), {
+            "encoding": "delta",
+            "index_dtype": array.dtype.str,
+            "index_shape": list(array.shape),
+        }
+    return array, {}
+
+
+def _decode_field(array: np.ndarray, attributes: Mapping[str, object]) -> np.ndarray:
+    encoding = attributes.get("encoding")
+    if encoding is None:
+        return array
+    if encoding == "quantized":
+        return dequantize_positions(array, attributes)
+    if encoding == "octahedral":
+        return decode_octahedral(array)
+    if encoding == "delta":
+        return delta_decode_indices(array, str(attributes["index_dtype"]), tuple(attributes["index_shape"]))
+    raise PackageError(f"Unknown mesh encoding {encoding!r}")
+
+
+def _write_mesh(
+    writer: ContainerWriter, mesh: MeshData, mesh_id: int, lod: Optional[int], quantize: bool
+) -> None:
+    prefix = _mesh_prefix(mesh_id, lod)
+    for name in _MESH_FIELDS:
+        array = getattr(mesh, name)
+        if array is None:
+            continue
+        array = np.asarray(array)
+        attributes: Dict[str, object] = {"mesh": mesh_id, "lod": lod, "field": name, "material": mesh.material}
+        if quantize:
+            array, encoding = _encode_field(name, array)
+            attributes.update(encoding)
+        writer.add_array(MESH, f"{prefix}/{name}", array, attributes=attributes)
+
+
+def write_scene_package(
+    path: Path,
+    key: str | bytes,
+    *,
+    project: str,
+    scene_graph: SceneGraph,
+    physics_profile: Mapping[str, float],
+    ai_metadata: Mapping[str, object],
+    physics_objects: Optional[Mapping[str, np.ndarray]] = None,
+    colliders: Optional[Mapping[str, np.ndarray]] = None,
+    spatial_index: Optional[Mapping[str, np.ndarray]] = None,
+    visibility: Optional[Mapping[str, np.ndarray]] = None,
+    chunk_manifest: Optional[Mapping[str, object]] = None,
+    source_nodes: Optional[np.ndarray] = None,
+    segment_size: int = DEFAULT_SEGMENT_SIZE,
+    max_workers: Optional[int] = None,
+    compression: Optional[str] = None,
+    compression_level: Optional[int] = None,
+    quantize_meshes: bool = False,
+) -> Path:
+    """Write ``scene_graph`` and its companions as typed sections of one container.
+
+    ``compression`` (``"zstd"``, ``"zlib"`` or ``"auto"``) compresses each section
+    before encryption; ``quantize_meshes`` additionally applies the lossy mesh
+    encodings from ``exporters.compression`` so the codec has less entropy to chew on.
+    ``physics_objects`` (per-object rigid-body arrays) become one physics section per field;
+    ``colliders`` (``ColliderSet`` arrays) get collider sections of their own, and
+    ``spatial_index`` (``BVH`` arrays) spatial sections, so runtimes load the
+    hierarchy instead of rebuilding it. ``visibility`` (``CellVisibility`` arrays)
+    stores the precomputed cells, portals and PVS. ``chunk_manifest`` (the chunk
+    files of a streamable export) and ``source_nodes`` (a chunk's node indices in
+    the full scene) are written by ``exporters.chunks``.
+    """
+
+    graph = scene_graph
+    with ContainerWriter(
+        path,
+        key,
+        segment_size=segment_size,
+        max_workers=max_workers,
+        compression=compression,
+        compression_level=compression_level,
+    ) as writer:
+        writer.add_json(
+            METADATA,
+            "metadata",
+            _to_json(
+                {
+                    "project": project,
+                    "ai_metadata": dict(ai_metadata),
+                    "nodes": len(graph),
+                    "meshes": len(graph.meshes),
+                    "triangles": graph.triangle_count,
+                    "draw_calls": graph.draw_call_count,
+                }
+            ),
+        )
+        writer.add_json(
+            SCENE_GRAPH,
+            "scene_graph",
+            _to_json(
+                {
+                    "names": list(graph.names),
+                    "attributes": list(graph.attributes),
+                    "materials": list(graph.materials),
+                    "material_properties": graph.material_properties,
+                    "metadata": graph.metadata,
+                }
+            ),
+        )
+        for name in _GRAPH_ARRAYS:
+            writer.add_array(SCENE_GRAPH, f"scene_graph/{name}", getattr(graph, name))
+        if source_nodes is not None:
+            writer.add_array(SCENE_GRAPH, "scene_graph/source_nodes", np.asarray(source_nodes))
+        if chunk_manifest is not None:
+            writer.add_json(METADATA, "chunks", _to_json(dict(chunk_manifest)))
+        for mesh_id, mesh in enumerate(graph.meshes):
+            _write_mesh(writer, mesh, mesh_id, None, quantize_meshes)
+        for mesh_id, levels in graph.lods.items():
+            for level, mesh in enumerate(levels):
+                _write_mesh(writer, mesh, mesh_id, level, quantize_meshes)
+        for texture_id, (name, levels) in enumerate(graph.textures.items()):
+            for level, image in enumerate(levels):
+                writer.add_array(
+                    TEXTURE, f"texture/{texture_id}/mip{level}", image, attributes={"texture": name, "level": level}
+                )
+        writer.add_json(PHYSICS, "physics", _to_json(dict(physics_profile)))
+        for name, array in (physics_objects or {}).items():
+            writer.add_array(PHYSICS, f"{_PHYSICS_OBJECTS}{name}", np.asarray(array), attributes={"field": name})
+        for name, array in (colliders or {}).items():
+            writer.add_array(COLLIDER, f"{_COLLIDERS}{name}", np.asarray(array), attributes={"field": name})
+        for name, array in (spatial_index or {}).items():
+            writer.add_array(SPATIAL, f"{_BVH}{name}", np.asarray(array), attributes={"field": name})
+        for name, array in (visibility or {}).items():
+            writer.add_array(VISIBILITY, f"{_VISIBILITY}{name}", np.asarray(array), attributes={"field": name})
+    return path
+
+
+class VRPackage:
+    """Lazy view of a sectioned scene package: only the sections touched are decrypted."""
+
+    def __init__(self, path: Path, key: str | bytes, *, max_workers: Optional[int] = None) -> None:
+        self.reader = ContainerReader(path, key, max_workers=max_workers)
+        self._metadata: Optional[Dict[str, object]] = None
+        self._lod_counts: Optional[Dict[int, int]] = None
+        self._textures: Optional[Dict[str, List[SectionInfo]]] = None
+
+    @property
+    def path(self) -> Path:
+        return self.reader.path
+
+    @property
+    def sections(self) -> List[SectionInfo]:
+        return self.reader.sections
+
+    @property
+    def metadata(self) -> Dict[str, object]:
+        if self._metadata is None:
+            self._metadata = dict(self.reader.read_json("metadata"))
+        return self._metadata
+
+    @property
+    def project_name(self) -> str:
+        return str(self.metadata["project"])
+
+    @property
+    def physics_profile(self) -> Dict[str, float]:
+        return dict(self.reader.read_json("physics"))
+
+    def physics_objects(self) -> Dict[str, np.ndarray]:
+        """Per-object rigid-body arrays by field (empty when the package was exported without them)."""
+
+        sections = [section for section in self.reader.by_kind(PHYSICS) if section.name.startswith(_PHYSICS_OBJECTS)]
+        return {
+            str(section.attributes["field"]): array
+            for section, array in zip(sections, self.reader.read_arrays(sections))
+        }
+
+    def colliders(self) -> Dict[str, np.ndarray]:
+        """Collider arrays by field (see ``processors.colliders.ColliderSet.from_arrays``); empty without them."""
+
+        sections = self.reader.by_kind(COLLIDER)
+        return {
+            str(section.attributes["field"]): array
+            for section, array in zip(sections, self.reader.read_arrays(sections))
+        }
+
+    def bvh(self) -> Optional[BVH]:
+        """The scene's bounding volume hierarchy (items are node indices), or ``None`` if not exported."""
+
+        sections = [section for section in self.reader.by_kind(SPATIAL) if section.name.startswith(_BVH)]
+        if not sections:
+            return None
+        arrays = self.reader.read_arrays(sections)
+        return BVH.from_arrays({str(section.attributes["field"]): array for section, array in zip(sections, arrays)})
+
+    def visibility(self) -> Dict[str, np.ndarray]:
+        """Cell, portal and PVS arrays by field (see ``processors.visibility.CellVisibility``); empty without them."""
+
+        sections = self.reader.by_kind(VISIBILITY)
+        return {
+            str(section.attributes["field"]): array
+            for section, array in zip(sections, self.reader.read_arrays(sections))
+        }
+
+    def chunk_manifest(self) -> Dict[str, object]:
+        """Chunk files and shared textures of a chunked export (see ``exporters.chunks``); empty otherwise."""
+
+        return dict(self.reader.read_json("chunks")) if "chunks" in self.reader else {}
+
+    def source_nodes(self) -> Optional[np.ndarray]:
+        """For a chunk file, the full scene's index of each of its nodes (root included); ``None`` otherwise."""
+
+        if "scene_graph/source_nodes" not in self.reader:
+            return None
+        return self.reader.read_array("scene_graph/source_nodes")
+
+    def mesh(self, mesh_id: int, lod: Optional[int] = None) -> MeshData:
+        """Decrypt one mesh (or one of its LOD levels) without touching the rest of the file."""
+
+        prefix = _mesh_prefix(mesh_id, lod)
+        sections = [self.reader.find(f"{prefix}/{name}") for name in _MESH_FIELDS if f"{prefix}/{name}" in self.reader]
+        if not sections:
+            raise PackageError(f"{self.path} has no mesh {prefix!r}")
+        arrays = {
+            section.attributes["field"]: _decode_field(array, section.attributes)
+            for section, array in zip(sections, self.reader.read_arrays(sections))
+        }
+        return MeshData(material=sections[0].attributes.get("material"), **arrays)
+
+    def lod_count(self, mesh_id: int) -> int:
+        if self._lod_counts is None:
+            levels: Dict[int, set] = {}
+            for section in self.reader.by_kind(MESH):
+                if section.attributes.get("lod") is not None:
+                    levels.setdefault(int(section.attributes["mesh"]), set()).add(section.attributes["lod"])
+            self._lod_counts = {mesh: len(found) for mesh, found in levels.items()}
+        return self._lod_counts.get(mesh_id, 0)
+
+    def _texture_sections(self) -> Dict[str, List[SectionInfo]]:
+        if self._textures is None:
+            found: Dict[str, List[SectionInfo]] = {}
+            for section in self.reader.by_kind(TEXTURE):
+                found.setdefault(str(section.attributes["texture"]), []).append(section)
+            self._textures = {
+                name: sorted(sections, key=lambda section: int(section.attributes["level"]))
+                for name, sections in found.items()
+            }
+        return self._textures
+
+    def texture_names(self) -> List[str]:
+        return list(self._texture_sections())
+
+    def texture(self, name: str, level: Optional[int] = None) -> List[np.ndarray]:
+        """Decrypt a texture's mip chain, or only ``level`` of it (returned as a one-item list)."""
+
+        sections = self._texture_sections().get(name)
+        if not sections:
+            raise PackageError(f"{self.path} has no texture {name!r}")
+        if level is not None:
+            sections = [section for section in sections if int(section.attributes["level"]) == level]
+            if not sections:
+                raise PackageError(f"Texture {name!r} has no mip level {level}")
+        return self.reader.read_arrays(sections)
+
+    def scene_graph(self, *, load_meshes: bool = True, load_textures: bool = False) -> SceneGraph:
+        """Rebuild the ``SceneGraph``; with ``load_meshes=False`` only the hierarchy is decrypted.
+
+        Textures are only decrypted with ``load_textures=True``; ``texture()``
+        reads single chains or levels on demand.
+        """
+
+        layout = self.reader.read_json("scene_graph")
+        parents, transforms, mesh_ids, material_ids = self.reader.read_arrays(
+            [self.reader.find(f"scene_graph/{name}") for name in _GRAPH_ARRAYS]
+        )
+        names, attributes, materials = layout["names"], layout["attributes"], layout["materials"]
+        graph = SceneGraph(root_attributes=attributes[0], capacity=len(names))
+        graph.set_transform(0, transforms[0])
+        for material, properties in layout["material_properties"].items():
+            graph.set_material_properties(material, properties)
+        graph.metadata.update(layout["metadata"])
+
+        if load_meshes:
+            mesh_count = int(self.metadata["meshes"])
+            for mesh_id in range(mesh_count):
+                graph.add_mesh(self.mesh(mesh_id))
+            for mesh_id in range(mesh_count):
+                levels = self.lod_count(mesh_id)
+                if levels:
+                    graph.set_lods(mesh_id, [self.mesh(mesh_id, level) for level in range(levels)])
+
+        for index in range(1, len(names)):
+            mesh_id = int(mesh_ids[index])
+            graph.add_node(
+                names[index],
+                parent=int(parents[index]),
+                transform=transforms[index],
+                mesh=mesh_id if load_meshes and mesh_id >= 0 else None,
+                attributes=attributes[index],
+            )
+        if load_textures:
+            for name in self.texture_names():
+                graph.set_texture(name, self.texture(name))
+        # Assign in table order so material ids match the exported graph.
+        for material_id, material in enumerate(materials):
+            graph.set_materials(np.flatnonzero(material_ids == material_id), material)
+        return graph
+
+    def describe(self) -> Dict[str, object]:
+        """Small JSON-friendly summary (metadata plus TOC) used for previews."""
+
+        return {
+            **self.metadata,
+            "format_version": CONTAINER_VERSION,
+            "sections": [
+                {"kind": section.kind, "name": section.name, "size": section.size} for section in self.sections
+            ],
+        }
+
+    def close(self) -> None:
+        self.reader.close()
+
+    def __enter__(self) -> "VRPackage":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+
+def open_package(path: Path, key: str | bytes, *, max_workers: Optional[int] = None) -> VRPackage:
+    return VRPackage(path, key, max_workers=max_workers)
+
+
+def describe_package(path: Path, key: str | bytes) -> Dict[str, object]:
+    """Summarise any ``.vrpkg``: sectioned containers via their TOC, legacy Fernet packages by decryption."""
+
+    if package_version(path) == CONTAINER_VERSION:
+        with open_package(path, key) as package:
+            return package.describe()
+    return json.loads(decrypt_package(path, key))
+
+
+__all__ = ["VRPackage", "describe_package", "open_package", "write_scene_package"]
@@ -1,13 +1,22 @@
 """Compose the final VR scene assets and package them for consumption."""
 from __future__ import annotations
 
-import json
 from pathlib import Path
-from typing import Callable, Dict, Tuple
+from typing import Callable, Dict, Mapping, Optional, Tuple
 
+import numpy as np
 from cryptography.fernet import Fernet
 
-from vrhouse.core import SceneSpecification, VRScene
+from vrhouse.core import SceneGraph, SceneSpecification, VRScene
+from vrhouse.pipeline.exporters.chunks import (
+    CHUNK_STRATEGIES,
+    DEFAULT_CHUNK_SIZE,
+    partition_nodes,
+    write_chunked_package,
+)
+from vrhouse.pipeline.exporters.compression import resolve_codec
+from vrhouse.pipeline.exporters.encryption import DEFAULT_SEGMENT_SIZE
+from vrhouse.pipeline.exporters.package import write_scene_package
 
 
 def _ensure_key_bytes(key: str | bytes) -> Tuple[str, bytes]:
@@ -19,18 +28,46 @@ def _ensure_key_bytes(key: str | bytes) -> Tuple[str, bytes]:
 class VRSceneBuilder:
     """Assemble a VR-ready scene from processed data and physics metadata."""
 
-    def __init__(self, key_factory: Callable[[], bytes] | None = None) -> None:
+    def __init__(
+        self,
+        key_factory: Callable[[], bytes] | None = None,
+        *,
+        segment_size: int = DEFAULT_SEGMENT_SIZE,
+        max_workers: Optional[int] = None,
+        compress_assets: bool = False,
+        compression: str = "auto",
+        compression_level: Optional[int] = None,
+        quantize_meshes: bool = True,
+        chunking: Optional[str] = None,
+        chunk_size: float = DEFAULT_CHUNK_SIZE,
+    ) -> None:
+        if chunking is not None and chunking not in CHUNK_STRATEGIES:
+            raise ValueError(f"Unknown chunking {chunking!r}; expected one of {CHUNK_STRATEGIES}")
         self._key_factory = key_factory or Fernet.generate_key
+        self.segment_size = segment_size
+        self.max_workers = max_workers
+        # Quantisation only applies to compressed packages.
+        self.compress_assets = compress_assets
+        self.compression = resolve_codec(compression) if compress_assets else compression
+        self.compression_level = compression_level
+        self.quantize_meshes = quantize_meshes
+        # ``None`` writes a single package.
+        self.chunking = chunking
+        self.chunk_size = chunk_size
 
     def build(
         self,
         specification: SceneSpecification,
-        scene_graph: Dict[str, Dict[str, str]],
+        scene_graph: SceneGraph | Mapping[str, Dict[str, object]],
         physics_profile: Dict[str, float],
+        physics_objects: Optional[Mapping[str, np.ndarray]] = None,
+        colliders: Optional[Mapping[str, np.ndarray]] = None,
+        spatial_index: Optional[Mapping[str, np.ndarray]] = None,
+        visibility: Optional[Mapping[str, np.ndarray]] = None,
     ) -> VRScene:
         """Create a ``VRScene`` object ready to be exported to engines such as Unity or Unreal."""
         output = {
-            "scene_graph": scene_graph,
+            "scene_graph": SceneGraph.coerce(scene_graph),
             "physics_profile": physics_profile,
             "metadata": {
                 "exporter": "vr-scene-builder",
@@ -42,10 +79,18 @@ class VRSceneBuilder:
             scene_graph=output["scene_graph"],
             physics_profile=output["physics_profile"],
             ai_metadata=output["metadata"],
+            physics_objects=dict(physics_objects or {}),
+            colliders=dict(colliders or {}),
+            spatial_index=dict(spatial_index or {}),
+            visibility=dict(visibility or {}),
         )
 
     def export_package(self, scene: VRScene, target_directory: Path) -> tuple[Path, str]:
-        """Persist the VR scene metadata to disk using symmetric encryption."""
+        """Write the VR scene as a sectioned, per-section encrypted container (see ``exporters.container``).
+
+        With ``chunking`` the returned path is the manifest of a chunked export
+        (see ``exporters.chunks``), with the chunk files in ``<project>.chunks/``.
+        """
 
         target_directory.mkdir(parents=True, exist_ok=True)
 
@@ -53,20 +98,30 @@ class VRSceneBuilder:
         if key is None:
             key = self._key_factory().decode("utf-8")
 
-        key_as_string, key_bytes = (key, key.encode("utf-8"))
-        fernet = Fernet(key_bytes)
-
-        payload = {
-            "project": scene.specification.project_name,
-            "scene_graph": scene.scene_graph,
-            "physics_profile": scene.physics_profile,
-            "ai_metadata": scene.ai_metadata,
-        }
-
-        encrypted_payload = fernet.encrypt(json.dumps(payload, indent=2).encode("utf-8"))
+        key_as_string, key_bytes = _ensure_key_bytes(key)
 
         output_file = target_directory / f"{scene.specification.project_name}.vrpkg"
-        output_file.write_bytes(encrypted_payload)
+        graph = SceneGraph.coerce(scene.scene_graph)
+        contents = dict(
+            project=scene.specification.project_name,
+            scene_graph=graph,
+            physics_profile=scene.physics_profile,
+            physics_objects=scene.physics_objects,
+            colliders=scene.colliders,
+            spatial_index=scene.spatial_index,
+            visibility=scene.visibility,
+            ai_metadata=scene.ai_metadata,
+            segment_size=self.segment_size,
+            max_workers=self.max_workers,
+            compression=self.compression if self.compress_assets else None,
+            compression_level=self.compression_level,
+            quantize_meshes=self.compress_assets and self.quantize_meshes,
+        )
+        if self.chunking is None:
+            write_scene_package(output_file, key_bytes, **contents)
+        else:
+            chunks = partition_nodes(graph, self.chunking, chunk_size=self.chunk_size, visibility=scene.visibility)
+            write_chunked_package(output_file, key_bytes, chunks=chunks, **contents)
 
         key_file = target_directory / f"{scene.specification.project_name}.key"
         if scene.specification.output_encryption_key is None:
@@ -0,0 +1,26 @@
+"""Shared interfaces and errors for the format importers."""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, Protocol, Union
+
+if TYPE_CHECKING:
+    from vrhouse.core import SceneGraph, SceneSpecification
+
+ImportedScene = Union["SceneGraph", Dict[str, Dict[str, object]]]
+
+
+class ImporterError(RuntimeError):
+    """Raised when an importer cannot handle the requested format."""
+
+
+class FormatImporter(Protocol):
+    """Interface implemented by concrete format importers."""
+
+    supported_suffixes: tuple[str, ...]
+
+    def load(self, specification: SceneSpecification) -> ImportedScene:
+        """Return a ``SceneGraph`` or the legacy ``{node_id: {key: value}}`` mapping."""
+        ...
+
+
+__all__ = ["FormatImporter", "ImportedScene", "ImporterError"]
@@ -0,0 +1,380 @@
+"""Zero-copy glTF 2.0 / GLB importer exposing accessors as NumPy views over mapped buffers."""
+from __future__ import annotations
+
+import base64
+import json
+import mmap
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import unquote
+
+import numpy as np
+
+from vrhouse.core import MeshData, SceneSpecification
+from vrhouse.pipeline.importers.base import ImporterError
+
+GLB_MAGIC = 0x46546C67
+GLB_CHUNK_JSON = 0x4E4F534A
+GLB_CHUNK_BIN = 0x004E4942
+
+COMPONENT_TYPES: Dict[int, np.dtype] = {
+    5120: np.dtype(np.int8),
+    5121: np.dtype(np.uint8),
+    5122: np.dtype(np.int16),
+    5123: np.dtype(np.uint16),
+    5125: np.dtype(np.uint32),
+    5126: np.dtype(np.float32),
+}
+COMPONENT_COUNTS: Dict[str, int] = {
+    "SCALAR": 1,
+    "VEC2": 2,
+    "VEC3": 3,
+    "VEC4": 4,
+    "MAT2": 4,
+    "MAT3": 9,
+    "MAT4": 16,
+}
+MODE_TRIANGLES = 4
+TEXTURE_SLOTS = (
+    "baseColorTexture",
+    "metallicRoughnessTexture",
+    "normalTexture",
+    "occlusionTexture",
+    "emissiveTexture",
+)
+# Scalar material parameters copied into the material library (as MTL-style strings).
+FACTOR_KEYS = ("baseColorFactor", "metallicFactor", "roughnessFactor", "alphaMode", "alphaCutoff", "doubleSided")
+# glTF is +Y up and -Z forward; this turns it into the scene graph's Z-up, +Y forward frame.
+SOURCE_UP_AXIS = "y"
+Y_UP_TO_Z_UP = np.array(
+    ((1.0, 0.0, 0.0, 0.0), (0.0, 0.0, -1.0, 0.0), (0.0, 1.0, 0.0, 0.0), (0.0, 0.0, 0.0, 1.0))
+)
+
+
+def _map_file(path: Path) -> memoryview:
+    with path.open("rb") as handle:
+        if path.stat().st_size == 0:
+            return memoryview(b"")
+        # The mapping stays alive as long as any view (and therefore any array) references it.
+        return memoryview(mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+class GLTFDocument:
+    """Parsed glTF JSON plus lazily mapped binary buffers.
+
+    ``accessor(index)`` returns read-only arrays that alias the mapped file, so
+    only the pages a consumer actually touches are ever read from disk.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._buffers: Dict[int, memoryview] = {}
+        self._glb_binary: Optional[memoryview] = None
+
+        if self.path.suffix.lower() == ".glb":
+            self.document = self._read_glb()
+        else:
+            try:
+                self.document = json.loads(self.path.read_text(encoding="utf-8"))
+            except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+                raise ImporterError(f"Invalid glTF JSON in {self.path}: {exc}") from exc
+
+    def _read_glb(self) -> dict:
+        data = _map_file(self.path)
+        if len(data) < 20:
+            raise ImporterError(f"{self.path} is too small to be a GLB file")
+        magic, version, length = struct.unpack_from("<III", data, 0)
+        if magic != GLB_MAGIC or version != 2:
+            raise ImporterError(f"{self.path} is not a glTF 2.0 binary file")
+
+        document: Optional[dict] = None
+        offset = 12
+        end = min(length, len(data))
+        while offset + 8 <= end:
+            chunk_length, chunk_type = struct.unpack_from("<II", data, offset)
+            chunk = data[offset + 8 : offset + 8 + chunk_length]
+            if chunk_type == GLB_CHUNK_JSON:
+                document = json.loads(bytes(chunk))
+            elif chunk_type == GLB_CHUNK_BIN and self._glb_binary is None:
+                self._glb_binary = chunk
+            offset += 8 + chunk_length
+        if document is None:
+            raise ImporterError(f"{self.path} has no JSON chunk")
+        return document
+
+    def buffer(self, index: int) -> memoryview:
+        cached = self._buffers.get(index)
+        if cached is not None:
+            return cached
+        try:
+            spec = self.document["buffers"][index]
+        except (KeyError, IndexError) as exc:
+            raise ImporterError(f"glTF buffer {index} does not exist") from exc
+
+        uri = spec.get("uri")
+        if uri is None:
+            if self._glb_binary is None:
+                raise ImporterError("glTF buffer without URI requires a GLB binary chunk")
+            view = self._glb_binary
+        elif uri.startswith("data:"):
+            # Embedded base64 buffers cannot be mapped; decoding is the only option.
+            view = memoryview(base64.b64decode(uri.split(",", 1)[1]))
+        else:
+            external = self.path.parent / uri
+            if not external.exists():
+                raise ImporterError(f"External glTF buffer not found: {external}")
+            view = _map_file(external)
+        self._buffers[index] = view
+        return view
+
+    def accessor(self, index: int) -> np.ndarray:
+        """Return accessor ``index`` as an ``(count, components)`` NumPy view (no copy)."""
+
+        accessors = self.document.get("accessors", [])
+        if not 0 <= index < len(accessors):
+            raise ImporterError(f"glTF accessor {index} does not exist")
+        spec = accessors[index]
+        dtype = COMPONENT_TYPES.get(spec.get("componentType"))
+        components = COMPONENT_COUNTS.get(spec.get("type", ""))
+        if dtype is None or components is None:
+            raise ImporterError(f"Unsupported glTF accessor layout: {spec}")
+        count = int(spec["count"])
+
+        if "bufferView" not in spec:
+            array = np.zeros((count, components), dtype=dtype)
+        else:
+            view_spec = self.document["bufferViews"][spec["bufferView"]]
+            buffer = self.buffer(view_spec["buffer"])
+            offset = int(view_spec.get("byteOffset", 0)) + int(spec.get("byteOffset", 0))
+            element_size = dtype.itemsize * components
+            stride = int(view_spec.get("byteStride") or element_size)
+            required = offset + stride * (count - 1) + element_size if count else offset
+            if required > len(buffer):
+                raise ImporterError(f"glTF accessor {index} exceeds its buffer bounds")
+            array = np.ndarray(
+                shape=(count, components),
+                dtype=dtype,
+                buffer=buffer,
+                offset=offset,
+                strides=(stride, dtype.itemsize),
+            )
+
+        if "sparse" in spec:
+            # Sparse substitution has to materialise a private copy of the base values.
+            array = self._apply_sparse(np.array(array), spec["sparse"])
+        return array
+
+    def _apply_sparse(self, array: np.ndarray, sparse: dict) -> np.ndarray:
+        count = int(sparse["count"])
+        indices_spec, values_spec = sparse["indices"], sparse["values"]
+        index_dtype = COMPONENT_TYPES[indices_spec["componentType"]]
+        indices_view = self.document["bufferViews"][indices_spec["bufferView"]]
+        values_view = self.document["bufferViews"][values_spec["bufferView"]]
+        indices = np.frombuffer(
+            self.buffer(indices_view["buffer"]),
+            dtype=index_dtype,
+            count=count,
+            offset=int(indices_view.get("byteOffset", 0)) + int(indices_spec.get("byteOffset", 0)),
+        )
+        values = np.frombuffer(
+            self.buffer(values_view["buffer"]),
+            dtype=array.dtype,
+            count=count * array.shape[1],
+            offset=int(values_view.get("byteOffset", 0)) + int(values_spec.get("byteOffset", 0)),
+        ).reshape(count, array.shape[1])
+        array[indices] = values
+        return array
+
+    def image_bytes(self, index: int) -> bytes:
+        """Encoded bytes of image ``index`` (external file, data URI or buffer view)."""
+
+        images = self.document.get("images", [])
+        if not 0 <= index < len(images):
+            raise ImporterError(f"glTF image {index} does not exist")
+        spec = images[index]
+        uri = spec.get("uri")
+        if uri is None:
+            view = self.document["bufferViews"][spec["bufferView"]]
+            offset = int(view.get("byteOffset", 0))
+            return bytes(self.buffer(view["buffer"])[offset : offset + int(view["byteLength"])])
+        if uri.startswith("data:"):
+            return base64.b64decode(uri.split(",", 1)[1])
+        return (self.path.parent / unquote(uri)).read_bytes()
+
+    def material_textures(self, index: int) -> Dict[str, str]:
+        """Texture references of material ``index`` keyed by glTF slot (``baseColorTexture``...).
+
+        External images are referenced by their path relative to the document;
+        embedded ones as ``#image/<n>`` so they can be read back on demand
+        without copying them into the scene graph.
+        """
+
+        material = self.document.get("materials", [])[index]
+        slots = {**material.get("pbrMetallicRoughness", {}), **material}
+        references: Dict[str, str] = {}
+        for slot in TEXTURE_SLOTS:
+            info = slots.get(slot)
+            if not isinstance(info, dict) or "index" not in info:
+                continue
+            texture = self.document.get("textures", [])[info["index"]]
+            image_index = texture.get("source")
+            if image_index is None:
+                continue
+            uri = self.document.get("images", [])[image_index].get("uri")
+            if uri is None or uri.startswith("data:"):
+                references[slot] = f"#image/{image_index}"
+            else:
+                references[slot] = unquote(uri)
+        return references
+
+    def material_factors(self, index: int) -> Dict[str, str]:
+        """Scalar parameters of material ``index`` that are set explicitly, as strings."""
+
+        material = self.document.get("materials", [])[index]
+        slots = {**material.get("pbrMetallicRoughness", {}), **material}
+        factors: Dict[str, str] = {}
+        for key in FACTOR_KEYS:
+            value = slots.get(key)
+            if value is None:
+                continue
+            factors[key] = " ".join(str(part) for part in value) if isinstance(value, list) else str(value)
+        return factors
+
+    def node_matrices(self) -> Dict[int, np.ndarray]:
+        """Return world matrices for every node reachable from the default scene."""
+
+        nodes = self.document.get("nodes", [])
+        scenes = self.document.get("scenes", [])
+        if scenes:
+            roots = scenes[self.document.get("scene", 0)].get("nodes", [])
+        else:
+            children = {child for node in nodes for child in node.get("children", [])}
+            roots = [index for index in range(len(nodes)) if index not in children]
+
+        matrices: Dict[int, np.ndarray] = {}
+        stack = [(index, np.eye(4)) for index in roots]
+        while stack:
+            index, parent = stack.pop()
+            if index in matrices:
+                continue
+            matrices[index] = world = parent @ _local_matrix(nodes[index])
+            stack.extend((child, world) for child in nodes[index].get("children", []))
+        return matrices
+
+
+def _local_matrix(node: dict) -> np.ndarray:
+    if "matrix" in node:
+        return np.asarray(node["matrix"], dtype=np.float64).reshape(4, 4).T
+    matrix = np.eye(4)
+    x, y, z, w = node.get("rotation", (0.0, 0.0, 0.0, 1.0))
+    matrix[:3, :3] = (
+        (1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)),
+        (2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)),
+        (2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)),
+    )
+    matrix[:3, :3] *= np.asarray(node.get("scale", (1.0, 1.0, 1.0)))
+    matrix[:3, 3] = node.get("translation", (0.0, 0.0, 0.0))
+    return matrix
+
+
+@dataclass
+class MappedGLTFImporter:
+    """Import glTF/GLB meshes whose vertex and index arrays alias the mapped source.
+
+    The Y-up to Z-up conversion goes into each node's transform, so vertex
+    arrays stay views of the file; the root records ``source_up_axis``.
+    """
+
+    supported_suffixes: tuple[str, ...] = (".gltf", ".glb")
+    format_name: str = "gltf"
+
+    def load(self, specification: SceneSpecification) -> Dict[str, Dict[str, str]]:
+        source = specification.source_file
+        if not source.exists():
+            raise FileNotFoundError(f"Source file not found: {source}")
+
+        document = GLTFDocument(source)
+        materials = [material.get("name", f"material_{index}") for index, material in enumerate(
+            document.document.get("materials", [])
+        )]
+        meshes = document.document.get("meshes", [])
+        nodes = document.document.get("nodes", [])
+
+        scene_graph: Dict[str, Dict[str, object]] = {}
+        for node_index, matrix in sorted(document.node_matrices().items()):
+            node = nodes[node_index]
+            if "mesh" not in node:
+                continue
+            mesh_spec = meshes[node["mesh"]]
+            base_name = node.get("name") or mesh_spec.get("name") or f"node_{node_index}"
+            for primitive_index, primitive in enumerate(mesh_spec.get("primitives", [])):
+                mesh = self._load_primitive(document, primitive, materials)
+                if mesh is None:
+                    continue
+                node_id = base_name if primitive_index == 0 else f"{base_name}#{primitive_index}"
+                if node_id in scene_graph:
+                    node_id = f"{node_id}@{node_index}"
+                scene_graph[node_id] = {
+                    "type": "mesh",
+                    "parent": "root",
+                    "mesh": mesh,
+                    "transform": (Y_UP_TO_Z_UP @ matrix).astype(np.float32),
+                    **({"material": mesh.material} if mesh.material else {}),
+                }
+
+        material_properties = {
+            name: properties
+            for index, name in enumerate(materials)
+            if (properties := {**document.material_factors(index), **document.material_textures(index)})
+        }
+        root: Dict[str, object] = {
+            "type": "scene",
+            "origin_file": str(source),
+            "format": self.format_name,
+            "source_up_axis": SOURCE_UP_AXIS,
+            **({"materials": material_properties} if material_properties else {}),
+            "required_assets": [
+                "embedded-binary" if source.suffix.lower() == ".glb" else "gltf-binary",
+                *[image.get("uri", f"image_{index}") for index, image in enumerate(
+                    document.document.get("images", [])
+                )],
+            ],
+            "children": list(scene_graph),
+        }
+        return {"root": root, **scene_graph}
+
+    def _load_primitive(
+        self, document: GLTFDocument, primitive: dict, materials: List[str]
+    ) -> Optional[MeshData]:
+        if primitive.get("mode", MODE_TRIANGLES) != MODE_TRIANGLES:
+            return None
+        attributes = primitive.get("attributes", {})
+        if "POSITION" not in attributes:
+            return None
+
+        positions = document.accessor(attributes["POSITION"])
+        if "indices" in primitive:
+            indices = document.accessor(primitive["indices"]).reshape(-1, 3)
+        else:
+            indices = np.arange(positions.shape[0], dtype=np.uint32).reshape(-1, 3)
+        material_index = primitive.get("material")
+        return MeshData(
+            positions=positions,
+            indices=indices,
+            normals=document.accessor(attributes["NORMAL"]) if "NORMAL" in attributes else None,
+            uvs=document.accessor(attributes["TEXCOORD_0"]) if "TEXCOORD_0" in attributes else None,
+            material=materials[material_index] if material_index is not None else None,
+        )
+
+
+__all__ = [
+    "COMPONENT_TYPES",
+    "FACTOR_KEYS",
+    "GLTFDocument",
+    "MappedGLTFImporter",
+    "SOURCE_UP_AXIS",
+    "TEXTURE_SLOTS",
+    "Y_UP_TO_Z_UP",
+]
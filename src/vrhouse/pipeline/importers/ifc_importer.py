@@ -0,0 +1,900 @@
+"""Indexed, lazily resolved STEP-21 reader and body triangulation for IFC building models."""
+from __future__ import annotations
+
+import mmap
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from vrhouse.core import MeshData, SceneSpecification
+from vrhouse.pipeline.importers.base import ImporterError
+
+# String literals (``''`` escapes a quote) and comments are matched whole so a
+# ``#1=IFCWALL(`` inside a label never registers as a record.
+_RECORD = re.compile(
+    rb"'[^']*(?:''[^']*)*'|/\*.*?\*/|#(\d+)[ \t\r\n]*=[ \t\r\n]*([A-Za-z0-9_]+)[ \t\r\n]*\(", re.DOTALL
+)
+_TOKEN = re.compile(
+    rb"""[ \t\r\n]*(?:
+        (?P<ref>\#\d+)
+      | (?P<string>'(?:[^']|'')*')
+      | (?P<number>[-+]?(?:\d+\.?\d*(?:[eE][-+]?\d+)?|\.\d+(?:[eE][-+]?\d+)?))
+      | (?P<enum>\.[A-Za-z0-9_]+\.)
+      | (?P<typed>[A-Za-z0-9_]+)[ \t\r\n]*\(
+      | (?P<open>\()
+      | (?P<close>\))
+      | (?P<comma>,)
+      | (?P<null>[$*])
+      | (?P<binary>"[0-9A-Fa-f]*")
+    )""",
+    re.VERBOSE,
+)
+_COUNT_BLOCK = 64 * 1024 * 1024
+_LIST_SEPARATORS = bytes.maketrans(b"(),", b"   ")
+
+# Building elements whose placements are resolved by default, including common subtypes.
+DEFAULT_ELEMENT_TYPES: Dict[str, Tuple[str, ...]] = {
+    "IFCWALL": ("IFCWALL", "IFCWALLSTANDARDCASE", "IFCWALLELEMENTEDCASE"),
+    "IFCWINDOW": ("IFCWINDOW", "IFCWINDOWSTANDARDCASE"),
+    "IFCDOOR": ("IFCDOOR", "IFCDOORSTANDARDCASE"),
+    "IFCSLAB": ("IFCSLAB", "IFCSLABSTANDARDCASE", "IFCSLABELEMENTEDCASE"),
+    "IFCROOF": ("IFCROOF",),
+    "IFCSTAIR": ("IFCSTAIR", "IFCSTAIRFLIGHT"),
+    "IFCCOLUMN": ("IFCCOLUMN", "IFCCOLUMNSTANDARDCASE"),
+    "IFCBEAM": ("IFCBEAM", "IFCBEAMSTANDARDCASE"),
+    "IFCFURNISHINGELEMENT": ("IFCFURNISHINGELEMENT", "IFCFURNITURE"),
+    "IFCSPACE": ("IFCSPACE",),
+    "IFCRAILING": ("IFCRAILING",),
+    "IFCCOVERING": ("IFCCOVERING",),
+    "IFCPLATE": ("IFCPLATE", "IFCPLATESTANDARDCASE"),
+    "IFCMEMBER": ("IFCMEMBER", "IFCMEMBERSTANDARDCASE"),
+    "IFCBUILDINGELEMENTPROXY": ("IFCBUILDINGELEMENTPROXY",),
+}
+
+
+@dataclass(frozen=True)
+class EntityRef:
+    """Unresolved ``#id`` reference found inside an entity's arguments."""
+
+    id: int
+
+
+@dataclass(frozen=True)
+class TypedValue:
+    """Inline typed parameter such as ``IFCLABEL('Kitchen')``."""
+
+    type: str
+    value: object
+
+
+def _count_byte(data: bytes | mmap.mmap, value: bytes, start: int) -> int:
+    """Occurrences of the single byte ``value`` in ``data[start:]``, counted a block at a time."""
+
+    view = np.frombuffer(data, dtype=np.uint8)
+    code = value[0]
+    return sum(
+        int(np.count_nonzero(view[first : first + _COUNT_BLOCK] == code)) for first in range(start, view.size, _COUNT_BLOCK)
+    )
+
+
+def _decode_string(token: bytes) -> str:
+    return token[1:-1].replace(b"''", b"'").decode("latin-1")
+
+
+def parse_arguments(data: bytes, start: int = 0) -> Tuple[List[object], int]:
+    """Parse a parenthesised STEP argument list beginning right after ``(``.
+
+    Returns the parsed values and the offset following the closing parenthesis.
+    """
+
+    stack: List[List[object]] = [[]]
+    typed: List[Optional[str]] = [None]
+    position = start
+    while True:
+        match = _TOKEN.match(data, position)
+        if match is None:
+            raise ImporterError(f"Malformed STEP arguments near offset {position}")
+        position = match.end()
+        kind = match.lastgroup
+        token = match.group(kind)
+        if kind == "comma":
+            continue
+        if kind == "close":
+            values = stack.pop()
+            type_name = typed.pop()
+            if not stack:
+                return values, position
+            item: object = values
+            if type_name is not None:
+                item = TypedValue(type_name, values[0] if len(values) == 1 else values)
+            stack[-1].append(item)
+        elif kind == "open":
+            stack.append([])
+            typed.append(None)
+        elif kind == "typed":
+            stack.append([])
+            typed.append(token.decode("ascii").upper())
+        elif kind == "ref":
+            stack[-1].append(EntityRef(int(token[1:])))
+        elif kind == "string":
+            stack[-1].append(_decode_string(token))
+        elif kind == "number":
+            stack[-1].append(float(token) if (b"." in token or b"e" in token or b"E" in token) else int(token))
+        elif kind == "enum":
+            stack[-1].append(token[1:-1].decode("ascii").upper())
+        elif kind == "null":
+            stack[-1].append(None)
+        else:
+            stack[-1].append(token[1:-1].decode("ascii"))
+
+
+class StepEntity:
+    """Lightweight handle to one ``#id=ENTITY(...)`` record; arguments parse on first access."""
+
+    __slots__ = ("_file", "id", "type", "_offset", "_arguments")
+
+    def __init__(self, step_file: "StepFile", entity_id: int, entity_type: str, offset: int) -> None:
+        self._file = step_file
+        self.id = entity_id
+        self.type = entity_type
+        self._offset = offset
+        self._arguments: Optional[List[object]] = None
+
+    @property
+    def arguments(self) -> List[object]:
+        if self._arguments is None:
+            self._arguments, _ = parse_arguments(self._file.data, self._offset)
+        return self._arguments
+
+    def __getitem__(self, index: int) -> object:
+        """Return an argument with entity references resolved to ``StepEntity`` handles."""
+
+        return self._file.resolve(self.arguments[index])
+
+    def __len__(self) -> int:
+        return len(self.arguments)
+
+    def __repr__(self) -> str:
+        return f"StepEntity(#{self.id}={self.type})"
+
+
+class StepFile:
+    """Memory-mapped STEP-21 file with a compact byte-offset index of its records.
+
+    The index is built with a single regular-expression scan and keeps three NumPy
+    arrays (ids, argument offsets, type codes); entities are only materialised and
+    parsed when they are requested.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._handle = self.path.open("rb")
+        size = self.path.stat().st_size
+        self.data: bytes | mmap.mmap = (
+            mmap.mmap(self._handle.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        )
+        if size and not self.data[:64].lstrip().startswith(b"ISO-10303-21"):
+            self.close()
+            raise ImporterError(f"{self.path} is not a STEP-21 (ISO-10303-21) file")
+        self._entities: Dict[int, StepEntity] = {}
+        self._placements: Dict[int, np.ndarray] = {}
+        self._build_index()
+
+    def _build_index(self) -> None:
+        start = self.data.find(b"DATA;") if self.data else -1
+        # Every record ends with ``;``, so their count bounds the number of records.
+        capacity = _count_byte(self.data, b";", start) if start >= 0 else 0
+        ids = np.empty(capacity, dtype=np.int64)
+        offsets = np.empty(capacity, dtype=np.int64)
+        codes = np.empty(capacity, dtype=np.int32)
+        self.type_names: List[str] = []
+        type_codes: Dict[bytes, int] = {}
+        count = 0
+        if start >= 0:
+            for match in _RECORD.finditer(self.data, start):
+                raw_type = match.group(2)
+                if raw_type is None:
+                    continue
+                code = type_codes.get(raw_type)
+                if code is None:
+                    code = type_codes[raw_type] = len(self.type_names)
+                    self.type_names.append(raw_type.decode("ascii").upper())
+                ids[count] = int(match.group(1))
+                offsets[count] = match.end()
+                codes[count] = code
+                count += 1
+        order = np.argsort(ids[:count], kind="stable")
+        self._ids = ids[order]
+        self._offsets = offsets[order]
+        self._codes = codes[order]
+
+    def __enter__(self) -> "StepFile":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if isinstance(self.data, mmap.mmap):
+            self._entities.clear()
+            self.data.close()
+        self._handle.close()
+
+    def __len__(self) -> int:
+        return int(self._ids.size)
+
+    def __contains__(self, entity_id: int) -> bool:
+        position = int(np.searchsorted(self._ids, entity_id))
+        return position < self._ids.size and int(self._ids[position]) == entity_id
+
+    def __getitem__(self, entity_id: int) -> StepEntity:
+        entity = self._entities.get(entity_id)
+        if entity is not None:
+            return entity
+        position = int(np.searchsorted(self._ids, entity_id))
+        if position >= self._ids.size or int(self._ids[position]) != entity_id:
+            raise KeyError(f"#{entity_id}")
+        entity = StepEntity(
+            self, entity_id, self.type_names[int(self._codes[position])], int(self._offsets[position])
+        )
+        self._entities[entity_id] = entity
+        return entity
+
+    def resolve(self, value: object) -> object:
+        if isinstance(value, EntityRef):
+            return self[value.id]
+        if isinstance(value, list):
+            return [self.resolve(item) for item in value]
+        return value
+
+    def type_counts(self) -> Dict[str, int]:
+        counts = np.bincount(self._codes, minlength=len(self.type_names))
+        return {name: int(count) for name, count in zip(self.type_names, counts) if count}
+
+    def by_type(self, *entity_types: str) -> Iterator[StepEntity]:
+        """Yield entities of the given (upper-case) STEP types in id order."""
+
+        wanted = [code for code, name in enumerate(self.type_names) if name in {t.upper() for t in entity_types}]
+        if not wanted:
+            return
+        for position in np.flatnonzero(np.isin(self._codes, wanted)):
+            yield self[int(self._ids[position])]
+
+    def _argument_text(self, entity: StepEntity, index: int) -> Optional[bytes]:
+        """Raw text of argument ``index``, cut at top-level commas; ``None`` when strings make that unsafe."""
+
+        end = self.data.find(b";", entity._offset)
+        end = len(self.data) if end < 0 else end
+        if self.data.find(b"'", entity._offset, end) >= 0:
+            return None
+        record = self.data[entity._offset : end]
+        view = np.frombuffer(record, dtype=np.uint8)
+        depth = np.cumsum(view == ord("(")) - np.cumsum(view == ord(")"))
+        bounds = np.concatenate(([-1], np.flatnonzero((view == ord(",")) & (depth == 0)), [record.rfind(b")")]))
+        if index + 1 >= bounds.size:
+            return None
+        return record[bounds[index] + 1 : bounds[index + 1]].strip()
+
+    def argument(self, entity: StepEntity, index: int) -> object:
+        """``entity[index]`` without parsing the other arguments (which may be huge lists)."""
+
+        text = None if entity._arguments is not None else self._argument_text(entity, index)
+        if text is None:
+            return entity[index] if index < len(entity) else None
+        values, _ = parse_arguments(text + b")")
+        return self.resolve(values[0]) if values else None
+
+    def numbers(self, entity: StepEntity, index: int, dtype: type = np.float64) -> Optional[np.ndarray]:
+        """Argument ``index`` of ``entity``, a (nested) list of plain numbers, as an array; ``None`` for ``$``.
+
+        Coordinate and index lists of face sets run to millions of values, so the
+        argument is cut out of the record and converted with one ``np.fromstring``
+        call instead of being parsed into Python lists.
+        """
+
+        text = None if entity._arguments is not None else self._argument_text(entity, index)
+        if text is not None:
+            if text in (b"$", b"*"):
+                return None
+            values = np.fromstring(text.translate(_LIST_SEPARATORS), dtype=dtype, sep=" ")
+            rows = text.count(b"(") - 1
+            if text.count(b",") == values.size - 1 and (rows <= 0 or values.size % rows == 0):
+                return values.reshape(rows, -1) if rows > 0 else values
+        value = entity.arguments[index] if index < len(entity) else None
+        return None if value is None else np.asarray(value, dtype=dtype)
+
+    def length_unit(self) -> float:
+        """Metres per length unit of the project (``IfcSIUnit`` prefix or ``IfcConversionBasedUnit``)."""
+
+        assignments = [
+            project[8] for project in self.by_type("IFCPROJECT") if len(project) > 8 and isinstance(project[8], StepEntity)
+        ] or list(self.by_type("IFCUNITASSIGNMENT"))
+        for assignment in assignments:
+            for unit in assignment[0] or ():
+                if isinstance(unit, StepEntity) and len(unit) > 1 and unit.arguments[1] == "LENGTHUNIT":
+                    return _unit_scale(unit)
+        return 1.0
+
+    def material_names(self) -> Dict[int, str]:
+        """Material name of every product named by an ``IfcRelAssociatesMaterial``, by entity id."""
+
+        names: Dict[int, str] = {}
+        for relation in self.by_type("IFCRELASSOCIATESMATERIAL"):
+            name = _material_name(relation[5]) if len(relation) > 5 else None
+            if name is None:
+                continue
+            for related in relation.arguments[4] or ():
+                if isinstance(related, EntityRef):
+                    names.setdefault(related.id, name)
+        return names
+
+    def placement_matrix(self, placement: Optional[StepEntity]) -> np.ndarray:
+        """Resolve an ``IfcLocalPlacement`` chain into a world-space 4x4 matrix."""
+
+        if placement is None:
+            return np.eye(4)
+        cached = self._placements.get(placement.id)
+        if cached is not None:
+            return cached
+        if placement.type != "IFCLOCALPLACEMENT":
+            matrix = np.eye(4)
+        else:
+            relative_to = placement[0]
+            parent = self.placement_matrix(relative_to if isinstance(relative_to, StepEntity) else None)
+            matrix = parent @ _axis_placement_matrix(placement[1])
+        self._placements[placement.id] = matrix
+        return matrix
+
+    def elements(
+        self, element_types: Optional[Dict[str, Sequence[str]]] = None
+    ) -> Iterator[Tuple[str, StepEntity, np.ndarray]]:
+        """Yield ``(ifc_class, entity, world_matrix)`` for building elements.
+
+        Only the attributes shared by every ``IfcProduct`` (ids, names, placement) are
+        parsed here; ``ShapeBuilder`` follows the representations, and property
+        sets remain untouched. Matrices are in file units.
+        """
+
+        for ifc_class, subtypes in (element_types or DEFAULT_ELEMENT_TYPES).items():
+            for entity in self.by_type(*subtypes):
+                placement = entity[5] if len(entity) > 5 else None
+                yield ifc_class, entity, self.placement_matrix(
+                    placement if isinstance(placement, StepEntity) else None
+                )
+
+
+def _coordinates(entity: object, default: Iterable[float]) -> np.ndarray:
+    if isinstance(entity, StepEntity):
+        return np.asarray(entity.arguments[0], dtype=np.float64)
+    return np.asarray(list(default), dtype=np.float64)
+
+
+def _vector3(entity: object, default: Iterable[float] = (0.0, 0.0, 0.0)) -> np.ndarray:
+    """Coordinates of a point or direction padded with zeros to three components."""
+
+    return np.append(_coordinates(entity, default), [0.0, 0.0, 0.0])[:3]
+
+
+def _axis_placement_matrix(axis_placement: object) -> np.ndarray:
+    """Build the 4x4 matrix of an ``IfcAxis2Placement3D``/``2D``."""
+
+    matrix = np.eye(4)
+    if not isinstance(axis_placement, StepEntity):
+        return matrix
+    location = _coordinates(axis_placement[0], (0.0, 0.0, 0.0))
+    matrix[: location.size, 3] = location
+    if axis_placement.type == "IFCAXIS2PLACEMENT2D":
+        x_axis = _coordinates(axis_placement[1] if len(axis_placement) > 1 else None, (1.0, 0.0))
+        x_axis = np.append(x_axis, 0.0) / np.linalg.norm(x_axis)
+        z_axis = np.array([0.0, 0.0, 1.0])
+    else:
+        z_axis = _coordinates(axis_placement[1] if len(axis_placement) > 1 else None, (0.0, 0.0, 1.0))
+        x_axis = _coordinates(axis_placement[2] if len(axis_placement) > 2 else None, (1.0, 0.0, 0.0))
+        z_axis = z_axis / np.linalg.norm(z_axis)
+        x_axis = x_axis - np.dot(x_axis, z_axis) * z_axis
+        x_axis = x_axis / np.linalg.norm(x_axis)
+    matrix[:3, 0] = x_axis
+    matrix[:3, 1] = np.cross(z_axis, x_axis)
+    matrix[:3, 2] = z_axis
+    return matrix
+
+
+# -- units and materials ---------------------------------------------------------------------
+_SI_PREFIXES = {
+    "EXA": 1e18, "PETA": 1e15, "TERA": 1e12, "GIGA": 1e9, "MEGA": 1e6, "KILO": 1e3, "HECTO": 1e2, "DECA": 1e1,
+    "DECI": 1e-1, "CENTI": 1e-2, "MILLI": 1e-3, "MICRO": 1e-6, "NANO": 1e-9, "PICO": 1e-12, "FEMTO": 1e-15,
+    "ATTO": 1e-18,
+}  # fmt: skip
+
+
+def _unit_scale(unit: StepEntity) -> float:
+    """Metres per unit of an ``IfcSIUnit`` or ``IfcConversionBasedUnit`` length unit."""
+
+    if unit.type == "IFCSIUNIT":
+        prefix = unit.arguments[2] if len(unit) > 2 else None
+        return _SI_PREFIXES.get(prefix, 1.0) if isinstance(prefix, str) else 1.0
+    if unit.type == "IFCCONVERSIONBASEDUNIT" and len(unit) > 3 and isinstance(unit[3], StepEntity):
+        measure = unit[3]
+        value = measure.arguments[0]
+        value = value.value if isinstance(value, TypedValue) else value
+        base = measure[1] if len(measure) > 1 else None
+        return float(value) * (_unit_scale(base) if isinstance(base, StepEntity) else 1.0)
+    return 1.0
+
+
+# Argument leading one step closer to an ``IfcMaterial``, per material definition type.
+_MATERIAL_LINKS = {
+    "IFCMATERIALLAYERSETUSAGE": 0,
+    "IFCMATERIALLAYERSET": 0,
+    "IFCMATERIALLAYER": 0,
+    "IFCMATERIALLIST": 0,
+    "IFCMATERIALPROFILESETUSAGE": 0,
+    "IFCMATERIALPROFILESET": 2,
+    "IFCMATERIALPROFILE": 2,
+    "IFCMATERIALCONSTITUENTSET": 2,
+    "IFCMATERIALCONSTITUENT": 2,
+}
+
+
+def _material_name(definition: object) -> Optional[str]:
+    """Name of the (first) ``IfcMaterial`` a material definition leads to."""
+
+    for _ in range(8):
+        if isinstance(definition, list):
+            definition = definition[0] if definition else None
+        if not isinstance(definition, StepEntity):
+            return None
+        if definition.type == "IFCMATERIAL":
+            name = definition.arguments[0]
+            return name if isinstance(name, str) and name else None
+        link = _MATERIAL_LINKS.get(definition.type)
+        if link is None or link >= len(definition):
+            return None
+        definition = definition[link]
+    return None
+
+
+# -- geometry --------------------------------------------------------------------------------
+# Representations without body geometry, never triangulated.
+NON_BODY_REPRESENTATIONS = frozenset({"AXIS", "FOOTPRINT", "PROFILE", "ANNOTATION", "COG", "CLEARANCE", "SURVEY"})
+CIRCLE_SEGMENTS = 24
+_MAX_NESTING = 8
+
+# Triangulated item: ``(positions (n, 3), normals (n, 3), indices (m, 3))`` in the item's frame.
+_Triangles = Tuple[np.ndarray, np.ndarray, np.ndarray]
+_NO_TRIANGLES: _Triangles = (np.zeros((0, 3)), np.zeros((0, 3)), np.zeros((0, 3), dtype=np.int64))
+
+
+def _vertex_normals(positions: np.ndarray, indices: np.ndarray) -> np.ndarray:
+    """Area-weighted vertex normals: flat for vertices that belong to a single planar face."""
+
+    corners = positions[indices]
+    face = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    normals = np.zeros_like(positions)
+    for column in range(3):
+        np.add.at(normals, indices[:, column], face)
+    length = np.linalg.norm(normals, axis=1, keepdims=True)
+    return np.divide(normals, length, out=np.zeros_like(normals), where=length > 0)
+
+
+def _clean_loop(points: np.ndarray) -> np.ndarray:
+    """Drop repeated consecutive points and the closing copy of the first one."""
+
+    if len(points) < 2:
+        return points
+    keep = np.ones(len(points), dtype=bool)
+    keep[1:] = np.any(np.abs(np.diff(points, axis=0)) > 1e-9, axis=1)
+    points = points[keep]
+    if len(points) > 1 and np.all(np.abs(points[0] - points[-1]) <= 1e-9):
+        points = points[:-1]
+    return points
+
+
+def _cross2(origin: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return (a[..., 0] - origin[..., 0]) * (b[..., 1] - origin[..., 1]) - (a[..., 1] - origin[..., 1]) * (
+        b[..., 0] - origin[..., 0]
+    )
+
+
+def triangulate_polygon(points: np.ndarray) -> np.ndarray:
+    """Counter-clockwise triangles (indices into ``points``) covering a simple 2D polygon.
+
+    Convex polygons become a fan; others are ear-clipped. Whatever cannot be
+    clipped (self-intersecting input) is closed with a fan.
+    """
+
+    count = len(points)
+    if count < 3:
+        return np.zeros((0, 3), dtype=np.int64)
+    area = float(np.sum(_cross2(np.zeros(2), points, np.roll(points, -1, axis=0))))
+    order = np.arange(count) if area >= 0 else np.arange(count)[::-1]
+    ring = points[order]
+    if np.all(_cross2(ring, np.roll(ring, -1, axis=0), np.roll(ring, -2, axis=0)) >= -1e-12):
+        fan = np.arange(1, count - 1)
+        return order[np.column_stack((np.zeros_like(fan), fan, fan + 1))]
+
+    remaining = order.tolist()
+    triangles: List[Tuple[int, int, int]] = []
+    while len(remaining) > 3:
+        size = len(remaining)
+        for position in range(size):
+            a, b, c = remaining[position - 1], remaining[position], remaining[(position + 1) % size]
+            if _cross2(points[a], points[b], points[c]) <= 1e-12:
+                continue  # reflex or degenerate corner
+            others = points[[index for index in remaining if index not in (a, b, c)]]
+            inside = (
+                (_cross2(points[a], points[b], others) >= 0)
+                & (_cross2(points[b], points[c], others) >= 0)
+                & (_cross2(points[c], points[a], others) >= 0)
+            )
+            if inside.any():
+                continue
+            triangles.append((a, b, c))
+            del remaining[position]
+            break
+        else:
+            break
+    triangles.extend((remaining[0], remaining[i], remaining[i + 1]) for i in range(1, len(remaining) - 1))
+    return np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+
+
+def _polygons(points: np.ndarray, loops: Sequence[np.ndarray]) -> _Triangles:
+    """Flat-shaded triangles of planar 3D polygons (``loops`` index ``points``), one vertex set per face."""
+
+    loops = [loop for loop in loops if len(loop) >= 3]
+    triangles = [loop for loop in loops if len(loop) == 3]
+    positions = [points[np.asarray(triangles, dtype=np.int64)].reshape(-1, 3)] if triangles else []
+    indices = [np.arange(3 * len(triangles)).reshape(-1, 3)] if triangles else []
+    offset = 3 * len(triangles)
+    for loop in loops:
+        if len(loop) == 3:
+            continue
+        vertices = _clean_loop(points[loop])
+        if len(vertices) < 3:
+            continue
+        normal = np.cross(vertices, np.roll(vertices, -1, axis=0)).sum(axis=0)
+        length = np.linalg.norm(normal)
+        if length <= 0:
+            continue
+        normal /= length
+        helper = np.eye(3)[int(np.argmin(np.abs(normal)))]
+        u = np.cross(helper, normal)
+        u /= np.linalg.norm(u)
+        v = np.cross(normal, u)
+        positions.append(vertices)
+        indices.append(triangulate_polygon(vertices @ np.column_stack((u, v))) + offset)
+        offset += len(vertices)
+    if not positions:
+        return _NO_TRIANGLES
+    positions_array, indices_array = np.concatenate(positions), np.concatenate(indices)
+    return positions_array, _vertex_normals(positions_array, indices_array), indices_array
+
+
+def _extrusion(outline: np.ndarray, extrusion: np.ndarray) -> _Triangles:
+    """Prism swept from the 2D ``outline`` (in the z=0 plane) along the vector ``extrusion``."""
+
+    outline = _clean_loop(outline)
+    count = len(outline)
+    if count < 3 or not np.any(extrusion):
+        return _NO_TRIANGLES
+    if float(np.sum(_cross2(np.zeros(2), outline, np.roll(outline, -1, axis=0)))) < 0:
+        outline = outline[::-1]
+    base = np.column_stack((outline, np.zeros(count)))
+    top = base + extrusion
+    cap = triangulate_polygon(outline)
+    # Sides are quads base[i], base[i+1], top[i+1], top[i] with their own vertices (sharp edges).
+    sides = np.stack((base, np.roll(base, -1, axis=0), np.roll(top, -1, axis=0), top), axis=1).reshape(-1, 3)
+    quad = 2 * count + 4 * np.arange(count)
+    positions = np.concatenate((base, top, sides))
+    indices = np.concatenate(
+        (cap[:, ::-1], cap + count, np.column_stack((quad, quad + 1, quad + 2)), np.column_stack((quad, quad + 2, quad + 3)))
+    )
+    if extrusion[2] < 0:
+        indices = indices[:, ::-1]  # swept below the profile plane: the solid would be inside out
+    return positions, _vertex_normals(positions, indices), indices
+
+
+def _operator_matrix(operator: object) -> np.ndarray:
+    """4x4 matrix of an ``IfcCartesianTransformationOperator3D`` (uniform or non-uniform scale)."""
+
+    matrix = np.eye(4)
+    if not isinstance(operator, StepEntity):
+        return matrix
+    arguments = operator.arguments
+
+    def argument(index: int) -> object:
+        return operator[index] if index < len(arguments) else None
+
+    def number(index: int, default: float) -> float:
+        value = arguments[index] if index < len(arguments) else None
+        return float(value) if isinstance(value, (int, float)) else default
+
+    z_axis = _vector3(argument(4), (0.0, 0.0, 1.0)) if "3D" in operator.type else np.eye(3)[2]
+    x_axis = _vector3(argument(0), (1.0, 0.0, 0.0))
+    z_axis = z_axis / np.linalg.norm(z_axis)
+    x_axis = x_axis - np.dot(x_axis, z_axis) * z_axis
+    x_axis = x_axis / np.linalg.norm(x_axis)
+    origin = _coordinates(argument(2), (0.0, 0.0, 0.0))
+    scale = number(3, 1.0)
+    matrix[:3, 0] = x_axis * scale
+    matrix[:3, 1] = np.cross(z_axis, x_axis) * number(5, scale)
+    matrix[:3, 2] = z_axis * number(6, scale)
+    matrix[: origin.size, 3] = origin
+    return matrix
+
+
+class ShapeBuilder:
+    """Triangulate the body representation of IFC products into ``MeshData``.
+
+    Supported items are ``IfcExtrudedAreaSolid`` (rectangle, circle and
+    arbitrary closed profiles; voids are ignored), ``IfcFacetedBrep`` and the
+    face/shell based surface models, ``IfcTriangulatedFaceSet``,
+    ``IfcPolygonalFaceSet`` and ``IfcBoundingBox``; ``IfcMappedItem`` and
+    boolean results are followed to their operands (clipping is not applied).
+    Positions are multiplied by ``scale`` (metres per file unit). Each item is
+    triangulated once, and products whose items and mapping transforms are the
+    same share one ``MeshData``, so type-based furniture arrives instanced.
+    """
+
+    def __init__(self, step_file: StepFile, scale: float = 1.0) -> None:
+        self.file = step_file
+        self.scale = scale
+        self.unsupported: Dict[str, int] = {}
+        self._items: Dict[int, _Triangles] = {}
+        self._meshes: Dict[Tuple[Tuple[int, bytes], ...], Optional[MeshData]] = {}
+
+    def product_mesh(self, product: StepEntity) -> Optional[MeshData]:
+        """Mesh of ``product``'s body in its placement's frame; ``None`` without usable geometry."""
+
+        shape = product[6] if len(product) > 6 else None
+        if not isinstance(shape, StepEntity) or len(shape) < 3:
+            return None
+        representations = [item for item in shape[2] or () if isinstance(item, StepEntity) and len(item) > 3]
+        representations.sort(key=lambda item: str(item.arguments[1] or "").upper() != "BODY")
+        for representation in representations:
+            if str(representation.arguments[1] or "").upper() in NON_BODY_REPRESENTATIONS:
+                continue
+            placed = self._placed_items(representation[3] or [], np.eye(4), 0)
+            key = tuple((item.id, matrix.tobytes()) for item, matrix in placed)
+            if key not in self._meshes:
+                self._meshes[key] = self._combine(placed)
+            if self._meshes[key] is not None:
+                return self._meshes[key]
+        return None
+
+    def _placed_items(self, items: Iterable[object], matrix: np.ndarray, depth: int) -> List[Tuple[StepEntity, np.ndarray]]:
+        placed: List[Tuple[StepEntity, np.ndarray]] = []
+        for item in items:
+            if not isinstance(item, StepEntity) or depth > _MAX_NESTING:
+                continue
+            if item.type == "IFCMAPPEDITEM":
+                source = item[0]
+                if isinstance(source, StepEntity) and isinstance(source[1], StepEntity):
+                    mapped = matrix @ _operator_matrix(item[1]) @ _axis_placement_matrix(source[0])
+                    placed.extend(self._placed_items(source[1][3] or [], mapped, depth + 1))
+            elif item.type in ("IFCBOOLEANRESULT", "IFCBOOLEANCLIPPINGRESULT"):
+                operands = [item[1]] + ([item[2]] if item.arguments[0] == "UNION" else [])
+                placed.extend(self._placed_items(operands, matrix, depth + 1))
+            else:
+                placed.append((item, matrix))
+        return placed
+
+    def _combine(self, placed: Sequence[Tuple[StepEntity, np.ndarray]]) -> Optional[MeshData]:
+        positions: List[np.ndarray] = []
+        normals: List[np.ndarray] = []
+        indices: List[np.ndarray] = []
+        offset = 0
+        for item, matrix in placed:
+            item_positions, item_normals, item_indices = self.item_triangles(item)
+            if not len(item_indices):
+                continue
+            linear = matrix[:3, :3]
+            normal_matrix = np.linalg.inv(linear).T
+            transformed = item_normals @ normal_matrix.T
+            length = np.linalg.norm(transformed, axis=1, keepdims=True)
+            positions.append(item_positions @ linear.T + matrix[:3, 3])
+            normals.append(np.divide(transformed, length, out=np.zeros_like(transformed), where=length > 0))
+            indices.append(item_indices + offset)
+            offset += len(item_positions)
+        if not indices:
+            return None
+        return MeshData(
+            positions=(np.concatenate(positions) * self.scale).astype(np.float32),
+            indices=np.concatenate(indices).astype(np.uint32),
+            normals=np.concatenate(normals).astype(np.float32),
+        )
+
+    def item_triangles(self, item: StepEntity) -> _Triangles:
+        """Triangles of one representation item in its own frame and file units (cached per item)."""
+
+        cached = self._items.get(item.id)
+        if cached is None:
+            try:
+                cached = self._triangulate(item)
+            except (ImporterError, IndexError, KeyError, TypeError, ValueError, ZeroDivisionError):
+                cached = None
+            if cached is None:
+                self.unsupported[item.type] = self.unsupported.get(item.type, 0) + 1
+                cached = _NO_TRIANGLES
+            self._items[item.id] = cached
+        return cached
+
+    def _triangulate(self, item: StepEntity) -> Optional[_Triangles]:
+        kind = item.type
+        if kind in ("IFCEXTRUDEDAREASOLID", "IFCEXTRUDEDAREASOLIDTAPERED"):
+            outline = self._profile(item[0])
+            if outline is None:
+                return None
+            direction = _vector3(item[2], (0.0, 0.0, 1.0))
+            triangles = _extrusion(outline, direction / np.linalg.norm(direction) * float(item.arguments[3]))
+            return self._place(triangles, _axis_placement_matrix(item[1]))
+        if kind == "IFCBOUNDINGBOX":
+            corner = _vector3(item[0])
+            x, y, z = (float(value) for value in item.arguments[1:4])
+            triangles = _extrusion(np.array([[0.0, 0.0], [x, 0.0], [x, y], [0.0, y]]), np.array([0.0, 0.0, z]))
+            return triangles[0] + corner, triangles[1], triangles[2]
+        if kind in ("IFCFACETEDBREP", "IFCFACETEDBREPWITHVOIDS"):
+            return self._faces(item[0][0])
+        if kind in ("IFCFACEBASEDSURFACEMODEL", "IFCSHELLBASEDSURFACEMODEL"):
+            return self._faces([face for shell in item[0] for face in shell[0]])
+        if kind == "IFCTRIANGULATEDFACESET":
+            return self._triangulated_face_set(item)
+        if kind == "IFCPOLYGONALFACESET":
+            points = self.file.numbers(self.file.argument(item, 0), 0)
+            mapping = self.file.numbers(item, 3, np.int64) if len(item) > 3 else None
+            loops = [np.asarray(face.arguments[0], dtype=np.int64) - 1 for face in item[2]]
+            if mapping is not None and mapping.size:
+                loops = [mapping[loop] - 1 for loop in loops]
+            return _polygons(points, loops)
+        return None
+
+    def _triangulated_face_set(self, item: StepEntity) -> _Triangles:
+        points = self.file.numbers(self.file.argument(item, 0), 0)
+        indices = self.file.numbers(item, 3, np.int64).reshape(-1, 3) - 1
+        mapping = self.file.numbers(item, 4, np.int64)
+        if mapping is not None and mapping.size:
+            indices = mapping[indices] - 1
+        if indices.size and (indices.min() < 0 or indices.max() >= len(points)):
+            raise ImporterError(f"#{item.id} references a missing coordinate")
+        normals = self.file.numbers(item, 1)
+        if normals is None or normals.shape != points.shape or (mapping is not None and mapping.size):
+            normals = _vertex_normals(points, indices)
+        return points, normals, indices
+
+    def _faces(self, faces: Iterable[StepEntity]) -> _Triangles:
+        """Polygons of ``IfcFace`` entities: the outer bound of each, reversed when its orientation is false."""
+
+        points: List[np.ndarray] = []
+        loops: List[np.ndarray] = []
+        offset = 0
+        for face in faces:
+            bounds = [bound for bound in face[0] if isinstance(bound, StepEntity)]
+            outer = next((bound for bound in bounds if bound.type == "IFCFACEOUTERBOUND"), bounds[0] if bounds else None)
+            if outer is None or not isinstance(outer[0], StepEntity) or outer[0].type != "IFCPOLYLOOP":
+                continue
+            loop = np.array([_vector3(point) for point in outer[0][0]], dtype=np.float64).reshape(-1, 3)
+            if outer.arguments[1] == "F":
+                loop = loop[::-1]
+            points.append(loop)
+            loops.append(np.arange(offset, offset + len(loop)))
+            offset += len(loop)
+        if not points:
+            return _NO_TRIANGLES
+        return _polygons(np.concatenate(points), loops)
+
+    def _profile(self, profile: object) -> Optional[np.ndarray]:
+        """Outer outline of a profile definition in the extrusion's z=0 plane."""
+
+        if not isinstance(profile, StepEntity):
+            return None
+        kind = profile.type
+        if kind in ("IFCARBITRARYCLOSEDPROFILEDEF", "IFCARBITRARYPROFILEDEFWITHVOIDS"):
+            return self._curve(profile[2])
+        if kind in ("IFCRECTANGLEPROFILEDEF", "IFCROUNDEDRECTANGLEPROFILEDEF", "IFCRECTANGLEHOLLOWPROFILEDEF"):
+            half_x, half_y = float(profile.arguments[3]) / 2, float(profile.arguments[4]) / 2
+            outline = np.array([[-half_x, -half_y], [half_x, -half_y], [half_x, half_y], [-half_x, half_y]])
+        elif kind in ("IFCCIRCLEPROFILEDEF", "IFCCIRCLEHOLLOWPROFILEDEF"):
+            angles = np.linspace(0.0, 2 * np.pi, CIRCLE_SEGMENTS, endpoint=False)
+            outline = float(profile.arguments[3]) * np.column_stack((np.cos(angles), np.sin(angles)))
+        else:
+            return None
+        placement = _axis_placement_matrix(profile[2])
+        return outline @ placement[:2, :2].T + placement[:2, 3]
+
+    def _curve(self, curve: object) -> Optional[np.ndarray]:
+        """2D points of a closed polyline or indexed poly curve (arc segments become their three points)."""
+
+        if not isinstance(curve, StepEntity):
+            return None
+        if curve.type == "IFCPOLYLINE":
+            return np.array([_vector3(point)[:2] for point in curve[0]], dtype=np.float64).reshape(-1, 2)
+        if curve.type == "IFCINDEXEDPOLYCURVE":
+            points = self.file.numbers(curve[0], 0)[:, :2]
+            segments = curve.arguments[1] if len(curve) > 1 else None
+            if not segments:
+                return points
+            order = [int(index) - 1 for segment in segments for index in np.ravel(getattr(segment, "value", segment))]
+            return points[np.asarray(order, dtype=np.int64)]
+        return None
+
+    @staticmethod
+    def _place(triangles: _Triangles, matrix: np.ndarray) -> _Triangles:
+        positions, normals, indices = triangles
+        return positions @ matrix[:3, :3].T + matrix[:3, 3], normals @ matrix[:3, :3].T, indices
+
+
+@dataclass
+class StepIFCImporter:
+    """Import IFC building elements, their placements and triangulated bodies from a STEP file.
+
+    Lengths are converted to metres with the project's length unit. ``IfcSpace``
+    bodies are not rendered: their world-space box is kept as the ``bounds``
+    attribute (room cells for visibility) instead of a mesh.
+    """
+
+    supported_suffixes: tuple[str, ...] = (".ifc",)
+    format_name: str = "ifc"
+
+    def load(self, specification: SceneSpecification) -> Dict[str, Dict[str, str]]:
+        source = specification.source_file
+        if not source.exists():
+            raise FileNotFoundError(f"Source file not found: {source}")
+
+        scene_graph: Dict[str, Dict[str, object]] = {}
+        with StepFile(source) as step_file:
+            scale = step_file.length_unit()
+            shapes = ShapeBuilder(step_file, scale)
+            materials = step_file.material_names()
+            for ifc_class, entity, matrix in step_file.elements():
+                global_id, name = entity[0], entity[2] if len(entity) > 2 else None
+                transform = matrix.copy()
+                transform[:3, 3] *= scale
+                node_id = f"{ifc_class.lower()}#{entity.id}"
+                node: Dict[str, object] = {
+                    "type": "ifc-element",
+                    "parent": "root",
+                    "ifc_class": ifc_class,
+                    "ifc_type": entity.type,
+                    "global_id": global_id if isinstance(global_id, str) else "",
+                    "name": name if isinstance(name, str) else "",
+                    "transform": transform.astype(np.float32),
+                }
+                mesh = shapes.product_mesh(entity)
+                if mesh is not None and ifc_class == "IFCSPACE":
+                    corners = mesh.positions @ transform[:3, :3].T + transform[:3, 3]
+                    node["bounds"] = [corners.min(axis=0).tolist(), corners.max(axis=0).tolist()]
+                elif mesh is not None:
+                    node["mesh"] = mesh
+                if entity.id in materials:
+                    node["material"] = materials[entity.id]
+                scene_graph[node_id] = node
+            entity_count = len(step_file)
+
+        root: Dict[str, object] = {
+            "type": "scene",
+            "origin_file": str(source),
+            "format": self.format_name,
+            "required_assets": ["ifc-structure", "bim-properties"],
+            "children": list(scene_graph),
+            "entity_count": entity_count,
+            "length_unit": scale,
+            **({"unsupported_geometry": dict(shapes.unsupported)} if shapes.unsupported else {}),
+        }
+        return {"root": root, **scene_graph}
+
+
+__all__ = [
+    "DEFAULT_ELEMENT_TYPES",
+    "EntityRef",
+    "NON_BODY_REPRESENTATIONS",
+    "ShapeBuilder",
+    "StepEntity",
+    "StepFile",
+    "StepIFCImporter",
+    "TypedValue",
+    "parse_arguments",
+    "triangulate_polygon",
+]
@@ -1,108 +1,72 @@
-"""Import 3D architectural plans from the most common exchange formats."""
+"""Import 3D architectural plans from the most common exchange formats.
+
+Importers are looked up by suffix in the plugin registry
+(``vrhouse.pipeline.registry``) and imported only when a file of that format is
+actually loaded, so validating a path or listing the supported suffixes stays
+cheap.
+"""
 from __future__ import annotations
 
-from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, List, Protocol
-
-from vrhouse.core import SceneSpecification
-
-
-class ImporterError(RuntimeError):
-    """Raised when an importer cannot handle the requested format."""
-
-
-class FormatImporter(Protocol):
-    """Interface implemented by concrete format importers."""
-
-    supported_suffixes: tuple[str, ...]
-
-    def load(self, specification: SceneSpecification) -> Dict[str, Dict[str, str]]:
-        ...
-
-
-@dataclass
-class StubImporter:
-    """Utility base class shared by the placeholder importers."""
-
-    supported_suffixes: tuple[str, ...]
-    format_name: str
-
-    def load(self, specification: SceneSpecification) -> Dict[str, Dict[str, str]]:
-        if not specification.source_file.exists():
-            raise FileNotFoundError(f"Source file not found: {specification.source_file}")
+from typing import TYPE_CHECKING, Any, Iterable, List, Optional
 
-        return {
-            "root": {
-                "type": "scene",
-                "origin_file": str(specification.source_file),
-                "format": self.format_name,
-                "required_assets": self._infer_required_assets(specification.source_file),
-            }
-        }
+from vrhouse.pipeline.importers.base import FormatImporter, ImporterError
+from vrhouse.pipeline.registry import IMPORTERS, PluginRegistry, UnknownPluginError, default_registry
 
-    def _infer_required_assets(self, source: Path) -> List[str]:
-        """Provide a list of placeholder assets to mimic texture/geometry needs."""
+if TYPE_CHECKING:
+    from vrhouse.core import SceneGraph, SceneSpecification
 
-        if source.suffix.lower() == ".gltf":
-            return ["gltf-binary", "pbr-textures"]
-        if source.suffix.lower() == ".glb":
-            return ["embedded-binary", "compressed-textures"]
-        if source.suffix.lower() == ".fbx":
-            return ["fbx-materials", "animation-curves"]
-        if source.suffix.lower() == ".obj":
-            return ["mtl-materials", "uv-coordinates"]
-        if source.suffix.lower() == ".ifc":
-            return ["ifc-structure", "bim-properties"]
-        if source.suffix.lower() == ".rvt":
-            return ["revit-metadata", "autodesk-materials"]
-        return ["generic-assets"]
 
+def iter_supported_suffixes(registry: Optional[PluginRegistry] = None) -> Iterable[str]:
+    yield from (registry or default_registry()).names(IMPORTERS)
 
-IFCImporter = StubImporter(supported_suffixes=(".ifc",), format_name="ifc")
-FBXImporter = StubImporter(supported_suffixes=(".fbx",), format_name="fbx")
-OBJImporter = StubImporter(supported_suffixes=(".obj",), format_name="obj")
-GLTFImporter = StubImporter(supported_suffixes=(".gltf", ".glb"), format_name="gltf")
-RVTImporter = StubImporter(supported_suffixes=(".rvt",), format_name="revit")
 
-SUPPORTED_IMPORTERS: tuple[StubImporter, ...] = (
-    IFCImporter,
-    FBXImporter,
-    OBJImporter,
-    GLTFImporter,
-    RVTImporter,
-)
-
-
-def iter_supported_suffixes() -> Iterable[str]:
-    for importer in SUPPORTED_IMPORTERS:
-        yield from importer.supported_suffixes
+class MultiFormatImporter:
+    """Dispatcher that selects the appropriate importer for the source file.
 
+    Without explicit ``importers`` the registry decides, which includes any
+    importer installed through the ``vrhouse.importers`` entry point group.
+    """
 
-class MultiFormatImporter:
-    """Dispatcher that selects the appropriate importer for the source file."""
+    def __init__(
+        self,
+        importers: Iterable[FormatImporter] | None = None,
+        *,
+        registry: Optional[PluginRegistry] = None,
+    ) -> None:
+        self._importers: Optional[List[FormatImporter]] = list(importers) if importers else None
+        self._registry = registry or default_registry()
 
-    def __init__(self, importers: Iterable[FormatImporter] | None = None) -> None:
-        self._importers: List[FormatImporter] = list(importers) if importers else list(SUPPORTED_IMPORTERS)
+    def load(self, specification: SceneSpecification) -> SceneGraph:
+        from vrhouse.core import SceneGraph
 
-    def load(self, specification: SceneSpecification) -> Dict[str, Dict[str, str]]:
         importer = self._select_importer(specification.source_file)
-        return importer.load(specification)
+        return SceneGraph.coerce(importer.load(specification))
 
     def validate_source_path(self, path: Path) -> None:
-        self._select_importer(path)
+        self._check_suffix(path)
 
-    def _select_importer(self, path: Path) -> FormatImporter:
+    def _check_suffix(self, path: Path) -> str:
         suffix = path.suffix.lower()
         if not suffix:
             raise ImporterError("Source file must have an extension identifying its format")
 
-        for importer in self._importers:
-            if suffix in importer.supported_suffixes:
-                return importer
+        if self._importers is not None:
+            supported = [item for importer in self._importers for item in importer.supported_suffixes]
+        else:
+            supported = list(iter_supported_suffixes(self._registry))
+        if suffix not in supported:
+            raise ImporterError(f"Unsupported file type: {suffix}. Supported extensions: {', '.join(supported)}")
+        return suffix
 
-        supported = ", ".join(iter_supported_suffixes())
-        raise ImporterError(f"Unsupported file type: {suffix}. Supported extensions: {supported}")
+    def _select_importer(self, path: Path) -> FormatImporter:
+        suffix = self._check_suffix(path)
+        if self._importers is not None:
+            return next(importer for importer in self._importers if suffix in importer.supported_suffixes)
+        try:
+            return self._registry.instance(IMPORTERS, suffix)
+        except UnknownPluginError as exc:  # pragma: no cover - _check_suffix already matched
+            raise ImporterError(str(exc)) from exc
 
 
 def validate_source_path(path: Path) -> None:
@@ -111,7 +75,32 @@ def validate_source_path(path: Path) -> None:
     MultiFormatImporter().validate_source_path(path)
 
 
+# The classic module-level importer instances, re-exported lazily (PEP 562) from the
+# default registry so importing this module does not pull in the format parsers.
+_IMPORTER_SUFFIXES = {
+    "IFCImporter": ".ifc",
+    "FBXImporter": ".fbx",
+    "OBJImporter": ".obj",
+    "GLTFImporter": ".gltf",
+    "RVTImporter": ".rvt",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _IMPORTER_SUFFIXES:
+        return default_registry().instance(IMPORTERS, _IMPORTER_SUFFIXES[name])
+    if name == "SUPPORTED_IMPORTERS":
+        return tuple(__getattr__(alias) for alias in _IMPORTER_SUFFIXES)
+    if name == "StubImporter":
+        from vrhouse.pipeline.importers.stub import StubImporter
+
+        return StubImporter
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 __all__ = [
+    "FormatImporter",
+    "ImporterError",
     "MultiFormatImporter",
     "validate_source_path",
     "iter_supported_suffixes",
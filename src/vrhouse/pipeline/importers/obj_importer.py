@@ -0,0 +1,396 @@
+"""Streaming Wavefront OBJ/MTL importer producing NumPy-backed meshes."""
+from __future__ import annotations
+
+import math
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from vrhouse.core import MeshData, SceneSpecification
+from vrhouse.pipeline.importers.base import ImporterError
+
+DEFAULT_CHUNK_SIZE = 16 * 1024 * 1024
+
+_TEXTURE_KEYS = ("map_kd", "map_ka", "map_ks", "map_bump", "bump", "map_d", "norm", "map_pr", "map_pm")
+
+
+# Pending face corners of a group are deduplicated into a piece once they reach this many.
+_FLUSH_CORNERS = 1 << 22
+
+_WHITESPACE = np.zeros(256, dtype=bool)
+_WHITESPACE[list(b" \t\n\v\f\r")] = True
+_LEADING_WHITESPACE = re.compile(rb"(?m)^[ \t\v\f\r]+")
+
+# Line kinds assigned by ``_classify``; ``_OTHER`` lines are the few handled one by one.
+_OTHER, _SKIP, _POSITION, _UV, _NORMAL, _FACE = range(6)
+_KEYWORDS = {_POSITION: b"v", _UV: b"vt", _NORMAL: b"vn"}
+# Face text keeps its ``f`` keywords; this blanks them together with the ``/`` separators.
+_FACE_SEPARATORS = bytes.maketrans(b"f/", b"  ")
+
+
+def _unique_rows(corners: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """``np.unique(corners, axis=0, return_inverse=True)`` through one packed int64 key per row."""
+
+    shifted = corners + 1  # missing attributes are -1
+    spans = [int(value) + 1 for value in shifted.max(axis=0)] if len(corners) else [1] * corners.shape[1]
+    if math.prod(spans) >= 2**62:
+        unique, inverse = np.unique(corners, axis=0, return_inverse=True)
+        return unique, inverse.reshape(-1)
+    key = shifted[:, 0].copy()
+    for column, span in enumerate(spans[1:], start=1):
+        key *= span
+        key += shifted[:, column]
+    packed, inverse = np.unique(key, return_inverse=True)
+    unique = np.empty((packed.size, corners.shape[1]), dtype=np.int64)
+    for column in range(corners.shape[1] - 1, -1, -1):
+        packed, unique[:, column] = np.divmod(packed, spans[column])
+    return unique - 1, inverse.reshape(-1)
+
+
+@dataclass
+class _Group:
+    """Face corners of one ``o``/``g``/``usemtl`` combination, deduplicated piece by piece.
+
+    Triangulated corners stay raw only until the group is left (or grows past
+    ``_FLUSH_CORNERS``); each flush keeps the distinct ``(v, vt, vn)`` rows and a
+    uint32 index per corner.
+    """
+
+    name: str
+    material: Optional[str]
+    width: int = 0
+    pending: List[np.ndarray] = field(default_factory=list)
+    pending_corners: int = 0
+    pieces: List[Tuple[np.ndarray, np.ndarray]] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.pending or self.pieces)
+
+    def append(self, corners: np.ndarray) -> None:
+        if self.width and corners.shape[1] != self.width:
+            raise ImporterError(f"Inconsistent face layout in OBJ group '{self.name}'")
+        self.width = corners.shape[1]
+        self.pending.append(corners)
+        self.pending_corners += len(corners)
+        if self.pending_corners >= _FLUSH_CORNERS:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.pending:
+            return
+        corners = np.concatenate(self.pending) if len(self.pending) > 1 else self.pending[0]
+        self.pending.clear()
+        self.pending_corners = 0
+        unique, inverse = _unique_rows(corners)
+        self.pieces.append((unique, inverse.astype(np.uint32)))
+
+    def corners(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Distinct corner rows of the whole group and the per-corner index into them."""
+
+        self.flush()
+        pieces, self.pieces = self.pieces, []
+        if len(pieces) == 1:
+            return pieces[0]
+        unique, remap = _unique_rows(np.concatenate([piece for piece, _ in pieces]))
+        offsets = np.cumsum([0] + [len(piece) for piece, _ in pieces[:-1]])
+        inverse = np.concatenate([remap[offset + indices] for offset, (_, indices) in zip(offsets, pieces)])
+        return unique, inverse
+
+
+class _AttributeStream:
+    """Convert blocks of ``v``/``vt``/``vn`` lines to float32 with one ``np.fromstring`` call each."""
+
+    def __init__(self, width: int) -> None:
+        self.width = width
+        self.count = 0
+        self._blocks: List[np.ndarray] = []
+
+    def add(self, text: bytes, lines: int) -> None:
+        """Append ``lines`` lines of whitespace-separated values (keywords already removed)."""
+
+        values = np.fromstring(text, dtype=np.float32, sep=" ")
+        if values.size == lines * self.width:
+            values = values.reshape(lines, self.width)
+        elif lines and values.size % lines == 0 and values.size // lines > self.width:
+            # Every line carries the same optional extras (``v x y z w``, vertex colours, ``vt u v w``).
+            values = values.reshape(lines, -1)[:, : self.width]
+        else:
+            try:
+                values = np.array([line.split()[: self.width] for line in text.splitlines()], dtype=np.float32)
+            except ValueError as exc:
+                raise ImporterError("Malformed vertex attribute in OBJ file") from exc
+            if values.ndim != 2 or values.shape != (lines, self.width):
+                raise ImporterError("Malformed vertex attribute in OBJ file")
+        self._blocks.append(values)
+        self.count += lines
+
+    def finish(self) -> np.ndarray:
+        if not self._blocks:
+            return np.zeros((0, self.width), dtype=np.float32)
+        array = np.concatenate(self._blocks) if len(self._blocks) > 1 else self._blocks[0]
+        self._blocks = [array]
+        return array
+
+
+def _classify(chunk: bytes) -> Tuple[bytes, np.ndarray, np.ndarray, np.ndarray]:
+    """Split a newline-terminated chunk into line ``starts``/``ends`` and a kind per line.
+
+    Leading whitespace is stripped first (only when some line has it), so every
+    line starts with its keyword.
+    """
+
+    data = np.frombuffer(chunk, dtype=np.uint8)
+    ends = np.flatnonzero(data == 0x0A)
+    starts = np.empty_like(ends)
+    starts[:1] = 0
+    starts[1:] = ends[:-1] + 1
+    if (_WHITESPACE[data[starts]] & (starts < ends)).any():
+        chunk = _LEADING_WHITESPACE.sub(b"", chunk)
+        return _classify(chunk)
+
+    padded = np.concatenate((data, np.zeros(3, dtype=np.uint8)))
+    first, second, third = padded[starts], padded[starts + 1], padded[starts + 2]
+    kinds = np.full(ends.size, _OTHER, dtype=np.int8)
+    vertex = first == ord("v")
+    kinds[vertex & _WHITESPACE[second]] = _POSITION
+    kinds[vertex & (second == ord("t")) & _WHITESPACE[third]] = _UV
+    kinds[vertex & (second == ord("n")) & _WHITESPACE[third]] = _NORMAL
+    kinds[(first == ord("f")) & _WHITESPACE[second]] = _FACE
+    kinds[(first == ord("#")) | _WHITESPACE[first]] = _SKIP
+    return chunk, starts, ends, kinds
+
+
+def _join_lines(chunk: bytes, starts: np.ndarray, ends: np.ndarray, lines: np.ndarray, keyword: bytes = b"") -> bytes:
+    """Text of ``lines`` (ascending line numbers) with their newlines and without the leading ``keyword``."""
+
+    if not lines.size:
+        return b""
+    breaks = np.flatnonzero(np.diff(lines) != 1) + 1
+    first = lines[np.concatenate(([0], breaks))]
+    last = lines[np.concatenate((breaks - 1, [lines.size - 1]))]
+    text = b"".join(chunk[a:b] for a, b in zip(starts[first].tolist(), (ends[last] + 1).tolist()))
+    return (b"\n" + text).replace(b"\n" + keyword, b"\n")[1:] if keyword else text
+
+
+def _triangulate(text: bytes, counts: np.ndarray) -> np.ndarray:
+    """Parse face lines into a ``(corners, width)`` int64 array of fan-triangulated corners.
+
+    ``text`` holds the ``f`` lines; ``counts`` the ``(v, vt, vn)`` totals read
+    before each of them, for negative indices.
+    """
+
+    data = np.frombuffer(text, dtype=np.uint8)
+    solid = ~_WHITESPACE[data]
+    token = solid.copy()
+    token[1:] &= ~solid[:-1]
+    newlines = np.flatnonzero(data == 0x0A)
+    line_starts = np.concatenate(([0], newlines[:-1] + 1))
+    sizes = np.add.reduceat(token, line_starts, dtype=np.int64) - 1  # minus the ``f`` keyword
+    if sizes.size and sizes.min() < 3:
+        raise ImporterError("OBJ face with fewer than three vertices")
+
+    width = text.split(None, 2)[1].count(b"/") + 1
+    if b"//" in text:
+        text = text.replace(b"//", b"/0/")
+    values = np.fromstring(text.translate(_FACE_SEPARATORS), dtype=np.int64, sep=" ")
+    if values.size != int(sizes.sum()) * width:
+        raise ImporterError("Mixed face formats in a single OBJ group are not supported")
+    corners = values.reshape(-1, width)
+
+    # Resolve negative (relative) and one-based indices against the attribute counts seen so far.
+    for column in range(width):
+        index = corners[:, column]
+        negative = index < 0
+        index -= 1
+        if negative.any():
+            index[negative] += np.repeat(counts[:, column], sizes)[negative] + 1
+
+    triangles = sizes - 2
+    starts = np.cumsum(sizes) - sizes
+    polygon = np.repeat(np.arange(sizes.size), triangles)
+    local = np.arange(polygon.size) - np.repeat(np.cumsum(triangles) - triangles, triangles) + 1
+    base = starts[polygon]
+    order = np.stack((base, base + local, base + local + 1), axis=1).reshape(-1)
+    return corners[order]
+
+
+def _build_mesh(
+    group: _Group,
+    positions: np.ndarray,
+    uvs: np.ndarray,
+    normals: np.ndarray,
+) -> MeshData:
+    unique, inverse = group.corners()
+
+    has_uv = group.width > 1 and uvs.size > 0 and bool((unique[:, 1] >= 0).all())
+    has_normal = group.width > 2 and normals.size > 0 and bool((unique[:, 2] >= 0).all())
+    columns = [0] + ([1] if has_uv else []) + ([2] if has_normal else [])
+    if len(columns) < unique.shape[1]:
+        unique, remap = _unique_rows(np.ascontiguousarray(unique[:, columns]))
+        inverse = remap[inverse]
+
+    if unique.size and unique.min() < 0:
+        raise ImporterError(f"OBJ group '{group.name}' references a missing vertex")
+    try:
+        mesh_positions = positions[unique[:, 0]]
+        mesh_uvs = uvs[unique[:, 1]] if has_uv else None
+        mesh_normals = normals[unique[:, columns.index(2)]] if has_normal else None
+    except IndexError as exc:
+        raise ImporterError(f"OBJ group '{group.name}' references a missing vertex") from exc
+
+    return MeshData(
+        positions=np.ascontiguousarray(mesh_positions, dtype=np.float32),
+        indices=inverse.reshape(-1, 3).astype(np.uint32),
+        normals=None if mesh_normals is None else np.ascontiguousarray(mesh_normals, dtype=np.float32),
+        uvs=None if mesh_uvs is None else np.ascontiguousarray(mesh_uvs, dtype=np.float32),
+        material=group.material,
+    )
+
+
+def parse_mtl(path: Path) -> Dict[str, Dict[str, str]]:
+    """Parse a Wavefront material library into ``{material: {key: value}}``."""
+
+    materials: Dict[str, Dict[str, str]] = {}
+    current: Optional[Dict[str, str]] = None
+    with path.open("r", encoding="utf-8", errors="replace") as handle:
+        for raw in handle:
+            line = raw.strip()
+            if not line or line.startswith("#"):
+                continue
+            key, _, value = line.partition(" ")
+            key = key.lower()
+            if key == "newmtl":
+                current = materials.setdefault(value.strip(), {})
+            elif current is not None:
+                current[key] = value.strip()
+    return materials
+
+
+@dataclass
+class StreamingOBJImporter:
+    """Read ``.obj`` files in fixed-size chunks into contiguous per-group meshes.
+
+    Each chunk is classified line by line with array operations and every
+    keyword block (``v``, ``vt``, ``vn``, ``f``) is converted with one
+    ``np.fromstring`` call, so the raw text never stays resident; face corners
+    are fan-triangulated and deduplicated whenever their group is left.
+    """
+
+    supported_suffixes: tuple[str, ...] = (".obj",)
+    format_name: str = "obj"
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+
+    def load(self, specification: SceneSpecification) -> Dict[str, Dict[str, str]]:
+        source = specification.source_file
+        if not source.exists():
+            raise FileNotFoundError(f"Source file not found: {source}")
+
+        with source.open("rb") as handle:
+            groups, libraries, streams = self._parse(handle)
+
+        positions, uvs, normals = (stream.finish() for stream in streams)
+        materials: Dict[str, Dict[str, str]] = {}
+        for library in libraries:
+            library_path = source.parent / library
+            if library_path.exists():
+                materials.update(parse_mtl(library_path))
+
+        scene_graph: Dict[str, Dict[str, object]] = {}
+        children: List[str] = []
+        for group in groups.values():
+            if not group:
+                continue
+            node_id = group.name if group.material is None else f"{group.name}:{group.material}"
+            scene_graph[node_id] = {
+                "type": "mesh",
+                "parent": "root",
+                "mesh": _build_mesh(group, positions, uvs, normals),
+                **({"material": group.material} if group.material else {}),
+            }
+            children.append(node_id)
+
+        textures = sorted(
+            {value for material in materials.values() for key, value in material.items() if key in _TEXTURE_KEYS}
+        )
+        root: Dict[str, object] = {
+            "type": "scene",
+            "origin_file": str(source),
+            "format": self.format_name,
+            "required_assets": ["mtl-materials", *textures] if materials else ["uv-coordinates"],
+            "children": children,
+            "materials": materials,
+        }
+        return {"root": root, **scene_graph}
+
+    def _parse(
+        self, handle: BinaryIO
+    ) -> Tuple[Dict[Tuple[str, Optional[str]], _Group], List[str], Tuple[_AttributeStream, ...]]:
+        positions, uvs, normals = _AttributeStream(3), _AttributeStream(2), _AttributeStream(3)
+        streams = (positions, uvs, normals)
+        groups: Dict[Tuple[str, Optional[str]], _Group] = {}
+        libraries: List[str] = []
+        object_name = group_name = "default"
+        material: Optional[str] = None
+
+        def current_group() -> _Group:
+            name = group_name if group_name != "default" else object_name
+            key = (name, material)
+            if key not in groups:
+                groups[key] = _Group(name=name, material=material)
+            return groups[key]
+
+        remainder = b""
+        while True:
+            chunk = handle.read(self.chunk_size)
+            if chunk:
+                chunk = remainder + chunk
+                cut = chunk.rfind(b"\n") + 1
+                chunk, remainder = chunk[:cut], chunk[cut:]
+            elif remainder:
+                chunk, remainder = remainder + b"\n", b""
+            else:
+                break
+            if not chunk:
+                continue
+
+            chunk, starts, ends, kinds = _classify(chunk)
+            faces = np.flatnonzero(kinds == _FACE)
+            # Attribute totals before every face line, for negative (relative) indices.
+            attributes = tuple(zip((_POSITION, _UV, _NORMAL), streams))
+            counts = np.stack([stream.count + np.cumsum(kinds == kind)[faces] for kind, stream in attributes], axis=1)
+            for kind, stream in attributes:
+                lines = np.flatnonzero(kinds == kind)
+                if lines.size:
+                    stream.add(_join_lines(chunk, starts, ends, lines, _KEYWORDS[kind]), lines.size)
+
+            def add_faces(begin: int, stop: int) -> None:
+                if stop > begin:
+                    text = _join_lines(chunk, starts, ends, faces[begin:stop])
+                    current_group().append(_triangulate(text, counts[begin:stop]))
+
+            done = 0
+            for line in np.flatnonzero(kinds == _OTHER).tolist():
+                keyword, *value = chunk[starts[line] : ends[line]].split(None, 1)
+                name = value[0].strip().decode("utf-8", errors="replace") if value else ""
+                if keyword in (b"o", b"g", b"usemtl"):
+                    cut = int(np.searchsorted(faces, line))
+                    add_faces(done, cut)
+                    done = cut
+                    current_group().flush()
+                    if keyword == b"o":
+                        object_name, group_name = name or "default", "default"
+                    elif keyword == b"g":
+                        group_name = name or "default"
+                    else:
+                        material = name or None
+                elif keyword == b"mtllib":
+                    libraries.extend(name.split())
+            add_faces(done, faces.size)
+
+        return groups, libraries, streams
+
+
+__all__ = ["StreamingOBJImporter", "parse_mtl"]
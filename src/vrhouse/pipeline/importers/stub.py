@@ -0,0 +1,53 @@
+"""Placeholder importers for formats that still need a native SDK (FBX, Revit)."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List
+
+from vrhouse.core import SceneSpecification
+
+
+@dataclass
+class StubImporter:
+    """Utility base class shared by the placeholder importers."""
+
+    supported_suffixes: tuple[str, ...]
+    format_name: str
+
+    def load(self, specification: SceneSpecification) -> Dict[str, Dict[str, str]]:
+        if not specification.source_file.exists():
+            raise FileNotFoundError(f"Source file not found: {specification.source_file}")
+
+        return {
+            "root": {
+                "type": "scene",
+                "origin_file": str(specification.source_file),
+                "format": self.format_name,
+                "required_assets": self._infer_required_assets(specification.source_file),
+            }
+        }
+
+    def _infer_required_assets(self, source: Path) -> List[str]:
+        """Provide a list of placeholder assets to mimic texture/geometry needs."""
+
+        if source.suffix.lower() == ".gltf":
+            return ["gltf-binary", "pbr-textures"]
+        if source.suffix.lower() == ".glb":
+            return ["embedded-binary", "compressed-textures"]
+        if source.suffix.lower() == ".fbx":
+            return ["fbx-materials", "animation-curves"]
+        if source.suffix.lower() == ".obj":
+            return ["mtl-materials", "uv-coordinates"]
+        if source.suffix.lower() == ".ifc":
+            return ["ifc-structure", "bim-properties"]
+        if source.suffix.lower() == ".rvt":
+            return ["revit-metadata", "autodesk-materials"]
+        return ["generic-assets"]
+
+
+FBXImporter = StubImporter(supported_suffixes=(".fbx",), format_name="fbx")
+RVTImporter = StubImporter(supported_suffixes=(".rvt",), format_name="revit")
+
+
+__all__ = ["FBXImporter", "RVTImporter", "StubImporter"]
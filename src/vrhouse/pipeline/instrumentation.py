@@ -0,0 +1,369 @@
+"""Structured per-stage metrics for pipeline runs, pluggable observers and trace exporters."""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, TextIO
+
+from vrhouse.core import SceneGraph, VRScene
+
+try:  # POSIX only; RSS figures fall back to ``None`` elsewhere
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+
+# -- process memory ----------------------------------------------------------------------
+def _proc_status_mb(field_name: str) -> Optional[float]:
+    try:
+        with open("/proc/self/status", encoding="ascii") as handle:
+            for line in handle:
+                if line.startswith(field_name):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def reset_peak_rss() -> bool:
+    """Reset the kernel's RSS high-water mark so later readings cover only what follows (Linux)."""
+
+    try:
+        with open("/proc/self/clear_refs", "w") as handle:
+            handle.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb(reset_supported: bool = True) -> Optional[float]:
+    """Peak resident set size of this process in megabytes.
+
+    Uses ``VmHWM`` (which ``reset_peak_rss`` can rewind) and falls back to
+    ``getrusage``, whose peak covers the whole life of the process.
+    """
+
+    if reset_supported:
+        peak = _proc_status_mb("VmHWM:")
+        if peak is not None:
+            return peak
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def current_rss_mb() -> Optional[float]:
+    return _proc_status_mb("VmRSS:")
+
+
+# -- sizes ---------------------------------------------------------------------------------
+def describe_size(value: Any) -> Dict[str, int]:
+    """Node/mesh/triangle counts and buffer bytes of a stage input or output.
+
+    Scene graphs (or scenes wrapping one) report their geometry, exported
+    packages their file size; anything else reports nothing.
+    """
+
+    if isinstance(value, VRScene):
+        value = value.scene_graph
+    if isinstance(value, SceneGraph):
+        mesh_bytes = sum(mesh.nbytes for mesh in value.meshes)
+        lod_bytes = sum(mesh.nbytes for levels in value.lods.values() for mesh in levels)
+        texture_bytes = sum(int(level.nbytes) for levels in value.textures.values() for level in levels)
+        return {
+            "nodes": len(value),
+            "meshes": len(value.meshes),
+            "triangles": value.triangle_count,
+            "bytes": mesh_bytes + lod_bytes + texture_bytes,
+        }
+    if isinstance(value, tuple) and value and isinstance(value[0], Path) and value[0].is_file():
+        return {"bytes": value[0].stat().st_size}
+    node_count = getattr(value, "node_count", None)
+    if isinstance(node_count, int):
+        return {"nodes": node_count}
+    return {}
+
+
+def _merge_sizes(values: Mapping[str, Any]) -> Dict[str, int]:
+    merged: Dict[str, int] = {}
+    for value in values.values():
+        for name, amount in describe_size(value).items():
+            merged[name] = merged.get(name, 0) + amount
+    return merged
+
+
+# -- metrics and observers -------------------------------------------------------------------
+@dataclass
+class StageMetrics:
+    """What one stage cost.
+
+    ``cpu_seconds`` is the CPU time of the thread that ran the stage, while
+    ``process_cpu_seconds`` covers every thread of the process during the stage
+    (including overlapping stages); work done in child process pools shows up in
+    neither. RSS figures and the ``tracemalloc`` peak are process-wide: both peaks
+    are rewound when a stage starts while no other stage is measured (the RSS one
+    through ``reset_peak_rss``, Linux only; elsewhere it covers the whole process
+    life), so with overlapping stages they bound rather than isolate a stage's memory.
+    """
+
+    name: str
+    started: float
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    process_cpu_seconds: float = 0.0
+    rss_start_mb: Optional[float] = None
+    rss_end_mb: Optional[float] = None
+    peak_rss_mb: Optional[float] = None
+    traced_delta_bytes: Optional[int] = None
+    traced_peak_bytes: Optional[int] = None
+    input_sizes: Dict[str, int] = field(default_factory=dict)
+    output_sizes: Dict[str, int] = field(default_factory=dict)
+    cached: bool = False
+    status: str = "ok"
+    error: Optional[str] = None
+    thread: str = ""
+
+    def to_dict(self) -> Dict[str, object]:
+        return asdict(self)
+
+
+class StageObserver:
+    """Receives run and stage events; override only the hooks you need.
+
+    Hooks are called from the scheduler's worker threads, one stage at a time
+    per thread, so observers that keep state must guard it themselves.
+    """
+
+    def run_started(self, run: Mapping[str, object]) -> None:
+        pass
+
+    def stage_started(self, name: str) -> None:
+        pass
+
+    def stage_finished(self, metrics: StageMetrics) -> None:
+        pass
+
+    def run_finished(self, metrics: Sequence[StageMetrics], run: Mapping[str, object]) -> None:
+        pass
+
+
+class Instrumentation:
+    """Measure every stage of a run and fan the results out to ``observers``.
+
+    ``trace_memory`` turns on ``tracemalloc`` for the duration of the run; it
+    attributes Python allocations to stages but slows allocation-heavy code
+    noticeably, so it is reserved for profiling runs.
+    """
+
+    def __init__(self, observers: Sequence[StageObserver] = (), *, trace_memory: bool = False) -> None:
+        self.observers = list(observers)
+        self.trace_memory = trace_memory
+        self.metrics: List[StageMetrics] = []
+        self.run_info: Dict[str, object] = {}
+        self._lock = threading.Lock()
+        self._active = 0
+        self._origin = time.perf_counter()
+        self._started_tracing = False
+        # Stages rewind VmHWM, so the run's peak is the highest reading taken before each rewind.
+        self._rss_rewound = False
+        self._run_peak_rss: Optional[float] = None
+
+    def _notify(self, hook: str, *args: object) -> None:
+        for observer in self.observers:
+            getattr(observer, hook)(*args)
+
+    def start(self, **run: object) -> None:
+        self._origin = time.perf_counter()
+        self.run_info = {"started_at": time.time(), "pid": os.getpid(), **run}
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._notify("run_started", self.run_info)
+
+    def finish(self, **run: object) -> None:
+        self.run_info.update(run)
+        self.run_info["wall_seconds"] = time.perf_counter() - self._origin
+        self.run_info["peak_rss_mb"] = self._fold_peak_rss(peak_rss_mb())
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        self._notify("run_finished", list(self.metrics), self.run_info)
+
+    def _fold_peak_rss(self, peak: Optional[float]) -> Optional[float]:
+        if peak is not None and (self._run_peak_rss is None or peak > self._run_peak_rss):
+            self._run_peak_rss = peak
+        return self._run_peak_rss
+
+    def _record(self, metrics: StageMetrics) -> None:
+        with self._lock:
+            self.metrics.append(metrics)
+        self._notify("stage_finished", metrics)
+
+    def cached(self, name: str, output: Any) -> None:
+        """Record a stage served from the stage cache (zero duration)."""
+
+        self._record(
+            StageMetrics(
+                name=name,
+                started=time.perf_counter() - self._origin,
+                output_sizes=describe_size(output),
+                cached=True,
+                thread=threading.current_thread().name,
+            )
+        )
+
+    @contextmanager
+    def stage(self, name: str, inputs: Mapping[str, Any]) -> Iterator[StageMetrics]:
+        """Measure the block as stage ``name``; the caller fills ``output_sizes`` from its result."""
+
+        tracing = tracemalloc.is_tracing()
+        with self._lock:
+            # The RSS and tracemalloc peaks are global: only rewind them when no other stage is being measured.
+            if self._active == 0:
+                self._fold_peak_rss(peak_rss_mb())
+                self._rss_rewound = reset_peak_rss()
+                if tracing:
+                    tracemalloc.reset_peak()
+            self._active += 1
+        metrics = StageMetrics(
+            name=name,
+            started=time.perf_counter() - self._origin,
+            rss_start_mb=current_rss_mb(),
+            input_sizes=_merge_sizes(inputs),
+            thread=threading.current_thread().name,
+        )
+        self._notify("stage_started", name)
+        traced_start = tracemalloc.get_traced_memory()[0] if tracing else 0
+        wall_start, cpu_start, process_start = time.perf_counter(), time.thread_time(), time.process_time()
+        try:
+            yield metrics
+        except BaseException as exc:
+            metrics.status = "failed"
+            metrics.error = f"{type(exc).__name__}: {exc}"
+            raise
+        finally:
+            metrics.wall_seconds = time.perf_counter() - wall_start
+            metrics.cpu_seconds = time.thread_time() - cpu_start
+            metrics.process_cpu_seconds = time.process_time() - process_start
+            metrics.rss_end_mb = current_rss_mb()
+            metrics.peak_rss_mb = peak_rss_mb(self._rss_rewound)
+            if tracing and tracemalloc.is_tracing():
+                current, peak = tracemalloc.get_traced_memory()
+                metrics.traced_delta_bytes = current - traced_start
+                metrics.traced_peak_bytes = peak
+            with self._lock:
+                self._fold_peak_rss(metrics.peak_rss_mb)
+                self._active -= 1
+            self._record(metrics)
+
+
+# -- exporters -----------------------------------------------------------------------------
+class ChromeTraceObserver(StageObserver):
+    """Write the run as Chrome trace-event JSON (open in ``chrome://tracing`` or Perfetto).
+
+    Each stage becomes a complete (``"X"``) event on the thread that ran it, with
+    its metrics as ``args``; cache hits appear as instant events.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+
+    def run_finished(self, metrics: Sequence[StageMetrics], run: Mapping[str, object]) -> None:
+        pid = int(run.get("pid", os.getpid()))
+        threads: Dict[str, int] = {}
+        events: List[Dict[str, object]] = [
+            {"name": "process_name", "ph": "M", "pid": pid, "args": {"name": f"vrhouse {run.get('project', '')}".strip()}}
+        ]
+        for stage in sorted(metrics, key=lambda item: item.started):
+            tid = threads.setdefault(stage.thread, len(threads) + 1)
+            event: Dict[str, object] = {
+                "name": stage.name,
+                "cat": "cache" if stage.cached else "stage",
+                "ph": "i" if stage.cached else "X",
+                "ts": round(stage.started * 1e6, 1),
+                "pid": pid,
+                "tid": tid,
+                "args": {key: value for key, value in stage.to_dict().items() if value not in (None, {}, "")},
+            }
+            if stage.cached:
+                event["s"] = "t"
+            else:
+                event["dur"] = round(stage.wall_seconds * 1e6, 1)
+            events.append(event)
+        for thread, tid in threads.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread}})
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(
+            json.dumps({"traceEvents": events, "displayTimeUnit": "ms", "otherData": dict(run)}, default=str),
+            encoding="utf-8",
+        )
+
+
+class JsonLinesObserver(StageObserver):
+    """Append one JSON record per finished stage, plus a closing ``run`` record, to a metrics log."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._handle: Optional[TextIO] = None
+        self._run: Dict[str, object] = {}
+
+    def _write(self, record: Mapping[str, object]) -> None:
+        with self._lock:
+            if self._handle is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._handle = self.path.open("a", encoding="utf-8")
+            self._handle.write(json.dumps(record, default=str) + "\n")
+            self._handle.flush()
+
+    def run_started(self, run: Mapping[str, object]) -> None:
+        self._run = {key: run[key] for key in ("project", "source", "started_at") if key in run}
+
+    def stage_finished(self, metrics: StageMetrics) -> None:
+        self._write({"event": "stage", **self._run, **metrics.to_dict()})
+
+    def run_finished(self, metrics: Sequence[StageMetrics], run: Mapping[str, object]) -> None:
+        self._write({"event": "run", **dict(run)})
+        with self._lock:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+
+
+def format_summary(metrics: Sequence[StageMetrics]) -> str:
+    """Plain-text table of the slowest stages first, for terminals."""
+
+    header = f"{'stage':<20}{'wall s':>9}{'cpu s':>9}{'peak MB':>9}{'py alloc MB':>13}{'triangles':>12}"
+    lines = [header, "-" * len(header)]
+    for stage in sorted(metrics, key=lambda item: item.wall_seconds, reverse=True):
+        peak = f"{stage.peak_rss_mb:.0f}" if stage.peak_rss_mb is not None else "-"
+        traced = f"{stage.traced_peak_bytes / 2**20:.1f}" if stage.traced_peak_bytes is not None else "-"
+        triangles = stage.output_sizes.get("triangles", stage.input_sizes.get("triangles"))
+        name = f"{stage.name}{' (cache)' if stage.cached else ''}"
+        lines.append(
+            f"{name:<20}{stage.wall_seconds:>9.3f}{stage.cpu_seconds:>9.3f}{peak:>9}{traced:>13}"
+            f"{triangles if triangles is not None else '-':>12}"
+        )
+    return "\n".join(lines)
+
+
+__all__ = [
+    "ChromeTraceObserver",
+    "Instrumentation",
+    "JsonLinesObserver",
+    "StageMetrics",
+    "StageObserver",
+    "current_rss_mb",
+    "describe_size",
+    "format_summary",
+    "peak_rss_mb",
+    "reset_peak_rss",
+]
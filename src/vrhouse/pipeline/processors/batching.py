@@ -0,0 +1,658 @@
+"""Pack material textures into atlases and merge static meshes sharing them, to cut draw calls."""
+from __future__ import annotations
+
+import dataclasses
+import math
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from vrhouse.core import MeshData, PipelineError, SceneGraph
+from vrhouse.pipeline.ai.physics_model import IFC_CLASS_BODIES
+from vrhouse.pipeline.processors.textures import (
+    COLOR,
+    NORMAL,
+    NORMAL_KEYS,
+    _color_channels,
+    _from_working,
+    _linear_to_srgb,
+    _to_working,
+    build_mip_chain,
+    resize_area,
+    texture_role,
+)
+
+DEFAULT_ATLAS_SIZE = 4096
+DEFAULT_PADDING = 4
+# Largest merged batch; keeps every batch addressable with 16-bit indices.
+DEFAULT_MAX_VERTICES = 65535
+DEFAULT_CELL_SIZE = 8.0
+
+COLOR_SLOT = "color"
+NORMAL_SLOT = "normal"
+_COLOR_TEXTURE_KEYS = frozenset({"map_kd", "basecolortexture"})
+_COLOR_FACTOR_KEYS = frozenset({"kd", "basecolorfactor"})
+# Formats whose UV origin is the top-left texel; OBJ, IFC, ... put v = 0 at the bottom.
+_TOP_DOWN_FORMATS = frozenset({"gltf", "glb"})
+_SOLID_TILE = 8
+_UV_EPSILON = 1e-3
+
+
+@dataclass
+class BatchingStats:
+    materials_before: int = 0
+    materials_after: int = 0
+    atlases: int = 0
+    atlased_materials: int = 0
+    merged_nodes: int = 0
+    batches: int = 0
+    draw_calls_before: int = 0
+    draw_calls_after: int = 0
+
+
+# -- packing ---------------------------------------------------------------------------------
+class SkylinePacker:
+    """Bottom-left skyline packer for one atlas page.
+
+    The skyline is a list of ``[x, y, width]`` segments covering the page width;
+    each rectangle goes where its top edge ends lowest (leftmost on ties).
+    """
+
+    def __init__(self, width: int, height: int) -> None:
+        self.width = width
+        self.height = height
+        self.skyline: List[List[int]] = [[0, 0, width]]
+        self.used_width = 0
+        self.used_height = 0
+
+    def _fit(self, index: int, width: int, height: int) -> Optional[int]:
+        x = self.skyline[index][0]
+        if x + width > self.width:
+            return None
+        top, remaining = 0, width
+        while remaining > 0:
+            _, segment_y, segment_width = self.skyline[index]
+            top = max(top, segment_y)
+            if top + height > self.height:
+                return None
+            remaining -= segment_width
+            index += 1
+        return top
+
+    def insert(self, width: int, height: int) -> Optional[Tuple[int, int]]:
+        """Place a ``width x height`` rectangle; ``None`` when the page has no room left."""
+
+        best: Optional[Tuple[int, int, int, int]] = None
+        for index, (x, _, _) in enumerate(self.skyline):
+            y = self._fit(index, width, height)
+            if y is not None and (best is None or (y + height, x) < (best[0], best[1])):
+                best = (y + height, x, index, y)
+        if best is None:
+            return None
+        _, x, index, y = best
+
+        self.skyline.insert(index, [x, y + height, width])
+        right = x + width
+        position = index + 1
+        while position < len(self.skyline) and self.skyline[position][0] < right:
+            segment = self.skyline[position]
+            overlap = right - segment[0]
+            segment[0] += overlap
+            segment[2] -= overlap
+            if segment[2] > 0:
+                break
+            del self.skyline[position]
+        merged = [self.skyline[0]]
+        for segment in self.skyline[1:]:
+            if segment[1] == merged[-1][1]:
+                merged[-1][2] += segment[2]
+            else:
+                merged.append(segment)
+        self.skyline = merged
+        self.used_width = max(self.used_width, right)
+        self.used_height = max(self.used_height, y + height)
+        return x, y
+
+
+def pack_rectangles(sizes: Sequence[Tuple[int, int]], page_size: int) -> List[Tuple[int, int, int]]:
+    """Pack ``(width, height)`` rectangles onto as few square pages as needed.
+
+    Returns ``(page, x, y)`` per rectangle, in input order. Rectangles are inserted
+    tallest first, which keeps the skyline flat.
+    """
+
+    order = sorted(range(len(sizes)), key=lambda index: (-sizes[index][1], -sizes[index][0]))
+    pages: List[SkylinePacker] = []
+    placements: List[Tuple[int, int, int]] = [(0, 0, 0)] * len(sizes)
+    for index in order:
+        width, height = sizes[index]
+        if width > page_size or height > page_size:
+            raise PipelineError(f"Atlas tile {width}x{height} does not fit a {page_size}px page")
+        for page, packer in enumerate(pages):
+            position = packer.insert(width, height)
+            if position is not None:
+                break
+        else:
+            pages.append(SkylinePacker(page_size, page_size))
+            page, position = len(pages) - 1, pages[-1].insert(width, height)
+        placements[index] = (page, *position)  # type: ignore[misc]
+    return placements
+
+
+def _page_sizes(
+    sizes: Sequence[Tuple[int, int]], placements: Sequence[Tuple[int, int, int]]
+) -> Dict[int, Tuple[int, int]]:
+    """Smallest power-of-two ``(width, height)`` enclosing what was placed on each page."""
+
+    bounds: Dict[int, Tuple[int, int]] = {}
+    for (width, height), (page, x, y) in zip(sizes, placements):
+        used = bounds.get(page, (1, 1))
+        bounds[page] = (max(used[0], x + width), max(used[1], y + height))
+    return {page: (1 << math.ceil(math.log2(w)), 1 << math.ceil(math.log2(h))) for page, (w, h) in bounds.items()}
+
+
+# -- materials -------------------------------------------------------------------------------
+def texture_slot(key: str) -> Optional[str]:
+    """Atlas slot fed by a material property key; ``None`` for scalar properties."""
+
+    key = key.lower()
+    if key in _COLOR_TEXTURE_KEYS:
+        return COLOR_SLOT
+    if key in NORMAL_KEYS:
+        return NORMAL_SLOT
+    return key if texture_role(key) is not None else None
+
+
+def _slot_role(slot: str) -> str:
+    if slot == COLOR_SLOT:
+        return COLOR
+    if slot == NORMAL_SLOT:
+        return NORMAL
+    return texture_role(slot) or COLOR
+
+
+def _color_factor(properties: Mapping[str, str]) -> np.ndarray:
+    """Linear RGBA multiplier from ``Kd``/``baseColorFactor`` (white when absent or unreadable)."""
+
+    factor = np.ones(4, dtype=np.float32)
+    for key, value in properties.items():
+        if key.lower() in _COLOR_FACTOR_KEYS:
+            try:
+                values = [float(part) for part in str(value).split()[:4]]
+            except ValueError:
+                continue
+            factor[: len(values)] = values
+    return factor
+
+
+def _expand_channels(image: np.ndarray, channels: int) -> np.ndarray:
+    """Convert a uint8 ``(h, w, c)`` image to ``channels`` (grey -> RGB, opaque alpha added)."""
+
+    have = image.shape[2]
+    if have == channels:
+        return image
+    colour = image[..., : _color_channels(have)]
+    if _color_channels(channels) == 3 and colour.shape[2] == 1:
+        colour = np.repeat(colour, 3, axis=2)
+    if channels in (2, 4):
+        alpha = image[..., -1:] if have in (2, 4) else np.full((*image.shape[:2], 1), 255, dtype=np.uint8)
+        return np.concatenate((colour, alpha), axis=2)
+    return np.ascontiguousarray(colour)
+
+
+def _atlas_channels(images: Sequence[np.ndarray], solid_alpha: bool) -> int:
+    counts = [image.shape[2] for image in images]
+    colour = 3 if not images or any(count >= 3 for count in counts) else 1
+    return colour + int(solid_alpha or any(count in (2, 4) for count in counts))
+
+
+@dataclass
+class _AtlasMaterial:
+    """One material's contribution to an atlas group: a tile per slot (``None`` = solid colour)."""
+
+    name: str
+    tiles: Dict[str, Optional[np.ndarray]]
+    factor: np.ndarray
+    size: Tuple[int, int] = (_SOLID_TILE, _SOLID_TILE)
+
+
+@dataclass
+class _Atlas:
+    material: str
+    page_size: Tuple[int, int]
+    members: List[str] = field(default_factory=list)
+    textures: Dict[str, List[np.ndarray]] = field(default_factory=dict)
+
+
+class MaterialBatcher:
+    """Processor stage trading per-material draws for texture atlases and merged meshes.
+
+    Materials whose non-texture properties match (same texture slots, opacity,
+    shading parameters...) form a group; their textures are packed into shared
+    atlas pages with ``SkylinePacker`` and untextured materials become small solid
+    colour tiles, so each page replaces a whole group with one ``atlas-<n>``
+    material. Colour factors (``Kd``/``baseColorFactor``) are baked into the
+    texels. Tiles keep their power-of-two size and are inset by ``padding`` texels
+    of edge bleed so the first mip levels do not mix neighbours. Materials whose
+    UVs tile outside [0, 1] keep their own textures.
+
+    Afterwards static nodes (see ``is_static``) whose mesh is not shared
+    are baked into world space and merged per material and ``cell_size`` grid
+    cell (so culling still works), up to ``max_vertices`` per batch and level by
+    level for LODs. Merged nodes stay in the hierarchy, without a mesh, with a
+    ``batch`` attribute naming the node that now draws them.
+    """
+
+    def __init__(
+        self,
+        atlas_size: int = DEFAULT_ATLAS_SIZE,
+        padding: int = DEFAULT_PADDING,
+        max_vertices: int = DEFAULT_MAX_VERTICES,
+        cell_size: float = DEFAULT_CELL_SIZE,
+        *,
+        merge_meshes: bool = True,
+    ) -> None:
+        self.atlas_size = atlas_size
+        self.padding = padding
+        self.max_vertices = max_vertices
+        self.cell_size = cell_size
+        self.merge_meshes = merge_meshes
+        self.last_stats: Optional[BatchingStats] = None
+
+    # -- entry point ---------------------------------------------------------------------
+    def batch(
+        self,
+        scene_graph: SceneGraph | Mapping[str, Dict[str, object]],
+        progress: Optional[Callable[[float], None]] = None,
+    ) -> SceneGraph:
+        graph = SceneGraph.coerce(scene_graph).copy()
+        stats = BatchingStats(
+            materials_before=self._materials_in_use(graph), draw_calls_before=graph.draw_call_count
+        )
+        atlases = self._build_atlases(graph, stats)
+        if progress is not None:
+            progress(0.6)
+        if self.merge_meshes:
+            self._merge_static(graph, stats)
+        if atlases:
+            self._drop_unused_textures(graph)
+            graph.metadata["atlases"] = {
+                atlas.material: {"size": list(atlas.page_size), "materials": atlas.members} for atlas in atlases
+            }
+        stats.materials_after = self._materials_in_use(graph)
+        stats.draw_calls_after = graph.draw_call_count
+        self.last_stats = stats
+        graph.metadata["batching"] = asdict(stats)
+        if progress is not None:
+            progress(1.0)
+        return graph
+
+    @staticmethod
+    def _materials_in_use(graph: SceneGraph) -> int:
+        ids = graph.material_ids[graph.mesh_nodes()]
+        return int(np.unique(ids[ids >= 0]).size)
+
+    @staticmethod
+    def _node_materials(graph: SceneGraph) -> Dict[int, str]:
+        """Material drawn by each mesh node: the node's own, else the mesh's."""
+
+        materials: Dict[int, str] = {}
+        material_ids, mesh_ids = graph.material_ids, graph.mesh_ids
+        for node in graph.mesh_nodes().tolist():
+            material_id = int(material_ids[node])
+            name = graph.materials[material_id] if material_id >= 0 else graph.meshes[int(mesh_ids[node])].material
+            if name is not None:
+                materials[node] = name
+        return materials
+
+    # -- atlases -------------------------------------------------------------------------
+    def _tile_limit(self) -> int:
+        return 1 << int(math.log2(max(self.atlas_size, 1)))
+
+    def _atlas_material(self, name: str, properties: Mapping[str, str], textures: Mapping[str, Sequence[np.ndarray]]):
+        """``(signature, _AtlasMaterial)`` for ``name``, or ``None`` when a texture is missing."""
+
+        limit = self._tile_limit()
+        tiles: Dict[str, Optional[np.ndarray]] = {COLOR_SLOT: None}
+        scalars: Dict[str, str] = {}
+        for key, value in properties.items():
+            slot = texture_slot(key)
+            if slot is None:
+                if key.lower() not in _COLOR_FACTOR_KEYS:
+                    scalars[key.lower()] = str(value)
+                continue
+            levels = textures.get(str(value).split()[-1]) if str(value).strip() else None
+            if not levels:
+                return None
+            # Mip chains are largest first; take the first level that fits a page.
+            tiles[slot] = next((level for level in levels if max(level.shape[:2]) <= limit), levels[-1])
+        material = _AtlasMaterial(name, tiles, _color_factor(properties))
+        sizes = [tile.shape[:2] for tile in tiles.values() if tile is not None]
+        if sizes:
+            material.size = (max(size[1] for size in sizes), max(size[0] for size in sizes))
+        signature = (tuple(sorted(slot for slot in tiles if slot != COLOR_SLOT)), tuple(sorted(scalars.items())))
+        return signature, material
+
+    def _uv_ranges(self, graph: SceneGraph, node_materials: Mapping[int, str]) -> Dict[str, bool]:
+        """Per material, whether every UV it is drawn with lies in [0, 1] (no tiling)."""
+
+        inside: Dict[str, bool] = {}
+        checked: Dict[int, bool] = {}
+        mesh_ids = graph.mesh_ids
+        for node, material in node_materials.items():
+            mesh_id = int(mesh_ids[node])
+            if mesh_id not in checked:
+                meshes = [graph.meshes[mesh_id], *graph.lods.get(mesh_id, ())]
+                checked[mesh_id] = all(
+                    mesh.uvs is None
+                    or not len(mesh.uvs)
+                    or (np.min(mesh.uvs) >= -_UV_EPSILON and np.max(mesh.uvs) <= 1.0 + _UV_EPSILON)
+                    for mesh in meshes
+                )
+            inside[material] = inside.get(material, True) and checked[mesh_id]
+        return inside
+
+    def _build_atlases(self, graph: SceneGraph, stats: BatchingStats) -> List[_Atlas]:
+        node_materials = self._node_materials(graph)
+        in_range = self._uv_ranges(graph, node_materials)
+        groups: Dict[tuple, List[_AtlasMaterial]] = {}
+        for name in sorted(set(node_materials.values())):
+            entry = self._atlas_material(name, graph.material_properties.get(name, {}), graph.textures)
+            if entry is None:
+                continue
+            signature, material = entry
+            if any(tile is not None for tile in material.tiles.values()) and not in_range[name]:
+                continue
+            groups.setdefault(signature, []).append(material)
+
+        top_down = str(graph.root.get("format", "")).lower() in _TOP_DOWN_FORMATS
+        color_key = "baseColorTexture" if top_down else "map_Kd"
+        atlases: List[_Atlas] = []
+        uv_transforms: Dict[str, Tuple[str, np.ndarray, np.ndarray]] = {}
+        for (slots, scalars), members in groups.items():
+            if len(members) < 2:
+                continue
+            sizes = [member.size for member in members]
+            placements = pack_rectangles(sizes, self._tile_limit())
+            pages = _page_sizes(sizes, placements)
+            for page, page_size in sorted(pages.items()):
+                on_page = [index for index, placement in enumerate(placements) if placement[0] == page]
+                if len(on_page) < 2:
+                    continue
+                atlas = _Atlas(material=f"atlas-{len(atlases)}", page_size=page_size)
+                for slot in (COLOR_SLOT, *slots):
+                    atlas.textures[slot] = self._render_page(
+                        slot, page_size, [(members[index], placements[index]) for index in on_page]
+                    )
+                properties = dict(scalars)
+                for slot in atlas.textures:
+                    properties[color_key if slot == COLOR_SLOT else slot] = f"{atlas.material}/{slot}"
+                graph.set_material_properties(atlas.material, properties)
+                for slot, levels in atlas.textures.items():
+                    graph.set_texture(f"{atlas.material}/{slot}", levels)
+                for index in on_page:
+                    member = members[index]
+                    scale, offset = self._uv_transform(member, placements[index], page_size, top_down)
+                    uv_transforms[member.name] = (atlas.material, scale, offset)
+                    atlas.members.append(member.name)
+                atlases.append(atlas)
+
+        if uv_transforms:
+            self._remap_uvs(graph, node_materials, uv_transforms)
+        stats.atlases = len(atlases)
+        stats.atlased_materials = len(uv_transforms)
+        return atlases
+
+    def _render_page(
+        self, slot: str, page_size: Tuple[int, int], tiles: Sequence[Tuple[_AtlasMaterial, Tuple[int, int, int]]]
+    ) -> List[np.ndarray]:
+        """Compose one slot of an atlas page and build its mip chain."""
+
+        role = _slot_role(slot)
+        images = [member.tiles[slot] for member, _ in tiles if member.tiles[slot] is not None]
+        solid_alpha = slot == COLOR_SLOT and any(member.factor[3] < 1.0 for member, _ in tiles)
+        channels = _atlas_channels(images, solid_alpha)  # type: ignore[arg-type]
+        width, height = page_size
+        page = np.zeros((height, width, channels), dtype=np.uint8)
+        padding = self.padding
+        for member, (_, x, y) in tiles:
+            tile_width, tile_height = member.size
+            image = member.tiles[slot]
+            if image is None:
+                page[y : y + tile_height, x : x + tile_width] = self._solid_texel(member.factor, slot, channels)
+                continue
+            inner_width, inner_height = max(1, tile_width - 2 * padding), max(1, tile_height - 2 * padding)
+            image = _expand_channels(image, channels)
+            factor = member.factor if slot == COLOR_SLOT else None
+            if image.shape[:2] != (inner_height, inner_width) or (factor is not None and (factor != 1.0).any()):
+                working = _to_working(image, role)
+                if factor is not None:
+                    working[..., : _color_channels(channels)] *= factor[:3] if channels >= 3 else factor[:1]
+                    if channels in (2, 4):
+                        working[..., -1] *= factor[3]
+                image = _from_working(resize_area(working, inner_height, inner_width), role)
+            pad_y, pad_x = (tile_height - inner_height) // 2, (tile_width - inner_width) // 2
+            page[y : y + tile_height, x : x + tile_width] = np.pad(
+                image,
+                ((pad_y, tile_height - inner_height - pad_y), (pad_x, tile_width - inner_width - pad_x), (0, 0)),
+                mode="edge",
+            )
+        return build_mip_chain(page, role, page_size)
+
+    @staticmethod
+    def _solid_texel(factor: np.ndarray, slot: str, channels: int) -> np.ndarray:
+        if slot == NORMAL_SLOT:
+            texel = np.array([128, 128, 255, 255], dtype=np.uint8)
+        elif slot == COLOR_SLOT:
+            colour = np.rint(_linear_to_srgb(factor[:3]) * 255.0)
+            texel = np.concatenate((colour, [np.rint(np.clip(factor[3], 0.0, 1.0) * 255.0)])).astype(np.uint8)
+        else:
+            texel = np.full(4, 255, dtype=np.uint8)
+        if channels in (1, 2):
+            texel = texel[[0, 3]]
+        return texel[:channels]
+
+    def _uv_transform(
+        self, member: _AtlasMaterial, placement: Tuple[int, int, int], page_size: Tuple[int, int], top_down: bool
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """``(scale, offset)`` with ``uv' = uv * scale + offset`` mapping [0, 1] onto the tile."""
+
+        _, x, y = placement
+        page_width, page_height = page_size
+        tile_width, tile_height = member.size
+        if all(tile is None for tile in member.tiles.values()):
+            centre_v = (y + tile_height / 2) / page_height
+            return np.zeros(2, dtype=np.float32), np.array(
+                [(x + tile_width / 2) / page_width, centre_v if top_down else 1.0 - centre_v], dtype=np.float32
+            )
+        inner_width, inner_height = max(1, tile_width - 2 * self.padding), max(1, tile_height - 2 * self.padding)
+        left, top = x + (tile_width - inner_width) // 2, y + (tile_height - inner_height) // 2
+        scale = np.array([inner_width / page_width, inner_height / page_height], dtype=np.float32)
+        # Images are stored top row first; with v pointing up the tile's bottom edge is v = 0.
+        offset_v = top / page_height if top_down else 1.0 - (top + inner_height) / page_height
+        return scale, np.array([left / page_width, offset_v], dtype=np.float32)
+
+    @staticmethod
+    def _remap_uvs(
+        graph: SceneGraph,
+        node_materials: Mapping[int, str],
+        uv_transforms: Mapping[str, Tuple[str, np.ndarray, np.ndarray]],
+    ) -> None:
+        """Move every (mesh, material) pair drawn with an atlased material into its tile."""
+
+        def remap(mesh: MeshData, atlas: str, scale: np.ndarray, offset: np.ndarray) -> MeshData:
+            if mesh.uvs is None or not len(mesh.uvs):
+                uvs = np.broadcast_to(offset + scale * 0.5, (mesh.vertex_count, 2))
+            else:
+                uvs = np.asarray(mesh.uvs, dtype=np.float32) * scale + offset
+            return dataclasses.replace(mesh, uvs=np.ascontiguousarray(uvs, dtype=np.float32), material=atlas)
+
+        mesh_ids = graph.mesh_ids
+        pairs: Dict[Tuple[int, str], List[int]] = {}
+        materials_by_mesh: Dict[int, set] = {}
+        for node, material in node_materials.items():
+            mesh_id = int(mesh_ids[node])
+            materials_by_mesh.setdefault(mesh_id, set()).add(material)
+            if material in uv_transforms:
+                pairs.setdefault((mesh_id, material), []).append(node)
+
+        for (mesh_id, material), nodes in pairs.items():
+            atlas, scale, offset = uv_transforms[material]
+            mesh = remap(graph.meshes[mesh_id], atlas, scale, offset)
+            levels = [remap(level, atlas, scale, offset) for level in graph.lods.get(mesh_id, ())]
+            if len(materials_by_mesh[mesh_id]) == 1:
+                graph.replace_mesh(mesh_id, mesh)
+                target = mesh_id
+            else:
+                # The mesh is also drawn with other materials: give this pairing its own copy.
+                target = graph.add_mesh(mesh)
+                for node in nodes:
+                    graph.set_mesh(node, target)
+            graph.set_lods(target, levels)
+            graph.set_materials(np.asarray(nodes, dtype=np.int64), atlas)
+
+    @staticmethod
+    def _drop_unused_textures(graph: SceneGraph) -> None:
+        """Forget textures no longer referenced by a material that is still drawn."""
+
+        ids = graph.material_ids[graph.mesh_nodes()]
+        drawn = {graph.materials[int(material_id)] for material_id in np.unique(ids[ids >= 0])}
+        drawn.update(mesh.material for mesh in graph.meshes if mesh.material is not None)
+        referenced = {
+            str(value).split()[-1]
+            for material in drawn
+            for key, value in graph.material_properties.get(material, {}).items()
+            if texture_slot(key) is not None and str(value).strip()
+        }
+        for name in [name for name in graph.textures if name not in referenced]:
+            graph.set_texture(name, [])
+
+    # -- merging -------------------------------------------------------------------------
+    @staticmethod
+    def is_static(attributes: Mapping[str, object]) -> bool:
+        """Nodes are static unless flagged ``static: False`` or of a class with a body in ``IFC_CLASS_BODIES``."""
+
+        if "static" in attributes:
+            return bool(attributes["static"])
+        return str(attributes.get("ifc_class", "")).upper() not in IFC_CLASS_BODIES
+
+    def _merge_static(self, graph: SceneGraph, stats: BatchingStats) -> None:
+        nodes = graph.mesh_nodes()
+        if not nodes.size:
+            return
+        mesh_ids = graph.mesh_ids
+        users = np.bincount(mesh_ids[nodes], minlength=len(graph.meshes))
+        world = graph.world_transforms().astype(np.float64)
+        # Batches hang off the root, so bake transforms relative to it.
+        relative = np.linalg.inv(world[0]) @ world
+        node_materials = self._node_materials(graph)
+
+        groups: Dict[tuple, List[int]] = {}
+        for node in nodes.tolist():
+            mesh_id = int(mesh_ids[node])
+            if users[mesh_id] != 1 or not self.is_static(graph.attributes[node]):
+                continue
+            mesh = graph.meshes[mesh_id]
+            if not mesh.vertex_count:
+                continue
+            positions = np.asarray(mesh.positions, dtype=np.float64)
+            centre = relative[node, :3, :3] @ ((positions.min(axis=0) + positions.max(axis=0)) / 2)
+            cell = tuple(np.floor((centre + relative[node, :3, 3]) / self.cell_size).astype(np.int64).tolist())
+            key = (
+                node_materials.get(node),
+                mesh.normals is not None,
+                mesh.uvs is not None,
+                len(graph.lods.get(mesh_id, ())),
+                cell,
+            )
+            groups.setdefault(key, []).append(node)
+
+        for (material, *_), members in groups.items():
+            for chunk in self._split(graph, members):
+                if len(chunk) < 2:
+                    continue
+                chunk_meshes = [int(mesh_ids[node]) for node in chunk]
+                transforms = relative[chunk]
+                merged = merge_meshes([graph.meshes[mesh_id] for mesh_id in chunk_meshes], transforms, material)
+                levels = [
+                    merge_meshes([graph.lods[mesh_id][level] for mesh_id in chunk_meshes], transforms, material)
+                    for level in range(len(graph.lods.get(chunk_meshes[0], ())))
+                ]
+                name = f"batch:{material or 'default'}:{stats.batches}"
+                batch = graph.add_node(
+                    name, mesh=merged, material=material, attributes={"type": "batch", "members": len(chunk)}
+                )
+                graph.set_lods(int(graph.mesh_ids[batch]), levels)
+                for node in chunk:
+                    graph.set_mesh(node, None)
+                    graph.set_attribute(node, "batch", name)
+                stats.batches += 1
+                stats.merged_nodes += len(chunk)
+        graph.compact_meshes()
+
+    def _split(self, graph: SceneGraph, members: Sequence[int]) -> List[List[int]]:
+        """Greedy runs of ``members`` whose vertex total stays within ``max_vertices``."""
+
+        chunks: List[List[int]] = [[]]
+        total = 0
+        mesh_ids = graph.mesh_ids
+        for node in members:
+            count = graph.meshes[int(mesh_ids[node])].vertex_count
+            if chunks[-1] and total + count > self.max_vertices:
+                chunks.append([])
+                total = 0
+            chunks[-1].append(node)
+            total += count
+        return chunks
+
+
+def merge_meshes(meshes: Sequence[MeshData], transforms: np.ndarray, material: Optional[str] = None) -> MeshData:
+    """Bake ``transforms`` (``(k, 4, 4)``) into ``meshes`` and concatenate them into one mesh.
+
+    Normals use the inverse transpose; mirrored transforms flip triangle winding.
+    All meshes must share their attribute layout (normals/UVs present or not).
+    """
+
+    counts = np.fromiter((mesh.vertex_count for mesh in meshes), dtype=np.int64, count=len(meshes))
+    triangles = np.fromiter((mesh.triangle_count for mesh in meshes), dtype=np.int64, count=len(meshes))
+    owner = np.repeat(np.arange(len(meshes)), counts)
+    linear = np.asarray(transforms, dtype=np.float64)[:, :3, :3]
+    translation = np.asarray(transforms, dtype=np.float64)[:, :3, 3]
+
+    positions = np.concatenate([np.asarray(mesh.positions, dtype=np.float64) for mesh in meshes])
+    positions = np.einsum("nij,nj->ni", linear[owner], positions) + translation[owner]
+
+    normals = None
+    if all(mesh.normals is not None for mesh in meshes):
+        normal_matrices = np.linalg.inv(linear).transpose(0, 2, 1)
+        stacked = np.concatenate([np.asarray(mesh.normals, dtype=np.float64) for mesh in meshes])
+        normals = np.einsum("nij,nj->ni", normal_matrices[owner], stacked)
+        normals /= np.maximum(np.linalg.norm(normals, axis=1, keepdims=True), 1e-12)
+        normals = normals.astype(np.float32)
+    uvs = None
+    if all(mesh.uvs is not None for mesh in meshes):
+        uvs = np.concatenate([np.asarray(mesh.uvs, dtype=np.float32) for mesh in meshes])
+
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    indices = np.concatenate([np.asarray(mesh.indices, dtype=np.int64) for mesh in meshes])
+    indices += np.repeat(offsets, triangles)[:, None]
+    mirrored = np.repeat(np.linalg.det(linear) < 0, triangles)
+    indices[mirrored] = indices[mirrored][:, [0, 2, 1]]
+    return MeshData(
+        positions=positions.astype(np.float32),
+        indices=indices.astype(np.uint32),
+        normals=normals,
+        uvs=uvs,
+        material=material,
+    )
+
+
+__all__ = [
+    "BatchingStats",
+    "MaterialBatcher",
+    "SkylinePacker",
+    "merge_meshes",
+    "pack_rectangles",
+    "texture_slot",
+]
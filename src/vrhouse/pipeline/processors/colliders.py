@@ -0,0 +1,643 @@
+"""Collision shapes per object: boxes, capsules, convex hulls and approximate convex decompositions."""
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, fields
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from vrhouse.core import MeshData, PipelineError, SceneGraph
+from vrhouse.pipeline.ai.physics_model import MIN_THICKNESS, ObjectPhysics, mesh_moments
+from vrhouse.pipeline.cache import StageCache
+from vrhouse.pipeline.processors.lod import (
+    PARALLEL_THRESHOLD,
+    SharedMeshHandle,
+    process_context,
+    read_shared_mesh,
+    share_meshes,
+)
+
+# Bump when the fitting changes so cached colliders are not reused across versions.
+COLLIDER_FORMAT_VERSION = 1
+BOX, CAPSULE, CONVEX_HULL = 0, 1, 2
+SHAPE_TYPES = ("box", "capsule", "convex_hull")
+DEFAULT_BOX_FILL = 0.85
+DEFAULT_CAPSULE_FILL = 0.8
+DEFAULT_CONCAVITY = 0.15
+DEFAULT_MAX_HULLS = 8
+DEFAULT_MAX_HULL_VERTICES = 64
+DEFAULT_RESOLUTION = 24
+# Rays are nudged off the voxel grid so they never run exactly through shared edges or vertices.
+_RAY_JITTER = np.array([1.37e-4, 2.71e-4])
+# Parts with fewer voxels than this are not split further.
+_MIN_PART_VOXELS = 8
+# Axes, then the eight diagonals: the 14-DOPs used to rank decomposition cuts.
+_DOP_DIRECTIONS = np.vstack((np.eye(3), -np.eye(3), np.array(np.meshgrid(*[(-1.0, 1.0)] * 3)).reshape(3, -1).T))
+
+
+@dataclass
+class Collider:
+    """One primitive in the mesh's local frame.
+
+    ``transform`` places the shape (a box's or capsule's centre and axes; identity
+    for hulls). ``size`` holds a box's half extents or a capsule's ``(radius,
+    half_height, 0)``, the capsule running along the shape's local Y axis. Hulls
+    carry ``vertices`` and outward-wound triangle ``faces`` instead.
+    """
+
+    shape: int
+    transform: np.ndarray
+    size: np.ndarray
+    vertices: Optional[np.ndarray] = None
+    faces: Optional[np.ndarray] = None
+
+    @property
+    def volume(self) -> float:
+        if self.shape == BOX:
+            return float(np.prod(2.0 * self.size))
+        if self.shape == CAPSULE:
+            radius, half_height = float(self.size[0]), float(self.size[1])
+            return math.pi * radius * radius * (2.0 * half_height + 4.0 / 3.0 * radius)
+        return hull_volume(self.vertices, self.faces)
+
+
+@dataclass
+class ColliderSet:
+    """Colliders for every object, packed into flat arrays.
+
+    ``nodes`` follows ``ObjectPhysics.nodes`` row for row; ``node_sets`` points
+    each node at its set, so nodes sharing a mesh share the set. Set ``s`` owns
+    colliders ``set_offsets[s]:set_offsets[s + 1]``, and hull ``c`` owns
+    ``vertices[vertex_offsets[c]:vertex_offsets[c + 1]]`` and likewise ``faces``
+    (indices local to the hull). Shapes are in the node's mesh frame: place them
+    with the node's world transform.
+    """
+
+    nodes: np.ndarray
+    node_sets: np.ndarray
+    set_offsets: np.ndarray
+    shapes: np.ndarray
+    transforms: np.ndarray
+    sizes: np.ndarray
+    vertex_offsets: np.ndarray
+    vertices: np.ndarray
+    face_offsets: np.ndarray
+    faces: np.ndarray
+
+    @property
+    def collider_count(self) -> int:
+        return int(self.shapes.size)
+
+    def __len__(self) -> int:
+        return self.collider_count
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {item.name: getattr(self, item.name) for item in fields(self)}
+
+    @classmethod
+    def from_arrays(cls, arrays: Mapping[str, np.ndarray]) -> "ColliderSet":
+        missing = [item.name for item in fields(cls) if item.name not in arrays]
+        if missing:
+            raise PipelineError(f"Collider set is missing {missing}")
+        return cls(**{item.name: np.asarray(arrays[item.name]) for item in fields(cls)})
+
+    @classmethod
+    def pack(cls, nodes: np.ndarray, node_sets: np.ndarray, sets: Sequence[Sequence[Collider]]) -> "ColliderSet":
+        colliders = [collider for colliders in sets for collider in colliders]
+        hulls = [(c.vertices, c.faces) if c.shape == CONVEX_HULL else (None, None) for c in colliders]
+        vertex_counts = [0 if vertices is None else len(vertices) for vertices, _ in hulls]
+        face_counts = [0 if faces is None else len(faces) for _, faces in hulls]
+        return cls(
+            nodes=np.asarray(nodes, dtype=np.int32),
+            node_sets=np.asarray(node_sets, dtype=np.int32),
+            set_offsets=np.concatenate(([0], np.cumsum([len(colliders) for colliders in sets]))).astype(np.int32),
+            shapes=np.array([c.shape for c in colliders], dtype=np.int8),
+            transforms=np.array([c.transform for c in colliders], dtype=np.float32).reshape(-1, 4, 4),
+            sizes=np.array([c.size for c in colliders], dtype=np.float32).reshape(-1, 3),
+            vertex_offsets=np.concatenate(([0], np.cumsum(vertex_counts))).astype(np.int32),
+            vertices=np.concatenate([v for v, _ in hulls if v is not None] or [np.zeros((0, 3))]).astype(np.float32),
+            face_offsets=np.concatenate(([0], np.cumsum(face_counts))).astype(np.int32),
+            faces=np.concatenate([f for _, f in hulls if f is not None] or [np.zeros((0, 3))]).astype(np.uint16),
+        )
+
+    def collider(self, index: int) -> Collider:
+        vertices = faces = None
+        if self.shapes[index] == CONVEX_HULL:
+            vertices = self.vertices[self.vertex_offsets[index] : self.vertex_offsets[index + 1]]
+            faces = self.faces[self.face_offsets[index] : self.face_offsets[index + 1]]
+        return Collider(int(self.shapes[index]), self.transforms[index], self.sizes[index], vertices, faces)
+
+    def node_colliders(self, row: int) -> List[Collider]:
+        """Colliders of the ``row``-th object (the node is ``nodes[row]``)."""
+
+        collider_set = int(self.node_sets[row])
+        start, stop = int(self.set_offsets[collider_set]), int(self.set_offsets[collider_set + 1])
+        return [self.collider(index) for index in range(start, stop)]
+
+    def summary(self) -> Dict[str, float]:
+        counts = np.diff(self.set_offsets)
+        owners = np.repeat(np.arange(counts.size), counts)
+        hulls = np.bincount(owners, weights=self.shapes == CONVEX_HULL, minlength=counts.size)
+        return {
+            "colliders": float(counts[self.node_sets].sum()),
+            "convex_hulls": float(hulls[self.node_sets].sum()),
+            "decomposed_objects": float(np.count_nonzero(counts[self.node_sets] > 1)),
+        }
+
+
+@dataclass
+class ColliderStats:
+    objects: int = 0
+    meshes: int = 0
+    cached: int = 0
+    boxes: int = 0
+    capsules: int = 0
+    hulls: int = 0
+    decomposed: int = 0
+
+
+def support_directions(count: int) -> np.ndarray:
+    """``count`` unit vectors spread evenly over the sphere (Fibonacci lattice)."""
+
+    index = np.arange(count) + 0.5
+    z = 1.0 - 2.0 * index / count
+    radius = np.sqrt(np.maximum(1.0 - z * z, 0.0))
+    angle = math.pi * (3.0 - math.sqrt(5.0)) * index
+    return np.column_stack((radius * np.cos(angle), radius * np.sin(angle), z))
+
+
+def convex_hull(points: np.ndarray) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Incremental quickhull; returns ``(vertices, faces)`` or ``None`` for flat or degenerate input.
+
+    Meant for the few dozen support points of a collider: each step is vectorised
+    over the current faces, but points are added one at a time.
+    """
+
+    points = np.unique(np.asarray(points, dtype=np.float64).reshape(-1, 3), axis=0)
+    if len(points) < 4:
+        return None
+    scale = float(np.ptp(points, axis=0).max())
+    epsilon = 1e-9 * max(scale, 1e-12)
+
+    first = int(np.argmin(points[:, 0]))
+    second = int(np.argmax(np.linalg.norm(points - points[first], axis=1)))
+    line = points[second] - points[first]
+    if np.linalg.norm(line) <= epsilon:
+        return None
+    third = int(np.argmax(np.linalg.norm(np.cross(points - points[first], line), axis=1)))
+    normal = np.cross(line, points[third] - points[first])
+    if np.linalg.norm(normal) <= epsilon * np.linalg.norm(line):
+        return None
+    heights = (points - points[first]) @ (normal / np.linalg.norm(normal))
+    fourth = int(np.argmax(np.abs(heights)))
+    if abs(heights[fourth]) <= epsilon * 10:
+        return None
+
+    simplex = [first, second, third, fourth]
+    centre = points[simplex].mean(axis=0)
+    faces = np.array([[first, second, third], [first, third, fourth], [first, fourth, second], [second, fourth, third]])
+    normals, offsets = _planes(points, faces)
+    inward = normals @ centre > offsets
+    faces[inward] = faces[inward][:, [0, 2, 1]]
+    normals[inward], offsets[inward] = -normals[inward], -offsets[inward]
+
+    # Farthest points first: they swallow most of the others early.
+    remaining = np.setdiff1d(np.arange(len(points)), simplex)
+    remaining = remaining[np.argsort(-np.linalg.norm(points[remaining] - centre, axis=1))]
+    count = len(points)
+    for index in remaining.tolist():
+        visible = normals @ points[index] - offsets > epsilon
+        if not visible.any():
+            continue
+        seen = faces[visible]
+        edges = np.concatenate((seen[:, [0, 1]], seen[:, [1, 2]], seen[:, [2, 0]]))
+        keys = edges[:, 0] * count + edges[:, 1]
+        horizon = edges[~np.isin(edges[:, 1] * count + edges[:, 0], keys)]
+        # Each horizon edge keeps the winding of the visible face it came from.
+        cone = np.column_stack((horizon, np.full(len(horizon), index)))
+        cone_normals, cone_offsets = _planes(points, cone)
+        faces = np.concatenate((faces[~visible], cone))
+        normals = np.concatenate((normals[~visible], cone_normals))
+        offsets = np.concatenate((offsets[~visible], cone_offsets))
+
+    used, local = np.unique(faces, return_inverse=True)
+    return points[used], local.reshape(-1, 3).astype(np.int64)
+
+
+def _planes(points: np.ndarray, faces: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Unit normals and offsets of the triangles ``faces`` (``normal @ x == offset`` on the plane)."""
+
+    a, b, c = points[faces[:, 0]], points[faces[:, 1]], points[faces[:, 2]]
+    u, v = b - a, c - a
+    normals = np.empty_like(u)
+    normals[:, 0] = u[:, 1] * v[:, 2] - u[:, 2] * v[:, 1]
+    normals[:, 1] = u[:, 2] * v[:, 0] - u[:, 0] * v[:, 2]
+    normals[:, 2] = u[:, 0] * v[:, 1] - u[:, 1] * v[:, 0]
+    normals /= np.maximum(np.linalg.norm(normals, axis=1), 1e-30)[:, None]
+    return normals, np.einsum("ij,ij->i", normals, a)
+
+
+def hull_volume(vertices: Optional[np.ndarray], faces: Optional[np.ndarray]) -> float:
+    if vertices is None or faces is None or not len(faces):
+        return 0.0
+    vertices = np.asarray(vertices, dtype=np.float64)
+    vertices = vertices - vertices.mean(axis=0)
+    a, b, c = vertices[faces[:, 0]], vertices[faces[:, 1]], vertices[faces[:, 2]]
+    return float(np.einsum("ij,ij->i", a, np.cross(b, c)).sum() / 6.0)
+
+
+def support_hull(points: np.ndarray, max_vertices: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Hull of ``points`` with at most ``max_vertices`` vertices: the extreme points along evenly spread directions."""
+
+    if len(points) > max_vertices:
+        extreme = np.unique(np.argmax(points @ support_directions(max_vertices).T, axis=0))
+        points = points[extreme]
+    return convex_hull(points)
+
+
+def _oriented_box(points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Smaller of the axis-aligned and principal-axis boxes around ``points``: ``(transform, half extents)``."""
+
+    candidates = [np.eye(3)]
+    if len(points) >= 4:
+        _, axes = np.linalg.eigh(np.cov((points - points.mean(axis=0)).T))
+        if np.linalg.det(axes) < 0:
+            axes[:, 2] = -axes[:, 2]
+        candidates.append(axes)
+    best: Optional[Tuple[float, np.ndarray, np.ndarray, np.ndarray]] = None
+    for axes in candidates:
+        local = points @ axes
+        lower, upper = local.min(axis=0), local.max(axis=0)
+        half = np.maximum((upper - lower) / 2.0, MIN_THICKNESS / 2.0)
+        volume = float(np.prod(half))
+        if best is None or volume < best[0] * (1.0 - 1e-6):
+            best = (volume, axes, axes @ ((lower + upper) / 2.0), half)
+    _, axes, centre, half = best
+    transform = np.eye(4)
+    transform[:3, :3], transform[:3, 3] = axes, centre
+    return transform, half
+
+
+def _capsule(points: np.ndarray, transform: np.ndarray, half: np.ndarray) -> Optional[Collider]:
+    """Capsule along the box's longest axis, if the box is elongated with a roughly square section."""
+
+    order = np.argsort(-half)
+    if half[order[0]] < 1.5 * half[order[1]] or half[order[1]] > 1.3 * half[order[2]]:
+        return None
+    axis = int(order[0])
+    local = (points - transform[:3, 3]) @ transform[:3, :3]
+    along = np.abs(local[:, axis])
+    radial = np.linalg.norm(np.delete(local, axis, axis=1), axis=1)
+    radius = float(radial.max())
+    half_height = float(np.max(along - np.sqrt(np.maximum(radius * radius - radial * radial, 0.0))))
+    # Cyclic column order keeps the frame right-handed with the capsule on local Y.
+    rotation = transform[:3, [(axis + 2) % 3, axis, (axis + 1) % 3]]
+    capsule = np.eye(4)
+    capsule[:3, :3], capsule[:3, 3] = rotation, transform[:3, 3]
+    return Collider(CAPSULE, capsule, np.array([radius, max(half_height, 0.0), 0.0]))
+
+
+def voxelize(mesh: MeshData, resolution: int) -> Tuple[np.ndarray, float, np.ndarray]:
+    """Solid voxels of a closed mesh: ``(origin, pitch, occupancy)`` with ``resolution`` cells on the longest side.
+
+    One ray per voxel column runs along Z; crossings toggle the parity of every
+    voxel above them, so a cumulative sum over Z marks the interior.
+    """
+
+    positions = np.asarray(mesh.positions, dtype=np.float64)
+    triangles = positions[np.asarray(mesh.indices, dtype=np.int64)]
+    lower, upper = positions.min(axis=0), positions.max(axis=0)
+    pitch = max(float((upper - lower).max()) / resolution, 1e-9)
+    dims = np.maximum(np.ceil((upper - lower) / pitch - 1e-9).astype(np.int64), 1)
+
+    # Column (i, j) is centred on the integer point (i, j) in these units.
+    plane = (triangles[:, :, :2] - lower[:2]) / pitch - 0.5 - _RAY_JITTER
+    first = np.maximum(np.ceil(plane.min(axis=1)), 0).astype(np.int64)
+    last = np.minimum(np.floor(plane.max(axis=1)), dims[:2] - 1).astype(np.int64)
+    spans = np.maximum(last - first + 1, 0)
+    counts = spans[:, 0] * spans[:, 1]
+    owner = np.repeat(np.arange(len(triangles)), counts)
+    within = np.arange(owner.size) - np.repeat(np.cumsum(counts) - counts, counts)
+    column_i = first[owner, 0] + within // spans[owner, 1]
+    column_j = first[owner, 1] + within % spans[owner, 1]
+
+    a, b, c = plane[owner, 0], plane[owner, 1], plane[owner, 2]
+    edge_b, edge_c = b - a, c - a
+    offset = np.column_stack((column_i, column_j)) - a
+    determinant = edge_b[:, 0] * edge_c[:, 1] - edge_c[:, 0] * edge_b[:, 1]
+    safe = np.where(np.abs(determinant) > 1e-12, determinant, 1.0)
+    u = (offset[:, 0] * edge_c[:, 1] - edge_c[:, 0] * offset[:, 1]) / safe
+    v = (edge_b[:, 0] * offset[:, 1] - offset[:, 0] * edge_b[:, 1]) / safe
+    hit = (np.abs(determinant) > 1e-12) & (u >= 0) & (v >= 0) & (u + v <= 1)
+
+    heights = triangles[owner[hit], :, 2]
+    z = heights[:, 0] + u[hit] * (heights[:, 1] - heights[:, 0]) + v[hit] * (heights[:, 2] - heights[:, 0])
+    layer = np.clip(np.ceil((z - lower[2]) / pitch - 0.5), 0, dims[2]).astype(np.int64)
+    toggles = np.zeros((dims[0], dims[1], dims[2] + 1), dtype=np.int32)
+    np.add.at(toggles, (column_i[hit], column_j[hit], layer), 1)
+    occupancy = (np.cumsum(toggles, axis=2)[:, :, : dims[2]] & 1).astype(bool)
+    return lower, pitch, occupancy
+
+
+def _voxel_hull(
+    voxels: np.ndarray, origin: np.ndarray, pitch: float, upper: np.ndarray, directions: np.ndarray
+) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Hull of a set of voxels (their centres grown by half a voxel), clipped to the mesh bounds."""
+
+    centres = origin + (voxels + 0.5) * pitch
+    extreme = np.argmax(centres @ directions.T, axis=0)
+    points = centres[extreme] + np.sign(directions) * (pitch / 2.0)
+    return convex_hull(np.clip(points, origin, upper))
+
+
+def _dop_volume(support: np.ndarray) -> np.ndarray:
+    """Volume of 14-DOPs from their supports along ``_DOP_DIRECTIONS`` (rows of ``support``).
+
+    The box spanned by the six axis supports loses a corner tetrahedron to each
+    diagonal plane; overlapping corner cuts are not corrected, which is fine for
+    ranking cuts.
+    """
+
+    extents = np.maximum(support[:, :3] + support[:, 3:6], 0.0)
+    corners = np.where(_DOP_DIRECTIONS[6:] > 0, support[:, None, :3], support[:, None, 3:6]).sum(axis=2)
+    depth = np.clip(corners - support[:, 6:], 0.0, extents.min(axis=1, keepdims=True))
+    return np.prod(extents, axis=1) - (depth**3).sum(axis=1) / 6.0
+
+
+def _best_split(voxels: np.ndarray) -> Optional[np.ndarray]:
+    """Axis-aligned cut between voxel layers minimising the parts' summed 14-DOP volume; returns the left mask.
+
+    Supports of every prefix and suffix of layers come from cumulative maxima,
+    so all cuts along an axis are ranked in one pass.
+    """
+
+    # Voxel centres in voxel units, grown by half a voxel along each direction.
+    support = (voxels + 0.5) @ _DOP_DIRECTIONS.T + 0.5 * np.abs(_DOP_DIRECTIONS).sum(axis=1)
+    best: Optional[Tuple[float, int, int]] = None
+    for axis in range(3):
+        layers, inverse = np.unique(voxels[:, axis], return_inverse=True)
+        if len(layers) < 2:
+            continue
+        per_layer = np.full((len(layers), len(_DOP_DIRECTIONS)), -np.inf)
+        np.maximum.at(per_layer, inverse, support)
+        prefix = np.maximum.accumulate(per_layer)[:-1]
+        suffix = np.maximum.accumulate(per_layer[::-1])[::-1][1:]
+        cost = _dop_volume(prefix) + _dop_volume(suffix)
+        cut = int(np.argmin(cost))
+        if best is None or cost[cut] < best[0]:
+            best = (float(cost[cut]), axis, int(layers[cut]))
+    if best is None:
+        return None
+    _, axis, layer = best
+    return voxels[:, axis] <= layer
+
+
+def decompose(
+    mesh: MeshData,
+    *,
+    concavity: float = DEFAULT_CONCAVITY,
+    max_hulls: int = DEFAULT_MAX_HULLS,
+    max_hull_vertices: int = DEFAULT_MAX_HULL_VERTICES,
+    resolution: int = DEFAULT_RESOLUTION,
+) -> List[Collider]:
+    """Approximate convex decomposition of a closed mesh.
+
+    The solid is voxelized and the part whose hull wastes the most volume is cut
+    in two, along the axis-aligned plane that minimises the parts' summed
+    bounding volumes (14-DOPs, a cheap stand-in for their hulls), until every
+    part's empty share is at most ``concavity`` or ``max_hulls`` parts exist.
+    Each part becomes the hull of its voxels.
+    """
+
+    origin, pitch, occupancy = voxelize(mesh, resolution)
+    voxels = np.argwhere(occupancy)
+    if len(voxels) < _MIN_PART_VOXELS:
+        return []
+    upper = np.asarray(mesh.positions, dtype=np.float64).max(axis=0)
+    directions = support_directions(max_hull_vertices)
+    voxel_volume = pitch**3
+
+    def measure(part: np.ndarray) -> Tuple[np.ndarray, float, float, Optional[Tuple[np.ndarray, np.ndarray]]]:
+        hull = _voxel_hull(part, origin, pitch, upper, directions)
+        volume = hull_volume(*hull) if hull is not None else 0.0
+        return part, max(volume - len(part) * voxel_volume, 0.0), volume, hull
+
+    parts = [measure(voxels)]
+    while len(parts) < max_hulls:
+        concave = [
+            index
+            for index, (part, empty, volume, hull) in enumerate(parts)
+            if hull is not None and len(part) >= _MIN_PART_VOXELS and empty > concavity * volume
+        ]
+        if not concave:
+            break
+        worst = max(concave, key=lambda index: parts[index][1])
+        part, _, volume, hull = parts[worst]
+        left = _best_split(part)
+        if left is None or left.all() or not left.any():
+            parts[worst] = (part, 0.0, volume, hull)
+            continue
+        parts[worst : worst + 1] = [measure(part[left]), measure(part[~left])]
+    return [Collider(CONVEX_HULL, np.eye(4), np.zeros(3), *hull) for *_, hull in parts if hull is not None]
+
+
+def fit_colliders(
+    mesh: MeshData,
+    *,
+    box_fill: float = DEFAULT_BOX_FILL,
+    capsule_fill: float = DEFAULT_CAPSULE_FILL,
+    concavity: float = DEFAULT_CONCAVITY,
+    max_hulls: int = DEFAULT_MAX_HULLS,
+    max_hull_vertices: int = DEFAULT_MAX_HULL_VERTICES,
+    resolution: int = DEFAULT_RESOLUTION,
+) -> List[Collider]:
+    """Cheapest shapes that still hug ``mesh``: a box, a capsule, one convex hull or a decomposition.
+
+    A primitive is used when the solid fills at least ``box_fill`` /
+    ``capsule_fill`` of it; otherwise the convex hull, split into up to
+    ``max_hulls`` hulls when the mesh is closed and more than ``concavity`` of its
+    hull is empty (a table or an L-shaped sofa). Open meshes are measured by their hull.
+    """
+
+    indices = np.asarray(mesh.indices, dtype=np.int64)
+    if not indices.size:
+        return []
+    points = np.asarray(mesh.positions, dtype=np.float64)[np.unique(indices)]
+    transform, half = _oriented_box(points)
+    box = Collider(BOX, transform, half)
+    hull = support_hull(points, max_hull_vertices)
+    if hull is None:
+        return [box]
+    hull_size = hull_volume(*hull)
+    volume, *_, closed = mesh_moments([mesh])
+    solid = float(volume[0]) if closed[0] else hull_size
+    if solid >= box_fill * box.volume:
+        return [box]
+    capsule = _capsule(points, transform, half)
+    if capsule is not None and solid >= capsule_fill * capsule.volume:
+        return [capsule]
+    if closed[0] and max_hulls > 1 and solid < (1.0 - concavity) * hull_size:
+        parts = decompose(
+            mesh, concavity=concavity, max_hulls=max_hulls, max_hull_vertices=max_hull_vertices, resolution=resolution
+        )
+        if len(parts) > 1:
+            return parts
+    return [Collider(CONVEX_HULL, np.eye(4), np.zeros(3), *hull)]
+
+
+def _fit_worker(handle: SharedMeshHandle, settings: Dict[str, float]) -> List[Collider]:
+    block = SharedMemory(name=handle.block)
+    try:
+        mesh = read_shared_mesh(block, handle, copy=False)
+        colliders = fit_colliders(mesh, **settings)
+        del mesh
+    finally:
+        block.close()
+    return colliders
+
+
+class ColliderGenerator:
+    """Fit collision shapes to every object ``PhysicsInferenceModel.predict_objects`` produced.
+
+    Shapes are fitted once per unique mesh, in its local frame, so instanced
+    furniture shares them; a mesh's shapes are cached under the hash of its
+    geometry and the settings, so unchanged objects are never refitted across
+    projects. Misses fan out to a process pool through shared memory (see
+    ``processors.lod``).
+    """
+
+    def __init__(
+        self,
+        box_fill: float = DEFAULT_BOX_FILL,
+        capsule_fill: float = DEFAULT_CAPSULE_FILL,
+        concavity: float = DEFAULT_CONCAVITY,
+        max_hulls: int = DEFAULT_MAX_HULLS,
+        max_hull_vertices: int = DEFAULT_MAX_HULL_VERTICES,
+        resolution: int = DEFAULT_RESOLUTION,
+        *,
+        cache: Optional[StageCache] = None,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        if not 4 <= max_hull_vertices <= 255:
+            raise ValueError("max_hull_vertices must be between 4 and 255")
+        if max_hulls < 1 or resolution < 2:
+            raise ValueError("max_hulls and resolution must be positive")
+        self.box_fill = box_fill
+        self.capsule_fill = capsule_fill
+        self.concavity = concavity
+        self.max_hulls = max_hulls
+        self.max_hull_vertices = max_hull_vertices
+        self.resolution = resolution
+        self.cache = cache
+        self.max_workers = max_workers
+        self.last_stats = ColliderStats()
+
+    def settings(self) -> Dict[str, float]:
+        return {
+            "box_fill": self.box_fill,
+            "capsule_fill": self.capsule_fill,
+            "concavity": self.concavity,
+            "max_hulls": self.max_hulls,
+            "max_hull_vertices": self.max_hull_vertices,
+            "resolution": self.resolution,
+        }
+
+    def _key(self, mesh: MeshData) -> str:
+        hasher = hashlib.blake2b(digest_size=20)
+        hasher.update(json.dumps([COLLIDER_FORMAT_VERSION, self.settings()], sort_keys=True).encode("utf-8"))
+        hasher.update(np.ascontiguousarray(mesh.positions, dtype=np.float32).tobytes())
+        hasher.update(np.ascontiguousarray(mesh.indices, dtype=np.uint32).tobytes())
+        return hasher.hexdigest()
+
+    def fit(
+        self, meshes: Sequence[MeshData], progress: Optional[Callable[[float], None]] = None
+    ) -> List[List[Collider]]:
+        """Colliders for each mesh, from the cache where possible; ``progress`` follows fitted triangles."""
+
+        results: List[Optional[List[Collider]]] = [None] * len(meshes)
+        keys = [self._key(mesh) for mesh in meshes] if self.cache is not None else []
+        if self.cache is not None:
+            for index, key in enumerate(keys):
+                results[index] = self.cache.get(key)
+        missing = [index for index, result in enumerate(results) if result is None]
+        self.last_stats.cached = len(meshes) - len(missing)
+
+        total = sum(meshes[index].triangle_count for index in missing)
+        finished = 0
+
+        def store(index: int, colliders: List[Collider]) -> None:
+            nonlocal finished
+            results[index] = colliders
+            if self.cache is not None:
+                self.cache.put(keys[index], colliders)
+            finished += meshes[index].triangle_count
+            if progress is not None:
+                progress(finished / max(total, 1))
+
+        settings = self.settings()
+        workers = self.max_workers or os.cpu_count() or 1
+        if workers <= 1 or len(missing) <= 1 or total < PARALLEL_THRESHOLD:
+            for index in missing:
+                store(index, fit_colliders(meshes[index], **settings))
+        else:
+            block, handles = share_meshes([meshes[index] for index in missing])
+            try:
+                order = sorted(range(len(missing)), key=lambda slot: meshes[missing[slot]].triangle_count, reverse=True)
+                with ProcessPoolExecutor(max_workers=min(workers, len(missing)), mp_context=process_context()) as pool:
+                    futures = {pool.submit(_fit_worker, handles[slot], settings): missing[slot] for slot in order}
+                    for future in as_completed(futures):
+                        store(futures[future], future.result())
+            finally:
+                if block is not None:
+                    block.close()
+                    block.unlink()
+        if self.cache is not None:
+            self.cache.evict()
+        return [result or [] for result in results]
+
+    def generate(
+        self,
+        scene_graph: SceneGraph | Mapping[str, Dict[str, object]],
+        objects: ObjectPhysics,
+        progress: Optional[Callable[[float], None]] = None,
+    ) -> ColliderSet:
+        """Colliders for every object in ``objects``, whose nodes index ``scene_graph``."""
+
+        graph = SceneGraph.coerce(scene_graph)
+        nodes = np.asarray(objects.nodes, dtype=np.int64)
+        used, node_sets = np.unique(graph.mesh_ids[nodes], return_inverse=True)
+        self.last_stats = ColliderStats(objects=int(nodes.size), meshes=int(used.size))
+        sets = self.fit([graph.meshes[int(mesh_id)] for mesh_id in used], progress)
+
+        stats = self.last_stats
+        for colliders in sets:
+            shapes = [collider.shape for collider in colliders]
+            stats.boxes += shapes.count(BOX)
+            stats.capsules += shapes.count(CAPSULE)
+            stats.hulls += shapes.count(CONVEX_HULL)
+            stats.decomposed += int(len(colliders) > 1)
+        return ColliderSet.pack(nodes, node_sets, sets)
+
+
+__all__ = [
+    "BOX",
+    "CAPSULE",
+    "CONVEX_HULL",
+    "Collider",
+    "ColliderGenerator",
+    "ColliderSet",
+    "ColliderStats",
+    "SHAPE_TYPES",
+    "convex_hull",
+    "decompose",
+    "fit_colliders",
+    "hull_volume",
+    "support_directions",
+    "voxelize",
+]
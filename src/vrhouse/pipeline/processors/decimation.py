@@ -0,0 +1,416 @@
+"""Quadric error metric (Garland & Heckbert) mesh decimation."""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+
+from vrhouse.core import MeshData
+
+# Collapses may not rotate a neighbouring face normal further than these cosines.
+FLIP_COS_PRESERVE = 0.5
+FLIP_COS_DEFAULT = 0.0
+BOUNDARY_WEIGHT = 1000.0
+
+
+def _weld(positions: np.ndarray, indices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Merge attribute-split vertices sharing a position; return welded positions and faces."""
+
+    unique, inverse = np.unique(positions, axis=0, return_inverse=True)
+    return unique.astype(np.float64), inverse.reshape(-1)[indices]
+
+
+def _cross(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Row-wise cross product; avoids ``np.cross`` overhead on the many small per-round batches."""
+
+    return np.stack(
+        (
+            a[:, 1] * b[:, 2] - a[:, 2] * b[:, 1],
+            a[:, 2] * b[:, 0] - a[:, 0] * b[:, 2],
+            a[:, 0] * b[:, 1] - a[:, 1] * b[:, 0],
+        ),
+        axis=1,
+    )
+
+
+def _plane_quadrics(normals: np.ndarray, offsets: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    planes = np.concatenate((normals, offsets[:, None]), axis=1)
+    return weights[:, None, None] * planes[:, :, None] * planes[:, None, :]
+
+
+def _sum_quadrics(total: np.ndarray, vertices: np.ndarray, quadrics: np.ndarray) -> None:
+    """Add symmetric ``(k, 4, 4)`` ``quadrics`` onto ``total[vertices]``, one ``np.bincount`` per entry."""
+
+    for row, column in zip(*np.triu_indices(4)):
+        summed = np.bincount(vertices, weights=quadrics[:, row, column], minlength=total.shape[0])
+        total[:, row, column] += summed
+        if row != column:
+            total[:, column, row] += summed
+
+
+def accumulate_quadrics(positions: np.ndarray, faces: np.ndarray) -> np.ndarray:
+    """Area-weighted fundamental error quadrics per vertex, plus boundary-preserving planes."""
+
+    corners = positions[faces]
+    cross = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    double_area = np.linalg.norm(cross, axis=1)
+    valid = double_area > 0
+    normals = np.zeros_like(cross)
+    normals[valid] = cross[valid] / double_area[valid, None]
+    offsets = -np.einsum("ij,ij->i", normals, corners[:, 0])
+    face_quadrics = _plane_quadrics(normals, offsets, 0.5 * double_area)
+
+    quadrics = np.zeros((positions.shape[0], 4, 4))
+    for corner in range(3):
+        _sum_quadrics(quadrics, faces[:, corner], face_quadrics)
+
+    # Edges used by a single face are boundaries (openings, seams); pin them with perpendicular planes.
+    edges = np.stack((faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]]), axis=1).reshape(-1, 2)
+    face_of_edge = np.repeat(np.arange(faces.shape[0]), 3)
+    keys = edges.min(axis=1) * positions.shape[0] + edges.max(axis=1)
+    _, first, counts = np.unique(keys, return_index=True, return_counts=True)
+    boundary = first[counts == 1]
+    if boundary.size:
+        start, end = positions[edges[boundary, 0]], positions[edges[boundary, 1]]
+        direction = end - start
+        perpendicular = np.cross(direction, normals[face_of_edge[boundary]])
+        length = np.linalg.norm(perpendicular, axis=1)
+        keep = length > 0
+        perpendicular = perpendicular[keep] / length[keep, None]
+        offsets = -np.einsum("ij,ij->i", perpendicular, start[keep])
+        weights = BOUNDARY_WEIGHT * np.einsum("ij,ij->i", direction[keep], direction[keep])
+        boundary_quadrics = _plane_quadrics(perpendicular, offsets, weights)
+        _sum_quadrics(quadrics, edges[boundary[keep], 0], boundary_quadrics)
+        _sum_quadrics(quadrics, edges[boundary[keep], 1], boundary_quadrics)
+    return quadrics
+
+
+def optimal_collapse(quadrics: np.ndarray, start: np.ndarray, end: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Batch-solve the minimum-error position and cost for collapsing edges ``start``-``end``.
+
+    ``quadrics`` is the ``(k, 4, 4)`` sum of both endpoint quadrics. Singular systems
+    fall back to the best of the endpoints and the midpoint.
+    """
+
+    system = quadrics[:, :3, :3]
+    rhs = -quadrics[:, :3, 3]
+    determinant = np.linalg.det(system)
+    scale = np.abs(system).max(axis=(1, 2)) ** 3 + 1e-30
+    solvable = np.abs(determinant) > 1e-10 * scale
+
+    candidates = np.stack((start, end, 0.5 * (start + end)), axis=1)
+    if solvable.any():
+        solved = np.linalg.solve(system[solvable], rhs[solvable][..., None])[..., 0]
+        candidates = np.concatenate((candidates, np.zeros_like(candidates[:, :1])), axis=1)
+        candidates[solvable, 3] = solved
+        candidates[~solvable, 3] = candidates[~solvable, 2]
+
+    homogeneous = np.concatenate((candidates, np.ones_like(candidates[..., :1])), axis=2)
+    costs = np.einsum("kci,kij,kcj->kc", homogeneous, quadrics, homogeneous)
+    best = np.argmin(costs, axis=1)
+    rows = np.arange(best.size)
+    return candidates[rows, best], np.maximum(costs[rows, best], 0.0)
+
+
+# Edges handed to ``optimal_collapse`` at once; bounds the ``(k, 4, 4)`` temporaries.
+_COST_CHUNK = 1 << 16
+
+
+def _expand(starts: np.ndarray, counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Flatten the ranges ``starts[i]:starts[i] + counts[i]``; return each element's ``i`` and position."""
+
+    rows = np.repeat(np.arange(counts.size), counts)
+    offsets = np.arange(rows.size) - np.repeat(np.cumsum(counts) - counts, counts)
+    return rows, np.repeat(starts, counts) + offsets
+
+
+@dataclass
+class _Rings:
+    """Per-pass adjacency of the surviving mesh in CSR form (vertex -> neighbours, vertex -> faces)."""
+
+    faces: np.ndarray
+    keys: np.ndarray
+    neighbours: np.ndarray
+    neighbour_starts: np.ndarray
+    neighbour_counts: np.ndarray
+    incident: np.ndarray
+    incident_starts: np.ndarray
+    incident_counts: np.ndarray
+
+    @classmethod
+    def build(cls, faces: np.ndarray, edges: np.ndarray, vertex_count: int) -> "_Rings":
+        ends = np.concatenate((edges[:, 0], edges[:, 1]))
+        others = np.concatenate((edges[:, 1], edges[:, 0]))
+        neighbour_counts = np.bincount(ends, minlength=vertex_count)
+        flat = faces.reshape(-1)
+        incident_counts = np.bincount(flat, minlength=vertex_count)
+        return cls(
+            faces=faces,
+            keys=edges[:, 0] * vertex_count + edges[:, 1],
+            neighbours=others[np.argsort(ends)],
+            neighbour_starts=np.cumsum(neighbour_counts) - neighbour_counts,
+            neighbour_counts=neighbour_counts,
+            incident=np.argsort(flat) // 3,
+            incident_starts=np.cumsum(incident_counts) - incident_counts,
+            incident_counts=incident_counts,
+        )
+
+
+class _Collapser:
+    """Edge collapse in passes of independent, cheapest-first collapses over a welded triangle soup.
+
+    Every pass recomputes the edges of the surviving faces, reuses the optimal
+    targets of edges whose endpoints did not move, and keeps the cheapest edges
+    the remaining reduction could still need. From those it greedily picks, in
+    cost order, collapses that pass the link condition and the normal-flip test
+    and have no endpoint on a face around another picked collapse. Such
+    collapses modify disjoint faces, so the whole set is applied with array
+    operations and checks made against the pre-pass mesh stay valid.
+    """
+
+    def __init__(self, positions: np.ndarray, faces: np.ndarray, min_cos: float) -> None:
+        self.positions = positions
+        self.quadrics = accumulate_quadrics(positions, faces)
+        self.faces = faces.copy()
+        self.alive = np.ones(faces.shape[0], dtype=bool)
+        self.min_cos = min_cos
+        # Edge keys, targets and costs of the previous pass; reused unless an endpoint moved since.
+        self._cached = (np.empty(0, dtype=np.int64), np.empty((0, 3)), np.empty(0))
+        self._moved = np.zeros(positions.shape[0], dtype=bool)
+
+    def collapse_to(self, target_faces: int) -> None:
+        growth = 1
+        while True:
+            rows = np.flatnonzero(self.alive)
+            excess = rows.size - target_faces
+            if excess <= 0:
+                return
+            faces = self.faces[rows]
+            edges, shared = self._edges(faces)
+            targets, costs = self._costs(edges)
+            # Each collapse removes about two faces; look no further than the edges still needed.
+            wanted = min(edges.shape[0], ((excess + 1) // 2) * growth)
+            pool = np.argpartition(costs, wanted - 1)[:wanted] if wanted < edges.shape[0] else np.arange(wanted)
+            pool = pool[np.argsort(costs[pool], kind="stable")]
+            rings = _Rings.build(faces, edges, self.positions.shape[0])
+            chosen = pool[self._independent(rings, edges[pool], targets[pool])]
+            if not chosen.size:
+                if wanted == edges.shape[0]:
+                    return
+                growth *= 4
+                continue
+            growth = 1
+            removed = np.cumsum(shared[chosen])
+            chosen = chosen[: int(np.searchsorted(removed, excess)) + 1]
+            self._collapse(rows, faces, edges[chosen], targets[chosen])
+
+    def _edges(self, faces: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Unique ``(low, high)`` vertex pairs of ``faces`` and the number of faces using each."""
+
+        count = self.positions.shape[0]
+        directed = np.concatenate((faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]]))
+        # Degenerate input faces repeat a vertex; such self-loops are not collapsible edges.
+        directed = directed[directed[:, 0] != directed[:, 1]]
+        keys = np.minimum(directed[:, 0], directed[:, 1]) * count + np.maximum(directed[:, 0], directed[:, 1])
+        keys, shared = np.unique(keys, return_counts=True)
+        return np.stack((keys // count, keys % count), axis=1), shared
+
+    def _costs(self, edges: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        keys = edges[:, 0] * self.positions.shape[0] + edges[:, 1]
+        cached_keys, targets, costs = self._cached
+        if cached_keys.size:
+            slot = np.minimum(np.searchsorted(cached_keys, keys), cached_keys.size - 1)
+            reuse = (cached_keys[slot] == keys) & ~self._moved[edges[:, 0]] & ~self._moved[edges[:, 1]]
+            targets, costs = targets[slot], costs[slot]
+        else:
+            reuse = np.zeros(keys.size, dtype=bool)
+            targets, costs = np.empty((keys.size, 3)), np.empty(keys.size)
+        stale = np.flatnonzero(~reuse)
+        for start in range(0, stale.size, _COST_CHUNK):
+            chunk = stale[start : start + _COST_CHUNK]
+            u, v = edges[chunk].T
+            targets[chunk], costs[chunk] = optimal_collapse(
+                self.quadrics[u] + self.quadrics[v], self.positions[u], self.positions[v]
+            )
+        self._cached = (keys, targets, costs)
+        self._moved[:] = False
+        return targets, costs
+
+    def _valid(self, rings: _Rings, edges: np.ndarray, targets: np.ndarray) -> np.ndarray:
+        """Mask of ``edges`` passing the link condition and the normal-flip test."""
+
+        count = self.positions.shape[0]
+        u, v = edges.T
+
+        # Link condition: an interior edge may share at most two neighbours to stay manifold.
+        rows, position = _expand(rings.neighbour_starts[u], rings.neighbour_counts[u])
+        neighbour, end = rings.neighbours[position], v[rows]
+        probe = np.minimum(neighbour, end) * count + np.maximum(neighbour, end)
+        found = rings.keys[np.minimum(np.searchsorted(rings.keys, probe), rings.keys.size - 1)] == probe
+        valid = np.bincount(rows, weights=found, minlength=edges.shape[0]) <= 2
+
+        # Faces around either endpoint that survive the collapse must keep their orientation.
+        endpoints = np.concatenate((u, v))
+        rows, position = _expand(rings.incident_starts[endpoints], rings.incident_counts[endpoints])
+        rows %= edges.shape[0]
+        corners = rings.faces[rings.incident[position]]
+        at_u = corners == u[rows, None]
+        at_v = corners == v[rows, None]
+        kept = ~(at_u.any(axis=1) & at_v.any(axis=1))
+        rows, corners, moving = rows[kept], corners[kept], (at_u | at_v)[kept]
+        before = self.positions[corners]
+        after = np.where(moving[..., None], targets[rows, None, :], before)
+        before = _cross(before[:, 1] - before[:, 0], before[:, 2] - before[:, 0])
+        after = _cross(after[:, 1] - after[:, 0], after[:, 2] - after[:, 0])
+        before_length = np.sqrt((before * before).sum(axis=1))
+        after_length = np.sqrt((after * after).sum(axis=1))
+        norms = before_length * after_length
+        cosine = (before * after).sum(axis=1) / np.where(norms > 0, norms, 1.0)
+        flipped = (after_length <= 1e-12 * (before_length + 1e-30)) | (cosine < self.min_cos)
+        return valid & (np.bincount(rows, weights=flipped, minlength=edges.shape[0]) == 0)
+
+    def _independent(self, rings: _Rings, edges: np.ndarray, targets: np.ndarray) -> np.ndarray:
+        """Greedy set of valid ``edges`` (sorted by cost) with no two endpoints on a common face.
+
+        Each round takes the open candidates that are the cheapest on every face
+        around both endpoints; the valid ones are chosen and close every
+        candidate touching their faces, the invalid ones are dropped. Rounds
+        continue until no candidate is open.
+        """
+
+        count = self.positions.shape[0]
+        faces, flat = rings.faces, rings.faces.reshape(-1)
+        chosen = np.zeros(edges.shape[0], dtype=bool)
+        open_ = np.arange(edges.shape[0])
+        while open_.size:
+            ends = edges[open_]
+            lowest = np.full(count, edges.shape[0], dtype=np.int64)
+            np.minimum.at(lowest, ends[:, 0], open_)
+            np.minimum.at(lowest, ends[:, 1], open_)
+            around = np.full(count, edges.shape[0], dtype=np.int64)
+            np.minimum.at(around, flat, np.repeat(lowest[faces].min(axis=1), 3))
+            leading = (around[ends[:, 0]] == open_) & (around[ends[:, 1]] == open_)
+            winners = open_[leading]
+            winners = winners[self._valid(rings, edges[winners], targets[winners])]
+            chosen[winners] = True
+            hot = np.zeros(count, dtype=bool)
+            hot[edges[winners]] = True
+            locked = np.zeros(count, dtype=bool)
+            locked[faces[hot[faces].any(axis=1)]] = True
+            open_ = open_[~leading & ~(locked[ends[:, 0]] | locked[ends[:, 1]])]
+        return chosen
+
+    def _collapse(self, rows: np.ndarray, faces: np.ndarray, edges: np.ndarray, targets: np.ndarray) -> None:
+        u, v = edges.T
+        self._moved[u] = True
+        self.positions[u] = targets
+        self.quadrics[u] += self.quadrics[v]
+        remap = np.arange(self.positions.shape[0])
+        remap[v] = u
+        faces = remap[faces]
+        self.faces[rows] = faces
+        self.alive[rows] = (faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 2] != faces[:, 0])
+
+
+def _recompute_normals(positions: np.ndarray, indices: np.ndarray) -> np.ndarray:
+    corners = positions[indices]
+    face_normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    normals = np.zeros_like(positions)
+    for corner in range(3):
+        np.add.at(normals, indices[:, corner], face_normals)
+    length = np.linalg.norm(normals, axis=1, keepdims=True)
+    return (normals / np.where(length > 0, length, 1.0)).astype(np.float32)
+
+
+def _attribute_features(mesh: MeshData) -> Optional[np.ndarray]:
+    columns = [np.asarray(array, dtype=np.float64) for array in (mesh.normals, mesh.uvs) if array is not None]
+    return np.concatenate(columns, axis=1) if columns else None
+
+
+def _reassign_attributes(
+    mesh: MeshData,
+    welded_faces: np.ndarray,
+    attribute_faces: np.ndarray,
+    alive: np.ndarray,
+    final_welded: np.ndarray,
+) -> np.ndarray:
+    """Pick, for every surviving corner, an attribute vertex belonging to its final position.
+
+    Corners whose vertex survived keep their attributes. Corners that were collapsed
+    onto another vertex take the attribute vertex of that vertex closest to their own
+    (so UV/normal seams stay split instead of smearing one side's attributes).
+    """
+
+    original_welded = welded_faces[alive].reshape(-1)
+    attributes = attribute_faces[alive].reshape(-1).copy()
+    moved = np.flatnonzero(original_welded != final_welded)
+    if not moved.size:
+        return attributes
+
+    owner = np.full(mesh.vertex_count, -1, dtype=np.int64)
+    owner[attribute_faces.reshape(-1)] = welded_faces.reshape(-1)
+    used = np.flatnonzero(owner >= 0)
+    order = used[np.argsort(owner[used], kind="stable")]
+    starts = np.searchsorted(owner[order], np.arange(int(owner.max(initial=0)) + 2))
+    features = _attribute_features(mesh)
+
+    for corner in moved.tolist():
+        target = final_welded[corner]
+        candidates = order[starts[target] : starts[target + 1]]
+        if candidates.size == 1 or features is None:
+            attributes[corner] = candidates[0]
+            continue
+        distance = ((features[candidates] - features[attributes[corner]]) ** 2).sum(axis=1)
+        attributes[corner] = candidates[int(np.argmin(distance))]
+    return attributes
+
+
+def decimate_mesh(
+    mesh: MeshData,
+    ratio: float,
+    *,
+    preserve_normals: bool = True,
+    target_triangles: Optional[int] = None,
+) -> MeshData:
+    """Return a copy of ``mesh`` reduced to roughly ``ratio`` of its triangles.
+
+    Topology is computed on position-welded vertices so UV/normal seams do not
+    tear; attribute vertices are re-selected per corner after collapsing.
+    With ``preserve_normals`` the source normals are carried over and collapses
+    that bend neighbouring faces by more than 60 degrees are rejected; otherwise
+    only face inversions are rejected and normals are recomputed.
+    """
+
+    if not 0.0 < ratio <= 1.0:
+        raise ValueError(f"Decimation ratio must be in (0, 1], got {ratio}")
+    attribute_faces = np.asarray(mesh.indices, dtype=np.int64).reshape(-1, 3)
+    total = attribute_faces.shape[0]
+    target = target_triangles if target_triangles is not None else int(math.ceil(total * ratio))
+    if total == 0 or target >= total:
+        return mesh
+
+    positions, faces = _weld(np.asarray(mesh.positions), attribute_faces)
+    collapser = _Collapser(positions.copy(), faces, FLIP_COS_PRESERVE if preserve_normals else FLIP_COS_DEFAULT)
+    collapser.collapse_to(target)
+
+    alive = collapser.alive
+    welded = collapser.faces[alive].reshape(-1)
+    attributes = _reassign_attributes(mesh, faces, attribute_faces, alive, welded)
+    keys, inverse = np.unique(welded * mesh.vertex_count + attributes, return_inverse=True)
+    pairs = np.stack(np.divmod(keys, mesh.vertex_count), axis=1)
+    indices = inverse.reshape(-1, 3).astype(np.uint32)
+    new_positions = collapser.positions[pairs[:, 0]].astype(np.float32)
+
+    if mesh.normals is None:
+        normals = None
+    elif preserve_normals:
+        normals = np.ascontiguousarray(np.asarray(mesh.normals)[pairs[:, 1]], dtype=np.float32)
+    else:
+        normals = _recompute_normals(new_positions, indices.astype(np.int64))
+    uvs = None if mesh.uvs is None else np.ascontiguousarray(np.asarray(mesh.uvs)[pairs[:, 1]], dtype=np.float32)
+    return MeshData(positions=new_positions, indices=indices, normals=normals, uvs=uvs, material=mesh.material)
+
+
+__all__ = ["accumulate_quadrics", "decimate_mesh", "optimal_collapse"]
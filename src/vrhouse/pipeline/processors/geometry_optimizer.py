@@ -1,19 +1,66 @@
 """Utilities that adapt geometry for VR friendly rendering."""
 from __future__ import annotations
 
-from typing import Dict
+from typing import Callable, Dict, Mapping, Optional, Sequence
 
-from vrhouse.core import PipelineError
+from vrhouse.core import PipelineError, SceneGraph
+from vrhouse.pipeline.processors.lod import DEFAULT_LOD_RATIOS, generate_lod_chains
 
 
 class GeometryOptimizer:
-    """Optimize geometry and mesh data for VR consumption."""
+    """Optimize geometry and mesh data for VR consumption.
 
-    def optimize(self, scene_graph: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, str]]:
+    Each mesh is first decimated by ``decimation_ratio``; ``lod_ratios`` then
+    describes the LOD chain relative to that result (the first entry becomes the
+    mesh itself, the remaining ones are stored in ``SceneGraph.lods``).
+    """
+
+    def __init__(
+        self,
+        decimation_ratio: float = 0.5,
+        preserve_normals: bool = True,
+        lod_ratios: Sequence[float] = DEFAULT_LOD_RATIOS,
+        min_triangles: int = 64,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        if not 0.0 < decimation_ratio <= 1.0:
+            raise PipelineError(f"decimation_ratio must be in (0, 1], got {decimation_ratio}")
+        if not lod_ratios or any(not 0.0 < ratio <= 1.0 for ratio in lod_ratios):
+            raise PipelineError(f"lod_ratios must be non-empty values in (0, 1], got {lod_ratios}")
+        self.decimation_ratio = decimation_ratio
+        self.preserve_normals = preserve_normals
+        self.lod_ratios = tuple(lod_ratios)
+        self.min_triangles = min_triangles
+        self.max_workers = max_workers
+
+    def optimize(
+        self,
+        scene_graph: SceneGraph | Mapping[str, Dict[str, object]],
+        progress: Optional[Callable[[float], None]] = None,
+    ) -> SceneGraph:
         """Run optimization routines such as decimation and UV unwrapping."""
         if "root" not in scene_graph:
             raise PipelineError("Scene graph missing root node")
 
-        optimized = dict(scene_graph)
-        optimized["root"] = {**scene_graph["root"], "geometry_optimized": "true"}
+        optimized = SceneGraph.coerce(scene_graph).copy()
+        before = optimized.triangle_count
+        # Meshes are shared between nodes, so each one is processed exactly once.
+        mesh_ids = [
+            mesh_id for mesh_id, mesh in enumerate(optimized.meshes) if mesh.triangle_count >= self.min_triangles
+        ]
+        ratios = tuple(self.decimation_ratio * ratio for ratio in self.lod_ratios)
+        if mesh_ids and (ratios[0] < 1.0 or len(ratios) > 1):
+            chains = generate_lod_chains(
+                [optimized.meshes[mesh_id] for mesh_id in mesh_ids],
+                ratios,
+                preserve_normals=self.preserve_normals,
+                max_workers=self.max_workers,
+                progress=progress,
+            )
+            for mesh_id, chain in zip(mesh_ids, chains):
+                optimized.replace_mesh(mesh_id, chain[0])
+                optimized.set_lods(mesh_id, chain[1:])
+        optimized.set_attribute(0, "geometry_optimized", "true")
+        optimized.metadata["triangles_before_optimization"] = before
+        optimized.metadata["triangles_after_optimization"] = optimized.triangle_count
         return optimized
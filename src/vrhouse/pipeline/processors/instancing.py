@@ -0,0 +1,233 @@
+"""Detect rigidly repeated meshes (windows, doors, chairs...) and collapse them into instances."""
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from vrhouse.core import MeshData, SceneGraph
+
+DEFAULT_TOLERANCE = 1e-4
+
+
+@dataclass
+class InstancingStats:
+    meshes_before: int = 0
+    meshes_after: int = 0
+    instanced_nodes: int = 0
+    bytes_saved: int = 0
+
+
+@dataclass
+class _Canonical:
+    """Translation/rotation-invariant description of one mesh."""
+
+    centroid: np.ndarray
+    axes: np.ndarray
+    centered: np.ndarray
+    scale: float
+    key: Tuple[object, ...]
+
+
+def canonicalize(mesh: MeshData, tolerance: float = DEFAULT_TOLERANCE) -> _Canonical:
+    """Move ``mesh`` into its principal-axes frame and derive a rigid-motion-invariant hash key.
+
+    The key combines vertex/triangle counts, material, the covariance eigenvalues and
+    radial moments about the centroid, all rounded relative to the mesh size. Equal
+    keys only nominate candidates; ``match_rigid`` confirms them exactly.
+    """
+
+    positions = np.asarray(mesh.positions, dtype=np.float64)
+    centroid = positions.mean(axis=0) if positions.size else np.zeros(3)
+    centered = positions - centroid
+    covariance = centered.T @ centered / max(len(positions), 1)
+    eigenvalues, axes = np.linalg.eigh(covariance)
+    radii = np.linalg.norm(centered, axis=1)
+    scale = float(radii.max(initial=0.0)) or 1.0
+    quantum = tolerance * scale
+    features = np.concatenate(
+        (np.sqrt(np.maximum(eigenvalues, 0.0)), [radii.mean(), np.sqrt((radii**2).mean()), scale])
+    )
+    key = (
+        mesh.vertex_count,
+        mesh.triangle_count,
+        mesh.material,
+        mesh.normals is not None,
+        mesh.uvs is not None,
+        tuple(np.round(features / (quantum * 100)).astype(np.int64).tolist()),
+    )
+    return _Canonical(centroid=centroid, axes=axes, centered=centered, scale=scale, key=key)
+
+
+def _kabsch(source: np.ndarray, target: np.ndarray) -> np.ndarray:
+    u, _, vt = np.linalg.svd(source.T @ target)
+    d = np.sign(np.linalg.det(vt.T @ u.T)) or 1.0
+    return vt.T @ np.diag((1.0, 1.0, d)) @ u.T
+
+
+def _canonical_triangles(indices: np.ndarray) -> np.ndarray:
+    """Rotate each triangle so its smallest index comes first (keeps winding), then sort rows."""
+
+    shift = np.argmin(indices, axis=1)
+    rows = np.arange(indices.shape[0])[:, None]
+    rotated = indices[rows, (shift[:, None] + np.arange(3)) % 3]
+    return rotated[np.lexsort(rotated.T[::-1])]
+
+
+def _vertex_keys(
+    centered: np.ndarray, mesh: MeshData, rotation: Optional[np.ndarray], quantum: float, tolerance: float
+) -> np.ndarray:
+    """Quantised (position, uv, normal) rows; ``rotation`` maps the mesh into the other's frame."""
+
+    positions = centered if rotation is None else centered @ rotation.T
+    columns = [np.round(positions / quantum)]
+    if mesh.uvs is not None:
+        columns.append(np.round(np.asarray(mesh.uvs, dtype=np.float64) / tolerance))
+    if mesh.normals is not None:
+        normals = np.asarray(mesh.normals, dtype=np.float64)
+        columns.append(np.round((normals if rotation is None else normals @ rotation.T) / 1e-3))
+    return np.concatenate(columns, axis=1).astype(np.int64)
+
+
+def _attributes_match(reference: MeshData, candidate: MeshData, rotation: np.ndarray, tolerance: float) -> bool:
+    if reference.uvs is not None and np.abs(np.asarray(reference.uvs) - np.asarray(candidate.uvs)).max(
+        initial=0.0
+    ) > tolerance:
+        return False
+    if reference.normals is not None:
+        rotated = np.asarray(reference.normals, dtype=np.float64) @ rotation.T
+        if np.abs(rotated - np.asarray(candidate.normals)).max(initial=0.0) > 1e-3:
+            return False
+    return True
+
+
+def _verify(
+    reference: MeshData,
+    candidate: MeshData,
+    rotation: np.ndarray,
+    reference_canonical: _Canonical,
+    candidate_canonical: _Canonical,
+    tolerance: float,
+) -> bool:
+    """Check that ``rotation`` maps every vertex and triangle of ``reference`` onto ``candidate``.
+
+    Vertices are compared through quantised keys, and triangles through the labels
+    of those keys, so vertex order and exact duplicates (seams) do not matter.
+    """
+
+    quantum = tolerance * reference_canonical.scale
+    if np.array_equal(reference.indices, candidate.indices):
+        # Same vertex order (the usual case for family copies): compare vertex by vertex.
+        moved_positions = reference_canonical.centered @ rotation.T
+        if np.abs(moved_positions - candidate_canonical.centered).max(initial=0.0) <= quantum and _attributes_match(
+            reference, candidate, rotation, tolerance
+        ):
+            return True
+
+    # Otherwise compare quantised vertex classes; grid straddling can only cause a missed match.
+    moved = _vertex_keys(reference_canonical.centered, reference, rotation, quantum, tolerance)
+    target = _vertex_keys(candidate_canonical.centered, candidate, None, quantum, tolerance)
+    _, labels = np.unique(np.concatenate((moved, target)), axis=0, return_inverse=True)
+    labels = labels.reshape(-1)
+    moved_labels, target_labels = labels[: len(moved)], labels[len(moved) :]
+    if not np.array_equal(np.sort(moved_labels), np.sort(target_labels)):
+        return False
+    return np.array_equal(
+        _canonical_triangles(moved_labels[np.asarray(reference.indices, dtype=np.int64)]),
+        _canonical_triangles(target_labels[np.asarray(candidate.indices, dtype=np.int64)]),
+    )
+
+
+def match_rigid(
+    reference: MeshData,
+    candidate: MeshData,
+    reference_canonical: Optional[_Canonical] = None,
+    candidate_canonical: Optional[_Canonical] = None,
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> Optional[np.ndarray]:
+    """Return the 4x4 rigid transform mapping ``reference`` onto ``candidate``, if one exists.
+
+    Copies exported with the same vertex order are aligned directly with Kabsch;
+    otherwise the four proper sign combinations of the principal axes are tried.
+    """
+
+    reference_canonical = reference_canonical or canonicalize(reference, tolerance)
+    candidate_canonical = candidate_canonical or canonicalize(candidate, tolerance)
+    if reference_canonical.key != candidate_canonical.key:
+        return None
+
+    rotations = [_kabsch(reference_canonical.centered, candidate_canonical.centered)]
+    for signs in ((1, 1, 1), (-1, -1, 1), (-1, 1, -1), (1, -1, -1)):
+        rotation = candidate_canonical.axes @ np.diag(signs) @ reference_canonical.axes.T
+        if np.linalg.det(rotation) < 0:
+            rotation = candidate_canonical.axes @ np.diag(np.negative(signs)) @ reference_canonical.axes.T
+        rotations.append(rotation)
+
+    for rotation in rotations:
+        if _verify(reference, candidate, rotation, reference_canonical, candidate_canonical, tolerance):
+            transform = np.eye(4)
+            transform[:3, :3] = rotation
+            transform[:3, 3] = candidate_canonical.centroid - rotation @ reference_canonical.centroid
+            return transform
+    return None
+
+
+class InstanceDeduplicator:
+    """Processor stage collapsing rigid copies of a mesh into one shared mesh plus transforms.
+
+    Nodes that referenced a duplicate are re-pointed at the prototype mesh and
+    their transform is post-multiplied by the prototype-to-copy motion, so world
+    placement is unchanged. Runs before decimation so each prototype is
+    simplified once.
+    """
+
+    def __init__(self, tolerance: float = DEFAULT_TOLERANCE) -> None:
+        self.tolerance = tolerance
+        self.last_stats: Optional[InstancingStats] = None
+
+    def deduplicate(
+        self,
+        scene_graph: SceneGraph | Mapping[str, Dict[str, object]],
+        progress: Optional[Callable[[float], None]] = None,
+    ) -> SceneGraph:
+        graph = SceneGraph.coerce(scene_graph).copy()
+        stats = InstancingStats(meshes_before=len(graph.meshes))
+
+        buckets: Dict[Tuple[object, ...], List[Tuple[int, _Canonical]]] = {}
+        replacement: Dict[int, Tuple[int, np.ndarray]] = {}
+        for mesh_id, mesh in enumerate(graph.meshes):
+            canonical = canonicalize(mesh, self.tolerance)
+            prototypes = buckets.setdefault(canonical.key, [])
+            for prototype_id, prototype_canonical in prototypes:
+                motion = match_rigid(
+                    graph.meshes[prototype_id], mesh, prototype_canonical, canonical, self.tolerance
+                )
+                if motion is not None:
+                    replacement[mesh_id] = (prototype_id, motion)
+                    stats.bytes_saved += mesh.nbytes
+                    break
+            else:
+                prototypes.append((mesh_id, canonical))
+            if progress is not None:
+                progress((mesh_id + 1) / len(graph.meshes))
+
+        if replacement:
+            mesh_ids = graph.mesh_ids
+            nodes = np.flatnonzero(np.isin(mesh_ids, list(replacement)))
+            transforms = np.array(graph.transforms[nodes], dtype=np.float64)
+            for row, node in enumerate(nodes.tolist()):
+                prototype_id, motion = replacement[int(mesh_ids[node])]
+                graph.set_mesh(node, prototype_id)
+                transforms[row] = transforms[row] @ motion
+            graph.set_transforms(nodes, transforms.astype(np.float32))
+            graph.compact_meshes()
+            stats.instanced_nodes = int(nodes.size)
+
+        stats.meshes_after = len(graph.meshes)
+        self.last_stats = stats
+        graph.metadata["instancing"] = asdict(stats)
+        return graph
+
+
+__all__ = ["InstanceDeduplicator", "InstancingStats", "canonicalize", "match_rigid"]
@@ -0,0 +1,257 @@
+"""Parallel level-of-detail chain generation over shared-memory mesh buffers."""
+from __future__ import annotations
+
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from multiprocessing.context import BaseContext
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from vrhouse.core import MeshData
+from vrhouse.pipeline.processors.decimation import decimate_mesh
+
+DEFAULT_LOD_RATIOS: Tuple[float, ...] = (1.0, 0.5, 0.25, 0.1)
+# Below this many triangles in total, process start-up costs more than it saves.
+PARALLEL_THRESHOLD = 20_000
+_MESH_FIELDS = ("positions", "indices", "normals", "uvs")
+_ALIGNMENT = 64
+
+
+@dataclass(frozen=True)
+class SharedArraySpec:
+    field: str
+    dtype: str
+    shape: Tuple[int, ...]
+    offset: int
+
+
+@dataclass(frozen=True)
+class SharedMeshHandle:
+    """Picklable description of a mesh living inside a shared-memory block."""
+
+    block: str
+    arrays: Tuple[SharedArraySpec, ...]
+    material: Optional[str]
+
+
+@dataclass(frozen=True)
+class SharedArraysHandle:
+    """Picklable description of named arrays living inside a shared-memory block."""
+
+    block: str
+    arrays: Tuple[SharedArraySpec, ...]
+
+
+def process_context() -> BaseContext:
+    """Start method for processor pools.
+
+    Stages run on scheduler threads, and forking a process that runs threads can
+    deadlock the child, so pools start their workers from a fork server (or spawn).
+    """
+
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def _aligned(size: int) -> int:
+    return (size + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def share_meshes(meshes: Sequence[MeshData]) -> Tuple[Optional[SharedMemory], List[SharedMeshHandle]]:
+    """Copy ``meshes`` into one shared-memory block and describe where each array lives.
+
+    The caller owns the returned block and must ``close()`` and ``unlink()`` it.
+    """
+
+    layout: List[List[SharedArraySpec]] = []
+    total = 0
+    for mesh in meshes:
+        specs = []
+        for name in _MESH_FIELDS:
+            array = getattr(mesh, name)
+            if array is None:
+                continue
+            array = np.asarray(array)
+            specs.append(SharedArraySpec(name, array.dtype.str, tuple(array.shape), total))
+            total += _aligned(array.nbytes)
+        layout.append(specs)
+    if total == 0:
+        return None, [SharedMeshHandle("", tuple(specs), mesh.material) for specs, mesh in zip(layout, meshes)]
+
+    block = SharedMemory(create=True, size=total)
+    for mesh, specs in zip(meshes, layout):
+        for spec in specs:
+            _view(block, spec)[...] = getattr(mesh, spec.field)
+    return block, [SharedMeshHandle(block.name, tuple(specs), mesh.material) for specs, mesh in zip(layout, meshes)]
+
+
+def _view(block: SharedMemory, spec: SharedArraySpec) -> np.ndarray:
+    return np.ndarray(spec.shape, dtype=np.dtype(spec.dtype), buffer=block.buf, offset=spec.offset)
+
+
+def share_arrays(arrays: Mapping[str, np.ndarray]) -> Tuple[Optional[SharedMemory], SharedArraysHandle]:
+    """Copy ``arrays`` into one shared-memory block; the caller owns the block, as with ``share_meshes``."""
+
+    specs = []
+    total = 0
+    for name, array in arrays.items():
+        array = np.asarray(array)
+        specs.append(SharedArraySpec(name, array.dtype.str, tuple(array.shape), total))
+        total += _aligned(array.nbytes)
+    if total == 0:
+        return None, SharedArraysHandle("", tuple(specs))
+
+    block = SharedMemory(create=True, size=total)
+    for spec in specs:
+        _view(block, spec)[...] = arrays[spec.field]
+    return block, SharedArraysHandle(block.name, tuple(specs))
+
+
+def read_shared_arrays(block: SharedMemory, handle: SharedArraysHandle, *, copy: bool) -> Dict[str, np.ndarray]:
+    return {spec.field: np.array(_view(block, spec)) if copy else _view(block, spec) for spec in handle.arrays}
+
+
+def read_shared_mesh(block: SharedMemory, handle: SharedMeshHandle, *, copy: bool) -> MeshData:
+    arrays: Dict[str, np.ndarray] = {}
+    for spec in handle.arrays:
+        view = _view(block, spec)
+        arrays[spec.field] = np.array(view) if copy else view
+    return MeshData(material=handle.material, **arrays)
+
+
+def decimate_chain(
+    mesh: MeshData, ratios: Sequence[float], *, preserve_normals: bool = True
+) -> List[MeshData]:
+    """Produce one mesh per ratio (relative to ``mesh``), each decimated from the previous level."""
+
+    chain: List[MeshData] = []
+    current = mesh
+    total = mesh.triangle_count
+    for ratio in ratios:
+        target = max(1, int(math.ceil(total * ratio)))
+        if target < current.triangle_count:
+            current = decimate_mesh(
+                current, 1.0, preserve_normals=preserve_normals, target_triangles=target
+            )
+        chain.append(current)
+    return chain
+
+
+def _chain_worker(
+    handle: SharedMeshHandle, ratios: Tuple[float, ...], preserve_normals: bool
+) -> Tuple[str, List[SharedMeshHandle]]:
+    """Decimate a shared mesh and publish the chain in a fresh shared block (owned by the parent)."""
+
+    source = SharedMemory(name=handle.block)
+    try:
+        mesh = read_shared_mesh(source, handle, copy=False)
+        chain = decimate_chain(mesh, ratios, preserve_normals=preserve_normals)
+        # Copy out before closing: unchanged levels still alias the parent's block.
+        output, handles = share_meshes(chain)
+        del mesh, chain
+    finally:
+        source.close()
+
+    if output is None:
+        return "", handles
+    name = output.name
+    output.close()
+    return name, handles
+
+
+def generate_lod_chains(
+    meshes: Sequence[MeshData],
+    ratios: Sequence[float] = DEFAULT_LOD_RATIOS,
+    *,
+    preserve_normals: bool = True,
+    max_workers: Optional[int] = None,
+    progress: Optional[Callable[[float], None]] = None,
+) -> List[List[MeshData]]:
+    """Build an LOD chain for every mesh, fanning independent meshes out to a process pool.
+
+    Vertex and index buffers travel through ``multiprocessing.shared_memory``; only
+    small handles are pickled. Small workloads run inline. ``progress`` receives
+    the fraction of input triangles whose chains are finished.
+    """
+
+    ratios = tuple(float(ratio) for ratio in ratios)
+    if any(not 0.0 < ratio <= 1.0 for ratio in ratios):
+        raise ValueError(f"LOD ratios must be in (0, 1], got {ratios}")
+    workers = max_workers or os.cpu_count() or 1
+    total_triangles = sum(mesh.triangle_count for mesh in meshes)
+    finished = 0
+
+    def advance(index: int) -> None:
+        nonlocal finished
+        finished += meshes[index].triangle_count
+        if progress is not None:
+            progress(finished / max(total_triangles, 1))
+
+    if workers <= 1 or len(meshes) <= 1 or total_triangles < PARALLEL_THRESHOLD:
+        chains = []
+        for index, mesh in enumerate(meshes):
+            chains.append(decimate_chain(mesh, ratios, preserve_normals=preserve_normals))
+            advance(index)
+        return chains
+
+    block, handles = share_meshes(meshes)
+    results: List[List[MeshData]] = [[] for _ in meshes]
+    try:
+        # Largest meshes first so the long tail does not serialise at the end.
+        order = sorted(range(len(meshes)), key=lambda index: meshes[index].triangle_count, reverse=True)
+        with ProcessPoolExecutor(max_workers=min(workers, len(meshes)), mp_context=process_context()) as pool:
+            futures = {
+                pool.submit(_chain_worker, handles[index], ratios, preserve_normals): index
+                for index in order
+            }
+            failure: Optional[BaseException] = None
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    name, chain_handles = future.result()
+                except BaseException as exc:  # keep draining so every output block gets unlinked
+                    failure = failure or exc
+                    continue
+                results[index] = collect_shared_meshes(name, chain_handles)
+                advance(index)
+            if failure is not None:
+                raise failure
+    finally:
+        if block is not None:
+            block.close()
+            block.unlink()
+    return results
+
+
+def collect_shared_meshes(name: str, handles: List[SharedMeshHandle]) -> List[MeshData]:
+    """Copy the meshes a worker published in block ``name`` out of it, then unlink the block."""
+
+    if not name:
+        return [MeshData(material=handle.material, **{spec.field: np.zeros(spec.shape, spec.dtype)
+                                                      for spec in handle.arrays}) for handle in handles]
+    block = SharedMemory(name=name)
+    try:
+        return [read_shared_mesh(block, handle, copy=True) for handle in handles]
+    finally:
+        block.close()
+        block.unlink()
+
+
+__all__ = [
+    "DEFAULT_LOD_RATIOS",
+    "SharedArraysHandle",
+    "SharedMeshHandle",
+    "collect_shared_meshes",
+    "decimate_chain",
+    "generate_lod_chains",
+    "process_context",
+    "read_shared_arrays",
+    "read_shared_mesh",
+    "share_arrays",
+    "share_meshes",
+]
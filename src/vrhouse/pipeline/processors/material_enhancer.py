@@ -1,19 +1,97 @@
 """Apply AI-powered material enhancements for realism."""
 from __future__ import annotations
 
-from typing import Dict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Mapping, Optional, Sequence
+
+import numpy as np
+
+from vrhouse.core import PipelineError, SceneGraph
+from vrhouse.pipeline.cache import StageCache
+from vrhouse.pipeline.processors.textures import (
+    DEFAULT_TEXTURE_RESOLUTION,
+    ProcessedTexture,
+    TextureProcessor,
+    collect_texture_sources,
+    texture_metadata,
+)
+
+
+@dataclass
+class MaterialPlan:
+    """Material decisions for a scene, computed independently of its geometry.
+
+    ``assignments`` maps a material name to the node indices that receive it.
+    Geometry stages never add or reorder nodes, so a plan made from an earlier
+    stage's graph can be applied to a later one. ``textures`` holds the processed
+    mip chains by the reference used in the material library.
+    """
+
+    node_count: int
+    assignments: Dict[str, np.ndarray] = field(default_factory=dict)
+    metadata: Dict[str, object] = field(default_factory=dict)
+    textures: Dict[str, ProcessedTexture] = field(default_factory=dict)
 
 
 class MaterialEnhancer:
-    """Attach PBR material metadata and textures."""
+    """Attach PBR material metadata and textures.
 
-    def enhance(self, scene_graph: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, str]]:
-        """Annotate nodes with material information inferred by AI models."""
-        enhanced = dict(scene_graph)
-        for node_id, node in enhanced.items():
-            if node_id == "root":
-                continue
-            node.setdefault("material", "ai-generated")
-        enhanced.setdefault("metadata", {})
-        enhanced["metadata"]["materials"] = "generated"
+    Referenced textures go through ``processors.textures.TextureProcessor``
+    (decode, resize to the budget of each of ``target_platforms``, full mip
+    chain); ``texture_cache`` shares the results across projects by content hash.
+    """
+
+    def __init__(
+        self,
+        texture_resolution: int = DEFAULT_TEXTURE_RESOLUTION,
+        target_platforms: Sequence[str] = (),
+        *,
+        process_textures: bool = True,
+        texture_cache: Optional[StageCache] = None,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        self.texture_resolution = texture_resolution
+        self.target_platforms = list(target_platforms)
+        self.process_textures = process_textures
+        self.max_workers = max_workers
+        self._textures = TextureProcessor(
+            texture_resolution, self.target_platforms, cache=texture_cache, max_workers=max_workers
+        )
+
+    def plan(
+        self,
+        scene_graph: SceneGraph | Mapping[str, Dict[str, object]],
+        report: Optional[Callable[[float], None]] = None,
+    ) -> MaterialPlan:
+        """Infer materials and process their textures without modifying the scene."""
+        graph = SceneGraph.coerce(scene_graph)
+        plan = MaterialPlan(node_count=len(graph), metadata={"materials": "generated"})
+        missing = np.flatnonzero(graph.material_ids[1:] < 0) + 1
+        if missing.size:
+            plan.assignments["ai-generated"] = missing
+        if self.process_textures:
+            plan.textures, errors = self._textures.process(collect_texture_sources(graph), report)
+            if plan.textures:
+                plan.metadata["textures"] = texture_metadata(plan.textures)
+            if errors:
+                plan.metadata["texture_errors"] = errors
+        return plan
+
+    def apply(self, scene_graph: SceneGraph | Mapping[str, Dict[str, object]], plan: MaterialPlan) -> SceneGraph:
+        """Return a copy of ``scene_graph`` with ``plan`` applied."""
+        enhanced = SceneGraph.coerce(scene_graph).copy()
+        if len(enhanced) != plan.node_count:
+            raise PipelineError("Material plan was computed for a different scene graph")
+        for material, indices in plan.assignments.items():
+            enhanced.set_materials(indices, material)
+        for name, texture in plan.textures.items():
+            enhanced.set_texture(name, texture.mips)
+        enhanced.metadata.update(plan.metadata)
         return enhanced
+
+    def enhance(self, scene_graph: SceneGraph | Mapping[str, Dict[str, object]]) -> SceneGraph:
+        """Annotate nodes with material information inferred by AI models."""
+        return self.apply(scene_graph, self.plan(scene_graph))
+
+
+__all__ = ["MaterialEnhancer", "MaterialPlan"]
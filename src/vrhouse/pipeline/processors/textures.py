@@ -0,0 +1,585 @@
+"""Texture decoding, budget resizing and mip-chain generation with a content-hashed cache.
+
+Textures referenced by the material library (MTL ``map_Kd``/``norm``/..., glTF
+``baseColorTexture``/``normalTexture``/...) are decoded to ``(height, width,
+channels)`` uint8 arrays, resized with an area filter to the largest
+power-of-two size that fits the platform budgets and reduced to a full mip
+chain. Colour textures are filtered in linear light and normal maps are
+renormalised on every level. Each platform gets the chain from the first level
+that fits its own budget, so a single chain serves every target.
+
+Results are keyed by the texture's content hash plus the processing settings,
+so the same wood-floor texture shared by many projects is processed once per
+cache directory. PNG and binary PPM/PGM are decoded natively; Pillow
+(``pip install vrhouse[textures]``) is used when installed and adds JPEG and the
+other common formats.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from vrhouse.core import PipelineError, SceneGraph
+from vrhouse.pipeline.cache import StageCache
+
+try:  # optional: ``pip install vrhouse[textures]``
+    from PIL import Image
+except ImportError:  # pragma: no cover - depends on the environment
+    Image = None
+
+TEXTURE_FORMAT_VERSION = 1
+DEFAULT_TEXTURE_RESOLUTION = 2048
+# Largest texture edge per headset; unknown platforms use ``texture_resolution``.
+PLATFORM_TEXTURE_BUDGETS: Dict[str, int] = {"meta-quest": 2048, "htc-vive": 4096, "pimax": 4096}
+
+COLOR = "color"
+NORMAL = "normal"
+DATA = "data"
+# Material keys (lower case) that reference textures, by how their texels are filtered.
+COLOR_KEYS = frozenset({"map_kd", "map_ka", "map_ks", "map_ke", "basecolortexture", "emissivetexture"})
+NORMAL_KEYS = frozenset({"norm", "normaltexture"})
+DATA_KEYS = frozenset(
+    {"map_bump", "bump", "map_d", "map_ns", "disp", "map_pr", "map_pm", "metallicroughnesstexture", "occlusiontexture"}
+)
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+
+class TextureError(PipelineError):
+    """A texture could not be read or decoded."""
+
+
+def texture_role(key: str) -> Optional[str]:
+    """Classify a material property key; ``None`` when it does not reference a texture."""
+
+    key = key.lower()
+    if key in COLOR_KEYS:
+        return COLOR
+    if key in NORMAL_KEYS:
+        return NORMAL
+    if key in DATA_KEYS:
+        return DATA
+    return None
+
+
+# -- decoding ------------------------------------------------------------------------------
+def _unfilter_png(raw: np.ndarray, height: int, stride: int, bpp: int) -> np.ndarray:
+    """Undo PNG scanline filters. None/Sub/Up rows are vectorised; Average/Paeth run per byte."""
+
+    rows = raw.reshape(height, stride + 1)
+    filters = rows[:, 0]
+    data = rows[:, 1:]
+    output = np.empty((height, stride), dtype=np.uint8)
+    previous = np.zeros(stride, dtype=np.uint8)
+    for y in range(height):
+        kind = int(filters[y])
+        line = data[y]
+        if kind == 0:
+            current = line.copy()
+        elif kind == 1:
+            current = np.cumsum(line.reshape(-1, bpp), axis=0, dtype=np.uint8).reshape(-1)
+        elif kind == 2:
+            current = line + previous
+        elif kind in (3, 4):
+            current = np.frombuffer(_unfilter_sequential(kind, line.tobytes(), previous.tobytes(), bpp), np.uint8)
+        else:
+            raise TextureError(f"Invalid PNG filter type {kind}")
+        output[y] = current
+        previous = current
+    return output
+
+
+def _unfilter_sequential(kind: int, line: bytes, previous: bytes, bpp: int) -> bytearray:
+    current = bytearray(line)
+    for index in range(len(current)):
+        left = current[index - bpp] if index >= bpp else 0
+        up = previous[index]
+        if kind == 3:
+            current[index] = (current[index] + ((left + up) >> 1)) & 0xFF
+            continue
+        up_left = previous[index - bpp] if index >= bpp else 0
+        estimate = left + up - up_left
+        distance_left, distance_up, distance_up_left = abs(estimate - left), abs(estimate - up), abs(estimate - up_left)
+        if distance_left <= distance_up and distance_left <= distance_up_left:
+            predictor = left
+        elif distance_up <= distance_up_left:
+            predictor = up
+        else:
+            predictor = up_left
+        current[index] = (current[index] + predictor) & 0xFF
+    return current
+
+
+def _decode_png(data: bytes) -> np.ndarray:
+    offset = len(_PNG_SIGNATURE)
+    header: Optional[Tuple[int, ...]] = None
+    palette: Optional[np.ndarray] = None
+    transparency: Optional[bytes] = None
+    compressed: List[bytes] = []
+    while offset + 8 <= len(data):
+        length, kind = struct.unpack_from(">I4s", data, offset)
+        body = data[offset + 8 : offset + 8 + length]
+        offset += 12 + length
+        if kind == b"IHDR":
+            header = struct.unpack(">IIBBBBB", body)
+        elif kind == b"PLTE":
+            palette = np.frombuffer(body, dtype=np.uint8).reshape(-1, 3)
+        elif kind == b"tRNS":
+            transparency = body
+        elif kind == b"IDAT":
+            compressed.append(body)
+        elif kind == b"IEND":
+            break
+    if header is None:
+        raise TextureError("PNG has no IHDR chunk")
+    width, height, depth, color_type, _, _, interlace = header
+    if interlace or color_type not in _PNG_CHANNELS or depth not in (1, 2, 4, 8, 16):
+        raise TextureError("Interlaced or unusual PNG layouts need Pillow (pip install vrhouse[textures])")
+
+    channels = _PNG_CHANNELS[color_type]
+    bits = channels * depth
+    stride = (width * bits + 7) // 8
+    raw = np.frombuffer(zlib.decompress(b"".join(compressed)), dtype=np.uint8)
+    if raw.size < height * (stride + 1):
+        raise TextureError("PNG image data is truncated")
+    rows = _unfilter_png(raw[: height * (stride + 1)], height, stride, max(1, bits // 8))
+
+    if depth == 16:
+        image = rows.reshape(height, width, channels, 2)[..., 0]
+    elif depth == 8:
+        image = rows.reshape(height, width, channels)
+    else:
+        samples = np.unpackbits(rows, axis=1).reshape(height, -1, depth)[:, :width]
+        image = (samples * (1 << np.arange(depth - 1, -1, -1, dtype=np.uint8))).sum(axis=2, dtype=np.uint8)
+        if color_type == 0:
+            image = image * np.uint8(255 // ((1 << depth) - 1))
+        image = image[..., None]
+
+    if color_type == 3:
+        if palette is None:
+            raise TextureError("Palette PNG has no PLTE chunk")
+        indices = image[..., 0]
+        if transparency:
+            entries = np.frombuffer(transparency[: len(palette)], dtype=np.uint8)
+            alpha = np.full(len(palette), 255, dtype=np.uint8)
+            alpha[: len(entries)] = entries
+            return np.concatenate([palette, alpha[:, None]], axis=1)[indices]
+        return palette[indices]
+    return np.ascontiguousarray(image)
+
+
+def _decode_pnm(data: bytes) -> np.ndarray:
+    fields: List[bytes] = []
+    offset = 0
+    while len(fields) < 4:
+        while offset < len(data) and data[offset : offset + 1].isspace():
+            offset += 1
+        if data[offset : offset + 1] == b"#":
+            offset = data.index(b"\n", offset) + 1
+            continue
+        end = offset
+        while end < len(data) and not data[end : end + 1].isspace():
+            end += 1
+        fields.append(data[offset:end])
+        offset = end
+    magic, width, height, maxval = fields[0], int(fields[1]), int(fields[2]), int(fields[3])
+    if maxval != 255:
+        raise TextureError("Only 8-bit PPM/PGM textures are supported")
+    channels = 3 if magic == b"P6" else 1
+    pixels = np.frombuffer(data, dtype=np.uint8, count=width * height * channels, offset=offset + 1)
+    return pixels.reshape(height, width, channels)
+
+
+def decode_image(data: bytes) -> np.ndarray:
+    """Decode an encoded image into a ``(height, width, channels)`` uint8 array."""
+
+    if Image is not None:
+        import io
+
+        try:
+            with Image.open(io.BytesIO(data)) as opened:
+                mode = opened.mode if opened.mode in ("L", "LA", "RGB", "RGBA") else (
+                    "RGBA" if "A" in opened.getbands() or "transparency" in opened.info else "RGB"
+                )
+                image = np.asarray(opened.convert(mode))
+            return image[..., None] if image.ndim == 2 else image
+        except Exception as exc:
+            raise TextureError(f"Cannot decode texture: {exc}") from exc
+    try:
+        if data.startswith(_PNG_SIGNATURE):
+            return _decode_png(data)
+        if data[:2] in (b"P5", b"P6"):
+            return _decode_pnm(data)
+    except (zlib.error, ValueError, struct.error) as exc:
+        raise TextureError(f"Corrupt texture: {exc}") from exc
+    raise TextureError("Unsupported texture encoding; install Pillow (pip install vrhouse[textures])")
+
+
+def encode_png(image: np.ndarray) -> bytes:
+    """Encode a uint8 ``(height, width[, channels])`` array as PNG (Up filter, zlib level 6)."""
+
+    image = np.ascontiguousarray(image, dtype=np.uint8)
+    if image.ndim == 2:
+        image = image[..., None]
+    height, width, channels = image.shape
+    color_type = {1: 0, 2: 4, 3: 2, 4: 6}[channels]
+    rows = image.reshape(height, width * channels)
+    filtered = np.empty((height, width * channels + 1), dtype=np.uint8)
+    filtered[:, 0] = 2
+    filtered[0, 0] = 0
+    filtered[0, 1:] = rows[0]
+    filtered[1:, 1:] = rows[1:] - rows[:-1]
+
+    def chunk(kind: bytes, body: bytes) -> bytes:
+        return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+
+    return b"".join(
+        [
+            _PNG_SIGNATURE,
+            chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0)),
+            chunk(b"IDAT", zlib.compress(filtered.tobytes(), 6)),
+            chunk(b"IEND", b""),
+        ]
+    )
+
+
+# -- filtering -----------------------------------------------------------------------------
+def _srgb_to_linear_table() -> np.ndarray:
+    values = np.arange(256, dtype=np.float64) / 255.0
+    return np.where(values <= 0.04045, values / 12.92, ((values + 0.055) / 1.055) ** 2.4).astype(np.float32)
+
+
+_SRGB_TO_LINEAR = _srgb_to_linear_table()
+
+
+def _linear_to_srgb(values: np.ndarray) -> np.ndarray:
+    values = np.clip(values, 0.0, 1.0)
+    return np.where(values <= 0.0031308, values * 12.92, 1.055 * np.power(values, 1 / 2.4) - 0.055)
+
+
+def _color_channels(channels: int) -> int:
+    """Channels holding colour (the trailing alpha of LA/RGBA images stays linear)."""
+
+    return channels if channels in (1, 3) else channels - 1
+
+
+# Rows converted per block, bounding float temporaries on large textures.
+_BLOCK_ROWS = 256
+
+
+def _to_working(image: np.ndarray, role: str) -> np.ndarray:
+    if role == COLOR:
+        working = _SRGB_TO_LINEAR[image]
+        colour = _color_channels(image.shape[2])
+        if colour < image.shape[2]:
+            np.multiply(image[..., colour:], np.float32(1 / 255), out=working[..., colour:])
+        return working
+    working = np.multiply(image, np.float32(1 / 255), dtype=np.float32)
+    if role == NORMAL and image.shape[2] >= 3:
+        working[..., :3] *= 2.0
+        working[..., :3] -= 1.0
+    return working
+
+
+def _from_working(working: np.ndarray, role: str) -> np.ndarray:
+    output = np.empty(working.shape, dtype=np.uint8)
+    colour = _color_channels(working.shape[2])
+    for start in range(0, working.shape[0], _BLOCK_ROWS):
+        block = working[start : start + _BLOCK_ROWS].copy()
+        if role == COLOR:
+            block[..., :colour] = _linear_to_srgb(block[..., :colour])
+        elif role == NORMAL and block.shape[2] >= 3:
+            block[..., :3] = _normalize(block[..., :3]) * 0.5 + 0.5
+        block *= 255.0
+        np.rint(block, out=block)
+        np.clip(block, 0, 255, out=block)
+        output[start : start + _BLOCK_ROWS] = block
+    return output
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    length = np.sqrt(np.einsum("...i,...i->...", vectors, vectors))[..., None]
+    fallback = np.zeros_like(vectors)
+    fallback[..., 2] = 1.0
+    return np.where(length > 1e-6, vectors / np.maximum(length, 1e-6), fallback)
+
+
+def _resize_axis(values: np.ndarray, size: int, axis: int) -> np.ndarray:
+    """Area-average ``values`` to ``size`` samples along ``axis``.
+
+    Integer reductions average blocks; other ratios integrate the interpolated
+    prefix sum over each output sample's footprint (values are in [-1, 1], so
+    float32 sums stay well within 8-bit precision).
+    """
+
+    length = values.shape[axis]
+    if size == length:
+        return values
+    moved = np.moveaxis(values, axis, 0)
+    if length % size == 0:
+        resized = moved.reshape(size, length // size, *moved.shape[1:]).mean(axis=1, dtype=np.float32)
+        return np.moveaxis(resized, 0, axis)
+    prefix = np.zeros((length + 1, *moved.shape[1:]), dtype=np.float32)
+    np.cumsum(moved, axis=0, dtype=np.float32, out=prefix[1:])
+    edges = np.linspace(0.0, length, size + 1)
+    whole = np.minimum(edges.astype(np.int64), length - 1)
+    fraction = (edges - whole).astype(np.float32).reshape(-1, *([1] * (moved.ndim - 1)))
+    sampled = prefix[whole] + fraction * moved[whole]
+    resized = (sampled[1:] - sampled[:-1]) * np.float32(size / length)
+    return np.moveaxis(resized, 0, axis)
+
+
+def resize_area(image: np.ndarray, height: int, width: int) -> np.ndarray:
+    """Box-filter resize of a float ``(h, w, c)`` image; exact for any ratio, separable and vectorised."""
+
+    return _resize_axis(_resize_axis(image, height, 0), width, 1)
+
+
+def _halve(image: np.ndarray) -> np.ndarray:
+    height, width, channels = image.shape
+    rows, columns = max(1, height // 2), max(1, width // 2)
+    if (height > 1 and height % 2) or (width > 1 and width % 2):
+        return resize_area(image, rows, columns)
+    return image.reshape(rows, height // rows, columns, width // columns, channels).mean(axis=(1, 3))
+
+
+def _power_of_two(value: float) -> int:
+    return 1 << max(0, int(round(math.log2(max(value, 1.0)))))
+
+
+def target_size(width: int, height: int, budget: int) -> Tuple[int, int]:
+    """Power-of-two ``(width, height)`` closest to the source that fits within ``budget`` texels per edge."""
+
+    scale = min(1.0, budget / max(width, height))
+    cap = 1 << int(math.log2(max(budget, 1)))
+    return min(cap, _power_of_two(width * scale)), min(cap, _power_of_two(height * scale))
+
+
+def build_mip_chain(image: np.ndarray, role: str, size: Tuple[int, int]) -> List[np.ndarray]:
+    """Resize ``image`` (uint8 ``(h, w, c)``) to ``size`` and reduce it down to a 1x1 level."""
+
+    width, height = size
+    working = resize_area(_to_working(image, role), height, width)
+    if role == NORMAL and working.shape[2] >= 3:
+        working[..., :3] = _normalize(working[..., :3])
+    levels = [_from_working(working, role)]
+    while working.shape[0] > 1 or working.shape[1] > 1:
+        working = _halve(working)
+        levels.append(_from_working(working, role))
+    return levels
+
+
+# -- texture sets ----------------------------------------------------------------------------
+@dataclass
+class TextureSource:
+    """A texture referenced by the scene; ``read`` returns its encoded bytes."""
+
+    name: str
+    role: str
+    path: Optional[Path] = None
+    loader: Optional[Callable[[], bytes]] = None
+
+    def read(self) -> bytes:
+        if self.loader is not None:
+            return self.loader()
+        if self.path is None or not self.path.is_file():
+            raise TextureError(f"Texture not found: {self.path or self.name}")
+        return self.path.read_bytes()
+
+
+@dataclass
+class ProcessedTexture:
+    """Mip chain of one texture plus, per platform, the first level within its budget."""
+
+    name: str
+    digest: str
+    role: str
+    source_size: Tuple[int, int]
+    mips: List[np.ndarray]
+    platform_levels: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return int(self.mips[0].shape[1]), int(self.mips[0].shape[0])
+
+    @property
+    def nbytes(self) -> int:
+        return sum(int(level.nbytes) for level in self.mips)
+
+    def describe(self) -> Dict[str, object]:
+        return {
+            "digest": self.digest,
+            "role": self.role,
+            "source_size": list(self.source_size),
+            "size": list(self.size),
+            "channels": int(self.mips[0].shape[2]),
+            "levels": len(self.mips),
+            "platform_levels": dict(self.platform_levels),
+        }
+
+
+def collect_texture_sources(scene_graph: SceneGraph) -> List[TextureSource]:
+    """Texture references of the material library, resolved next to the source file.
+
+    References of the form ``#image/<n>`` (glTF images embedded in the binary
+    chunk or as data URIs) are read back from the original glTF document.
+    """
+
+    origin = scene_graph.root.get("origin_file")
+    base = Path(str(origin)).parent if origin else Path.cwd()
+    sources: Dict[str, TextureSource] = {}
+    for properties in scene_graph.material_properties.values():
+        for key, value in properties.items():
+            role = texture_role(key)
+            if role is None or not isinstance(value, str) or not value.strip():
+                continue
+            # MTL options (``-bm 1.0 brick_n.png``) precede the file name.
+            reference = value.split()[-1]
+            if reference in sources:
+                continue
+            if reference.startswith("#image/") and origin:
+                sources[reference] = TextureSource(
+                    reference, role, loader=_gltf_image_loader(Path(str(origin)), int(reference[7:]))
+                )
+            else:
+                sources[reference] = TextureSource(reference, role, path=base / reference)
+    return list(sources.values())
+
+
+def _gltf_image_loader(source: Path, index: int) -> Callable[[], bytes]:
+    def load() -> bytes:
+        from vrhouse.pipeline.importers.gltf_importer import GLTFDocument
+
+        return GLTFDocument(source).image_bytes(index)
+
+    return load
+
+
+class TextureProcessor:
+    """Decode, resize and mip textures on a thread pool, through an optional disk cache.
+
+    ``texture_resolution`` caps every edge; each platform in ``platforms`` is
+    further capped by ``PLATFORM_TEXTURE_BUDGETS``. One chain is built at the largest budget
+    and every platform records the level it starts from.
+    """
+
+    def __init__(
+        self,
+        texture_resolution: int = DEFAULT_TEXTURE_RESOLUTION,
+        platforms: Sequence[str] = (),
+        *,
+        cache: Optional[StageCache] = None,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        if texture_resolution < 1:
+            raise ValueError("texture_resolution must be positive")
+        self.texture_resolution = texture_resolution
+        self.platforms = tuple(platforms)
+        self.cache = cache
+        self.max_workers = max_workers
+
+    def budgets(self) -> Dict[str, int]:
+        if not self.platforms:
+            return {"default": self.texture_resolution}
+        return {
+            platform: min(self.texture_resolution, PLATFORM_TEXTURE_BUDGETS.get(platform, self.texture_resolution))
+            for platform in self.platforms
+        }
+
+    def _key(self, digest: str, role: str) -> str:
+        settings = json.dumps([TEXTURE_FORMAT_VERSION, role, self.texture_resolution, self.budgets()], sort_keys=True)
+        return hashlib.blake2b(f"{digest}:{settings}".encode("utf-8"), digest_size=20).hexdigest()
+
+    def process_one(self, source: TextureSource) -> ProcessedTexture:
+        if self.cache is not None and source.loader is None and source.path is not None and source.path.is_file():
+            digest = self.cache.source_digest(source.path)
+            data: Optional[bytes] = None
+        else:
+            data = source.read()
+            digest = hashlib.blake2b(data, digest_size=20).hexdigest()
+
+        key = self._key(digest, source.role)
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached is None:
+            image = decode_image(data if data is not None else source.read())
+            source_size = (int(image.shape[1]), int(image.shape[0]))
+            size = target_size(*source_size, max(self.budgets().values()))
+            cached = {"source_size": source_size, "mips": build_mip_chain(image, source.role, size)}
+            if self.cache is not None:
+                self.cache.put(key, cached)
+
+        mips = list(cached["mips"])
+        platform_levels = {
+            platform: next(
+                (level for level, mip in enumerate(mips) if max(mip.shape[:2]) <= budget), len(mips) - 1
+            )
+            for platform, budget in self.budgets().items()
+        }
+        return ProcessedTexture(
+            name=source.name,
+            digest=digest,
+            role=source.role,
+            source_size=tuple(cached["source_size"]),
+            mips=mips,
+            platform_levels=platform_levels,
+        )
+
+    def process(
+        self, sources: Sequence[TextureSource], report: Optional[Callable[[float], None]] = None
+    ) -> Tuple[Dict[str, ProcessedTexture], Dict[str, str]]:
+        """Process every source; returns the textures and ``{name: error}`` for those that failed.
+
+        A missing or undecodable texture does not fail the conversion: the
+        material keeps its reference and the error is reported in the metadata.
+        """
+
+        textures: Dict[str, ProcessedTexture] = {}
+        errors: Dict[str, str] = {}
+        if not sources:
+            return textures, errors
+        workers = self.max_workers or os.cpu_count() or 1
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="vrhouse-texture") as pool:
+            futures = [(source, pool.submit(self.process_one, source)) for source in sources]
+            for done, (source, future) in enumerate(futures, start=1):
+                try:
+                    textures[source.name] = future.result()
+                except (TextureError, OSError) as exc:
+                    errors[source.name] = str(exc)
+                if report is not None:
+                    report(done / len(futures))
+        if self.cache is not None:
+            self.cache.evict()
+        return textures, errors
+
+
+def texture_metadata(textures: Mapping[str, ProcessedTexture]) -> Dict[str, Dict[str, object]]:
+    return {name: texture.describe() for name, texture in textures.items()}
+
+
+__all__ = [
+    "DEFAULT_TEXTURE_RESOLUTION",
+    "PLATFORM_TEXTURE_BUDGETS",
+    "ProcessedTexture",
+    "TextureError",
+    "TextureProcessor",
+    "TextureSource",
+    "build_mip_chain",
+    "collect_texture_sources",
+    "decode_image",
+    "encode_png",
+    "resize_area",
+    "target_size",
+    "texture_metadata",
+    "texture_role",
+]
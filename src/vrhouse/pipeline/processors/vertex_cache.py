@@ -0,0 +1,372 @@
+"""Vertex welding, degenerate removal and GPU cache-friendly index/vertex ordering."""
+from __future__ import annotations
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from vrhouse.core import MeshData, PipelineError, SceneGraph
+from vrhouse.pipeline.processors.lod import (
+    SharedMeshHandle,
+    collect_shared_meshes,
+    process_context,
+    read_shared_mesh,
+    share_meshes,
+)
+
+DEFAULT_CACHE_SIZE = 16
+# Tipsify and the ACMR simulation are pure Python; above this many triangles the
+# per-mesh work is spread over a process pool.
+PARALLEL_THRESHOLD = 50_000
+DEFAULT_WELD_EPSILON = 1e-5
+# Attribute tolerances used when deciding whether two co-located vertices are identical.
+NORMAL_EPSILON = 1e-3
+UV_EPSILON = 1e-5
+
+
+@dataclass
+class VertexCacheStats:
+    """Per-mesh (or aggregated) before/after figures reported by ``VertexCacheOptimizer``."""
+
+    vertices_before: int = 0
+    vertices_after: int = 0
+    triangles_before: int = 0
+    triangles_after: int = 0
+    acmr_before: float = 0.0
+    acmr_after: float = 0.0
+
+    def merge(self, other: "VertexCacheStats") -> None:
+        triangles_before = self.triangles_before + other.triangles_before
+        triangles_after = self.triangles_after + other.triangles_after
+        if triangles_before:
+            self.acmr_before = (
+                self.acmr_before * self.triangles_before + other.acmr_before * other.triangles_before
+            ) / triangles_before
+        if triangles_after:
+            self.acmr_after = (
+                self.acmr_after * self.triangles_after + other.acmr_after * other.triangles_after
+            ) / triangles_after
+        self.vertices_before += other.vertices_before
+        self.vertices_after += other.vertices_after
+        self.triangles_before = triangles_before
+        self.triangles_after = triangles_after
+
+
+def _quantize(values: np.ndarray, epsilon: float) -> np.ndarray:
+    return np.floor(np.asarray(values, dtype=np.float64) / epsilon + 0.5).astype(np.int64)
+
+
+def weld_vertices(mesh: MeshData, epsilon: float = DEFAULT_WELD_EPSILON) -> MeshData:
+    """Merge vertices falling into the same ``epsilon`` grid cell with matching attributes.
+
+    Positions (and normals/UVs at their own tolerances) are snapped to a hashed
+    integer grid and deduplicated with a single ``np.unique`` over the cell keys;
+    the first vertex of each cell is kept as representative.
+    """
+
+    keys = [_quantize(mesh.positions, epsilon)]
+    if mesh.normals is not None:
+        keys.append(_quantize(mesh.normals, NORMAL_EPSILON))
+    if mesh.uvs is not None:
+        keys.append(_quantize(mesh.uvs, UV_EPSILON))
+    key = np.ascontiguousarray(np.concatenate(keys, axis=1))
+    _, representative, inverse = np.unique(key, axis=0, return_index=True, return_inverse=True)
+    if representative.size == mesh.vertex_count:
+        return mesh
+    return MeshData(
+        positions=np.ascontiguousarray(np.asarray(mesh.positions)[representative], dtype=np.float32),
+        indices=inverse.reshape(-1)[np.asarray(mesh.indices, dtype=np.int64)].astype(np.uint32),
+        normals=None if mesh.normals is None else np.asarray(mesh.normals)[representative].astype(np.float32),
+        uvs=None if mesh.uvs is None else np.asarray(mesh.uvs)[representative].astype(np.float32),
+        material=mesh.material,
+    )
+
+
+def remove_degenerate_triangles(mesh: MeshData, area_epsilon: float = 1e-12) -> MeshData:
+    """Drop triangles that repeat an index or have (near) zero area."""
+
+    indices = np.asarray(mesh.indices, dtype=np.int64).reshape(-1, 3)
+    corners = np.asarray(mesh.positions, dtype=np.float64)[indices]
+    cross = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    keep = (
+        (indices[:, 0] != indices[:, 1])
+        & (indices[:, 1] != indices[:, 2])
+        & (indices[:, 0] != indices[:, 2])
+        & (np.einsum("ij,ij->i", cross, cross) > area_epsilon * area_epsilon)
+    )
+    if keep.all():
+        return mesh
+    return MeshData(
+        positions=mesh.positions,
+        indices=indices[keep].astype(np.uint32),
+        normals=mesh.normals,
+        uvs=mesh.uvs,
+        material=mesh.material,
+    )
+
+
+def average_cache_miss_ratio(indices: np.ndarray, cache_size: int = DEFAULT_CACHE_SIZE) -> float:
+    """ACMR of ``indices`` under a FIFO post-transform cache of ``cache_size`` entries."""
+
+    flat = np.asarray(indices).reshape(-1).tolist()
+    if not flat:
+        return 0.0
+    cache: deque[int] = deque()
+    resident: set[int] = set()
+    misses = 0
+    for vertex in flat:
+        if vertex in resident:
+            continue
+        misses += 1
+        cache.append(vertex)
+        resident.add(vertex)
+        if len(cache) > cache_size:
+            resident.discard(cache.popleft())
+    return misses / (len(flat) / 3)
+
+
+def _vertex_triangles(indices: np.ndarray, vertex_count: int) -> Tuple[np.ndarray, np.ndarray]:
+    """CSR adjacency from vertices to the triangles using them."""
+
+    flat = indices.reshape(-1)
+    order = np.argsort(flat, kind="stable")
+    offsets = np.zeros(vertex_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(flat, minlength=vertex_count), out=offsets[1:])
+    return offsets, order // 3
+
+
+def tipsify(indices: np.ndarray, vertex_count: int, cache_size: int = DEFAULT_CACHE_SIZE) -> np.ndarray:
+    """Reorder triangles for post-transform cache locality (Sander et al., "Tipsify").
+
+    Runs in time linear in the triangle count and is independent of the exact
+    hardware cache size, which makes it a good fit for heterogeneous headset GPUs.
+    """
+
+    triangles = np.asarray(indices, dtype=np.int64).reshape(-1, 3)
+    triangle_count = triangles.shape[0]
+    if triangle_count == 0:
+        return triangles.astype(np.uint32)
+
+    offsets_array, adjacency_array = _vertex_triangles(triangles, vertex_count)
+    offsets = offsets_array.tolist()
+    adjacency = adjacency_array.tolist()
+    corners = triangles.tolist()
+    live = np.diff(offsets_array).tolist()
+    cache_time = [0] * vertex_count
+    emitted = [False] * triangle_count
+    dead_end: List[int] = []
+    output: List[int] = []
+    timestamp = cache_size + 1
+    cursor = 0
+    vertex = int(triangles[0, 0])
+
+    while vertex >= 0:
+        candidates: List[int] = []
+        for triangle in adjacency[offsets[vertex] : offsets[vertex + 1]]:
+            if emitted[triangle]:
+                continue
+            emitted[triangle] = True
+            output.append(triangle)
+            for corner in corners[triangle]:
+                dead_end.append(corner)
+                candidates.append(corner)
+                live[corner] -= 1
+                if timestamp - cache_time[corner] > cache_size:
+                    cache_time[corner] = timestamp
+                    timestamp += 1
+
+        # Next fanning vertex: the candidate that stays in cache longest while still having work.
+        best, best_priority = -1, -1
+        for candidate in candidates:
+            if live[candidate] <= 0:
+                continue
+            age = timestamp - cache_time[candidate]
+            priority = age if age + 2 * live[candidate] <= cache_size else 0
+            if priority > best_priority:
+                best, best_priority = candidate, priority
+        if best < 0:
+            while dead_end:
+                candidate = dead_end.pop()
+                if live[candidate] > 0:
+                    best = candidate
+                    break
+        if best < 0:
+            while cursor < vertex_count and live[cursor] <= 0:
+                cursor += 1
+            best = cursor if cursor < vertex_count else -1
+        vertex = best
+
+    return triangles[np.asarray(output, dtype=np.int64)].astype(np.uint32)
+
+
+def optimize_vertex_fetch(mesh: MeshData) -> MeshData:
+    """Renumber vertices in order of first use so vertex fetches stream linearly."""
+
+    flat = np.asarray(mesh.indices, dtype=np.int64).reshape(-1)
+    unique, first = np.unique(flat, return_index=True)
+    order = unique[np.argsort(first, kind="stable")]
+    remap = np.full(mesh.vertex_count, -1, dtype=np.int64)
+    remap[order] = np.arange(order.size)
+    return MeshData(
+        positions=np.ascontiguousarray(np.asarray(mesh.positions)[order]),
+        indices=remap[flat].reshape(-1, 3).astype(np.uint32),
+        normals=None if mesh.normals is None else np.ascontiguousarray(np.asarray(mesh.normals)[order]),
+        uvs=None if mesh.uvs is None else np.ascontiguousarray(np.asarray(mesh.uvs)[order]),
+        material=mesh.material,
+    )
+
+
+def optimize_mesh(
+    mesh: MeshData,
+    *,
+    epsilon: float = DEFAULT_WELD_EPSILON,
+    cache_size: int = DEFAULT_CACHE_SIZE,
+) -> Tuple[MeshData, VertexCacheStats]:
+    """Weld, clean, cache-order and fetch-order ``mesh``; return it with its statistics."""
+
+    stats = VertexCacheStats(
+        vertices_before=mesh.vertex_count,
+        triangles_before=mesh.triangle_count,
+        acmr_before=average_cache_miss_ratio(mesh.indices, cache_size),
+    )
+    result = remove_degenerate_triangles(weld_vertices(mesh, epsilon))
+    result = MeshData(
+        positions=result.positions,
+        indices=tipsify(result.indices, result.vertex_count, cache_size),
+        normals=result.normals,
+        uvs=result.uvs,
+        material=result.material,
+    )
+    result = optimize_vertex_fetch(result)
+    stats.vertices_after = result.vertex_count
+    stats.triangles_after = result.triangle_count
+    stats.acmr_after = average_cache_miss_ratio(result.indices, cache_size)
+    return result, stats
+
+
+def _optimize_chain(
+    meshes: Sequence[MeshData], epsilon: float, cache_size: int
+) -> List[Tuple[MeshData, VertexCacheStats]]:
+    return [optimize_mesh(mesh, epsilon=epsilon, cache_size=cache_size) for mesh in meshes]
+
+
+def _chain_worker(
+    handles: Sequence[SharedMeshHandle], epsilon: float, cache_size: int
+) -> Tuple[str, List[SharedMeshHandle], List[VertexCacheStats]]:
+    """Optimize a shared chain and publish the results in a fresh shared block (owned by the parent)."""
+
+    source = SharedMemory(name=handles[0].block)
+    try:
+        chain = [read_shared_mesh(source, handle, copy=False) for handle in handles]
+        results = _optimize_chain(chain, epsilon, cache_size)
+        # Copy out before closing: results may still alias the parent's block.
+        output, output_handles = share_meshes([mesh for mesh, _ in results])
+        stats = [item for _, item in results]
+        del chain, results
+    finally:
+        source.close()
+
+    if output is None:
+        return "", output_handles, stats
+    name = output.name
+    output.close()
+    return name, output_handles, stats
+
+
+class VertexCacheOptimizer:
+    """Processor stage that prepares index/vertex buffers for mobile VR GPUs.
+
+    Runs after ``GeometryOptimizer`` on every shared mesh and LOD level and records
+    the aggregated ACMR/vertex figures in ``SceneGraph.metadata["vertex_cache"]``.
+    Each mesh and its LOD chain form one independent task; large scenes run
+    those tasks on a process pool, passing buffers through shared memory as
+    ``lod.generate_lod_chains`` does.
+    """
+
+    def __init__(
+        self,
+        weld_epsilon: float = DEFAULT_WELD_EPSILON,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        if weld_epsilon <= 0 or cache_size < 3:
+            raise PipelineError("weld_epsilon must be positive and cache_size at least 3")
+        self.weld_epsilon = weld_epsilon
+        self.cache_size = cache_size
+        self.max_workers = max_workers
+        self.last_stats: Optional[VertexCacheStats] = None
+
+    def optimize(
+        self,
+        scene_graph: SceneGraph | Mapping[str, Dict[str, object]],
+        progress: Optional[Callable[[float], None]] = None,
+    ) -> SceneGraph:
+        optimized = SceneGraph.coerce(scene_graph).copy()
+        lods = optimized.lods
+        tasks = [[mesh, *lods.get(mesh_id, ())] for mesh_id, mesh in enumerate(optimized.meshes)]
+        weights = [sum(mesh.triangle_count for mesh in chain) for chain in tasks]
+        total_weight = max(sum(weights), 1)
+        workers = self.max_workers or os.cpu_count() or 1
+
+        results: List[List[Tuple[MeshData, VertexCacheStats]]] = [[] for _ in tasks]
+        finished = 0
+        if workers > 1 and len(tasks) > 1 and total_weight >= PARALLEL_THRESHOLD:
+            block, handles = share_meshes([mesh for chain in tasks for mesh in chain])
+            starts = np.cumsum([0] + [len(chain) for chain in tasks]).tolist()
+            try:
+                with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), mp_context=process_context()) as pool:
+                    futures = [
+                        pool.submit(_chain_worker, handles[first:last], self.weld_epsilon, self.cache_size)
+                        for first, last in zip(starts[:-1], starts[1:])
+                    ]
+                    failure: Optional[BaseException] = None
+                    for mesh_id, future in enumerate(futures):
+                        try:
+                            name, chain_handles, chain_stats = future.result()
+                        except BaseException as exc:  # keep draining so every output block gets unlinked
+                            failure = failure or exc
+                            continue
+                        results[mesh_id] = list(zip(collect_shared_meshes(name, chain_handles), chain_stats))
+                        finished += weights[mesh_id]
+                        if progress is not None:
+                            progress(finished / total_weight)
+                    if failure is not None:
+                        raise failure
+            finally:
+                if block is not None:
+                    block.close()
+                    block.unlink()
+        else:
+            for mesh_id, chain in enumerate(tasks):
+                results[mesh_id] = _optimize_chain(chain, self.weld_epsilon, self.cache_size)
+                finished += weights[mesh_id]
+                if progress is not None:
+                    progress(finished / total_weight)
+
+        total = VertexCacheStats()
+        for mesh_id, chain in enumerate(results):
+            (mesh, stats), levels = chain[0], chain[1:]
+            optimized.replace_mesh(mesh_id, mesh)
+            total.merge(stats)
+            if mesh_id in lods:
+                optimized.set_lods(mesh_id, [level for level, _ in levels])
+        self.last_stats = total
+        optimized.metadata["vertex_cache"] = asdict(total)
+        return optimized
+
+
+__all__ = [
+    "VertexCacheOptimizer",
+    "VertexCacheStats",
+    "average_cache_miss_ratio",
+    "optimize_mesh",
+    "optimize_vertex_fetch",
+    "remove_degenerate_triangles",
+    "tipsify",
+    "weld_vertices",
+]
@@ -0,0 +1,579 @@
+"""Room cells, portals and a precomputed potentially-visible set (PVS) for occlusion culling."""
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields, replace
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from vrhouse.core import AXES, BVH, UP_AXIS, PipelineError, SceneGraph
+from vrhouse.pipeline.processors.batching import MaterialBatcher
+from vrhouse.pipeline.processors.lod import SharedArraysHandle, process_context, read_shared_arrays, share_arrays
+
+DEFAULT_VOXEL_SIZE = 0.25
+DEFAULT_PORTAL_WIDTH = 1.0
+DEFAULT_RAYS_PER_PAIR = 64
+DEFAULT_MIN_OCCLUDER_SIZE = 1.8
+DEFAULT_MIN_CELL_VOLUME = 1.0
+# Classes that always occlude, and classes that never do (openings, glazing, the rooms themselves).
+OCCLUDER_CLASSES = frozenset({"IFCWALL", "IFCWALLSTANDARDCASE", "IFCSLAB", "IFCROOF", "IFCCOLUMN", "IFCBEAM", "IFCSTAIR"})
+SEE_THROUGH_CLASSES = frozenset({"IFCDOOR", "IFCWINDOW", "IFCSPACE"})
+# Without IFC classes, material and object names give glazing and door leaves away.
+SEE_THROUGH_NAMES = ("vidro", "glass", "janela", "window", "porta", "door")
+# Panels (walls beside a doorway) are at most this thick relative to their length.
+PANEL_RATIO = 0.1
+# Below this many rays, process start-up costs more than it saves.
+PARALLEL_RAYS = 200_000
+_RAY_BATCH = 50_000
+_UNSET = np.iinfo(np.int32).max
+
+
+@dataclass
+class CellVisibility:
+    """Cells, portals and the PVS of a scene, as flat arrays in the root's frame.
+
+    ``cells`` labels a voxel grid (``grid_origin``, edge ``grid_pitch``) with the
+    cell of each free voxel, ``-1`` for walls and outdoors, so the runtime finds
+    the camera's cell with one lookup (``cell_at``). ``pvs`` holds one packed
+    bit row per cell; ``node_offsets``/``nodes`` list the scene-graph nodes
+    overlapping each cell (``with_nodes`` reassigns them for another graph, e.g.
+    the batched one) and ``cell_spaces`` the ``IfcSpace`` node a cell came from
+    (``-1`` when it was found by voxelization).
+    """
+
+    grid_origin: np.ndarray
+    grid_pitch: np.ndarray
+    cells: np.ndarray
+    cell_bounds: np.ndarray
+    cell_spaces: np.ndarray
+    portals: np.ndarray
+    portal_bounds: np.ndarray
+    pvs: np.ndarray
+    node_offsets: np.ndarray
+    nodes: np.ndarray
+
+    @property
+    def cell_count(self) -> int:
+        return int(self.cell_bounds.shape[0])
+
+    def __len__(self) -> int:
+        return self.cell_count
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {item.name: getattr(self, item.name) for item in fields(self)}
+
+    @classmethod
+    def from_arrays(cls, arrays: Mapping[str, np.ndarray]) -> "CellVisibility":
+        missing = [item.name for item in fields(cls) if item.name not in arrays]
+        if missing:
+            raise PipelineError(f"Cell visibility is missing {missing}")
+        return cls(**{item.name: np.asarray(arrays[item.name]) for item in fields(cls)})
+
+    @classmethod
+    def empty(cls) -> "CellVisibility":
+        return cls(
+            grid_origin=np.zeros(3, dtype=np.float32),
+            grid_pitch=np.ones(1, dtype=np.float32),
+            cells=np.full((0, 0, 0), -1, dtype=np.int16),
+            cell_bounds=np.zeros((0, 2, 3), dtype=np.float32),
+            cell_spaces=np.zeros(0, dtype=np.int32),
+            portals=np.zeros((0, 2), dtype=np.int32),
+            portal_bounds=np.zeros((0, 2, 3), dtype=np.float32),
+            pvs=np.zeros((0, 0), dtype=np.uint8),
+            node_offsets=np.zeros(1, dtype=np.int32),
+            nodes=np.zeros(0, dtype=np.int32),
+        )
+
+    def with_nodes(self, bvh: BVH) -> "CellVisibility":
+        """Copy whose per-cell node lists index the items of ``bvh`` (a ``BVH.from_scene``)."""
+
+        offsets, nodes = _cell_nodes(bvh, self.cell_bounds[:, 0], self.cell_bounds[:, 1])
+        return replace(self, node_offsets=offsets, nodes=nodes)
+
+    def cell_at(self, points: np.ndarray) -> np.ndarray:
+        """Cell of each ``(n, 3)`` point; ``-1`` outside every cell (render everything there)."""
+
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        voxel = np.floor((points - self.grid_origin) / float(self.grid_pitch[0])).astype(np.int64)
+        inside = np.all((voxel >= 0) & (voxel < np.array(self.cells.shape)), axis=1)
+        found = np.full(len(points), -1, dtype=np.int64)
+        found[inside] = self.cells[tuple(voxel[inside].T)]
+        return found
+
+    def visible_cells(self, cell: int) -> np.ndarray:
+        return np.flatnonzero(np.unpackbits(self.pvs[cell], count=self.cell_count))
+
+    def visible_nodes(self, cell: int) -> np.ndarray:
+        """Scene-graph nodes to draw from ``cell``: everything overlapping a cell in its PVS."""
+
+        offsets = self.node_offsets
+        spans = [self.nodes[offsets[other] : offsets[other + 1]] for other in self.visible_cells(cell)]
+        return np.unique(np.concatenate(spans)) if spans else np.zeros(0, dtype=np.int32)
+
+    def summary(self) -> Dict[str, float]:
+        visible = np.unpackbits(self.pvs, axis=1, count=self.cell_count).sum(axis=1) if self.cell_count else np.zeros(0)
+        return {
+            "cells": float(self.cell_count),
+            "portals": float(len(self.portals)),
+            "mean_visible_cells": float(visible.mean()) if visible.size else 0.0,
+        }
+
+
+@dataclass
+class VisibilityStats:
+    occluder_nodes: int = 0
+    occluder_triangles: int = 0
+    voxels: int = 0
+    cells: int = 0
+    portals: int = 0
+    rays: int = 0
+    visible_pairs: int = 0
+
+
+def _window_free(free: np.ndarray, radius: int, axis: int) -> np.ndarray:
+    """Voxels whose ``2 * radius + 1`` neighbourhood along ``axis`` is entirely free (1D erosion)."""
+
+    blocked = np.moveaxis(~free, axis, 0).astype(np.int32)
+    rest = blocked.shape[1:]
+    padded = np.concatenate((np.zeros((radius + 1,) + rest, np.int32), blocked, np.zeros((radius,) + rest, np.int32)))
+    running = np.cumsum(padded, axis=0)
+    window = running[2 * radius + 1 :] - running[: -2 * radius - 1]
+    return np.moveaxis(window == 0, 0, axis) & free
+
+
+def label_components(mask: np.ndarray) -> Tuple[np.ndarray, int]:
+    """6-connected components of ``mask``: ``(labels, count)`` with ``-1`` outside the mask.
+
+    Each sweep gives every straight run of voxels along an axis the smallest
+    label in the run, so labels cross a whole room per sweep and a handful of
+    sweeps settle any floor plan.
+    """
+
+    labels = np.where(mask, np.arange(mask.size, dtype=np.int64).reshape(mask.shape), _UNSET)
+    if not mask.any():
+        return np.full(mask.shape, -1, dtype=np.int32), 0
+    while True:
+        before = labels.copy()
+        for axis in range(mask.ndim):
+            inside = np.moveaxis(mask, axis, -1)
+            values = np.ascontiguousarray(np.moveaxis(labels, axis, -1))
+            starts = inside.copy()
+            starts[..., 1:] &= ~inside[..., :-1]
+            run = np.cumsum(starts.ravel()).reshape(inside.shape)
+            smallest = np.full(int(run.max()) + 1, _UNSET, dtype=np.int64)
+            np.minimum.at(smallest, run[inside], values[inside])
+            values[inside] = smallest[run[inside]]
+            np.moveaxis(labels, axis, -1)[...] = values
+        if np.array_equal(before, labels):
+            break
+    _, compact = np.unique(labels[mask], return_inverse=True)
+    result = np.full(mask.shape, -1, dtype=np.int32)
+    result[mask] = compact
+    return result, int(compact.max()) + 1
+
+
+def _grow(labels: np.ndarray, free: np.ndarray) -> np.ndarray:
+    """Spread labels into unlabelled free voxels, one voxel per step, until nothing changes."""
+
+    labels = labels.copy()
+    while True:
+        grown = labels.copy()
+        for axis in range(labels.ndim):
+            for step in (1, -1):
+                neighbour = np.roll(labels, step, axis=axis)
+                edge = [slice(None)] * labels.ndim
+                edge[axis] = 0 if step == 1 else -1
+                neighbour[tuple(edge)] = -1
+                take = free & (grown < 0) & (neighbour >= 0)
+                grown[take] = neighbour[take]
+        if np.array_equal(grown, labels):
+            return labels
+        labels = grown
+
+
+def _cell_nodes(bvh: BVH, lower: np.ndarray, upper: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """``(offsets, nodes)``: the ``bvh`` items overlapping each ``lower``/``upper`` box, sorted per box."""
+
+    offsets = np.zeros(len(lower) + 1, dtype=np.int64)
+    members = np.zeros(0, dtype=np.int64)
+    if len(lower) and len(bvh):
+        cell, members = bvh.query_aabb(lower, upper)
+        order = np.lexsort((members, cell))
+        cell, members = cell[order], members[order]
+        offsets[1:] = np.cumsum(np.bincount(cell, minlength=len(lower)))
+    return offsets.astype(np.int32), members.astype(np.int32)
+
+
+def _blocked(occluders: Mapping[str, np.ndarray], origins: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """Whether each segment ``origin -> target`` hits an occluder.
+
+    ``occluders`` holds the arrays of the occluders' triangle ``BVH`` plus its
+    ``positions`` and ``indices``.
+    """
+
+    bvh = BVH.from_arrays(occluders)
+    distance, _ = bvh.raycast(origins, targets - origins, occluders["positions"], occluders["indices"], 1.0)
+    return np.isfinite(distance)
+
+
+def _blocked_worker(handle: SharedArraysHandle, origins: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    block = SharedMemory(name=handle.block)
+    try:
+        occluders = read_shared_arrays(block, handle, copy=False)
+        blocked = _blocked(occluders, origins, targets)
+        del occluders
+    finally:
+        block.close()
+    return blocked
+
+
+class VisibilityBaker:
+    """Split the house into cells, find the portals between them and precompute a PVS per cell.
+
+    Occluders are the static, opaque architecture: ``OCCLUDER_CLASSES``, or (for
+    formats without IFC classes) objects spanning at least ``min_occluder_size``
+    in two directions or thin panels that long, i.e. walls and slabs rather than
+    furniture, glazing or door leaves. Their triangles are voxelized at
+    ``voxel_size``. Cells are the ``IfcSpace`` boxes when the spaces carry
+    a ``bounds`` box or geometry; otherwise the free space is eroded horizontally (across
+    ``up_axis``) until openings up to ``portal_width`` close, each remaining
+    room becomes a cell, and cells grow back into the doorways. Free space
+    reaching the grid's sides is outdoors. Portals are the faces where two
+    cells touch.
+
+    Cell pairs sharing a portal see each other; every other pair casts
+    ``rays_per_pair`` segments between random points of both cells against a
+    triangle ``BVH`` of the occluders, in batches fanned out to a process pool
+    that reads the occluders from one shared-memory block.
+    """
+
+    def __init__(
+        self,
+        voxel_size: float = DEFAULT_VOXEL_SIZE,
+        portal_width: float = DEFAULT_PORTAL_WIDTH,
+        rays_per_pair: int = DEFAULT_RAYS_PER_PAIR,
+        min_occluder_size: float = DEFAULT_MIN_OCCLUDER_SIZE,
+        min_cell_volume: float = DEFAULT_MIN_CELL_VOLUME,
+        up_axis: str = UP_AXIS,
+        *,
+        seed: int = 0,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        if voxel_size <= 0 or rays_per_pair < 1:
+            raise ValueError("voxel_size and rays_per_pair must be positive")
+        if up_axis not in AXES:
+            raise ValueError(f"up_axis must be one of {sorted(AXES)}")
+        self.voxel_size = voxel_size
+        self.portal_width = portal_width
+        self.rays_per_pair = rays_per_pair
+        self.min_occluder_size = min_occluder_size
+        self.min_cell_volume = min_cell_volume
+        self.up_axis = up_axis
+        self.seed = seed
+        self.max_workers = max_workers
+        self.last_stats = VisibilityStats()
+
+    @property
+    def _horizontal(self) -> Tuple[int, int]:
+        return tuple(axis for axis in range(3) if axis != AXES[self.up_axis])  # type: ignore[return-value]
+
+    def is_occluder(
+        self, name: str, attributes: Mapping[str, object], material: Optional[str], extents: np.ndarray
+    ) -> bool:
+        ifc_class = str(attributes.get("ifc_class", "")).upper()
+        if ifc_class in SEE_THROUGH_CLASSES or not MaterialBatcher.is_static(attributes):
+            return False
+        if ifc_class in OCCLUDER_CLASSES:
+            return True
+        label = f"{name} {material or ''}".lower()
+        if any(keyword in label for keyword in SEE_THROUGH_NAMES):
+            return False
+        thinnest, middle, longest = np.sort(extents).tolist()
+        panel = thinnest <= PANEL_RATIO * longest
+        return longest >= self.min_occluder_size and (middle >= self.min_occluder_size or panel)
+
+    def occluders(self, graph: SceneGraph) -> Tuple[np.ndarray, np.ndarray]:
+        """Occluder triangles in the root's frame, as ``(positions, indices)``."""
+
+        nodes = graph.mesh_nodes()
+        lower, upper = graph.node_bounds(nodes)
+        world = graph.world_transforms().astype(np.float64)
+        relative = np.linalg.inv(world[0]) @ world
+        positions: List[np.ndarray] = []
+        indices: List[np.ndarray] = []
+        offset = 0
+        material_ids = graph.material_ids
+        for row, node in enumerate(nodes.tolist()):
+            mesh = graph.meshes[int(graph.mesh_ids[node])]
+            material_id = int(material_ids[node])
+            material = graph.materials[material_id] if material_id >= 0 else mesh.material
+            extents = upper[row] - lower[row]
+            if not len(mesh.indices) or not self.is_occluder(
+                graph.names[node], graph.attributes[node], material, extents
+            ):
+                continue
+            points = np.asarray(mesh.positions, dtype=np.float64) @ relative[node, :3, :3].T + relative[node, :3, 3]
+            positions.append(points)
+            indices.append(np.asarray(mesh.indices, dtype=np.int64) + offset)
+            offset += len(points)
+            self.last_stats.occluder_nodes += 1
+        if not positions:
+            return np.zeros((0, 3)), np.zeros((0, 3), dtype=np.int64)
+        return np.concatenate(positions), np.concatenate(indices)
+
+    def _solid(self, triangles: np.ndarray, origin: np.ndarray, shape: Tuple[int, ...]) -> np.ndarray:
+        """Voxels touched by ``triangles``, from barycentric samples at most half a voxel apart."""
+
+        solid = np.zeros(shape, dtype=bool)
+        edges = np.linalg.norm(triangles - np.roll(triangles, 1, axis=1), axis=2).max(axis=1)
+        steps = np.maximum(np.ceil(edges / (self.voxel_size / 2)).astype(np.int64), 1)
+        for step in np.unique(steps).tolist():
+            i, j = np.meshgrid(np.arange(step + 1), np.arange(step + 1), indexing="ij")
+            keep = i + j <= step
+            weights = np.column_stack((step - i[keep] - j[keep], i[keep], j[keep])) / step
+            chosen = np.flatnonzero(steps == step)
+            for chunk in np.array_split(chosen, max(1, len(chosen) * len(weights) // 2_000_000)):
+                points = np.einsum("lk,tkj->tlj", weights, triangles[chunk]).reshape(-1, 3)
+                voxel = np.floor((points - origin) / self.voxel_size).astype(np.int64)
+                voxel = np.clip(voxel, 0, np.array(shape) - 1)
+                solid[tuple(voxel.T)] = True
+        return solid
+
+    def _segment(self, free: np.ndarray) -> np.ndarray:
+        radius = int(np.ceil(self.portal_width / (2 * self.voxel_size)))
+        core = free
+        for axis in self._horizontal:
+            core = _window_free(core, radius, axis)
+        rooms, _ = label_components(core)
+        labels = _grow(rooms, free)
+        leftover, count = label_components(free & (labels < 0))
+        if count:
+            labels = np.where(leftover >= 0, leftover + int(labels.max()) + 1, labels)
+        return labels
+
+    def _space_cells(self, graph: SceneGraph, free: np.ndarray, origin: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Cells from ``IfcSpace`` boxes (first space wins where they overlap); empty when spaces have no extent.
+
+        A space's box is its ``bounds`` attribute (how ``StepIFCImporter`` keeps
+        space bodies, in the root's frame), or its mesh's bounds when it has one.
+        """
+
+        spaces: List[int] = []
+        boxes: List[np.ndarray] = []
+        for node, attributes in enumerate(graph.attributes):
+            if str(attributes.get("ifc_class", "")).upper() != "IFCSPACE":
+                continue
+            if attributes.get("bounds") is not None:
+                boxes.append(np.asarray(attributes["bounds"], dtype=np.float64).reshape(2, 3))
+            elif graph.mesh_ids[node] >= 0:
+                lower, upper = graph.node_bounds(np.array([node]))
+                boxes.append(np.stack((lower[0], upper[0])))
+            else:
+                continue
+            spaces.append(node)
+        labels = np.full(free.shape, -1, dtype=np.int32)
+        if not spaces:
+            return labels, np.zeros(0, dtype=np.int64)
+        corners = np.stack(boxes)
+        first = np.clip(np.floor((corners[:, 0] - origin) / self.voxel_size).astype(np.int64), 0, np.array(free.shape))
+        last = np.clip(np.ceil((corners[:, 1] - origin) / self.voxel_size).astype(np.int64), 0, np.array(free.shape))
+        for cell in range(len(spaces) - 1, -1, -1):
+            region = tuple(slice(a, b) for a, b in zip(first[cell], last[cell]))
+            labels[region] = np.where(free[region], cell, labels[region])
+        return labels, np.array(spaces, dtype=np.int64)
+
+    def bake(
+        self,
+        scene_graph: SceneGraph | Mapping[str, Dict[str, object]],
+        bvh: Optional[BVH] = None,
+        progress: Optional[Callable[[float], None]] = None,
+    ) -> CellVisibility:
+        """Cells, portals and PVS of ``scene_graph``; ``bvh`` (over its nodes) maps objects to cells.
+
+        See ``CellVisibility.with_nodes`` to map objects of a later graph instead.
+        """
+
+        graph = SceneGraph.coerce(scene_graph)
+        self.last_stats = stats = VisibilityStats()
+        positions, indices = self.occluders(graph)
+        stats.occluder_triangles = int(len(indices))
+        if not len(indices):
+            return CellVisibility.empty()
+
+        triangles = positions[indices]
+        pitch = self.voxel_size
+        # One free voxel ring around the sides lets the outdoors wrap the house; floors and roofs bound Z.
+        padding = np.full(3, pitch)
+        padding[AXES[self.up_axis]] = 0.0
+        origin = positions[indices.ravel()].min(axis=0) - padding
+        extent = positions[indices.ravel()].max(axis=0) + padding - origin
+        shape = tuple(np.maximum(np.ceil(extent / pitch - 1e-4).astype(np.int64), 1).tolist())
+        free = ~self._solid(triangles, origin, shape)
+        stats.voxels = int(free.size)
+        if progress is not None:
+            progress(0.2)
+
+        labels, spaces = self._space_cells(graph, free, origin)
+        if not spaces.size:
+            labels = self._segment(free)
+            sides = [np.take(labels, [0, -1], axis=axis).ravel() for axis in self._horizontal]
+            outdoors = np.unique(np.concatenate(sides))
+            keep = np.ones(int(labels.max()) + 1, dtype=bool)
+            keep[outdoors[outdoors >= 0]] = False
+            sizes = np.bincount(labels[labels >= 0], minlength=keep.size) * pitch**3
+            keep &= sizes >= self.min_cell_volume
+            renumber = np.where(keep, np.cumsum(keep) - 1, -1)
+            labels = np.where(labels >= 0, renumber[np.maximum(labels, 0)], -1).astype(np.int32)
+            spaces = np.full(int(keep.sum()), -1, dtype=np.int64)
+        count = len(spaces)
+        stats.cells = count
+        if progress is not None:
+            progress(0.4)
+
+        voxels = np.argwhere(labels >= 0)
+        owner = labels[tuple(voxels.T)]
+        cell_lower = np.full((count, 3), np.inf)
+        cell_upper = np.full((count, 3), -np.inf)
+        np.minimum.at(cell_lower, owner, origin + voxels * pitch)
+        np.maximum.at(cell_upper, owner, origin + (voxels + 1) * pitch)
+        empty = ~np.isfinite(cell_lower[:, 0])
+        cell_lower[empty] = cell_upper[empty] = 0.0
+
+        portals, portal_lower, portal_upper = self._portals(labels, origin)
+        stats.portals = len(portals)
+        visible = np.eye(count, dtype=bool)
+        if len(portals):
+            visible[portals[:, 0], portals[:, 1]] = visible[portals[:, 1], portals[:, 0]] = True
+
+        pairs = np.argwhere(np.triu(~visible, k=1))
+        if len(pairs):
+            seen = self._cast(pairs, voxels, owner, origin, positions, indices, progress)
+            visible[pairs[seen, 0], pairs[seen, 1]] = visible[pairs[seen, 1], pairs[seen, 0]] = True
+        stats.visible_pairs = int((np.count_nonzero(visible) - count) // 2)
+
+        offsets, members = _cell_nodes(
+            bvh if bvh is not None else BVH.from_scene(graph), cell_lower, cell_upper
+        )
+        if progress is not None:
+            progress(1.0)
+        return CellVisibility(
+            grid_origin=origin.astype(np.float32),
+            grid_pitch=np.array([pitch], dtype=np.float32),
+            cells=labels.astype(np.int16 if count < np.iinfo(np.int16).max else np.int32),
+            cell_bounds=np.stack((cell_lower, cell_upper), axis=1).astype(np.float32),
+            cell_spaces=spaces.astype(np.int32),
+            portals=portals.astype(np.int32),
+            portal_bounds=np.stack((portal_lower, portal_upper), axis=1).astype(np.float32),
+            pvs=np.packbits(visible, axis=1) if count else np.zeros((0, 0), dtype=np.uint8),
+            node_offsets=offsets,
+            nodes=members,
+        )
+
+    def _portals(self, labels: np.ndarray, origin: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Cell pairs touching across a voxel face, with the bounds of their shared faces."""
+
+        found_pairs: List[np.ndarray] = []
+        found_lower: List[np.ndarray] = []
+        found_upper: List[np.ndarray] = []
+        for axis in range(3):
+            here = [slice(None)] * 3
+            there = [slice(None)] * 3
+            here[axis], there[axis] = slice(None, -1), slice(1, None)
+            a, b = labels[tuple(here)], labels[tuple(there)]
+            touching = np.argwhere((a >= 0) & (b >= 0) & (a != b))
+            if not len(touching):
+                continue
+            pair = np.sort(np.column_stack((a[tuple(touching.T)], b[tuple(touching.T)])), axis=1)
+            face = origin + touching * self.voxel_size
+            face_upper = face + self.voxel_size
+            face[:, axis] = face_upper[:, axis]  # the shared face lies on the far side of the first voxel
+            found_pairs.append(pair)
+            found_lower.append(face)
+            found_upper.append(face_upper)
+        if not found_pairs:
+            return np.zeros((0, 2), dtype=np.int64), np.zeros((0, 3)), np.zeros((0, 3))
+        pairs = np.concatenate(found_pairs)
+        unique, inverse = np.unique(pairs, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        lower = np.full((len(unique), 3), np.inf)
+        upper = np.full((len(unique), 3), -np.inf)
+        np.minimum.at(lower, inverse, np.concatenate(found_lower))
+        np.maximum.at(upper, inverse, np.concatenate(found_upper))
+        return unique, lower, upper
+
+    def _cast(
+        self,
+        pairs: np.ndarray,
+        voxels: np.ndarray,
+        owner: np.ndarray,
+        origin: np.ndarray,
+        positions: np.ndarray,
+        indices: np.ndarray,
+        progress: Optional[Callable[[float], None]],
+    ) -> np.ndarray:
+        """Whether any of ``rays_per_pair`` random segments between each pair of cells is unobstructed."""
+
+        rng = np.random.default_rng(self.seed)
+        order = np.argsort(owner, kind="stable")
+        starts = np.searchsorted(owner[order], np.arange(int(owner.max()) + 1))
+        sizes = np.bincount(owner, minlength=len(starts))
+
+        def sample(cells: np.ndarray) -> np.ndarray:
+            picks = starts[cells] + (rng.random(cells.size) * sizes[cells]).astype(np.int64)
+            return origin + (voxels[order[picks]] + rng.random((cells.size, 3))) * self.voxel_size
+
+        pair_of_ray = np.repeat(np.arange(len(pairs)), self.rays_per_pair)
+        sources = sample(pairs[pair_of_ray, 0])
+        targets = sample(pairs[pair_of_ray, 1])
+        self.last_stats.rays = int(len(pair_of_ray))
+
+        occluders = {**BVH.from_triangles(positions, indices).arrays(), "positions": positions, "indices": indices}
+        batches = range(0, len(pair_of_ray), _RAY_BATCH)
+        blocked = np.zeros(len(pair_of_ray), dtype=bool)
+        workers = self.max_workers or os.cpu_count() or 1
+        if workers <= 1 or len(pair_of_ray) < PARALLEL_RAYS:
+            for done, first in enumerate(batches, start=1):
+                blocked[first : first + _RAY_BATCH] = _blocked(
+                    occluders, sources[first : first + _RAY_BATCH], targets[first : first + _RAY_BATCH]
+                )
+                if progress is not None:
+                    progress(0.4 + 0.6 * done / len(batches))
+        else:
+            block, handle = share_arrays(occluders)
+            try:
+                with ProcessPoolExecutor(max_workers=workers, mp_context=process_context()) as pool:
+                    futures = [
+                        (
+                            first,
+                            pool.submit(
+                                _blocked_worker,
+                                handle,
+                                sources[first : first + _RAY_BATCH],
+                                targets[first : first + _RAY_BATCH],
+                            ),
+                        )
+                        for first in batches
+                    ]
+                    for done, (first, future) in enumerate(futures, start=1):
+                        blocked[first : first + _RAY_BATCH] = future.result()
+                        if progress is not None:
+                            progress(0.4 + 0.6 * done / len(futures))
+            finally:
+                if block is not None:
+                    block.close()
+                    block.unlink()
+        open_rays = np.bincount(pair_of_ray[~blocked], minlength=len(pairs))
+        return open_rays > 0
+
+
+__all__ = [
+    "CellVisibility",
+    "OCCLUDER_CLASSES",
+    "SEE_THROUGH_CLASSES",
+    "VisibilityBaker",
+    "VisibilityStats",
+    "label_components",
+]
@@ -0,0 +1,193 @@
+"""Lazy plugin registry for importers, processors and exporters.
+
+Plugins are described by ``"package.module:attribute"`` targets and only
+imported the first time they are used, so answering "which suffixes can we
+read?" or building ``--help`` never loads a parser, NumPy or ``cryptography``.
+Besides the built-ins below, installed distributions can add or replace plugins
+through entry points::
+
+    [project.entry-points."vrhouse.importers"]
+    ".ifc" = "my_ifc_plugin:IfcOpenShellImporter"     # importers are named by suffix
+
+    [project.entry-points."vrhouse.processors"]
+    "geometry" = "my_plugin:FasterGeometryOptimizer"  # processors/exporters by name
+
+This module must stay importable without third-party packages.
+"""
+from __future__ import annotations
+
+import importlib
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+IMPORTERS = "importers"
+PROCESSORS = "processors"
+EXPORTERS = "exporters"
+ENTRY_POINT_GROUPS: Dict[str, str] = {
+    IMPORTERS: "vrhouse.importers",
+    PROCESSORS: "vrhouse.processors",
+    EXPORTERS: "vrhouse.exporters",
+}
+
+
+class UnknownPluginError(LookupError):
+    """No plugin of the requested kind is registered under that name or suffix."""
+
+
+@dataclass(frozen=True)
+class PluginSpec:
+    """Where to find a plugin; nothing is imported until ``PluginRegistry.load``."""
+
+    kind: str
+    name: str
+    target: str
+    source: str = "builtin"
+
+    @property
+    def module(self) -> str:
+        return self.target.partition(":")[0]
+
+
+_IMPORTERS = "vrhouse.pipeline.importers"
+_PROCESSORS = "vrhouse.pipeline.processors"
+BUILTIN_PLUGINS: Tuple[PluginSpec, ...] = (
+    PluginSpec(IMPORTERS, ".ifc", f"{_IMPORTERS}.ifc_importer:StepIFCImporter"),
+    PluginSpec(IMPORTERS, ".fbx", f"{_IMPORTERS}.stub:FBXImporter"),
+    PluginSpec(IMPORTERS, ".obj", f"{_IMPORTERS}.obj_importer:StreamingOBJImporter"),
+    PluginSpec(IMPORTERS, ".gltf", f"{_IMPORTERS}.gltf_importer:MappedGLTFImporter"),
+    PluginSpec(IMPORTERS, ".glb", f"{_IMPORTERS}.gltf_importer:MappedGLTFImporter"),
+    PluginSpec(IMPORTERS, ".rvt", f"{_IMPORTERS}.stub:RVTImporter"),
+    PluginSpec(PROCESSORS, "instancing", f"{_PROCESSORS}.instancing:InstanceDeduplicator"),
+    PluginSpec(PROCESSORS, "geometry", f"{_PROCESSORS}.geometry_optimizer:GeometryOptimizer"),
+    PluginSpec(PROCESSORS, "vertex-cache", f"{_PROCESSORS}.vertex_cache:VertexCacheOptimizer"),
+    PluginSpec(PROCESSORS, "materials", f"{_PROCESSORS}.material_enhancer:MaterialEnhancer"),
+    PluginSpec(PROCESSORS, "batching", f"{_PROCESSORS}.batching:MaterialBatcher"),
+    PluginSpec(PROCESSORS, "physics", "vrhouse.pipeline.ai.physics_model:PhysicsInferenceModel"),
+    PluginSpec(PROCESSORS, "colliders", f"{_PROCESSORS}.colliders:ColliderGenerator"),
+    PluginSpec(PROCESSORS, "visibility", f"{_PROCESSORS}.visibility:VisibilityBaker"),
+    PluginSpec(EXPORTERS, "vrpkg", "vrhouse.pipeline.exporters.vr_scene_builder:VRSceneBuilder"),
+)
+
+
+class PluginRegistry:
+    """Name/suffix -> ``PluginSpec`` table whose targets are imported on first use.
+
+    Entry points are read once, on the first lookup, and override built-ins with
+    the same name. ``load`` records how long each target took to import
+    (``import_seconds``) so slow plugins show up in profiles.
+    """
+
+    def __init__(self, plugins: Iterable[PluginSpec] = BUILTIN_PLUGINS, *, discover: bool = True) -> None:
+        self._specs: Dict[str, Dict[str, PluginSpec]] = {kind: {} for kind in ENTRY_POINT_GROUPS}
+        for spec in plugins:
+            self.register(spec)
+        self._discovered = not discover
+        self._lock = threading.RLock()
+        self._loaded: Dict[str, Any] = {}
+        self._instances: Dict[str, Any] = {}
+        self.import_seconds: Dict[str, float] = {}
+
+    @staticmethod
+    def _key(kind: str, name: str) -> str:
+        return name.lower() if kind == IMPORTERS else name
+
+    def register(self, spec: PluginSpec) -> None:
+        if spec.kind not in self._specs:
+            raise ValueError(f"Unknown plugin kind {spec.kind!r}; expected one of {sorted(self._specs)}")
+        if ":" not in spec.target:
+            raise ValueError(f"Plugin target {spec.target!r} must look like 'package.module:attribute'")
+        self._specs[spec.kind][self._key(spec.kind, spec.name)] = spec
+
+    def _discover(self) -> None:
+        if self._discovered:
+            return
+        with self._lock:
+            if self._discovered:
+                return
+            from importlib.metadata import entry_points  # slow to import; only needed once
+
+            for kind, group in ENTRY_POINT_GROUPS.items():
+                for entry_point in entry_points(group=group):
+                    distribution = getattr(entry_point, "dist", None)
+                    source = distribution.name if distribution is not None else "entry-point"
+                    self.register(PluginSpec(kind, entry_point.name, entry_point.value, source))
+            self._discovered = True
+
+    def specs(self, kind: str) -> List[PluginSpec]:
+        self._discover()
+        return list(self._specs[kind].values())
+
+    def names(self, kind: str) -> List[str]:
+        return [spec.name for spec in self.specs(kind)]
+
+    def find(self, kind: str, name: str) -> PluginSpec:
+        self._discover()
+        spec = self._specs.get(kind, {}).get(self._key(kind, name))
+        if spec is None:
+            raise UnknownPluginError(f"No {kind[:-1]} registered for {name!r}")
+        return spec
+
+    def load(self, kind: str, name: str) -> Any:
+        """Import and return the plugin's target attribute (a class, factory or instance)."""
+
+        spec = self.find(kind, name)
+        loaded = self._loaded.get(spec.target)
+        if loaded is not None:
+            return loaded
+        with self._lock:
+            if spec.target not in self._loaded:
+                module_name, _, attribute = spec.target.partition(":")
+                started = time.perf_counter()
+                module = importlib.import_module(module_name)
+                target: Any = module
+                for part in attribute.split("."):
+                    target = getattr(target, part)
+                self.import_seconds[spec.target] = time.perf_counter() - started
+                self._loaded[spec.target] = target
+            return self._loaded[spec.target]
+
+    def create(self, kind: str, name: str, *args: Any, **kwargs: Any) -> Any:
+        """Build a new plugin object: classes and factories are called, instances returned as is."""
+
+        target = self.load(kind, name)
+        return target(*args, **kwargs) if callable(target) else target
+
+    def instance(self, kind: str, name: str) -> Any:
+        """Shared, argument-less plugin object (e.g. the importer serving ``.gltf`` and ``.glb``)."""
+
+        spec = self.find(kind, name)
+        instance = self._instances.get(spec.target)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.get(spec.target)
+                if instance is None:
+                    instance = self._instances[spec.target] = self.create(kind, name)
+        return instance
+
+    def is_loaded(self, kind: str, name: str) -> bool:
+        return self.find(kind, name).target in self._loaded
+
+
+_default: Optional[PluginRegistry] = None
+
+
+def default_registry() -> PluginRegistry:
+    global _default
+    if _default is None:
+        _default = PluginRegistry()
+    return _default
+
+
+__all__ = [
+    "BUILTIN_PLUGINS",
+    "ENTRY_POINT_GROUPS",
+    "EXPORTERS",
+    "IMPORTERS",
+    "PROCESSORS",
+    "PluginRegistry",
+    "PluginSpec",
+    "UnknownPluginError",
+    "default_registry",
+]
@@ -1,14 +1,17 @@
 ﻿"""High level helpers to execute the conversion pipeline with progress reporting."""
 from __future__ import annotations
 
-from typing import Callable, Dict, Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Mapping, Optional, Sequence
 
-from vrhouse.core import SceneSpecification
-from vrhouse.pipeline.ai.physics_model import PhysicsInferenceModel
-from vrhouse.pipeline.exporters.vr_scene_builder import VRSceneBuilder
-from vrhouse.pipeline.importers.multi_importer import MultiFormatImporter, validate_source_path
-from vrhouse.pipeline.processors.geometry_optimizer import GeometryOptimizer
-from vrhouse.pipeline.processors.material_enhancer import MaterialEnhancer
+from vrhouse.core import BVH, SceneSpecification
+from vrhouse.pipeline.cache import StageCache
+from vrhouse.pipeline.importers.multi_importer import MultiFormatImporter
+from vrhouse.pipeline.instrumentation import Instrumentation, StageObserver
+from vrhouse.pipeline.registry import EXPORTERS, PROCESSORS, PluginRegistry, default_registry
+from vrhouse.pipeline.scheduler import Stage, StageReport, StageScheduler
+
+if TYPE_CHECKING:
+    from vrhouse.pipeline.exporters.vr_scene_builder import VRSceneBuilder
 
 ProgressCallback = Callable[[float, str], None]
 
@@ -18,47 +21,234 @@ def run_conversion(
     output_directory,
     *,
     progress_callback: Optional[ProgressCallback] = None,
+    cache: Optional[StageCache] = None,
+    exporter: Optional[VRSceneBuilder] = None,
+    max_workers: Optional[int] = None,
+    observers: Sequence[StageObserver] = (),
+    trace_memory: bool = False,
+    registry: Optional[PluginRegistry] = None,
 ) -> Dict[str, object]:
-    """Execute the conversion pipeline and export the encrypted package."""
+    """Execute the conversion pipeline and export the encrypted package.
+
+    Stages form a DAG run by ``StageScheduler``: per-object physics and material
+    planning only need the instanced scene (full-resolution meshes give exact
+    mass properties), so both overlap with geometry work; the batching stage then applies the material
+    plan and collapses materials into atlases and static meshes into batches
+    (see ``processors.batching``). Collision shapes are fitted per object once its
+    physics is known (see ``processors.colliders``). A ``BVH`` over the batched
+    scene (so its leaves index the exported nodes) is exported with it, as are the
+    room cells and their potentially visible sets (see ``processors.visibility``).
+    Progress is the weighted share of finished work, including per-mesh progress
+    inside the heavy stages.
+
+    With a ``cache`` every stage before export is looked up by the chained key of
+    its inputs, configuration and code version, and only recomputed on a miss;
+    processed textures and colliders are kept next to it (``<cache>/textures``,
+    ``<cache>/colliders``) keyed by their content, so projects sharing a texture or
+    a piece of furniture process it once; all three share the cache's size budget.
+    ``exporter`` overrides the default ``VRSceneBuilder`` (e.g. to enable compression).
+    ``max_workers`` caps the pools used inside stages (useful when several
+    conversions already run side by side).
+
+    Every stage is measured (wall and CPU time, RSS, input/output sizes) and the
+    records are returned as ``stage_metrics``; ``observers`` receive them as
+    they happen (see ``pipeline.instrumentation`` for the Chrome trace and
+    JSON-lines exporters). ``trace_memory`` adds ``tracemalloc`` figures at a
+    noticeable speed cost.
+
+    Processors and the exporter come from ``registry`` (the default plugin
+    registry when omitted), so an installed plugin can replace any of them.
+    """
     def emit(progress: float, message: str) -> None:
         if progress_callback:
             progress_callback(progress, message)
 
-    importer = MultiFormatImporter()
-    optimizer = GeometryOptimizer()
-    enhancer = MaterialEnhancer()
-    physics_model = PhysicsInferenceModel()
-    exporter = VRSceneBuilder()
-
-    emit(0.05, "Validando arquivo de origem")
-    validate_source_path(specification.source_file)
-
-    emit(0.2, "Carregando geometria base")
-    scene_graph = importer.load(specification)
-
-    emit(0.35, "Otimizando geometria e malhas")
-    scene_graph = optimizer.optimize(scene_graph)
-
+    registry = registry or default_registry()
+    importer = MultiFormatImporter(registry=registry)
+    deduplicator = registry.create(PROCESSORS, "instancing")
+    optimizer = registry.create(PROCESSORS, "geometry", max_workers=max_workers)
+    vertex_optimizer = registry.create(PROCESSORS, "vertex-cache", max_workers=max_workers)
+    enhancer = registry.create(
+        PROCESSORS,
+        "materials",
+        target_platforms=specification.target_platforms,
+        texture_cache=cache.subcache("textures") if cache else None,
+        max_workers=max_workers,
+    )
+    batcher = registry.create(PROCESSORS, "batching")
+    physics_model = registry.create(PROCESSORS, "physics")
+    collider_generator = registry.create(
+        PROCESSORS,
+        "colliders",
+        cache=cache.subcache("colliders") if cache else None,
+        max_workers=max_workers,
+    )
+    visibility_baker = registry.create(PROCESSORS, "visibility", max_workers=max_workers)
+    exporter = exporter or registry.create(EXPORTERS, "vrpkg", max_workers=max_workers)
+
+    emit(0.0, "Validando arquivo de origem")
+    importer.validate_source_path(specification.source_file)
+
+    def batch(inputs: Mapping[str, Any], report: StageReport) -> Any:
+        scene_graph = inputs["vertex-cache"]
+        if "materials" in inputs:
+            scene_graph = enhancer.apply(scene_graph, inputs["materials"])
+        return batcher.batch(scene_graph, report)
+
+    def compose(inputs: Mapping[str, Any], report: StageReport) -> Any:
+        spatial_index = inputs["bvh"].arrays()
+        # Cells are baked from the imported scene (IFC classes pick the occluders); their
+        # objects are looked up in the batched one, which is what gets exported.
+        visibility = inputs["visibility"].with_nodes(inputs["bvh"]).arrays()
+        objects = inputs.get("physics")
+        if objects is None:
+            return exporter.build(
+                specification, inputs["batching"], {}, spatial_index=spatial_index, visibility=visibility
+            )
+        colliders = inputs["colliders"]
+        profile = {**objects.summary(), **colliders.summary()}
+        return exporter.build(
+            specification,
+            inputs["batching"],
+            profile,
+            objects.arrays(),
+            colliders.arrays(),
+            spatial_index=spatial_index,
+            visibility=visibility,
+        )
+
+    # Weights approximate each stage's share of the run time on typical projects.
+    stages: List[Stage] = [
+        Stage(
+            "import",
+            lambda inputs, report: importer.load(specification),
+            weight=2.0,
+            message="Carregando geometria base",
+            cache_object=importer,
+        ),
+        Stage(
+            "visibility",
+            lambda inputs, report: visibility_baker.bake(inputs["import"], progress=report),
+            ("import",),
+            weight=1.0,
+            message="Calculando células, portais e visibilidade (PVS)",
+            cache_object=visibility_baker,
+        ),
+        Stage(
+            "instancing",
+            lambda inputs, report: deduplicator.deduplicate(inputs["import"], report),
+            ("import",),
+            weight=1.0,
+            message="Detectando elementos repetidos para instanciamento",
+            cache_object=deduplicator,
+        ),
+        Stage(
+            "geometry",
+            lambda inputs, report: optimizer.optimize(inputs["instancing"], report),
+            ("instancing",),
+            weight=4.0,
+            message="Otimizando geometria e malhas",
+            cache_object=optimizer,
+        ),
+        Stage(
+            "vertex-cache",
+            lambda inputs, report: vertex_optimizer.optimize(inputs["geometry"], report),
+            ("geometry",),
+            weight=2.0,
+            message="Soldando vértices e reordenando para o cache da GPU",
+            cache_object=vertex_optimizer,
+        ),
+    ]
+    batching_dependencies = ["vertex-cache"]
+    scene_dependencies = ["batching", "bvh", "visibility"]
     if specification.enable_ai_realism:
-        emit(0.5, "Aplicando IA para realismo de materiais")
-        scene_graph = enhancer.enhance(scene_graph)
-
-    physics_profile: Dict[str, float] = {}
+        stages.append(
+            Stage(
+                "materials",
+                lambda inputs, report: enhancer.plan(inputs["instancing"], report),
+                ("instancing",),
+                weight=1.0,
+                message="Aplicando IA para realismo de materiais",
+                # Not a stage-cache entry: texture files are not part of the chained key, so
+                # the plan is rebuilt each run and textures come from the content-hashed cache.
+            )
+        )
+        batching_dependencies.append("materials")
     if specification.enable_physics:
-        emit(0.65, "Gerando perfil de física")
-        physics_profile = physics_model.predict(specification)
-
-    emit(0.8, "Compondo cena VR criptografada")
-    scene = exporter.build(specification, scene_graph, physics_profile)
-
-    emit(0.95, "Exportando pacote protegido")
-    package_path, encryption_key = exporter.export_package(scene, output_directory)
+        stages.append(
+            Stage(
+                "physics",
+                lambda inputs, report: physics_model.predict_objects(inputs["instancing"], report),
+                ("instancing",),
+                weight=0.5,
+                message="Estimando massa, inércia e atrito por objeto",
+                cache_object=physics_model,
+            )
+        )
+        stages.append(
+            Stage(
+                "colliders",
+                lambda inputs, report: collider_generator.generate(inputs["instancing"], inputs["physics"], report),
+                ("instancing", "physics"),
+                weight=1.0,
+                message="Gerando colisores por objeto",
+                cache_object=collider_generator,
+            )
+        )
+        scene_dependencies.extend(("physics", "colliders"))
+    stages.extend(
+        [
+            Stage(
+                "batching",
+                batch,
+                tuple(batching_dependencies),
+                weight=1.0,
+                message="Agrupando materiais em atlas e unindo malhas estáticas",
+            ),
+            Stage(
+                "bvh",
+                lambda inputs, report: BVH.from_scene(inputs["batching"]),
+                ("batching",),
+                weight=0.5,
+                message="Construindo índice espacial (BVH)",
+            ),
+            Stage("scene", compose, tuple(scene_dependencies), weight=0.5, message="Compondo cena VR criptografada"),
+            Stage(
+                "export",
+                lambda inputs, report: exporter.export_package(inputs["scene"], output_directory),
+                ("scene",),
+                weight=1.5,
+                message="Exportando pacote protegido",
+            ),
+        ]
+    )
+
+    source_key = cache.source_digest(specification.source_file) if cache is not None else ""
+    instrumentation = Instrumentation(observers, trace_memory=trace_memory)
+    scheduler = StageScheduler(
+        stages,
+        progress_callback=emit,
+        cache=cache,
+        source_key=source_key,
+        instrumentation=instrumentation,
+    )
+    instrumentation.start(project=specification.project_name, source=str(specification.source_file))
+    try:
+        outputs = scheduler.run()
+    except BaseException:
+        instrumentation.finish(status="failed")
+        raise
+    instrumentation.finish(status="ok", cache_hits=list(scheduler.cache_hits))
+    package_path, encryption_key = outputs["export"]
 
     emit(1.0, "Conversão concluída")
     return {
-        "scene": scene,
+        "scene": outputs["scene"],
         "package_path": package_path,
         "encryption_key": encryption_key,
+        "stage_seconds": dict(scheduler.stage_seconds),
+        "cache_hits": list(scheduler.cache_hits),
+        "stage_metrics": list(instrumentation.metrics),
     }
 
 
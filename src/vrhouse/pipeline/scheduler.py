@@ -0,0 +1,213 @@
+"""Dependency-driven stage scheduler with weighted progress and stage-cache integration."""
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import nullcontext
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+from vrhouse.core import PipelineError
+from vrhouse.pipeline.cache import StageCache
+from vrhouse.pipeline.instrumentation import Instrumentation, describe_size
+
+ProgressCallback = Callable[[float, str], None]
+StageReport = Callable[[float], None]
+_MISSING = object()
+
+
+@dataclass
+class Stage:
+    """One node of the pipeline DAG.
+
+    ``run`` receives the outputs of ``dependencies`` (by stage name) and a
+    ``report(fraction)`` callable for progress inside the stage. ``weight`` is the
+    stage's share of the total work. Stages with a ``cache_object`` are looked up
+    in the ``StageCache`` under a key chained from their dependencies' keys; stages
+    without one (or depending on one without) always run.
+    """
+
+    name: str
+    run: Callable[[Mapping[str, Any], StageReport], Any]
+    dependencies: Sequence[str] = ()
+    weight: float = 1.0
+    message: str = ""
+    cache_object: Optional[object] = None
+
+
+def topological_order(stages: Sequence[Stage]) -> List[Stage]:
+    by_name: Dict[str, Stage] = {}
+    for stage in stages:
+        if stage.name in by_name:
+            raise PipelineError(f"Duplicate pipeline stage: {stage.name}")
+        by_name[stage.name] = stage
+    for stage in stages:
+        unknown = [dependency for dependency in stage.dependencies if dependency not in by_name]
+        if unknown:
+            raise PipelineError(f"Stage {stage.name} depends on unknown stages: {unknown}")
+
+    order: List[Stage] = []
+    state: Dict[str, int] = {}
+
+    def visit(stage: Stage, trail: List[str]) -> None:
+        mark = state.get(stage.name, 0)
+        if mark == 2:
+            return
+        if mark == 1:
+            raise PipelineError(f"Pipeline stages form a cycle: {' -> '.join(trail + [stage.name])}")
+        state[stage.name] = 1
+        for dependency in stage.dependencies:
+            visit(by_name[dependency], trail + [stage.name])
+        state[stage.name] = 2
+        order.append(stage)
+
+    for stage in stages:
+        visit(stage, [])
+    return order
+
+
+class StageScheduler:
+    """Run a stage DAG, overlapping independent stages on a thread pool.
+
+    Stages mostly release the GIL (NumPy, crypto, zlib) or fan out to their own
+    process pools, so threads are enough to overlap them. Only the stages needed
+    to produce the DAG's sinks are executed: a cache hit prunes everything that
+    only fed the cached stage. With an ``Instrumentation`` every executed or
+    cached stage is measured and reported to its observers.
+    """
+
+    def __init__(
+        self,
+        stages: Sequence[Stage],
+        *,
+        max_workers: Optional[int] = None,
+        progress_callback: Optional[ProgressCallback] = None,
+        cache: Optional[StageCache] = None,
+        source_key: str = "",
+        instrumentation: Optional[Instrumentation] = None,
+    ) -> None:
+        self.stages = topological_order(stages)
+        self.max_workers = max_workers or min(4, len(self.stages)) or 1
+        self.cache = cache
+        self.source_key = source_key
+        self.instrumentation = instrumentation
+        self._progress_callback = progress_callback
+        self._lock = threading.Lock()
+        self._fractions: Dict[str, float] = {}
+        self._total_weight = sum(stage.weight for stage in self.stages) or 1.0
+        self._reported = 0.0
+        self.cache_hits: List[str] = []
+        self.stage_seconds: Dict[str, float] = {}
+
+    # -- progress ------------------------------------------------------------------------
+    def _update(self, stage: Stage, fraction: float, message: Optional[str] = None) -> None:
+        if self._progress_callback is None:
+            return
+        with self._lock:
+            previous = self._fractions.get(stage.name, 0.0)
+            self._fractions[stage.name] = max(previous, min(1.0, fraction))
+            done = sum(
+                candidate.weight * self._fractions.get(candidate.name, 0.0) for candidate in self.stages
+            )
+            progress = max(self._reported, done / self._total_weight)
+            self._reported = progress
+            self._progress_callback(progress, message or stage.message or stage.name)
+
+    # -- planning ------------------------------------------------------------------------
+    def _keys(self) -> Dict[str, Optional[str]]:
+        keys: Dict[str, Optional[str]] = {}
+        for stage in self.stages:
+            upstream = [keys[dependency] for dependency in stage.dependencies]
+            if self.cache is None or stage.cache_object is None or any(key is None for key in upstream):
+                keys[stage.name] = None
+                continue
+            keys[stage.name] = self.cache.key(
+                stage.name, stage.cache_object, "|".join(upstream) if upstream else self.source_key
+            )
+        return keys
+
+    def _plan(self, keys: Mapping[str, Optional[str]]) -> Tuple[Set[str], Dict[str, Any]]:
+        """Walk back from the sinks; return the stages to run and the outputs served from cache."""
+
+        consumers: Dict[str, int] = {stage.name: 0 for stage in self.stages}
+        for stage in self.stages:
+            for dependency in stage.dependencies:
+                consumers[dependency] += 1
+        required = {stage.name for stage in self.stages if consumers[stage.name] == 0}
+        to_run: Set[str] = set()
+        cached: Dict[str, Any] = {}
+        for stage in reversed(self.stages):
+            if stage.name not in required:
+                continue
+            key = keys[stage.name]
+            if key is not None and self.cache is not None:
+                value = self.cache.get(key, _MISSING)
+                if value is not _MISSING:
+                    cached[stage.name] = value
+                    continue
+            to_run.add(stage.name)
+            required.update(stage.dependencies)
+        return to_run, cached
+
+    # -- execution -----------------------------------------------------------------------
+    def run(self) -> Dict[str, Any]:
+        """Execute the DAG and return every computed or cached stage output by name."""
+
+        keys = self._keys()
+        to_run, outputs = self._plan(keys)
+        for stage in self.stages:
+            if stage.name not in to_run:
+                if stage.name in outputs:
+                    self.cache_hits.append(stage.name)
+                    if self.instrumentation is not None:
+                        self.instrumentation.cached(stage.name, outputs[stage.name])
+                self._update(stage, 1.0)
+
+        remaining = [stage for stage in self.stages if stage.name in to_run]
+        running: Dict[Future, Stage] = {}
+        failure: Optional[BaseException] = None
+
+        def execute(stage: Stage) -> Any:
+            self._update(stage, 0.0)
+            started = time.perf_counter()
+            inputs = {dependency: outputs[dependency] for dependency in stage.dependencies}
+            measure = (
+                self.instrumentation.stage(stage.name, inputs) if self.instrumentation is not None else nullcontext()
+            )
+            with measure as metrics:
+                result = stage.run(inputs, lambda fraction: self._update(stage, fraction))
+                if metrics is not None:
+                    metrics.output_sizes = describe_size(result)
+            self.stage_seconds[stage.name] = time.perf_counter() - started
+            key = keys[stage.name]
+            if key is not None and self.cache is not None:
+                self.cache.put(key, result)
+            return result
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="vrhouse-stage") as pool:
+            while remaining or running:
+                if failure is None:
+                    ready = [
+                        stage for stage in remaining if all(dependency in outputs for dependency in stage.dependencies)
+                    ]
+                    for stage in ready:
+                        remaining.remove(stage)
+                        running[pool.submit(execute, stage)] = stage
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    try:
+                        outputs[stage.name] = future.result()
+                    except BaseException as exc:  # let running siblings finish, start nothing new
+                        failure = failure or exc
+                        continue
+                    self._update(stage, 1.0)
+        if failure is not None:
+            raise failure
+        return outputs
+
+
+__all__ = ["ProgressCallback", "Stage", "StageReport", "StageScheduler", "topological_order"]
@@ -0,0 +1,134 @@
+"""Blocking client for ``vrhouse serve`` built on ``urllib`` (used by the desktop app as a thin client)."""
+from __future__ import annotations
+
+import json
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+from urllib.parse import urlencode
+
+from vrhouse.core import PipelineError
+from vrhouse.service.server import TERMINAL_STATES
+
+
+class ServiceError(PipelineError):
+    """The conversion service rejected a request or could not be reached."""
+
+
+class ServiceClient:
+    def __init__(self, base_url: str, *, timeout: float = 30.0) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def _request(
+        self,
+        method: str,
+        path: str,
+        *,
+        data: Optional[object] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ):
+        request = urllib.request.Request(self.base_url + path, data=data, method=method, headers=headers or {})
+        try:
+            return urllib.request.urlopen(request, timeout=timeout if timeout is not None else self.timeout)
+        except urllib.error.HTTPError as exc:
+            try:
+                message = json.loads(exc.read().decode("utf-8")).get("error", exc.reason)
+            except (ValueError, AttributeError):
+                message = exc.reason
+            raise ServiceError(f"{method} {path}: {exc.code} {message}") from exc
+        except urllib.error.URLError as exc:
+            raise ServiceError(f"Conversion service at {self.base_url} is unreachable: {exc.reason}") from exc
+
+    def _json(self, method: str, path: str, **kwargs: object) -> Dict[str, object]:
+        with self._request(method, path, **kwargs) as response:
+            return json.loads(response.read().decode("utf-8"))
+
+    def status(self) -> Dict[str, object]:
+        return self._json("GET", "/")
+
+    def submit(
+        self,
+        source: Path,
+        project_name: str,
+        *,
+        enable_physics: bool = True,
+        enable_ai_realism: bool = True,
+        encryption_key: Optional[str] = None,
+    ) -> Dict[str, object]:
+        """Upload ``source`` (streamed from disk) and queue its conversion; returns the job record."""
+
+        source = Path(source)
+        query = urlencode(
+            {
+                "project_name": project_name,
+                "physics": int(enable_physics),
+                "ai": int(enable_ai_realism),
+            }
+        )
+        headers = {
+            "Content-Type": "application/octet-stream",
+            "Content-Length": str(source.stat().st_size),
+            "X-Filename": source.name,
+        }
+        if encryption_key:
+            headers["X-Encryption-Key"] = encryption_key
+        with source.open("rb") as handle:
+            return self._json("POST", f"/jobs?{query}", data=handle, headers=headers)
+
+    def job(self, job_id: str) -> Dict[str, object]:
+        return self._json("GET", f"/jobs/{job_id}")
+
+    def cancel(self, job_id: str) -> Dict[str, object]:
+        return self._json("DELETE", f"/jobs/{job_id}")
+
+    def events(self, job_id: str) -> Iterator[Dict[str, object]]:
+        """Follow the job's Server-Sent Events until it finishes, failing or being cancelled."""
+
+        with self._request(
+            "GET", f"/jobs/{job_id}/events", headers={"Accept": "text/event-stream"}, timeout=None
+        ) as response:
+            data = []
+            for raw in response:
+                line = raw.decode("utf-8").rstrip("\r\n")
+                if line.startswith("data:"):
+                    data.append(line[5:].strip())
+                elif not line and data:
+                    event = json.loads("\n".join(data))
+                    data = []
+                    yield event
+                    if event.get("event") in TERMINAL_STATES:
+                        return
+
+    def download(self, job_id: str, target: Path) -> Path:
+        """Save the job's package to ``target``.
+
+        Bytes land in a job-specific ``.part`` file first; if an earlier attempt
+        was interrupted the download resumes from where it stopped with a
+        ``Range`` request, and the file is renamed into place once complete.
+        """
+
+        target = Path(target)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        partial = target.with_name(f".{target.name}.{job_id}.part")
+        offset = partial.stat().st_size if partial.exists() else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        try:
+            response = self._request("GET", f"/jobs/{job_id}/package", headers=headers, timeout=None)
+        except ServiceError as exc:
+            if not (offset and " 416 " in str(exc)):  # 416 on resume: the partial file is already complete
+                raise
+        else:
+            with response, partial.open("ab" if response.status == 206 else "wb") as handle:
+                while True:
+                    chunk = response.read(1024 * 1024)
+                    if not chunk:
+                        break
+                    handle.write(chunk)
+        partial.replace(target)
+        return target
+
+
+__all__ = ["ServiceClient", "ServiceError"]
@@ -0,0 +1,697 @@
+"""Local asyncio HTTP conversion service: uploads, a bounded job pool, progress streams and downloads.
+
+Endpoints (JSON unless noted)::
+
+    GET    /                      service status
+    POST   /jobs                  upload a model (raw body) and queue a conversion
+    GET    /jobs                  list jobs
+    GET    /jobs/{id}             job status
+    GET    /jobs/{id}/events      progress as Server-Sent Events, or WebSocket on ``Upgrade``
+    DELETE /jobs/{id}             cancel a queued or running job
+    GET    /jobs/{id}/package     the finished ``.vrpkg`` (supports ``Range``)
+
+Uploads send the file as the request body with ``X-Filename`` (or ``?filename=``);
+``project_name``, ``physics`` and ``ai`` are query parameters and an optional
+``X-Encryption-Key`` header sets the package key.
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import contextlib
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import struct
+import time
+import traceback
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional, Set, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from cryptography.fernet import Fernet
+
+from vrhouse.pipeline.batch import BatchJob, BatchOptions, limit_memory, run_job
+from vrhouse.pipeline.importers.base import ImporterError
+from vrhouse.pipeline.importers.multi_importer import validate_source_path
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_MAX_UPLOAD_MB = 2048
+CHUNK_SIZE = 1024 * 1024
+HEARTBEAT_SECONDS = 15.0
+# Progress events closer than this (and less than 0.5% apart) are coalesced in the worker.
+PROGRESS_INTERVAL = 0.1
+TERMINAL_STATES = frozenset({"done", "failed", "cancelled"})
+_WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+_REASONS = {
+    101: "Switching Protocols",
+    200: "OK",
+    202: "Accepted",
+    206: "Partial Content",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    411: "Length Required",
+    413: "Payload Too Large",
+    416: "Range Not Satisfiable",
+    500: "Internal Server Error",
+}
+_TRUE = {"1", "true", "yes", "sim", "on"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str, headers: Optional[Dict[str, str]] = None) -> None:
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    query: Dict[str, str]
+    headers: Dict[str, str]
+    reader: asyncio.StreamReader
+
+
+@dataclass
+class Job:
+    """A conversion tracked by the service; ``last_event`` is replayed to late subscribers."""
+
+    id: str
+    project_name: str
+    source_file: Path
+    output_directory: Path
+    encryption_key: str
+    enable_physics: bool = True
+    enable_ai_realism: bool = True
+    status: str = "queued"
+    progress: float = 0.0
+    message: str = "Na fila"
+    error: Optional[str] = None
+    package_path: Optional[Path] = None
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+    created: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    last_event: Dict[str, object] = field(default_factory=dict)
+    subscribers: Set[asyncio.Queue] = field(default_factory=set)
+    process: Optional[Any] = None
+    cancel_requested: bool = False
+
+    def to_dict(self) -> Dict[str, object]:
+        data: Dict[str, object] = {
+            "id": self.id,
+            "project_name": self.project_name,
+            "status": self.status,
+            "progress": round(self.progress, 4),
+            "message": self.message,
+            "error": self.error,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "stage_seconds": self.stage_seconds,
+        }
+        if self.status == "done":
+            data["package"] = f"/jobs/{self.id}/package"
+            data["package_size"] = self.package_path.stat().st_size if self.package_path else None
+            data["encryption_key"] = self.encryption_key
+        return data
+
+
+# -- worker process ----------------------------------------------------------------------
+def _conversion_worker(connection: Any, job: BatchJob, options: BatchOptions) -> None:
+    """Child-process entry point: run one job and report progress and the outcome over ``connection``."""
+
+    limit_memory(options.memory_limit_mb)
+    last = {"time": 0.0, "progress": -1.0, "message": ""}
+
+    def report(progress: float, message: str) -> None:
+        now = time.monotonic()
+        if (
+            message == last["message"]
+            and progress - last["progress"] < 0.005
+            and now - last["time"] < PROGRESS_INTERVAL
+        ):
+            return
+        last.update(time=now, progress=progress, message=message)
+        connection.send(("progress", progress, message))
+
+    try:
+        result = run_job(job, options, progress_callback=report)
+        connection.send(("result", result))
+    except BaseException:  # pragma: no cover - run_job already captures conversion errors
+        connection.send(("error", traceback.format_exc(limit=-3)))
+    finally:
+        connection.close()
+
+
+def _receive(connection: Any) -> Optional[tuple]:
+    try:
+        return connection.recv()
+    except (EOFError, OSError):
+        return None
+
+
+def _context() -> Any:
+    methods = multiprocessing.get_all_start_methods()
+    # Never fork the event-loop process itself: it runs threads.
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+class JobManager:
+    """Queue conversions onto at most ``max_workers`` worker processes.
+
+    Each running job owns its process, so cancelling one terminates it without
+    disturbing the others; queued jobs wait on a semaphore in submission order.
+    """
+
+    def __init__(self, root: Path, *, max_workers: int = 1, options: Optional[BatchOptions] = None) -> None:
+        self.root = Path(root)
+        self.max_workers = max(1, max_workers)
+        self.options = options or BatchOptions()
+        self.jobs: Dict[str, Job] = {}
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._context = _context()
+
+    @property
+    def running(self) -> int:
+        return sum(1 for job in self.jobs.values() if job.status == "running")
+
+    def create(
+        self,
+        project_name: str,
+        filename: str,
+        *,
+        encryption_key: Optional[str] = None,
+        enable_physics: bool = True,
+        enable_ai_realism: bool = True,
+    ) -> Job:
+        job_id = uuid.uuid4().hex[:12]
+        directory = self.root / job_id
+        directory.mkdir(parents=True, exist_ok=True)
+        return Job(
+            id=job_id,
+            project_name=project_name,
+            source_file=directory / Path(filename).name,
+            output_directory=directory / "output",
+            encryption_key=encryption_key or Fernet.generate_key().decode("utf-8"),
+            enable_physics=enable_physics,
+            enable_ai_realism=enable_ai_realism,
+        )
+
+    def submit(self, job: Job) -> None:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+        self.jobs[job.id] = job
+        self.publish(job, "queued")
+        task = asyncio.get_running_loop().create_task(self._run(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def publish(self, job: Job, event: str, **fields: object) -> None:
+        job.last_event = {"event": event, **job.to_dict(), **fields}
+        for queue in list(job.subscribers):
+            queue.put_nowait(job.last_event)
+
+    def _finish(self, job: Job, status: str, message: str, error: Optional[str] = None) -> None:
+        job.status, job.message, job.error = status, message, error
+        job.finished = time.time()
+        job.process = None
+        if status == "done":
+            job.progress = 1.0
+        self.publish(job, status)
+
+    async def _run(self, job: Job) -> None:
+        assert self._slots is not None
+        async with self._slots:
+            if job.cancel_requested:
+                return
+            batch_job = BatchJob(
+                project_name=job.project_name,
+                source_file=job.source_file,
+                output_directory=job.output_directory,
+                encryption_key=job.encryption_key,
+                enable_physics=job.enable_physics,
+                enable_ai_realism=job.enable_ai_realism,
+            )
+            receiver, sender = self._context.Pipe(duplex=False)
+            process = self._context.Process(
+                target=_conversion_worker, args=(sender, batch_job, self.options), daemon=True
+            )
+            process.start()
+            sender.close()
+            job.process = process
+            job.status, job.started, job.message = "running", time.time(), "Iniciando conversão"
+            self.publish(job, "running")
+            outcome: Optional[tuple] = None
+            try:
+                while True:
+                    message = await asyncio.to_thread(_receive, receiver)
+                    if message is None:
+                        break
+                    if message[0] == "progress":
+                        job.progress, job.message = float(message[1]), str(message[2])
+                        self.publish(job, "progress")
+                    else:
+                        outcome = message
+            finally:
+                receiver.close()
+                await asyncio.to_thread(process.join)
+
+            if job.cancel_requested:
+                shutil.rmtree(job.output_directory, ignore_errors=True)
+                self._finish(job, "cancelled", "Conversão cancelada")
+            elif outcome is None:
+                self._finish(job, "failed", "Falha na conversão", f"Worker exited with code {process.exitcode}")
+            elif outcome[0] == "error":
+                self._finish(job, "failed", "Falha na conversão", str(outcome[1]))
+            else:
+                result = outcome[1]
+                job.stage_seconds = result.stage_seconds
+                if result.status == "ok":
+                    job.package_path = Path(result.package_path)
+                    self._finish(job, "done", "Conversão concluída")
+                else:
+                    self._finish(job, "failed", "Falha na conversão", result.error)
+
+    def cancel(self, job: Job) -> None:
+        if job.status in TERMINAL_STATES:
+            raise HTTPError(409, f"Job {job.id} already {job.status}")
+        job.cancel_requested = True
+        if job.process is not None:
+            job.process.terminate()
+        else:
+            self._finish(job, "cancelled", "Conversão cancelada")
+
+    async def shutdown(self) -> None:
+        for job in self.jobs.values():
+            if job.status not in TERMINAL_STATES:
+                self.cancel(job)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+# -- HTTP plumbing -------------------------------------------------------------------------
+async def _read_request(reader: asyncio.StreamReader) -> Optional[Request]:
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, _ = line.decode("latin-1").split(" ", 2)
+    except ValueError as exc:
+        raise HTTPError(400, "Malformed request line") from exc
+    headers: Dict[str, str] = {}
+    while True:
+        raw = await reader.readline()
+        if raw in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = raw.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    parts = urlsplit(target)
+    query = {name: values[0] for name, values in parse_qs(parts.query).items()}
+    return Request(method.upper(), unquote(parts.path).rstrip("/") or "/", query, headers, reader)
+
+
+def _head(status: int, headers: Dict[str, str]) -> bytes:
+    lines = [f"HTTP/1.1 {status} {_REASONS.get(status, 'Unknown')}"]
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def _send_json(writer: asyncio.StreamWriter, status: int, payload: object, headers: Optional[Dict[str, str]] = None) -> None:
+    body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+    writer.write(
+        _head(
+            status,
+            {
+                "Content-Type": "application/json; charset=utf-8",
+                "Content-Length": str(len(body)),
+                "Connection": "close",
+                **(headers or {}),
+            },
+        )
+        + body
+    )
+    await writer.drain()
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Return the inclusive byte span of a single-range ``Range`` header, or ``None`` to send everything.
+
+    Multi-range requests and malformed specs (e.g. ``bytes=10-5``) are answered with the
+    full body, as RFC 9110 allows.
+    """
+
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, _, last = (part.strip() for part in spec.strip().partition("-"))
+    if not (first or last) or not all(part.isascii() and part.isdigit() for part in (first, last) if part):
+        return None
+    unsatisfiable = HTTPError(416, "Requested range not satisfiable", {"Content-Range": f"bytes */{size}"})
+    if not first:
+        length = int(last)
+        if length == 0 or size == 0:
+            raise unsatisfiable
+        return max(0, size - length), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None  # syntactically invalid, so the header is ignored
+    if start >= size:
+        raise unsatisfiable
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+def _websocket_frame(payload: bytes, opcode: int = 0x1) -> bytes:
+    length = len(payload)
+    if length < 126:
+        header = struct.pack("!BB", 0x80 | opcode, length)
+    elif length < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+    return header + payload
+
+
+async def _read_websocket_frame(reader: asyncio.StreamReader) -> Tuple[int, bytes]:
+    first, second = await reader.readexactly(2)
+    length = second & 0x7F
+    if length == 126:
+        (length,) = struct.unpack("!H", await reader.readexactly(2))
+    elif length == 127:
+        (length,) = struct.unpack("!Q", await reader.readexactly(8))
+    mask = await reader.readexactly(4) if second & 0x80 else b"\0\0\0\0"
+    data = await reader.readexactly(length)
+    return first & 0x0F, bytes(byte ^ mask[index % 4] for index, byte in enumerate(data))
+
+
+class ConversionService:
+    """HTTP front end of a ``JobManager`` built on ``asyncio.start_server`` (no third-party server needed)."""
+
+    def __init__(
+        self,
+        root: Path,
+        *,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        max_workers: int = 1,
+        max_upload_mb: int = DEFAULT_MAX_UPLOAD_MB,
+        options: Optional[BatchOptions] = None,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.max_upload_bytes = max_upload_mb * 1024 * 1024
+        self.manager = JobManager(root, max_workers=max_workers, options=options)
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        self.manager.root.mkdir(parents=True, exist_ok=True)
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, limit=64 * 1024)
+        # Report the real port when 0 (ephemeral) was requested.
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        assert self._server is not None
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        finally:
+            await self.manager.shutdown()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.manager.shutdown()
+
+    # -- request handling ----------------------------------------------------------------
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request = await _read_request(reader)
+            if request is not None:
+                await self._dispatch(request, writer)
+        except HTTPError as exc:
+            with contextlib.suppress(ConnectionError):
+                await _send_json(writer, exc.status, {"error": exc.message}, exc.headers)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as exc:  # keep serving other clients
+            with contextlib.suppress(ConnectionError):
+                await _send_json(writer, 500, {"error": f"{type(exc).__name__}: {exc}"})
+        finally:
+            writer.close()
+            with contextlib.suppress(ConnectionError, OSError):
+                await writer.wait_closed()
+
+    async def _dispatch(self, request: Request, writer: asyncio.StreamWriter) -> None:
+        segments = [segment for segment in request.path.split("/") if segment]
+        if not segments:
+            if request.method != "GET":
+                raise HTTPError(405, "Use GET")
+            await _send_json(writer, 200, self._status())
+            return
+        if segments[0] != "jobs" or len(segments) > 3:
+            raise HTTPError(404, f"No route for {request.path}")
+        if len(segments) == 1:
+            if request.method == "GET":
+                await _send_json(writer, 200, [job.to_dict() for job in self.manager.jobs.values()])
+            elif request.method == "POST":
+                await self._create_job(request, writer)
+            else:
+                raise HTTPError(405, "Use GET or POST")
+            return
+
+        job = self.manager.jobs.get(segments[1])
+        if job is None:
+            raise HTTPError(404, f"Unknown job {segments[1]}")
+        action = segments[2] if len(segments) == 3 else None
+        if action is None and request.method == "GET":
+            await _send_json(writer, 200, job.to_dict())
+        elif action is None and request.method == "DELETE":
+            self.manager.cancel(job)
+            await _send_json(writer, 202, job.to_dict())
+        elif action == "events" and request.method == "GET":
+            if request.headers.get("upgrade", "").lower() == "websocket":
+                await self._stream_websocket(job, request, writer)
+            else:
+                await self._stream_sse(job, writer)
+        elif action == "package" and request.method in ("GET", "HEAD"):
+            await self._send_package(job, request, writer)
+        else:
+            raise HTTPError(405 if action in (None, "events", "package") else 404, f"No route for {request.method} {request.path}")
+
+    def _status(self) -> Dict[str, object]:
+        states: Dict[str, int] = {}
+        for job in self.manager.jobs.values():
+            states[job.status] = states.get(job.status, 0) + 1
+        return {
+            "service": "vrhouse",
+            "workers": self.manager.max_workers,
+            "running": self.manager.running,
+            "jobs": states,
+            "max_upload_mb": self.max_upload_bytes // (1024 * 1024),
+        }
+
+    async def _create_job(self, request: Request, writer: asyncio.StreamWriter) -> None:
+        filename = request.headers.get("x-filename") or request.query.get("filename")
+        if not filename:
+            raise HTTPError(400, "Send the model's file name in X-Filename or ?filename=")
+        try:
+            validate_source_path(Path(filename))
+        except ImporterError as exc:
+            raise HTTPError(400, str(exc)) from exc
+        if "content-length" not in request.headers:
+            raise HTTPError(411, "Content-Length is required (chunked uploads are not supported)")
+        declared = request.headers["content-length"]
+        # int() would accept "-1" (which reader.read() takes as "until EOF") and raise on junk.
+        if not (declared.isascii() and declared.isdigit()):
+            raise HTTPError(400, "Content-Length must be a non-negative integer")
+        length = int(declared)
+        if length > self.max_upload_bytes:
+            raise HTTPError(413, f"Upload exceeds {self.max_upload_bytes // (1024 * 1024)} MB")
+        key = request.headers.get("x-encryption-key") or None
+        if key is not None:
+            try:
+                Fernet(key.encode("utf-8"))
+            except ValueError as exc:
+                raise HTTPError(400, f"Invalid encryption key: {exc}") from exc
+
+        # The project name becomes the package file name: keep it to a single path component.
+        project_name = Path(request.query.get("project_name") or Path(filename).stem).name.strip()
+        if not project_name or project_name in (".", ".."):
+            raise HTTPError(400, "Invalid project_name")
+        job = self.manager.create(
+            project_name,
+            filename,
+            encryption_key=key,
+            enable_physics=request.query.get("physics", "1").lower() in _TRUE,
+            enable_ai_realism=request.query.get("ai", "1").lower() in _TRUE,
+        )
+        if request.headers.get("expect", "").lower() == "100-continue":
+            writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+            await writer.drain()
+        # Stream the body to disk so large models never sit in memory.
+        remaining = length
+        try:
+            with job.source_file.open("wb") as handle:
+                while remaining:
+                    chunk = await request.reader.read(min(CHUNK_SIZE, remaining))
+                    if not chunk:
+                        raise HTTPError(400, "Upload ended before Content-Length bytes were received")
+                    handle.write(chunk)
+                    remaining -= len(chunk)
+        except BaseException:
+            shutil.rmtree(job.source_file.parent, ignore_errors=True)
+            raise
+        self.manager.submit(job)
+        await _send_json(writer, 202, job.to_dict(), {"Location": f"/jobs/{job.id}"})
+
+    async def _events(self, job: Job) -> AsyncIterator[Dict[str, object]]:
+        """Yield the job's latest event, then every new one until a terminal state.
+
+        An empty dict is yielded after ``HEARTBEAT_SECONDS`` of silence so
+        streams can send keep-alives.
+        """
+
+        queue: asyncio.Queue = asyncio.Queue()
+        job.subscribers.add(queue)
+        try:
+            event = job.last_event or {"event": job.status, **job.to_dict()}
+            while True:
+                yield event
+                if event.get("event") in TERMINAL_STATES:
+                    return
+                try:
+                    event = await asyncio.wait_for(queue.get(), HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    event = {}
+        finally:
+            job.subscribers.discard(queue)
+
+    async def _stream_sse(self, job: Job, writer: asyncio.StreamWriter) -> None:
+        writer.write(
+            _head(
+                200,
+                {"Content-Type": "text/event-stream", "Cache-Control": "no-cache", "Connection": "close"},
+            )
+        )
+        async for event in self._events(job):
+            if event:
+                data = json.dumps(event, ensure_ascii=False, default=str)
+                writer.write(f"event: {event['event']}\ndata: {data}\n\n".encode("utf-8"))
+            else:
+                writer.write(b": keep-alive\n\n")
+            await writer.drain()
+
+    async def _stream_websocket(self, job: Job, request: Request, writer: asyncio.StreamWriter) -> None:
+        key = request.headers.get("sec-websocket-key")
+        if not key:
+            raise HTTPError(400, "Missing Sec-WebSocket-Key")
+        accept = base64.b64encode(hashlib.sha1((key + _WEBSOCKET_GUID).encode("ascii")).digest()).decode("ascii")
+        writer.write(
+            _head(101, {"Upgrade": "websocket", "Connection": "Upgrade", "Sec-WebSocket-Accept": accept})
+        )
+        await writer.drain()
+
+        async def listen() -> None:
+            # Clients may send "cancel"; a close frame ends the stream.
+            while True:
+                opcode, payload = await _read_websocket_frame(request.reader)
+                if opcode == 0x8:
+                    return
+                if opcode == 0x1 and payload.strip() == b"cancel" and job.status not in TERMINAL_STATES:
+                    self.manager.cancel(job)
+
+        listener = asyncio.get_running_loop().create_task(listen())
+        try:
+            async for event in self._events(job):
+                if listener.done():
+                    return
+                if event:
+                    writer.write(_websocket_frame(json.dumps(event, ensure_ascii=False, default=str).encode("utf-8")))
+                else:
+                    writer.write(_websocket_frame(b"", opcode=0x9))
+                await writer.drain()
+            writer.write(_websocket_frame(struct.pack("!H", 1000), opcode=0x8))
+            await writer.drain()
+        finally:
+            listener.cancel()
+            with contextlib.suppress(asyncio.CancelledError, asyncio.IncompleteReadError, ConnectionError):
+                await listener
+
+    async def _send_package(self, job: Job, request: Request, writer: asyncio.StreamWriter) -> None:
+        if job.status != "done" or job.package_path is None or not job.package_path.is_file():
+            raise HTTPError(409, f"Job {job.id} has no package yet (status: {job.status})")
+        size = job.package_path.stat().st_size
+        headers = {
+            "Content-Type": "application/octet-stream",
+            "Content-Disposition": f'attachment; filename="{job.package_path.name}"',
+            "Accept-Ranges": "bytes",
+            "ETag": f'"{job.id}-{size}"',
+            "Connection": "close",
+        }
+        span = parse_range(request.headers["range"], size) if "range" in request.headers else None
+        if span is not None and request.headers.get("if-range", headers["ETag"]) != headers["ETag"]:
+            span = None
+        start, end = span if span is not None else (0, size - 1)
+        headers["Content-Length"] = str(max(0, end - start + 1))
+        if span is not None:
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        writer.write(_head(206 if span is not None else 200, headers))
+        if request.method == "HEAD":
+            await writer.drain()
+            return
+        with job.package_path.open("rb") as handle:
+            handle.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = handle.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                writer.write(chunk)
+                remaining -= len(chunk)
+                await writer.drain()
+
+
+def serve(
+    root: Path,
+    *,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    max_workers: Optional[int] = None,
+    max_upload_mb: int = DEFAULT_MAX_UPLOAD_MB,
+    options: Optional[BatchOptions] = None,
+) -> None:
+    """Run the service until interrupted (Ctrl+C cancels the jobs still running)."""
+
+    service = ConversionService(
+        root,
+        host=host,
+        port=port,
+        max_workers=max_workers or max(1, (os.cpu_count() or 2) // 2),
+        max_upload_mb=max_upload_mb,
+        options=options,
+    )
+
+    async def main() -> None:
+        await service.start()
+        print(f"vrhouse serve: http://{service.host}:{service.port} ({service.manager.max_workers} workers)", flush=True)
+        await service.serve_forever()
+
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(main())
+
+
+__all__ = ["ConversionService", "HTTPError", "Job", "JobManager", "parse_range", "serve"]
@@ -2,28 +2,38 @@
 from __future__ import annotations
 
 import json
+import os
 import queue
 import threading
 import tkinter as tk
 from pathlib import Path
 from tkinter import filedialog, messagebox, ttk
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-from cryptography.fernet import Fernet, InvalidToken
-
-from vrhouse.core import SceneSpecification
 from vrhouse.pipeline.importers.multi_importer import iter_supported_suffixes
-from vrhouse.pipeline.runner import run_conversion
+
+if TYPE_CHECKING:
+    from vrhouse.core import SceneSpecification
+
+# The pipeline, cryptography and the service client are imported where they are
+# used so the window appears before NumPy and the converters are loaded.
 
 
 class VRHouseApp(tk.Tk):
-    """Tkinter based shell exposing the vrHouse pipeline to end users."""
+    """Tkinter based shell exposing the vrHouse pipeline to end users.
+
+    With a ``service_url`` (or the field filled in) conversions run on a
+    ``vrhouse serve`` instance instead of locally: the model is uploaded, progress
+    follows the service's event stream and the package is downloaded into the
+    chosen output folder.
+    """
 
-    def __init__(self) -> None:
+    def __init__(self, service_url: Optional[str] = None) -> None:
         super().__init__()
         self.title("vrHouse - Conversor VR")
-        self.geometry("640x360")
-        self.minsize(560, 320)
+        self.geometry("640x400")
+        self.minsize(560, 360)
+        self._service_url = service_url or ""
 
         self._queue: queue.Queue[tuple[float, str]] = queue.Queue()
         self._worker: Optional[threading.Thread] = None
@@ -74,14 +84,18 @@ class VRHouseApp(tk.Tk):
         ttk.Entry(self, textvariable=self.key_var, width=60).grid(row=6, column=1, sticky="ew", **padding)
         ttk.Button(self, text="Gerar chave", command=self._generate_key).grid(row=6, column=2, sticky="ew", **padding)
 
+        ttk.Label(self, text="Servidor de conversão (opcional)").grid(row=7, column=0, sticky="w", **padding)
+        self.server_var = tk.StringVar(value=self._service_url)
+        ttk.Entry(self, textvariable=self.server_var, width=60).grid(row=7, column=1, sticky="ew", **padding)
+
         self.progress = ttk.Progressbar(self, orient="horizontal", mode="determinate", maximum=100)
-        self.progress.grid(row=7, column=0, columnspan=3, sticky="ew", padx=12, pady=(12, 0))
+        self.progress.grid(row=8, column=0, columnspan=3, sticky="ew", padx=12, pady=(12, 0))
 
         self.progress_label = ttk.Label(self, text="Aguardando início da conversão")
-        self.progress_label.grid(row=8, column=0, columnspan=3, sticky="w", padx=12, pady=(4, 12))
+        self.progress_label.grid(row=9, column=0, columnspan=3, sticky="w", padx=12, pady=(4, 12))
 
         action_frame = ttk.Frame(self)
-        action_frame.grid(row=9, column=0, columnspan=3, sticky="ew", padx=12, pady=(8, 12))
+        action_frame.grid(row=10, column=0, columnspan=3, sticky="ew", padx=12, pady=(8, 12))
         action_frame.columnconfigure(0, weight=1)
         action_frame.columnconfigure(1, weight=1)
 
@@ -111,6 +125,8 @@ class VRHouseApp(tk.Tk):
             self.output_var.set(path)
 
     def _generate_key(self) -> None:
+        from cryptography.fernet import Fernet
+
         self.key_var.set(Fernet.generate_key().decode("utf-8"))
 
     def _start_conversion(self) -> None:
@@ -125,6 +141,7 @@ class VRHouseApp(tk.Tk):
             return
 
         output_dir = Path(self.output_var.get()).expanduser()
+        server = self.server_var.get().strip()
 
         self.progress_label.config(text="Preparando conversão")
         self.progress.config(value=0)
@@ -134,11 +151,16 @@ class VRHouseApp(tk.Tk):
 
         def worker() -> None:
             try:
-                result = run_conversion(
-                    specification,
-                    output_dir,
-                    progress_callback=lambda progress, message: self._queue.put((progress, message)),
-                )
+                if server:
+                    result = self._run_remote(server, specification, output_dir)
+                else:
+                    from vrhouse.pipeline.runner import run_conversion
+
+                    result = run_conversion(
+                        specification,
+                        output_dir,
+                        progress_callback=lambda progress, message: self._queue.put((progress, message)),
+                    )
                 self._queue.put((1.0, json.dumps({"status": "done", "result": result}, default=str)))
             except Exception as exc:
                 self._queue.put((-1.0, str(exc)))
@@ -148,7 +170,35 @@ class VRHouseApp(tk.Tk):
         self._worker.start()
         self._set_controls_enabled(False)
 
+    def _run_remote(self, server: str, specification: SceneSpecification, output_dir: Path) -> dict[str, object]:
+        """Convert on a ``vrhouse serve`` instance and download the package into ``output_dir``."""
+
+        from vrhouse.service.client import ServiceClient
+
+        client = ServiceClient(server)
+        self._queue.put((0.0, "Enviando arquivo ao servidor de conversão"))
+        job = client.submit(
+            specification.source_file,
+            specification.project_name,
+            enable_physics=specification.enable_physics,
+            enable_ai_realism=specification.enable_ai_realism,
+            encryption_key=specification.output_encryption_key,
+        )
+        for event in client.events(str(job["id"])):
+            if event["event"] in ("failed", "cancelled"):
+                raise RuntimeError(str(event.get("error") or event.get("message")))
+            # 1.0 on the queue means "finished"; keep the bar just short of it until the download ends.
+            self._queue.put((min(float(event["progress"]), 0.99), str(event["message"])))
+        self._queue.put((0.99, "Baixando pacote do servidor"))
+        job = client.job(str(job["id"]))
+        package_path = client.download(str(job["id"]), output_dir / f"{specification.project_name}.vrpkg")
+        return {"package_path": package_path, "encryption_key": job["encryption_key"], "server_job": job["id"]}
+
     def _build_specification(self) -> SceneSpecification:
+        from cryptography.fernet import Fernet
+
+        from vrhouse.core import SceneSpecification
+
         source = Path(self.source_var.get()).expanduser()
         if not source.exists():
             raise ValueError("Selecione um arquivo 3D válido.")
@@ -248,9 +298,11 @@ class VRHouseApp(tk.Tk):
         package_path = Path(str(self._last_result.get("package_path")))
         key = str(self._last_result.get("encryption_key"))
 
+        from vrhouse.pipeline.exporters.encryption import PackageError
+
         try:
             decrypted = self._decrypt_package(package_path, key)
-        except (InvalidToken, FileNotFoundError) as exc:
+        except (PackageError, FileNotFoundError) as exc:
             messagebox.showerror("Preview indisponível", f"Não foi possível abrir o pacote protegido: {exc}")
             return
 
@@ -263,13 +315,13 @@ class VRHouseApp(tk.Tk):
         text.pack(expand=True, fill=tk.BOTH)
 
     def _decrypt_package(self, package_path: Path, key: str) -> dict[str, object]:
-        fernet = Fernet(key.encode("utf-8"))
-        payload = fernet.decrypt(package_path.read_bytes())
-        return json.loads(payload)
+        from vrhouse.pipeline.exporters.package import describe_package
+
+        return describe_package(package_path, key)
 
 
-def launch() -> None:
-    app = VRHouseApp()
+def launch(service_url: Optional[str] = None) -> None:
+    app = VRHouseApp(service_url or os.environ.get("VRHOUSE_SERVICE_URL"))
     app.mainloop()
 
 
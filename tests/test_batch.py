@@ -0,0 +1,35 @@
+import multiprocessing
+import os
+
+import pytest
+
+from vrhouse.pipeline import batch
+from vrhouse.pipeline.batch import MAX_ATTEMPTS, BatchJob, run_batch
+
+pytestmark = pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork", reason="workers must inherit the patched run_conversion"
+)
+
+
+def _fake_conversion(specification, output_directory, **_):
+    if specification.project_name == "crash":
+        os._exit(1)
+    return {"package_path": output_directory / f"{specification.project_name}.vrpkg", "stage_seconds": {"import": 0.0}}
+
+
+def test_worker_crash_is_charged_only_to_the_crashing_job(monkeypatch, tmp_path):
+    monkeypatch.setattr(batch, "run_conversion", _fake_conversion)
+    names = ["casa-1", "casa-2", "crash", "casa-3", "casa-4", "casa-5", "casa-6"]
+    jobs = [BatchJob(name, tmp_path / f"{name}.obj", tmp_path / name) for name in names]
+
+    results = run_batch(jobs, max_workers=2)
+
+    assert [result.project_name for result in results] == names
+    by_name = {result.project_name: result for result in results}
+    crashed = by_name.pop("crash")
+    assert crashed.status == "failed"
+    assert crashed.attempts == MAX_ATTEMPTS
+    assert "Worker process died" in crashed.error
+    for result in by_name.values():
+        assert result.status == "ok", result.error
+        assert result.attempts == 1
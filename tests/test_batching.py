@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+
+from vrhouse.core import MeshData, SceneGraph
+from vrhouse.pipeline.processors.batching import MaterialBatcher, merge_meshes, pack_rectangles
+
+
+def _quad(uv_scale=1.0):
+    positions = np.array([[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0]], dtype=np.float32)
+    uvs = positions[:, :2] * uv_scale
+    return MeshData(positions=positions, indices=np.array([[0, 1, 2], [0, 2, 3]], dtype=np.uint32), uvs=uvs)
+
+
+def _two_tone(top, bottom, size=16):
+    image = np.empty((size, size, 3), dtype=np.uint8)
+    image[: size // 2], image[size // 2 :] = top, bottom
+    return image
+
+
+def _shift(offset):
+    shift = np.zeros((4, 4))
+    shift[0, 3] = 2.0 * offset
+    return shift
+
+
+def test_packed_rectangles_stay_on_their_page_without_overlapping():
+    sizes = [tuple(size) for size in np.random.default_rng(3).integers(1, 24, (60, 2)).tolist()]
+    placements = pack_rectangles(sizes, 64)
+
+    pages = {}
+    for (width, height), (page, x, y) in zip(sizes, placements):
+        assert 0 <= x and x + width <= 64 and 0 <= y and y + height <= 64
+        coverage = pages.setdefault(page, np.zeros((64, 64), dtype=np.int64))
+        coverage[y : y + height, x : x + width] += 1
+    assert all(coverage.max() == 1 for coverage in pages.values())
+    assert sorted(pages) == list(range(len(pages)))
+
+
+def test_atlased_uvs_sample_the_original_texels():
+    colours = {"tijolo": ((200, 40, 30), (20, 180, 60)), "azulejo": ((30, 60, 220), (240, 240, 240))}
+    graph = SceneGraph()
+    for offset, (name, (top, bottom)) in enumerate(colours.items()):
+        graph.set_material_properties(name, {"map_Kd": f"{name}.png"})
+        graph.set_texture(f"{name}.png", [_two_tone(top, bottom)])
+        graph.add_node(name, mesh=_quad(), material=name, transform=np.eye(4) + _shift(offset))
+
+    batched = MaterialBatcher(padding=2, merge_meshes=False).batch(graph)
+
+    assert batched.metadata["batching"]["atlases"] == 1
+    for name, (top, bottom) in colours.items():
+        node = batched.index_of(name)
+        atlas = batched.materials[int(batched.material_ids[node])]
+        page = batched.textures[f"{atlas}/color"][0]
+        uvs = batched.meshes[int(batched.mesh_ids[node])].uvs
+        # OBJ-style v points up while image rows go down: v near 1 is the top half.
+        for u, v, expected in ((0.5, 0.8, top), (0.5, 0.2, bottom), (0.1, 0.9, top), (0.9, 0.1, bottom)):
+            mapped = uvs[0] + (uvs[2] - uvs[0]) * np.array([u, v])
+            row = int((1.0 - mapped[1]) * page.shape[0])
+            column = int(mapped[0] * page.shape[1])
+            assert page[row, column].tolist() == list(expected), (name, u, v)
+
+
+def test_tiling_uvs_keep_their_own_material():
+    graph = SceneGraph()
+    for name in ("a", "b"):
+        graph.set_material_properties(name, {"map_Kd": f"{name}.png"})
+        graph.set_texture(f"{name}.png", [_two_tone((255, 0, 0), (0, 0, 255))])
+    graph.add_node("a", mesh=_quad(uv_scale=4.0), material="a")
+    graph.add_node("b", mesh=_quad(), material="b")
+
+    batched = MaterialBatcher(merge_meshes=False).batch(graph)
+    assert batched.metadata["batching"]["atlases"] == 0
+    assert batched.materials[int(batched.material_ids[batched.index_of("a")])] == "a"
+
+
+def test_merge_meshes_bakes_transforms_and_fixes_mirrored_winding():
+    triangle = MeshData(
+        positions=np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0]], dtype=np.float32),
+        indices=np.array([[0, 1, 2]], dtype=np.uint32),
+        normals=np.tile(np.float32([0, 0, 1]), (3, 1)),
+    )
+    moved = np.eye(4)
+    moved[:3, 3] = (5, 0, 0)
+    mirrored = np.diag([-1.0, 2.0, 1.0, 1.0])
+
+    merged = merge_meshes([triangle, triangle], np.stack([moved, mirrored]), "concreto")
+
+    assert merged.material == "concreto"
+    assert merged.indices.tolist()[0] == [0, 1, 2] and sorted(merged.indices.tolist()[1]) == [3, 4, 5]
+    assert np.allclose(merged.positions[:3], [[5, 0, 0], [6, 0, 0], [5, 1, 0]])
+    assert np.allclose(merged.positions[3:], [[0, 0, 0], [-1, 0, 0], [0, 2, 0]])
+    corners = merged.positions[merged.indices.astype(np.int64)]
+    faces = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    # Winding must agree with the (inverse-transpose) normals on both copies.
+    assert (np.einsum("ij,ij->i", faces, merged.normals[merged.indices[:, 0]]) > 0).all()
+    assert np.allclose(np.linalg.norm(merged.normals, axis=1), 1.0)
+
+
+@pytest.mark.parametrize("max_vertices, batches", [(1000, 1), (8, 2)])
+def test_static_nodes_merge_per_material_within_the_vertex_budget(max_vertices, batches):
+    graph = SceneGraph()
+    for index in range(4):
+        graph.add_node(f"laje-{index}", mesh=_quad(), material="concreto", transform=np.eye(4) + _shift(index))
+    graph.add_node("porta", mesh=_quad(), material="concreto", attributes={"ifc_class": "IFCDOOR"})
+
+    batched = MaterialBatcher(max_vertices=max_vertices, cell_size=100.0).batch(graph)
+
+    stats = batched.metadata["batching"]
+    assert stats["batches"] == batches and stats["merged_nodes"] == 4
+    assert batched.mesh_ids[batched.index_of("porta")] >= 0
+    assert stats["draw_calls_after"] == batches + 1
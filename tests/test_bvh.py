@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+
+from vrhouse.benchmarks.synthetic import sphere
+from vrhouse.core import BVH
+
+RNG_SEED = 7
+
+
+@pytest.fixture
+def boxes():
+    rng = np.random.default_rng(RNG_SEED)
+    lower = rng.uniform(-20, 20, (300, 3))
+    upper = lower + rng.uniform(0.05, 3.0, (300, 3))
+    return BVH.build(lower, upper, np.arange(300) * 3 + 1)
+
+
+def _pairs(first, second):
+    return set(zip(np.asarray(first).tolist(), np.asarray(second).tolist()))
+
+
+def _stored_boxes(bvh):
+    """Item boxes as the tree stores them, so brute force and traversal compare identical numbers."""
+
+    return bvh.items, bvh.item_lower.astype(np.float64), bvh.item_upper.astype(np.float64)
+
+
+def test_aabb_queries_match_brute_force(boxes):
+    rng = np.random.default_rng(1)
+    lower = rng.uniform(-22, 18, (40, 3)).astype(np.float32)
+    upper = lower + rng.uniform(0.0, 8.0, (40, 3)).astype(np.float32)
+    items, item_lower, item_upper = _stored_boxes(boxes)
+
+    overlap = np.all((item_lower[None] <= upper[:, None]) & (item_upper[None] >= lower[:, None]), axis=2)
+    query, item = np.nonzero(overlap)
+    result = boxes.query_aabb(lower, upper)
+    assert _pairs(*result) == _pairs(query, items[item])
+    assert len(result[0]) == overlap.sum()
+
+
+def test_frustum_queries_match_brute_force(boxes):
+    rng = np.random.default_rng(2)
+    normals = rng.normal(size=(10, 5, 3))
+    normals /= np.linalg.norm(normals, axis=2, keepdims=True)
+    planes = np.concatenate((normals, rng.uniform(0, 25, (10, 5, 1))), axis=2).astype(np.float32)
+    items, item_lower, item_upper = _stored_boxes(boxes)
+
+    normal, offset = planes[..., :3].astype(np.float64), planes[..., 3].astype(np.float64)
+    corner = np.where(normal[:, None] > 0, item_upper[None, :, None], item_lower[None, :, None])
+    inside = np.all(np.einsum("qkj,qnkj->qnk", normal, corner) + offset[:, None] >= 0, axis=2)
+    query, item = np.nonzero(inside)
+    assert _pairs(*boxes.query_frustum(planes)) == _pairs(query, items[item])
+    assert 0 < inside.sum() < inside.size
+
+
+def test_ray_box_entries_match_brute_force(boxes):
+    rng = np.random.default_rng(3)
+    origins = rng.uniform(-25, 25, (50, 3))
+    directions = rng.normal(size=(50, 3))
+    directions[0] = (1.0, 0.0, 0.0)  # axis-aligned rays divide by zero on two slabs
+    items, item_lower, item_upper = _stored_boxes(boxes)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        near = (item_lower[None] - origins[:, None]) / directions[:, None]
+        far = (item_upper[None] - origins[:, None]) / directions[:, None]
+    enter = np.maximum(np.fmax.reduce(np.fmin(near, far), axis=2), 0.0)
+    leave = np.fmin.reduce(np.fmax(near, far), axis=2)
+    hit = (enter <= leave) & (enter <= 30.0)
+    ray, item = np.nonzero(hit)
+
+    result_ray, result_item, distance = boxes.intersect_rays(origins, directions, 30.0)
+    assert _pairs(result_ray, result_item) == _pairs(ray, items[item])
+    expected = {(r, items[i]): enter[r, i] for r, i in zip(ray.tolist(), item.tolist())}
+    assert np.allclose(distance, [expected[pair] for pair in zip(result_ray.tolist(), result_item.tolist())])
+    assert all(np.all(np.diff(distance[result_ray == r]) >= 0) for r in np.unique(result_ray))
+
+
+def test_raycast_finds_the_nearest_triangle():
+    positions, _, _, indices = sphere(2.0, 6, center=(1.0, -1.0, 0.5))
+    bvh = BVH.from_triangles(positions, indices)
+    rng = np.random.default_rng(4)
+    origins = rng.uniform(-6, 6, (64, 3))
+    targets = rng.uniform(-1.5, 1.5, (64, 3)) + (1.0, -1.0, 0.5)
+    directions = targets - origins
+
+    triangles = positions.astype(np.float64)[np.asarray(indices, dtype=np.int64)]
+    a = triangles[:, 0][None]
+    edge1, edge2 = triangles[:, 1][None] - a, triangles[:, 2][None] - a
+    p = np.cross(directions[:, None], edge2)
+    determinant = np.einsum("rtj,rtj->rt", edge1, p)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        offset = origins[:, None] - a
+        u = np.einsum("rtj,rtj->rt", offset, p) / determinant
+        q = np.cross(offset, edge1)
+        v = np.einsum("rj,rtj->rt", directions, q) / determinant
+        distance = np.einsum("rtj,rtj->rt", np.broadcast_to(edge2, q.shape), q) / determinant
+        valid = (np.abs(determinant) > 1e-12) & (u >= 0) & (v >= 0) & (u + v <= 1) & (distance >= 0)
+    nearest = np.where(valid, distance, np.inf).min(axis=1)
+
+    best, triangle = bvh.raycast(origins, directions, positions, indices)
+    assert np.allclose(best, nearest)
+    assert np.isfinite(best).sum() > 40
+    assert (triangle[np.isinf(best)] == -1).all()
+    limited, _ = bvh.raycast(origins, directions, positions, indices, max_distance=0.5)
+    assert np.array_equal(np.isfinite(limited), nearest <= 0.5)
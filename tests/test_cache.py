@@ -0,0 +1,124 @@
+import os
+from pathlib import Path
+
+import numpy as np
+
+from vrhouse.core import MeshData, SceneGraph
+from vrhouse.pipeline import cache as cache_module
+from vrhouse.pipeline.cache import StageCache, code_version, stage_configuration
+
+
+class _Stage:
+    def __init__(self, ratio=0.5, max_workers=None):
+        self.ratio = ratio
+        self.max_workers = max_workers
+        self.last_report = None
+
+
+def test_miss_then_hit(tmp_path):
+    cache = StageCache(tmp_path)
+    payload = {"positions": np.arange(12, dtype=np.float32).reshape(4, 3)}
+    key = cache.key("geometry", _Stage(), "upstream")
+
+    assert cache.get(key, "missing") == "missing"
+    cache.put(key, payload)
+    loaded = cache.get(cache.key("geometry", _Stage(), "upstream"))
+
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert np.array_equal(loaded["positions"], payload["positions"])
+    # Arrays come back as read-only views over the mapped entry, not copies.
+    assert not loaded["positions"].flags.writeable
+
+
+def test_keys_follow_upstream_and_configuration_but_not_runtime_settings(tmp_path):
+    cache = StageCache(tmp_path)
+    base = cache.key("geometry", _Stage(), "upstream")
+
+    assert cache.key("geometry", _Stage(max_workers=8), "upstream") == base
+    assert cache.key("geometry", _Stage(ratio=0.25), "upstream") != base
+    assert cache.key("geometry", _Stage(), "other-upstream") != base
+    assert cache.key("materials", _Stage(), "upstream") != base
+    assert "max_workers" not in stage_configuration(_Stage()) and "last_report" not in stage_configuration(_Stage())
+
+
+def test_cached_scene_graph_is_a_private_copy(tmp_path):
+    cache = StageCache(tmp_path)
+    graph = SceneGraph()
+    mesh = MeshData(positions=np.zeros((3, 3), dtype=np.float32), indices=np.array([[0, 1, 2]], dtype=np.uint32))
+    graph.add_node("parede", mesh=mesh)
+    cache.put("k" * 40, graph)
+
+    loaded = cache.get("k" * 40)
+    loaded.set_attribute(1, "type", "wall")
+    loaded.add_node("porta")
+    assert "type" not in cache.get("k" * 40)["parede"]
+    assert len(cache.get("k" * 40)) == 2
+
+
+def test_corrupt_entries_are_dropped_as_misses(tmp_path):
+    cache = StageCache(tmp_path)
+    key = "a" * 40
+    cache.put(key, [1, 2, 3])
+    path = next(tmp_path.rglob("*.bin"))
+    path.write_bytes(b"garbage")
+
+    assert cache.get(key, "missing") == "missing"
+    assert cache.misses == 1 and not path.exists()
+
+
+def test_source_digest_is_invalidated_by_content_changes(tmp_path):
+    cache = StageCache(tmp_path / "cache")
+    source = tmp_path / "casa.obj"
+    source.write_text("v 0 0 0\n", encoding="utf-8")
+    first = cache.source_digest(source)
+    assert cache.source_digest(source) == first
+
+    source.write_text("v 1 0 0\nv 2 0 0\n", encoding="utf-8")
+    assert cache.source_digest(source) != first
+
+
+def test_subcaches_share_one_lru_budget(tmp_path):
+    cache = StageCache(tmp_path, max_bytes=3 * 1024)
+    textures = cache.subcache("textures")
+    blob = np.zeros(900, dtype=np.uint8)
+
+    cache.put("1" * 40, blob)
+    textures.put("2" * 40, blob)
+    old = os.stat(cache._path("1" * 40)).st_mtime
+    # Touch the first entry so the texture entry becomes least recently used.
+    os.utime(cache._path("1" * 40), (old + 10, old + 10))
+    cache.put("3" * 40, blob)
+    textures.put("4" * 40, blob)
+
+    assert sum(size for _, size, _ in cache.entries()) <= cache.max_bytes
+    assert cache.get("1" * 40) is not None
+    assert textures.get("2" * 40) is None
+    assert textures.get("4" * 40) is not None
+
+
+def test_imported_modules_include_relative_and_function_level_imports():
+    source = (
+        b"from . import decimation\n"
+        b"from ..cache import StageCache\n"
+        b"def build():\n"
+        b"    import vrhouse.core\n"
+        b"    import numpy\n"
+    )
+    found = cache_module._imported_modules("vrhouse.pipeline.processors.lod", Path("lod.py"), source)
+    assert {"vrhouse.pipeline.processors.decimation", "vrhouse.pipeline.cache", "vrhouse.core"} <= found
+    assert not any(module.startswith("numpy") for module in found)
+
+
+def test_code_version_covers_imported_helpers(monkeypatch):
+    from vrhouse.pipeline.processors.geometry_optimizer import GeometryOptimizer
+
+    before = code_version(GeometryOptimizer)
+    monkeypatch.setattr(cache_module, "_CODE_VERSIONS", {})
+    original = Path.read_bytes
+
+    def patched(path):
+        data = original(path)
+        return data + b"\n# edited\n" if path.name == "decimation.py" else data
+
+    monkeypatch.setattr(Path, "read_bytes", patched)
+    assert code_version(GeometryOptimizer) != before
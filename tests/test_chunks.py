@@ -0,0 +1,126 @@
+import numpy as np
+import pytest
+from cryptography.fernet import Fernet
+
+from vrhouse.core import MeshData, SceneGraph
+from vrhouse.pipeline.exporters.chunks import ChunkStreamer, partition_nodes, write_chunked_package
+from vrhouse.pipeline.exporters.encryption import PackageError
+from vrhouse.pipeline.exporters.package import VRPackage, write_scene_package
+
+KEY = Fernet.generate_key()
+
+
+def _quad():
+    positions = np.array([[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0]], dtype=np.float32)
+    return MeshData(positions=positions, indices=np.array([[0, 1, 2], [0, 2, 3]], dtype=np.uint32))
+
+
+def _scene():
+    """Three one-quad rooms 10 m apart; ``piso`` is textured in two of them, ``vidro`` in one."""
+
+    graph = SceneGraph()
+    mesh = _quad()
+    for index, material in enumerate(("piso", "piso", "vidro")):
+        translation = np.eye(4, dtype=np.float32)
+        translation[0, 3] = 10.0 * index
+        graph.add_node(f"sala_{index}", mesh=mesh, material=material, transform=translation)
+    graph.add_node("grupo")  # no mesh: manifest only
+    graph.set_material_properties("piso", {"map_kd": "piso.png"})
+    graph.set_material_properties("vidro", {"map_kd": "-s 1 1 vidro.png"})
+    graph.set_texture("piso.png", [np.full((4, 4, 3), 200, dtype=np.uint8), np.zeros((2, 2, 3), dtype=np.uint8)])
+    graph.set_texture("vidro.png", [np.full((8, 8, 4), 90, dtype=np.uint8)])
+    return graph
+
+
+def _write(tmp_path, graph=None):
+    graph = graph or _scene()
+    chunks = partition_nodes(graph, "grid", chunk_size=8.0)
+    path = write_chunked_package(
+        tmp_path / "casa.vrpkg",
+        KEY,
+        project="casa",
+        scene_graph=graph,
+        chunks=chunks,
+        physics_profile={"gravity": -9.81},
+        ai_metadata={},
+    )
+    return path, chunks
+
+
+def test_partition_groups_mesh_nodes_by_grid_cell():
+    chunks = partition_nodes(_scene(), "grid", chunk_size=8.0)
+    assert [chunk.tolist() for chunk in chunks] == [[1], [2], [3]]
+    assert [chunk.tolist() for chunk in partition_nodes(_scene(), "floor")] == [[1, 2, 3]]
+    with pytest.raises(ValueError):
+        partition_nodes(_scene(), "bairro")
+
+
+def test_manifest_describes_every_chunk_and_shared_textures(tmp_path):
+    path, chunks = _write(tmp_path)
+    with VRPackage(path, KEY) as manifest:
+        layout = manifest.chunk_manifest()
+        hierarchy = manifest.scene_graph()
+
+    assert [descriptor["nodes"] for descriptor in layout["chunks"]] == [1, 1, 1]
+    assert [descriptor["triangles"] for descriptor in layout["chunks"]] == [2, 2, 2]
+    assert layout["chunks"][1]["lower"] == [10.0, 0.0, 0.0] and layout["chunks"][1]["upper"] == [11.0, 1.0, 0.0]
+    assert [descriptor["textures"] for descriptor in layout["chunks"]] == [["piso.png"], ["piso.png"], []]
+    assert layout["shared"]["textures"] == {"piso.png": 48 + 12}
+    for descriptor in layout["chunks"]:
+        assert (path.parent / descriptor["file"]).stat().st_size == descriptor["bytes"]
+    # The manifest keeps the whole hierarchy but no geometry.
+    assert list(hierarchy) == ["root", "sala_0", "sala_1", "sala_2", "grupo"]
+    assert not hierarchy.meshes
+
+
+def test_plain_packages_have_no_chunk_manifest(tmp_path):
+    path = write_scene_package(
+        tmp_path / "plana.vrpkg", KEY, project="casa", scene_graph=_scene(), physics_profile={}, ai_metadata={}
+    )
+    with VRPackage(path, KEY) as package:
+        assert package.chunk_manifest() == {}
+        assert package.source_nodes() is None
+    with pytest.raises(PackageError, match="not a chunked package"):
+        ChunkStreamer(path, KEY)
+
+
+def test_streamer_loads_chunks_with_their_shared_textures(tmp_path):
+    path, _ = _write(tmp_path)
+    with ChunkStreamer(path, KEY, radius=2.0) as streamer:
+        loaded, evicted = streamer.update([0.5, 0.5, 0.0])
+        assert (loaded, evicted) == ([0], [])
+        chunk = streamer.resident[0]
+        assert list(chunk) == ["root", "sala_0"]
+        assert chunk.triangle_count == 2
+        assert np.array_equal(chunk.textures["piso.png"][0], np.full((4, 4, 3), 200, dtype=np.uint8))
+        assert streamer.source_nodes[0].tolist() == [0, 1]
+
+        streamer.update([10.5, 0.5, 0.0])
+        assert sorted(streamer.resident) == [0, 1]
+        # Both chunks hold the same shared texture arrays; they are counted once.
+        assert streamer.resident[0].textures["piso.png"][0] is streamer.resident[1].textures["piso.png"][0]
+
+        streamer.evict(0)
+        streamer.evict(1)
+        assert streamer.resident_bytes == 0
+
+
+def test_streamer_respects_the_memory_budget(tmp_path):
+    path, _ = _write(tmp_path)
+    with ChunkStreamer(path, KEY, radius=100.0) as streamer:
+        budget = max(streamer.cost(index) for index in range(len(streamer.chunks))) + 1
+    with ChunkStreamer(path, KEY, radius=100.0, max_resident_bytes=budget) as streamer:
+        loaded, _ = streamer.update([0.5, 0.5, 0.0])
+        assert loaded == [0, 1]
+        assert streamer.resident_bytes <= budget
+        # Walking to the far room: the nearer chunk evicts wanted but farther ones, farthest first.
+        loaded, evicted = streamer.update([20.5, 0.5, 0.0])
+        assert (loaded, evicted) == ([2], [0, 1])
+        assert streamer.resident_bytes <= budget
+
+
+def test_the_camera_chunk_loads_even_over_budget(tmp_path):
+    path, _ = _write(tmp_path)
+    with ChunkStreamer(path, KEY, radius=100.0, max_resident_bytes=1) as streamer:
+        assert streamer.update([10.5, 0.5, 0.0]) == ([1], [])
+        assert streamer.update([0.5, 0.5, 0.0]) == ([0], [1])
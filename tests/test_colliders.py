@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+from vrhouse.benchmarks.synthetic import box, sphere
+from vrhouse.core import MeshData
+from vrhouse.pipeline.cache import StageCache
+from vrhouse.pipeline.processors import colliders
+from vrhouse.pipeline.processors.colliders import (
+    BOX,
+    CAPSULE,
+    CONVEX_HULL,
+    ColliderGenerator,
+    convex_hull,
+    fit_colliders,
+    hull_volume,
+)
+
+
+def _mesh(parts):
+    positions, _, _, indices = parts
+    return MeshData(positions=positions, indices=np.asarray(indices, dtype=np.uint32))
+
+
+def _l_prism():
+    """Closed L-shaped prism (3 x 3 footprint with a 2 x 2 notch, 1 high): volume 5, hull volume 7."""
+
+    outline = [(0, 0), (3, 0), (3, 1), (1, 1), (1, 3), (0, 3), (0, 1)]
+    count = len(outline)
+    positions = np.array([(x, y, z) for z in (0.0, 1.0) for x, y in outline], dtype=np.float32)
+    faces = []
+    for index in range(count):
+        following = (index + 1) % count
+        faces += [(index, following, following + count), (index, following + count, index + count)]
+    # Caps: the footprint is the rectangle 0-1-2-3-6 plus the rectangle 6-3-4-5.
+    for polygon in ((0, 1, 2, 3, 6), (6, 3, 4, 5)):
+        for a, b in zip(polygon[1:-1], polygon[2:]):
+            faces += [(polygon[0], b, a), (polygon[0] + count, a + count, b + count)]
+    return MeshData(positions=positions, indices=np.array(faces, dtype=np.uint32))
+
+
+def test_convex_hull_of_a_cube_with_interior_points():
+    rng = np.random.default_rng(0)
+    corners = np.array(list(np.ndindex(2, 2, 2)), dtype=np.float64)
+    points = np.vstack((corners, rng.random((200, 3))))
+    vertices, faces = convex_hull(points)
+
+    assert np.isclose(hull_volume(vertices, faces), 1.0)
+    assert len(vertices) == 8
+    assert convex_hull(np.c_[rng.random((30, 2)), np.zeros(30)]) is None
+
+
+def test_convex_hull_contains_its_points():
+    points = np.random.default_rng(1).normal(size=(300, 3))
+    vertices, faces = convex_hull(points)
+    a, b, c = (vertices[faces[:, column]] for column in range(3))
+    normals = np.cross(b - a, c - a)
+    # Outward winding: every point is behind every face plane.
+    distances = np.einsum("fk,pk->pf", normals, points) - np.einsum("fk,fk->f", normals, a)
+    assert distances.max() <= 1e-9
+    assert hull_volume(vertices, faces) > 0
+
+
+def test_boxes_and_elongated_round_meshes_get_primitives():
+    (fitted,) = fit_colliders(_mesh(box((2.0, 0.5, 1.0), 2, center=(1.0, 1.0, 1.0))))
+    assert fitted.shape == BOX
+    assert np.allclose(sorted(fitted.size), [0.25, 0.5, 1.0], atol=1e-5)
+    assert np.allclose(fitted.transform[:3, 3], [1, 1, 1], atol=1e-5)
+
+    positions, normals, uvs, indices = sphere(0.5, 8)
+    positions = positions.copy()
+    positions[:, 2] += np.where(positions[:, 2] >= 0, 1.0, -1.0)  # stretch into a capsule along Z
+    (fitted,) = fit_colliders(_mesh((positions, normals, uvs, indices)))
+    assert fitted.shape == CAPSULE
+    radius, half_height, _ = fitted.size
+    assert np.isclose(radius, 0.5, atol=0.01) and np.isclose(half_height, 1.0, atol=0.05)
+    assert np.isclose(abs(fitted.transform[2, 1]), 1.0, atol=1e-3)  # local Y runs along Z
+
+
+def test_l_shaped_solids_are_decomposed_into_hulls():
+    mesh = _l_prism()
+    assert fit_colliders(mesh, max_hulls=1)[0].shape == CONVEX_HULL
+
+    parts = fit_colliders(mesh)
+    assert len(parts) >= 2 and all(part.shape == CONVEX_HULL for part in parts)
+    total = sum(part.volume for part in parts)
+    # Hulls of voxel parts: close to the solid, well below the single hull's 7.
+    assert 4.5 < total < 6.0
+
+
+def test_colliders_are_cached_by_geometry(tmp_path, monkeypatch):
+    cache = StageCache(tmp_path).subcache("colliders")
+    mesh = _l_prism()
+    first = ColliderGenerator(cache=cache, max_workers=1).fit([mesh])
+
+    def refit(*args, **kwargs):
+        raise AssertionError("cached geometry must not be refitted")
+
+    monkeypatch.setattr(colliders, "fit_colliders", refit)
+    generator = ColliderGenerator(cache=cache, max_workers=1)
+    renamed = MeshData(positions=mesh.positions.copy(), indices=mesh.indices.copy(), material="madeira")
+    second = generator.fit([renamed])
+
+    assert generator.last_stats.cached == 1
+    assert [part.volume for part in second[0]] == pytest.approx([part.volume for part in first[0]])
+    with pytest.raises(AssertionError):
+        moved = MeshData(positions=mesh.positions + np.float32(1.0), indices=mesh.indices)
+        generator.fit([moved])
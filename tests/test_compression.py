@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from vrhouse.core import PipelineError
+from vrhouse.pipeline.exporters.compression import (
+    available_codecs,
+    compress_bytes,
+    decode_octahedral,
+    decompress_bytes,
+    delta_decode_indices,
+    delta_encode_indices,
+    dequantize_positions,
+    encode_octahedral,
+    quantize_positions,
+    resolve_codec,
+)
+
+
+@pytest.mark.parametrize("codec", available_codecs())
+@pytest.mark.parametrize("level", [None, 1])
+def test_codecs_round_trip(codec, level):
+    data = np.arange(50_000, dtype=np.uint32).tobytes() + b"vrhouse" * 100
+    packed = compress_bytes(memoryview(data), codec, level)
+    assert len(packed) < len(data)
+    assert decompress_bytes(packed, codec, len(data)) == data
+
+
+def test_resolve_codec():
+    assert resolve_codec("auto") == available_codecs()[0]
+    assert resolve_codec("zlib") == "zlib"
+    with pytest.raises(PipelineError):
+        resolve_codec("lz4")
+
+
+def test_quantized_positions_stay_within_half_a_grid_step():
+    rng = np.random.default_rng(5)
+    positions = (rng.random((1000, 3)) * [12.0, 8.0, 3.0] - [2.0, 1.0, 0.0]).astype(np.float32)
+    quantized, parameters = quantize_positions(positions)
+    restored = dequantize_positions(quantized, parameters)
+
+    step = (positions.max(axis=0) - positions.min(axis=0)) / 65535.0
+    assert quantized.dtype == np.uint16
+    assert np.all(np.abs(restored - positions) <= step / 2 + 1e-6)
+
+
+def test_quantizing_a_flat_axis_keeps_it_exact():
+    positions = np.array([[0.0, 1.0, 2.0], [4.0, 1.0, 2.0]], dtype=np.float32)
+    quantized, parameters = quantize_positions(positions)
+    assert np.array_equal(dequantize_positions(quantized, parameters), positions)
+
+
+def test_octahedral_normals_round_trip():
+    rng = np.random.default_rng(9)
+    normals = rng.normal(size=(2000, 3))
+    normals = np.vstack((normals, np.eye(3), -np.eye(3)))
+    normals /= np.linalg.norm(normals, axis=1, keepdims=True)
+
+    decoded = decode_octahedral(encode_octahedral(normals))
+    assert np.allclose(np.linalg.norm(decoded, axis=1), 1.0, atol=1e-5)
+    assert np.all(np.einsum("ij,ij->i", decoded, normals) > np.cos(np.radians(0.05)))
+
+
+@pytest.mark.parametrize(
+    "indices, narrowest",
+    [
+        (np.array([[0, 1, 2], [2, 1, 3], [3, 4, 2]], dtype=np.uint32), np.uint8),
+        (np.array([[0, 70_000, 1]], dtype=np.uint32), np.uint32),
+        (np.zeros((0, 3), dtype=np.uint16), np.uint8),
+    ],
+)
+def test_delta_indices_round_trip(indices, narrowest):
+    encoded = delta_encode_indices(indices)
+    assert encoded.dtype == narrowest
+    decoded = delta_decode_indices(encoded, indices.dtype.str, indices.shape)
+    assert decoded.dtype == indices.dtype
+    assert np.array_equal(decoded, indices)
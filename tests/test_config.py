@@ -0,0 +1,31 @@
+import argparse
+
+import pytest
+
+from vrhouse.cli import build_batch_parser, build_parser, resolve_compress_assets
+from vrhouse.config import config_value, load_config
+from vrhouse.core import PipelineError
+
+
+def test_default_config_is_read():
+    config = load_config()
+    assert config_value(config, "export.compress_assets") is False
+    assert config_value(config, "export.missing.key", 7) == 7
+
+
+def test_compress_assets_comes_from_the_config_unless_a_flag_is_given(tmp_path):
+    config = tmp_path / "vrhouse.yaml"
+    config.write_text("export:\n  compress_assets: true\n", encoding="utf-8")
+    base = ["casa.ifc", "casa", "build"]
+
+    assert resolve_compress_assets(build_parser().parse_args(base + ["--config", str(config)])) is True
+    assert resolve_compress_assets(build_parser().parse_args(base)) is False
+    args = build_parser().parse_args(base + ["--config", str(config), "--no-compress-assets"])
+    assert resolve_compress_assets(args) is False
+    args = build_batch_parser().parse_args(["*.ifc", "build", "--config", str(config)])
+    assert resolve_compress_assets(args) is True
+
+
+def test_explicit_config_must_exist(tmp_path):
+    with pytest.raises(PipelineError):
+        resolve_compress_assets(argparse.Namespace(compress_assets=None, config=tmp_path / "missing.yaml"))
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+from cryptography.fernet import Fernet
+
+from vrhouse.pipeline.exporters.container import MESH, METADATA, ContainerReader, ContainerWriter, package_version
+from vrhouse.pipeline.exporters.encryption import PackageError
+
+KEY = Fernet.generate_key()
+OTHER_KEY = Fernet.generate_key()
+
+
+def _flip(path, position):
+    data = bytearray(path.read_bytes())
+    data[position] ^= 0x01
+    path.write_bytes(bytes(data))
+
+
+def _write_v3(path, **options):
+    with ContainerWriter(path, KEY, segment_size=128, **options) as writer:
+        writer.add_json(METADATA, "metadata", {"project": "casa"})
+        writer.add_array(MESH, "sealed", np.arange(200, dtype=np.float32))
+        writer.add_array(MESH, "open", np.arange(200, dtype=np.float32) * 2, encrypted=False)
+        writer.add_array(MESH, "twin", np.arange(200, dtype=np.float32) + 1)
+    return path
+
+
+def test_v3_round_trip(tmp_path):
+    path = _write_v3(tmp_path / "casa.vrpkg")
+    assert package_version(path) == 3
+    with ContainerReader(path, KEY) as reader:
+        assert reader.read_json("metadata") == {"project": "casa"}
+        assert np.array_equal(reader.read_array("sealed"), np.arange(200, dtype=np.float32))
+        opened = reader.read_array("open")
+        assert np.array_equal(opened, np.arange(200, dtype=np.float32) * 2)
+        assert not opened.flags.writeable
+        assert reader.find("open").digest is not None
+
+
+def test_v3_rejects_wrong_keys(tmp_path):
+    path = _write_v3(tmp_path / "casa.vrpkg")
+    with pytest.raises(PackageError, match="failed authentication"):
+        ContainerReader(path, OTHER_KEY)
+
+
+@pytest.mark.parametrize("name", ["sealed", "open"])
+def test_v3_detects_tampered_sections(tmp_path, name):
+    path = _write_v3(tmp_path / "casa.vrpkg")
+    with ContainerReader(path, KEY) as reader:
+        offset = reader.find(name).offset
+    _flip(path, offset + 300)
+    with ContainerReader(path, KEY) as reader:
+        assert reader.read_json("metadata") == {"project": "casa"}
+        with pytest.raises(PackageError, match="failed authentication"):
+            reader.read_array(name)
+
+
+def test_v3_detects_swapped_sections(tmp_path):
+    path = _write_v3(tmp_path / "casa.vrpkg")
+    with ContainerReader(path, KEY) as reader:
+        sealed, twin = reader.find("sealed"), reader.find("twin")
+    assert sealed.stored_size == twin.stored_size
+    data = bytearray(path.read_bytes())
+    data[twin.offset : twin.offset + twin.stored_size] = data[sealed.offset : sealed.offset + sealed.stored_size]
+    path.write_bytes(bytes(data))
+    with ContainerReader(path, KEY) as reader:
+        with pytest.raises(PackageError, match="failed authentication"):
+            reader.read_array("twin")
+
+
+def test_v3_detects_truncation(tmp_path):
+    path = _write_v3(tmp_path / "casa.vrpkg")
+    data = path.read_bytes()
+    for size in (len(data) - 1, len(data) // 2, 10):
+        path.write_bytes(data[:size])
+        with pytest.raises(PackageError):
+            ContainerReader(path, KEY)
+
+
+def test_v3_compressed_sections_round_trip(tmp_path):
+    path = _write_v3(tmp_path / "casa.vrpkg", compression="zlib")
+    with ContainerReader(path, KEY) as reader:
+        assert reader.find("sealed").codec == "zlib"
+        assert np.array_equal(reader.read_array("sealed"), np.arange(200, dtype=np.float32))
+        assert np.array_equal(reader.read_array("open"), np.arange(200, dtype=np.float32) * 2)
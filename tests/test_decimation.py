@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+from vrhouse.benchmarks.synthetic import box, sphere
+from vrhouse.core import MeshData
+from vrhouse.pipeline.processors.decimation import accumulate_quadrics, decimate_mesh, optimal_collapse
+
+
+def _mesh(positions, normals, uvs, indices):
+    return MeshData(positions=positions, indices=indices.reshape(-1, 3), normals=normals, uvs=uvs)
+
+
+def _grid(size):
+    steps = np.linspace(0.0, 1.0, size + 1)
+    x, y = np.meshgrid(steps, steps, indexing="ij")
+    positions = np.stack((x.ravel(), y.ravel(), np.zeros(x.size)), axis=1).astype(np.float32)
+    quad = np.arange(size * (size + 1)).reshape(size, size + 1)[:, :-1].ravel()
+    a, b, c, d = quad, quad + size + 1, quad + size + 2, quad + 1
+    indices = np.concatenate((np.stack((a, b, c), 1), np.stack((a, c, d), 1))).astype(np.uint32)
+    return MeshData(positions=positions, indices=indices)
+
+
+def _homogeneous(points):
+    return np.concatenate((points, np.ones((points.shape[0], 1))), axis=1)
+
+
+def test_vertices_have_zero_error_against_their_own_quadrics():
+    mesh = _mesh(*sphere(1.0, 4))
+    positions = mesh.positions.astype(np.float64)
+    quadrics = accumulate_quadrics(positions, mesh.indices.astype(np.int64))
+    points = _homogeneous(positions)
+    errors = np.einsum("ki,kij,kj->k", points, quadrics, points)
+    assert np.allclose(errors, 0.0, atol=1e-9)
+    assert np.allclose(quadrics, np.transpose(quadrics, (0, 2, 1)))
+
+
+def test_optimal_collapse_never_beats_the_true_minimum_and_never_exceeds_the_endpoints():
+    rng = np.random.default_rng(3)
+    planes = rng.normal(size=(64, 5, 4))
+    quadrics = np.einsum("kpi,kpj->kij", planes, planes)
+    start, end = rng.normal(size=(64, 3)), rng.normal(size=(64, 3))
+
+    positions, costs = optimal_collapse(quadrics, start, end)
+
+    def error(points):
+        homogeneous = _homogeneous(points)
+        return np.einsum("ki,kij,kj->k", homogeneous, quadrics, homogeneous)
+
+    assert np.allclose(costs, error(positions))
+    assert np.all(costs >= 0.0)
+    assert np.all(costs <= np.minimum(error(start), error(end)) + 1e-9)
+    minimum = np.linalg.solve(quadrics[:, :3, :3], -quadrics[:, :3, 3:])[..., 0]
+    assert np.all(costs >= error(minimum) - 1e-9)
+
+
+def test_singular_quadric_falls_back_to_a_point_on_the_plane():
+    plane = np.array([0.0, 0.0, 1.0, -2.0])
+    quadrics = np.outer(plane, plane)[None]
+    position, cost = optimal_collapse(quadrics, np.array([[0.0, 0.0, 2.0]]), np.array([[1.0, 0.0, 2.0]]))
+    assert cost[0] == pytest.approx(0.0)
+    assert position[0, 2] == pytest.approx(2.0)
+
+
+def test_planar_grid_stays_planar_and_keeps_its_outline():
+    mesh = _grid(24)
+    result = decimate_mesh(mesh, 0.1)
+
+    assert result.triangle_count <= int(np.ceil(mesh.triangle_count * 0.1)) + 2
+    assert np.allclose(result.positions[:, 2], 0.0, atol=1e-6)
+    assert np.allclose(result.positions.min(axis=0), mesh.positions.min(axis=0), atol=1e-5)
+    assert np.allclose(result.positions.max(axis=0), mesh.positions.max(axis=0), atol=1e-5)
+    # Boundary planes pin the outline, so the survivors still tile the unit square without folding over.
+    area = np.cross(*(result.positions[result.indices[:, i]] - result.positions[result.indices[:, 0]] for i in (1, 2)))
+    assert np.abs(area[:, 2]).sum() / 2 == pytest.approx(1.0, rel=1e-4)
+
+
+def test_box_decimates_to_its_corners_without_leaving_the_surface():
+    mesh = _mesh(*box((2.0, 1.0, 0.5), 8))
+    result = decimate_mesh(mesh, 0.05)
+
+    half = np.array([1.0, 0.5, 0.25])
+    outside = np.abs(result.positions) - half
+    assert np.all(outside <= 1e-5)
+    # Every vertex touches at least one face of the box.
+    assert np.all(np.isclose(np.abs(outside), 0.0, atol=1e-5).any(axis=1))
+    assert result.triangle_count <= int(np.ceil(mesh.triangle_count * 0.05)) + 2
+
+
+@pytest.mark.parametrize("ratio, tolerance", [(0.5, 0.02), (0.25, 0.05)])
+def test_sphere_error_stays_bounded(ratio, tolerance):
+    mesh = _mesh(*sphere(1.0, 8))
+    result = decimate_mesh(mesh, ratio)
+
+    assert result.triangle_count <= int(np.ceil(mesh.triangle_count * ratio)) + 2
+    radii = np.linalg.norm(result.positions, axis=1)
+    assert np.all(np.abs(radii - 1.0) <= tolerance)
+    assert result.normals.shape == result.positions.shape
+    assert result.uvs.shape == (result.vertex_count, 2)
+    assert int(result.indices.max()) < result.vertex_count
+
+
+def test_ratio_validation_and_noop():
+    mesh = _grid(2)
+    with pytest.raises(ValueError):
+        decimate_mesh(mesh, 0.0)
+    assert decimate_mesh(mesh, 1.0) is mesh
@@ -0,0 +1,45 @@
+import json
+
+import pytest
+from cryptography.fernet import Fernet
+
+from vrhouse.pipeline.exporters.container import package_version
+from vrhouse.pipeline.exporters.encryption import PackageError, decrypt_package, derive_key
+from vrhouse.pipeline.exporters.package import describe_package
+
+KEY = Fernet.generate_key()
+OTHER_KEY = Fernet.generate_key()
+
+
+def _write_legacy(path, key, scene):
+    """Write a version 1 package: the scene JSON as a single Fernet token."""
+
+    path.write_bytes(Fernet(key).encrypt(json.dumps(scene).encode("utf-8")))
+
+
+def test_legacy_fernet_package_is_readable(tmp_path):
+    scene = {"name": "casa", "nodes": [{"name": "parede"}], "metadata": {"triangles": 12}}
+    path = tmp_path / "casa.vrpkg"
+    _write_legacy(path, KEY, scene)
+
+    assert package_version(path) == 1
+    assert json.loads(decrypt_package(path, KEY)) == scene
+    assert describe_package(path, KEY.decode("ascii")) == scene
+
+
+def test_legacy_package_rejects_wrong_keys_and_foreign_files(tmp_path):
+    path = tmp_path / "casa.vrpkg"
+    _write_legacy(path, KEY, {"name": "casa"})
+    with pytest.raises(PackageError):
+        decrypt_package(path, OTHER_KEY)
+
+    path.write_bytes(b"not a package")
+    with pytest.raises(PackageError):
+        decrypt_package(path, KEY)
+
+
+def test_derive_key_depends_on_salt_and_validates_the_key():
+    assert len(derive_key(KEY, b"a" * 16)) == 32
+    assert derive_key(KEY, b"a" * 16) != derive_key(KEY, b"b" * 16)
+    with pytest.raises(PackageError):
+        derive_key(b"short", b"a" * 16)
@@ -0,0 +1,152 @@
+import json
+import struct
+
+import numpy as np
+import pytest
+
+from vrhouse.benchmarks.synthetic import build_house, generate_house, house_spec
+from vrhouse.core import SceneGraph, SceneSpecification
+from vrhouse.pipeline.importers.base import ImporterError
+from vrhouse.pipeline.importers.gltf_importer import GLTFDocument, MappedGLTFImporter
+
+FLOAT, UINT16 = 5126, 5123
+
+
+def _load(importer, path):
+    return SceneGraph.coerce(importer.load(SceneSpecification("casa", path)))
+
+
+def _write_gltf(path, document, binary):
+    path.with_suffix(".bin").write_bytes(binary)
+    document["buffers"] = [{"uri": path.with_suffix(".bin").name, "byteLength": len(binary)}]
+    path.write_text(json.dumps(document), encoding="utf-8")
+    return path
+
+
+def test_gltf_interleaved_accessors_honour_byte_stride(tmp_path):
+    positions = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0]], dtype=np.float32)
+    normals = np.array([[0, 0, 1]] * 3, dtype=np.float32)
+    interleaved = np.hstack((positions, normals)).tobytes()
+    indices = np.array([0, 1, 2, 0], dtype=np.uint16).tobytes()  # padded to 4-byte alignment
+    document = {
+        "asset": {"version": "2.0"},
+        "bufferViews": [
+            {"buffer": 0, "byteOffset": 0, "byteLength": len(interleaved), "byteStride": 24},
+            {"buffer": 0, "byteOffset": len(interleaved), "byteLength": 6},
+        ],
+        "accessors": [
+            {"bufferView": 0, "byteOffset": 0, "componentType": FLOAT, "count": 3, "type": "VEC3"},
+            {"bufferView": 0, "byteOffset": 12, "componentType": FLOAT, "count": 3, "type": "VEC3"},
+            {"bufferView": 1, "componentType": UINT16, "count": 3, "type": "SCALAR"},
+        ],
+        "meshes": [{"name": "tri", "primitives": [{"attributes": {"POSITION": 0, "NORMAL": 1}, "indices": 2}]}],
+        "nodes": [{"mesh": 0, "translation": [0, 0, 5]}],
+        "scenes": [{"nodes": [0]}],
+    }
+    path = _write_gltf(tmp_path / "tri.gltf", document, interleaved + indices)
+
+    mesh = GLTFDocument(path).accessor(0)
+    assert mesh.strides == (24, 4) and not mesh.flags.writeable
+    graph = _load(MappedGLTFImporter(), path)
+    node = graph["tri"]
+    assert np.array_equal(node.mesh.positions, positions)
+    assert np.array_equal(node.mesh.normals, normals)
+    assert node.mesh.indices.tolist() == [[0, 1, 2]]
+    assert node.transform[:3, 3].tolist() == pytest.approx([0.0, -5.0, 0.0])  # glTF +Z points backwards
+
+
+def test_gltf_nodes_are_rotated_into_z_up(tmp_path):
+    positions = np.array([[0, 0, 0], [1, 0, 0], [0, 3, -2]], dtype=np.float32)
+    document = {
+        "asset": {"version": "2.0"},
+        "bufferViews": [{"buffer": 0, "byteLength": positions.nbytes}],
+        "accessors": [{"bufferView": 0, "componentType": FLOAT, "count": 3, "type": "VEC3"}],
+        "meshes": [{"name": "tri", "primitives": [{"attributes": {"POSITION": 0}}]}],
+        "nodes": [{"mesh": 0, "translation": [0, 1, 0]}],
+    }
+    graph = _load(MappedGLTFImporter(), _write_gltf(tmp_path / "up.gltf", document, positions.tobytes()))
+
+    lower, upper = graph.node_bounds()
+    assert lower[0].tolist() == pytest.approx([0.0, 0.0, 1.0])
+    assert upper[0].tolist() == pytest.approx([1.0, 2.0, 4.0])  # glTF up is +Z, glTF forward (-Z) is +Y
+    assert graph.root.get("source_up_axis") == "y"
+    assert np.array_equal(graph["tri"].mesh.positions, positions)
+
+
+def test_gltf_sparse_accessor_overrides_base_values(tmp_path):
+    base = np.zeros((4, 3), dtype=np.float32).tobytes()
+    sparse_indices = np.array([1, 3], dtype=np.uint16).tobytes()
+    sparse_values = np.array([[1, 2, 3], [4, 5, 6]], dtype=np.float32).tobytes()
+    binary = base + sparse_indices + sparse_values
+    document = {
+        "asset": {"version": "2.0"},
+        "bufferViews": [
+            {"buffer": 0, "byteOffset": 0, "byteLength": 48},
+            {"buffer": 0, "byteOffset": 48, "byteLength": 4},
+            {"buffer": 0, "byteOffset": 52, "byteLength": 24},
+        ],
+        "accessors": [
+            {
+                "bufferView": 0,
+                "componentType": FLOAT,
+                "count": 4,
+                "type": "VEC3",
+                "sparse": {
+                    "count": 2,
+                    "indices": {"bufferView": 1, "componentType": UINT16},
+                    "values": {"bufferView": 2},
+                },
+            },
+            {
+                "componentType": FLOAT,
+                "count": 4,
+                "type": "VEC3",
+                "sparse": {
+                    "count": 2,
+                    "indices": {"bufferView": 1, "componentType": UINT16},
+                    "values": {"bufferView": 2},
+                },
+            },
+        ],
+    }
+    path = _write_gltf(tmp_path / "sparse.gltf", document, binary)
+    gltf = GLTFDocument(path)
+
+    expected = [[0, 0, 0], [1, 2, 3], [0, 0, 0], [4, 5, 6]]
+    assert gltf.accessor(0).tolist() == expected
+    # The mapped base buffer is untouched by the substitution.
+    assert not np.frombuffer(gltf.buffer(0), dtype=np.float32, count=12).any()
+    # Without a bufferView the base values are zeros.
+    assert gltf.accessor(1).tolist() == expected
+
+
+def test_gltf_accessor_out_of_bounds_is_rejected(tmp_path):
+    document = {
+        "asset": {"version": "2.0"},
+        "bufferViews": [{"buffer": 0, "byteLength": 12, "byteStride": 16}],
+        "accessors": [{"bufferView": 0, "componentType": FLOAT, "count": 2, "type": "VEC3"}],
+    }
+    path = _write_gltf(tmp_path / "short.gltf", document, b"\0" * 12)
+    with pytest.raises(ImporterError):
+        GLTFDocument(path).accessor(0)
+
+
+def test_glb_round_trip_of_a_synthetic_house(tmp_path):
+    house = generate_house(house_spec("tiny", texture_size=0), tmp_path / "casa.glb")
+    with house.path.open("rb") as handle:
+        assert struct.unpack("<I", handle.read(4))[0] == 0x46546C67
+    graph = _load(MappedGLTFImporter(), house.path)
+    assert graph.triangle_count == house.triangles
+
+
+def test_synthetic_gltf_is_y_up_and_imports_z_up(tmp_path):
+    spec = house_spec("tiny", texture_size=0)
+    house = generate_house(spec, tmp_path / "casa.gltf")
+    corners = np.concatenate([part.world_positions() for part in build_house(spec)])
+
+    document = GLTFDocument(house.path)
+    slab = next(index for index, node in enumerate(document.document["nodes"]) if node["name"] == "laje_0")
+    assert document.node_matrices()[slab][1, 3] == pytest.approx(-0.1)  # the slab's elevation, along glTF's +Y
+    lower, upper = _load(MappedGLTFImporter(), house.path).node_bounds()
+    assert lower.min(axis=0) == pytest.approx(corners.min(axis=0), abs=1e-4)
+    assert upper.max(axis=0) == pytest.approx(corners.max(axis=0), abs=1e-4)
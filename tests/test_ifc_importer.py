@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from vrhouse.benchmarks.synthetic import generate_house, house_spec
+from vrhouse.core import SceneGraph, SceneSpecification
+from vrhouse.pipeline.importers.ifc_importer import StepFile, StepIFCImporter
+
+
+def _load(importer, path):
+    return SceneGraph.coerce(importer.load(SceneSpecification("casa", path)))
+
+
+def test_ifc_elements_are_triangulated_in_metres(tmp_path):
+    house = generate_house(house_spec("tiny", texture_size=0), tmp_path / "casa.ifc")
+    graph = _load(StepIFCImporter(), house.path)
+
+    assert graph.root["length_unit"] == pytest.approx(0.001)
+    assert graph.triangle_count == house.triangles
+    assert "unsupported_geometry" not in graph.root
+    lower, upper = graph.node_bounds()
+    spec = house.spec
+    assert upper.max(axis=0)[2] == pytest.approx(spec.floors * spec.floor_height - 0.2, abs=0.05)
+    assert upper.max(axis=0)[0] == pytest.approx(spec.rooms_x * spec.room_size + 0.075, abs=0.05)
+
+
+def test_ifc_spaces_carry_bounds_instead_of_meshes(tmp_path):
+    house = generate_house(house_spec("tiny", texture_size=0), tmp_path / "casa.ifc")
+    graph = _load(StepIFCImporter(), house.path)
+
+    spaces = [node for node in graph.nodes() if node.get("ifc_class") == "IFCSPACE"]
+    assert spaces
+    for space in spaces:
+        assert space.mesh is None
+        lower, upper = np.asarray(space["bounds"])
+        size = upper - lower
+        assert 1.0 < size[0] <= house.spec.room_size + 1e-3
+        assert 1.0 < size[2] <= house.spec.floor_height + 1e-3
+
+
+def test_records_are_not_read_from_string_literals_or_comments(tmp_path):
+    source = tmp_path / "rotulos.ifc"
+    source.write_text(
+        "ISO-10303-21;\nHEADER;\nFILE_NAME('#9=IFCWALL(',$);\nENDSEC;\nDATA;\n"
+        "#1=IFCPROJECT('0a',$,'#2=IFCDOOR(#3=IFCDOOR(#4=IFCDOOR(#5=IFCDOOR(',$);\n"
+        "/* #1=IFCWINDOW( */\n"
+        "#2=IFCWALL('0b',$,'it''s #1=IFCSLAB(',$);\n"
+        "ENDSEC;\nEND-ISO-10303-21;\n",
+        encoding="utf-8",
+    )
+    with StepFile(source) as step_file:
+        assert len(step_file) == 2
+        assert step_file[1].type == "IFCPROJECT"
+        assert step_file[2].type == "IFCWALL"
+        assert step_file.type_counts() == {"IFCPROJECT": 1, "IFCWALL": 1}
@@ -0,0 +1,92 @@
+import numpy as np
+
+from vrhouse.core import MeshData, SceneGraph
+from vrhouse.pipeline.processors.instancing import InstanceDeduplicator, match_rigid
+
+
+def _chair(seed=1):
+    """An irregular mesh with no symmetry, so only the true motion aligns two copies."""
+
+    rng = np.random.default_rng(seed)
+    positions = rng.random((24, 3)).astype(np.float32) * [0.5, 0.5, 1.0]
+    indices = np.array([rng.choice(24, 3, replace=False) for _ in range(30)], dtype=np.uint32)
+    return MeshData(positions=positions, indices=indices, material="madeira")
+
+
+def _rotation(angle, axis):
+    axis = np.asarray(axis, dtype=np.float64) / np.linalg.norm(axis)
+    k = np.array([[0, -axis[2], axis[1]], [axis[2], 0, -axis[0]], [-axis[1], axis[0], 0]])
+    return np.eye(3) + np.sin(angle) * k + (1 - np.cos(angle)) * k @ k
+
+
+def _moved(mesh, rotation, translation, order=None):
+    positions = mesh.positions.astype(np.float64) @ rotation.T + translation
+    indices = mesh.indices
+    if order is not None:  # renumber vertices, as another exporter would
+        inverse = np.argsort(order)
+        positions, indices = positions[order], inverse[indices].astype(np.uint32)
+    return MeshData(positions=positions.astype(np.float32), indices=indices, material=mesh.material)
+
+
+def _world_triangles(graph):
+    world = graph.world_transforms().astype(np.float64)
+    result = {}
+    for node in graph.mesh_nodes().tolist():
+        mesh = graph.meshes[int(graph.mesh_ids[node])]
+        points = mesh.positions.astype(np.float64) @ world[node, :3, :3].T + world[node, :3, 3]
+        result[graph.names[node]] = np.sort(points[mesh.indices.astype(np.int64)].reshape(-1, 9), axis=0)
+    return result
+
+
+def test_rigid_copies_collapse_into_one_mesh_and_keep_their_world_geometry():
+    chair = _chair()
+    graph = SceneGraph()
+    graph.add_node("cadeira_0", mesh=chair)
+    graph.add_node("cadeira_1", mesh=_moved(chair, _rotation(0.7, (0, 0, 1)), [3.0, 1.0, 0.0]))
+    graph.add_node("cadeira_2", mesh=_moved(chair, _rotation(2.1, (1, 2, 3)), [-2.0, 5.0, 1.0]))
+    order = np.random.default_rng(7).permutation(chair.vertex_count)
+    graph.add_node("cadeira_3", mesh=_moved(chair, _rotation(-1.2, (0, 1, 0)), [0.0, -4.0, 2.0], order))
+    before = _world_triangles(graph)
+
+    deduplicator = InstanceDeduplicator()
+    instanced = deduplicator.deduplicate(graph)
+
+    assert len(instanced.meshes) == 1
+    assert deduplicator.last_stats.instanced_nodes == 3
+    assert instanced.metadata["instancing"]["meshes_after"] == 1
+    after = _world_triangles(instanced)
+    for name, triangles in before.items():
+        assert np.allclose(after[name], triangles, atol=1e-4)
+    assert len(graph.meshes) == 4  # the input graph is untouched
+
+
+def test_near_misses_and_mirror_images_do_not_merge():
+    chair = _chair()
+    bent = chair.positions.copy()
+    bent[5] += [0.0, 0.0, 0.01]
+    mirrored = _moved(chair, np.diag([-1.0, 1.0, 1.0]), [2.0, 0.0, 0.0])
+    other_material = MeshData(positions=chair.positions, indices=chair.indices, material="metal")
+    candidates = [
+        MeshData(positions=bent, indices=chair.indices, material=chair.material),
+        mirrored,
+        other_material,
+        _chair(seed=2),
+    ]
+    for candidate in candidates:
+        assert match_rigid(chair, candidate) is None
+
+    graph = SceneGraph()
+    graph.add_node("cadeira", mesh=chair)
+    for index, candidate in enumerate(candidates):
+        graph.add_node(f"quase_{index}", mesh=candidate)
+    assert len(InstanceDeduplicator().deduplicate(graph).meshes) == 5
+
+
+def test_match_rigid_returns_the_motion():
+    chair = _chair()
+    rotation, translation = _rotation(1.3, (1, 0, 1)), np.array([1.0, 2.0, 3.0])
+    motion = match_rigid(chair, _moved(chair, rotation, translation))
+
+    assert motion is not None
+    assert np.allclose(motion[:3, :3], rotation, atol=1e-4)
+    assert np.allclose(motion[:3, 3], translation, atol=1e-4)
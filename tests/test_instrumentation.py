@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from vrhouse.pipeline.instrumentation import Instrumentation, StageObserver, reset_peak_rss
+
+
+class _Runs(StageObserver):
+    def run_finished(self, metrics, run):
+        self.run = dict(run)
+
+
+@pytest.mark.skipif(not reset_peak_rss(), reason="needs a rewindable VmHWM (Linux)")
+def test_peak_rss_is_rewound_per_stage_but_kept_for_the_run():
+    runs = _Runs()
+    instrumentation = Instrumentation([runs])
+    instrumentation.start()
+    with instrumentation.stage("grande", {}):
+        block = np.ones(64 * 1024 * 1024, dtype=np.uint8)
+        del block
+    with instrumentation.stage("pequeno", {}):
+        pass
+    instrumentation.finish()
+
+    big, small = instrumentation.metrics
+    assert big.peak_rss_mb - small.peak_rss_mb > 48
+    assert runs.run["peak_rss_mb"] >= big.peak_rss_mb
@@ -0,0 +1,61 @@
+import math
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from vrhouse.benchmarks.synthetic import sphere
+from vrhouse.core import MeshData
+from vrhouse.pipeline.processors import lod
+from vrhouse.pipeline.processors.lod import generate_lod_chains, share_meshes
+
+SHM = Path("/dev/shm")
+RATIOS = (1.0, 0.5, 0.25)
+
+
+def _meshes():
+    return [
+        MeshData(positions=positions, indices=indices.reshape(-1, 3), normals=normals, uvs=uvs)
+        for positions, normals, uvs, indices in (sphere(1.0, 12), sphere(2.0, 16), sphere(0.5, 8))
+    ]
+
+
+def _blocks():
+    return {path.name for path in SHM.iterdir()} if SHM.is_dir() else set()
+
+
+def test_chains_meet_their_triangle_targets():
+    meshes = _meshes()
+    progress = []
+    chains = generate_lod_chains(meshes, RATIOS, max_workers=1, progress=progress.append)
+
+    for mesh, chain in zip(meshes, chains):
+        assert chain[0] is mesh
+        for level, ratio in zip(chain, RATIOS):
+            assert level.triangle_count <= math.ceil(mesh.triangle_count * ratio)
+        assert chain[-1].triangle_count >= 0.9 * math.ceil(mesh.triangle_count * RATIOS[-1])
+    assert progress[-1] == pytest.approx(1.0)
+
+
+def test_invalid_ratios_are_rejected():
+    with pytest.raises(ValueError):
+        generate_lod_chains(_meshes(), (1.0, 0.0))
+
+
+@pytest.mark.skipif(not SHM.is_dir(), reason="needs /dev/shm to observe shared-memory blocks")
+def test_parallel_path_matches_inline_and_frees_shared_memory(monkeypatch):
+    meshes = _meshes()
+    inline = generate_lod_chains(meshes, RATIOS, max_workers=1)
+    shared = []
+    monkeypatch.setattr(lod, "PARALLEL_THRESHOLD", 0)
+    monkeypatch.setattr(lod, "share_meshes", lambda items: shared.append(len(items)) or share_meshes(items))
+    before = _blocks()
+    pooled = generate_lod_chains(meshes, RATIOS, max_workers=2)
+
+    assert shared == [len(meshes)]
+    assert _blocks() == before
+    for expected, chain in zip(inline, pooled):
+        assert [level.triangle_count for level in chain] == [level.triangle_count for level in expected]
+        for left, right in zip(expected, chain):
+            assert np.array_equal(left.positions, right.positions)
+            assert np.array_equal(left.indices, right.indices)
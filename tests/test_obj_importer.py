@@ -0,0 +1,50 @@
+import numpy as np
+
+from vrhouse.benchmarks.synthetic import generate_house, house_spec
+from vrhouse.core import SceneGraph, SceneSpecification
+from vrhouse.pipeline.importers.obj_importer import StreamingOBJImporter
+
+
+def _load(importer, path):
+    return SceneGraph.coerce(importer.load(SceneSpecification("casa", path)))
+
+
+def test_obj_groups_materials_quads_and_relative_indices(tmp_path):
+    (tmp_path / "casa.mtl").write_text("newmtl tijolo\nKd 0.8 0.3 0.2\nmap_Kd tijolo.png\n", encoding="utf-8")
+    source = tmp_path / "casa.obj"
+    source.write_text(
+        "mtllib casa.mtl\n"
+        "o parede\n"
+        "v 0 0 0\nv 1 0 0\nv 1 1 0\nv 0 1 0\n"
+        "vt 0 0\nvt 1 0\nvt 1 1\nvt 0 1\n"
+        "usemtl tijolo\n"
+        "f 1/1 2/2 3/3 4/4\n"
+        "o piso\n"
+        "v 0 0 1\nv 1 0 1\nv 1 1 1\n"
+        "f -3 -2 -1\n",
+        encoding="utf-8",
+    )
+    graph = _load(StreamingOBJImporter(), source)
+
+    wall, floor = graph["parede:tijolo"], graph["piso:tijolo"]  # usemtl state carries over
+    assert wall.mesh.triangle_count == 2 and wall.mesh.vertex_count == 4
+    assert wall.material == "tijolo"
+    assert np.allclose(wall.mesh.uvs[np.argsort(wall.mesh.positions[:, 0] * 2 + wall.mesh.positions[:, 1])],
+                       [[0, 0], [0, 1], [1, 0], [1, 1]])
+    assert floor.mesh.triangle_count == 1
+    assert np.allclose(floor.mesh.positions[:, 2], 1.0)
+    assert graph.material_properties["tijolo"]["map_kd"] == "tijolo.png"
+    assert "tijolo.png" in graph.root["required_assets"]
+
+
+def test_obj_chunk_boundaries_do_not_change_the_result(tmp_path):
+    house = generate_house(house_spec("tiny", texture_size=0), tmp_path / "casa.obj")
+    whole = _load(StreamingOBJImporter(), house.path)
+    chunked = _load(StreamingOBJImporter(chunk_size=997), house.path)
+
+    assert whole.triangle_count == chunked.triangle_count == house.triangles
+    assert list(whole) == list(chunked)
+    for name in whole:
+        if whole[name].mesh is not None:
+            assert np.array_equal(whole[name].mesh.positions, chunked[name].mesh.positions)
+            assert np.array_equal(whole[name].mesh.indices, chunked[name].mesh.indices)
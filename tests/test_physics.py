@@ -0,0 +1,81 @@
+import numpy as np
+
+from vrhouse.benchmarks.synthetic import box, sphere
+from vrhouse.core import MeshData, SceneGraph
+from vrhouse.pipeline.ai.physics_model import DYNAMIC, KINEMATIC, STATIC, PhysicsInferenceModel, mesh_moments
+
+
+def _mesh(parts, flip=False):
+    positions, _, _, indices = parts
+    indices = np.asarray(indices, dtype=np.uint32)
+    return MeshData(positions=positions, indices=indices[:, ::-1] if flip else indices)
+
+
+def _box_second_moment(size):
+    size = np.asarray(size, dtype=np.float64)
+    return np.diag(np.prod(size) / 12.0 * (size[[1, 0, 0]] ** 2 + size[[2, 2, 1]] ** 2))
+
+
+def test_box_and_sphere_moments_match_closed_forms():
+    meshes = [
+        _mesh(box((2.0, 1.0, 0.5), 2, center=(1.0, 2.0, 3.0))),
+        _mesh(box((2.0, 1.0, 0.5), 1), flip=True),
+        _mesh(sphere(0.5, 12, center=(-1.0, 0.0, 0.0))),
+    ]
+    volume, centroid, central, area, lower, upper, closed = mesh_moments(meshes)
+
+    assert closed.all()
+    assert np.allclose(volume[:2], 1.0) and np.allclose(area[:2], 2 * (2 + 1 + 0.5))
+    assert np.allclose(centroid[:2], [[1, 2, 3], [0, 0, 0]], atol=1e-6)
+    # ``central`` is the second moment of volume: the inertia tensor is trace(C) I - C per unit density.
+    for tensor in central[:2]:
+        inertia = np.trace(tensor) * np.eye(3) - tensor
+        assert np.allclose(inertia, _box_second_moment((2.0, 1.0, 0.5)), atol=1e-6)
+    assert np.isclose(volume[2], 4 / 3 * np.pi * 0.5**3, rtol=0.02)
+    assert np.allclose(centroid[2], [-1, 0, 0], atol=1e-6)
+    sphere_inertia = np.trace(central[2]) * np.eye(3) - central[2]
+    assert np.allclose(sphere_inertia, np.eye(3) * 0.4 * volume[2] * 0.5**2, rtol=0.03, atol=1e-6)
+
+
+def test_open_meshes_fall_back_to_their_box():
+    quad = MeshData(
+        positions=np.array([[0, 0, 0], [2, 0, 0], [2, 3, 0], [0, 3, 0]], dtype=np.float32),
+        indices=np.array([[0, 1, 2], [0, 2, 3]], dtype=np.uint32),
+    )
+    volume, centroid, _, _, _, _, closed = mesh_moments([quad])
+
+    assert not closed[0]
+    assert np.isclose(volume[0], 2 * 3 * 0.01)
+    assert np.allclose(centroid[0], [1, 1.5, 0])
+
+
+def test_predict_objects_moves_mass_properties_with_each_node():
+    rotation = np.eye(4)
+    rotation[:3, :3] = [[0, -1, 0], [1, 0, 0], [0, 0, 1]]  # 90 degrees about z
+    rotation[:3, 3] = (10, 0, 0)
+    graph = SceneGraph()
+    slab = graph.add_node("laje", mesh=_mesh(box((2.0, 1.0, 0.5), 1)), material="concreto", transform=rotation)
+    chair = graph.add_node(
+        "cadeira",
+        mesh=_mesh(box((0.5, 0.5, 1.0), 1)),
+        material="madeira",
+        attributes={"ifc_class": "IFCFURNISHINGELEMENT"},
+    )
+    door = graph.add_node("porta", mesh=_mesh(box((1.0, 0.1, 2.0), 1)), attributes={"ifc_class": "IFCDOOR"})
+
+    objects = PhysicsInferenceModel().predict_objects(graph)
+    rows = {int(node): row for row, node in enumerate(objects.nodes)}
+
+    slab_row = rows[slab]
+    assert np.isclose(objects.mass[slab_row], 2400.0)
+    assert np.allclose(objects.centroid[slab_row], [10, 0, 0], atol=1e-5)
+    expected = 2400.0 * _box_second_moment((1.0, 2.0, 0.5))  # the rotation swaps the x and y extents
+    assert np.allclose(objects.inertia[slab_row], expected, rtol=1e-5, atol=1e-3)
+    assert np.isclose(objects.mass[rows[chair]], 600.0 * 0.25)
+    assert [int(objects.body[rows[node]]) for node in (slab, chair, door)] == [STATIC, DYNAMIC, KINEMATIC]
+
+    summary = objects.summary()
+    assert summary["dynamic_objects"] == 1.0
+    assert np.isclose(summary["total_mass"], float(objects.mass.sum()))
+    weights = objects.mass / objects.mass.sum()
+    assert np.isclose(summary["friction_coefficient"], float(weights @ objects.friction))
@@ -0,0 +1,35 @@
+import pytest
+
+from vrhouse.service.server import HTTPError, parse_range
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("bytes=0-99", (0, 99)),
+        ("bytes=100-", (100, 999)),
+        ("bytes=900-5000", (900, 999)),
+        ("bytes=-100", (900, 999)),
+        ("bytes=-5000", (0, 999)),
+        ("Bytes = 10-19", (10, 19)),
+        ("bytes=999-999", (999, 999)),
+    ],
+)
+def test_single_ranges(header, expected):
+    assert parse_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize(
+    "header",
+    ["items=0-10", "bytes=0-10,20-30", "bytes=abc-", "bytes=-", "bytes=10-5", "bytes=5-x", "bytes=--5"],
+)
+def test_unsupported_or_invalid_ranges_send_the_whole_body(header):
+    assert parse_range(header, 1000) is None
+
+
+@pytest.mark.parametrize("header, size", [("bytes=1000-", 1000), ("bytes=-0", 1000), ("bytes=-10", 0), ("bytes=0-", 0)])
+def test_unsatisfiable_ranges(header, size):
+    with pytest.raises(HTTPError) as raised:
+        parse_range(header, size)
+    assert raised.value.status == 416
+    assert raised.value.headers["Content-Range"] == f"bytes */{size}"
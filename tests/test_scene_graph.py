@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from vrhouse.core import MeshData, PipelineError, SceneGraph
+
+
+def _quad(material=None):
+    positions = np.array([[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0]], dtype=np.float32)
+    indices = np.array([[0, 1, 2], [0, 2, 3]], dtype=np.uint32)
+    return MeshData(positions=positions, indices=indices, material=material)
+
+
+def _graph():
+    graph = SceneGraph(root_attributes={"project": "casa"})
+    mesh = _quad()
+    wall = graph.add_node("parede", mesh=mesh, material="reboco", attributes={"type": "wall"})
+    graph.add_node("quadro", parent=wall, mesh=mesh, material="madeira", transform=np.diag([2, 2, 2, 1]))
+    graph.set_material_properties("reboco", {"Kd": "0.9 0.9 0.9"})
+    graph.metadata["units"] = "m"
+    return graph
+
+
+def test_copy_shares_buffers_until_a_write():
+    graph = _graph()
+    clone = graph.copy()
+    assert np.shares_memory(clone.parents, graph.parents)
+
+    clone.set_transform(1, np.diag([3, 3, 3, 1]))
+    clone.set_attribute(1, "type", "door")
+    clone.set_material(2, "vidro")
+    clone.metadata["units"] = "mm"
+    clone.add_node("porta", mesh=0)
+
+    assert np.array_equal(graph.transforms[1], np.eye(4))
+    assert graph["parede"]["type"] == "wall"
+    assert graph["quadro"].material == "madeira"
+    assert graph.metadata == {"units": "m"}
+    assert "porta" not in graph and len(graph) == 3
+    assert clone["parede"]["type"] == "door" and len(clone) == 4
+    # Buffers the clone never touched are still shared.
+    assert clone.meshes is graph.meshes
+
+
+def test_original_writes_do_not_leak_into_the_copy():
+    graph = _graph()
+    clone = graph.copy()
+    graph.set_attribute(1, "type", "floor")
+    graph.remove_nodes([2])
+    assert clone["parede"]["type"] == "wall"
+    assert "quadro" in clone and clone["quadro"]["parent"] == "parede"
+
+
+def test_readonly_views():
+    graph = _graph()
+    with pytest.raises(ValueError):
+        graph.parents[1] = 0
+
+
+def test_dict_round_trip_keeps_structure_metadata_and_shared_meshes():
+    graph = _graph()
+    restored = SceneGraph.from_dict(graph.to_dict())
+
+    assert list(restored) == list(graph)
+    assert np.array_equal(restored.parents, graph.parents)
+    assert np.allclose(restored.transforms, graph.transforms)
+    assert restored.materials == graph.materials
+    assert restored.material_properties == {"reboco": {"Kd": "0.9 0.9 0.9"}}
+    assert restored.metadata == {"units": "m"}
+    assert restored.root["project"] == "casa"
+    assert len(restored.meshes) == 1
+    assert restored.triangle_count == graph.triangle_count
+
+
+def test_from_dict_accepts_children_before_parents_and_rejects_orphans():
+    layout = {
+        "root": {"type": "scene"},
+        "filho": {"type": "mesh", "parent": "pai"},
+        "pai": {"type": "group"},
+    }
+    graph = SceneGraph.from_dict(layout)
+    assert graph["filho"]["parent"] == "pai"
+    assert graph.index_of("pai") < graph.index_of("filho")
+
+    with pytest.raises(PipelineError):
+        SceneGraph.from_dict({"root": {}, "perdido": {"parent": "nenhum"}})
+
+
+def test_remove_nodes_reparents_children():
+    graph = _graph()
+    graph.remove_nodes([graph.index_of("parede")])
+    assert graph["quadro"]["parent"] == "root"
+    with pytest.raises(PipelineError):
+        graph.remove_nodes([0])
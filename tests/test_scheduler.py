@@ -0,0 +1,104 @@
+import threading
+
+import pytest
+
+from vrhouse.core import PipelineError
+from vrhouse.pipeline.cache import StageCache
+from vrhouse.pipeline.scheduler import Stage, StageScheduler, topological_order
+
+
+class _Config:
+    def __init__(self, value):
+        self.value = value
+
+
+def _constant(value, log=None, name=None):
+    def run(inputs, report):
+        if log is not None:
+            log.append(name)
+        report(0.5)
+        return value
+
+    return run
+
+
+def _fail(exc):
+    def run(inputs, report):
+        raise exc
+
+    return run
+
+
+def test_failure_propagates_and_stops_dependants_but_lets_siblings_finish():
+    sibling_started, release = threading.Event(), threading.Event()
+    ran = []
+
+    def boom(inputs, report):
+        sibling_started.wait(5)
+        release.set()
+        raise ValueError("geometria inválida")
+
+    def sibling(inputs, report):
+        sibling_started.set()
+        release.wait(5)
+        ran.append("sibling")
+        return 2
+
+    stages = [
+        Stage("import", _constant(1)),
+        Stage("geometry", boom, ("import",)),
+        Stage("materials", sibling, ("import",)),
+        Stage("export", _constant(3, ran, "export"), ("geometry", "materials")),
+    ]
+    with pytest.raises(ValueError, match="geometria inválida"):
+        StageScheduler(stages, max_workers=2).run()
+    assert ran == ["sibling"]
+
+
+def test_first_failure_wins_with_a_single_worker():
+    stages = [
+        Stage("a", _fail(KeyError("a"))),
+        Stage("b", _fail(KeyError("b"))),
+    ]
+    with pytest.raises(KeyError, match="a"):
+        StageScheduler(stages, max_workers=1).run()
+
+
+def test_outputs_flow_along_dependencies_and_progress_is_monotonic():
+    progress = []
+    stages = [
+        Stage("import", _constant(2), weight=2.0),
+        Stage("double", lambda inputs, report: inputs["import"] * 2, ("import",)),
+        Stage("sum", lambda inputs, report: inputs["import"] + inputs["double"], ("import", "double")),
+    ]
+    outputs = StageScheduler(stages, progress_callback=lambda value, message: progress.append(value)).run()
+
+    assert outputs == {"import": 2, "double": 4, "sum": 6}
+    assert progress == sorted(progress) and progress[-1] == pytest.approx(1.0)
+
+
+def test_cache_hit_prunes_upstream_stages(tmp_path):
+    cache = StageCache(tmp_path)
+    log = []
+
+    def stages():
+        return [
+            Stage("import", _constant(1, log, "import"), cache_object=_Config("obj")),
+            Stage("geometry", _constant(2, log, "geometry"), ("import",), cache_object=_Config(0.5)),
+        ]
+
+    StageScheduler(stages(), cache=cache, source_key="casa").run()
+    scheduler = StageScheduler(stages(), cache=cache, source_key="casa")
+    assert scheduler.run() == {"geometry": 2}
+    assert log == ["import", "geometry"]
+    assert scheduler.cache_hits == ["geometry"]
+
+
+def test_invalid_graphs_are_rejected():
+    run = _constant(None)
+    with pytest.raises(PipelineError, match="cycle"):
+        topological_order([Stage("a", run, ("b",)), Stage("b", run, ("a",))])
+    with pytest.raises(PipelineError, match="unknown"):
+        topological_order([Stage("a", run, ("missing",))])
+    with pytest.raises(PipelineError, match="Duplicate"):
+        topological_order([Stage("a", run), Stage("a", run)])
@@ -0,0 +1,91 @@
+import asyncio
+import json
+import socket
+import threading
+
+import pytest
+
+from vrhouse.benchmarks.synthetic import generate_house, house_spec
+from vrhouse.pipeline.exporters.container import CONTAINER_VERSION, package_version
+from vrhouse.service.client import ServiceClient
+from vrhouse.service.server import ConversionService
+
+
+@pytest.fixture
+def service(tmp_path):
+    loop = asyncio.new_event_loop()
+    service = ConversionService(tmp_path / "jobs", port=0, max_workers=1, max_upload_mb=1)
+    loop.run_until_complete(service.start())
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield service
+    asyncio.run_coroutine_threadsafe(service.close(), loop).result(60)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+@pytest.fixture
+def client(service):
+    return ServiceClient(f"http://{service.host}:{service.port}", timeout=10)
+
+
+@pytest.fixture
+def house(tmp_path):
+    return generate_house(house_spec("tiny", texture_size=0), tmp_path / "casa.ifc").path
+
+
+def _post(service, headers, body=b""):
+    """Send a raw upload request and return the status and JSON body of the answer."""
+
+    lines = ["POST /jobs?project_name=casa HTTP/1.1", *(f"{name}: {value}" for name, value in headers.items())]
+    head = "\r\n".join(lines) + "\r\n"
+    with socket.create_connection((service.host, service.port), timeout=10) as connection:
+        connection.sendall(head.encode("latin-1") + b"\r\n" + body)
+        response = b""
+        while chunk := connection.recv(65536):
+            response += chunk
+    head, _, payload = response.partition(b"\r\n\r\n")
+    return int(head.split(b" ", 2)[1]), json.loads(payload)
+
+
+def test_upload_streams_progress_and_serves_the_package(client, house, tmp_path):
+    job = client.submit(house, "casa")
+    events = list(client.events(job["id"]))
+
+    assert events[-1]["event"] == "done", events[-1].get("error")
+    progress = [event["progress"] for event in events]
+    assert progress == sorted(progress) and progress[-1] == 1.0
+    package = client.download(job["id"], tmp_path / "casa.vrpkg")
+    assert package.stat().st_size == client.job(job["id"])["package_size"]
+    assert package_version(package) == CONTAINER_VERSION
+
+
+def test_queued_job_is_cancelled(client, house):
+    first = client.submit(house, "primeira")
+    second = client.submit(house, "segunda")
+
+    assert client.cancel(second["id"])["status"] in ("cancelled", "running")
+    assert list(client.events(second["id"]))[-1]["event"] == "cancelled"
+    assert client.job(second["id"])["status"] == "cancelled"
+    client.cancel(first["id"])
+    assert list(client.events(first["id"]))[-1]["event"] == "cancelled"
+
+
+@pytest.mark.parametrize(
+    "headers, status",
+    [
+        ({}, 411),
+        ({"Content-Length": str(2 * 1024 * 1024)}, 413),
+        ({"Content-Length": "-1"}, 400),
+        ({"Content-Length": "12abc"}, 400),
+    ],
+)
+def test_upload_length_is_checked_before_the_body_is_read(service, headers, status):
+    # The body is shorter than any declared length and the connection stays open:
+    # reading it would hang instead of answering.
+    code, payload = _post(service, {"X-Filename": "casa.ifc", **headers}, body=b"ISO-10303-21;")
+
+    assert code == status, payload
+    assert "error" in payload
+    assert not service.manager.jobs
@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+_PROBE = (
+    "import sys\n"
+    "import {module}\n"
+    "heavy = ('numpy', 'cryptography', 'tkinter', 'vrhouse.pipeline.processors')\n"
+    "print('\\n'.join(sorted(name for name in sys.modules if name.startswith(heavy))))\n"
+)
+
+
+def _cold_import(module):
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module)],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PYTHONPATH": str(SRC)},
+    )
+    return result.stdout.split()
+
+
+@pytest.mark.parametrize("module", ["vrhouse.cli", "vrhouse.pipeline.importers.multi_importer"])
+def test_cold_import_stays_light(module):
+    assert _cold_import(module) == []
+
+
+def test_classic_importer_names_resolve_lazily():
+    from vrhouse.pipeline.importers import multi_importer
+    from vrhouse.pipeline.importers.stub import StubImporter
+
+    assert multi_importer.StubImporter is StubImporter
+    assert multi_importer.GLTFImporter is multi_importer.GLTFImporter
+    assert ".glb" in multi_importer.GLTFImporter.supported_suffixes
+    assert [importer.format_name for importer in multi_importer.SUPPORTED_IMPORTERS] == [
+        "ifc",
+        "fbx",
+        "obj",
+        "gltf",
+        "revit",
+    ]
+    with pytest.raises(AttributeError):
+        multi_importer.DWGImporter
@@ -0,0 +1,110 @@
+import struct
+import zlib
+
+import numpy as np
+import pytest
+
+from vrhouse.pipeline.cache import StageCache
+from vrhouse.pipeline.processors import textures
+from vrhouse.pipeline.processors.textures import (
+    DATA,
+    TextureProcessor,
+    TextureSource,
+    build_mip_chain,
+    decode_image,
+    encode_png,
+    resize_area,
+)
+
+
+@pytest.fixture
+def native(monkeypatch):
+    """Exercise the built-in PNG decoder even when Pillow is installed."""
+
+    monkeypatch.setattr(textures, "Image", None)
+
+
+def _paeth(left, up, up_left):
+    estimate = left + up - up_left
+    distances = abs(estimate - left), abs(estimate - up), abs(estimate - up_left)
+    if distances[0] <= distances[1] and distances[0] <= distances[2]:
+        return left
+    return up if distances[1] <= distances[2] else up_left
+
+
+def _png_with_filters(image, filters):
+    """Encode ``image`` row by row with the given PNG filter types (a straightforward reference encoder)."""
+
+    height, width, channels = image.shape
+    rows = image.reshape(height, width * channels).astype(np.int64)
+    raw = bytearray()
+    previous = np.zeros(width * channels, dtype=np.int64)
+    for row, kind in zip(rows, filters):
+        out = []
+        for index, value in enumerate(row):
+            left = row[index - channels] if index >= channels else 0
+            up_left = previous[index - channels] if index >= channels else 0
+            up = previous[index]
+            predictor = [0, left, up, (left + up) >> 1, _paeth(left, up, up_left)][kind]
+            out.append((value - predictor) & 0xFF)
+        raw += bytes([kind, *out])
+        previous = row
+
+    def chunk(kind, body):
+        return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+
+    color_type = {1: 0, 2: 4, 3: 2, 4: 6}[channels]
+    header = struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0)
+    body = chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(bytes(raw))) + chunk(b"IEND", b"")
+    return b"\x89PNG\r\n\x1a\n" + body
+
+
+@pytest.mark.parametrize("channels", [1, 2, 3, 4])
+def test_png_filters_and_encoder_round_trip(native, channels):
+    image = np.random.default_rng(channels).integers(0, 256, (10, 7, channels), dtype=np.uint8)
+
+    assert np.array_equal(decode_image(_png_with_filters(image, [0, 1, 2, 3, 4] * 2)), image)
+    assert np.array_equal(decode_image(encode_png(image)), image)
+
+
+@pytest.mark.parametrize("source, target", [(8, 4), (7, 3), (5, 8)])
+def test_area_resize_integrates_each_footprint(source, target):
+    values = np.random.default_rng(source).random((source, 1, 1), dtype=np.float32)
+    # Weight of source texel j in output i: overlap of [j, j + 1) with the footprint of i.
+    edges = np.linspace(0.0, source, target + 1)
+    overlap = np.clip(
+        np.minimum(edges[1:, None], np.arange(1, source + 1)) - np.maximum(edges[:-1, None], np.arange(source)), 0, None
+    )
+    expected = overlap @ values[:, 0, 0] * (target / source)
+
+    resized = resize_area(values, target, 1)
+    assert resized.shape == (target, 1, 1)
+    assert np.allclose(resized[:, 0, 0], expected, atol=1e-5)
+
+
+def test_mip_chain_halves_down_to_a_single_texel():
+    image = np.random.default_rng(0).integers(0, 256, (48, 40, 3), dtype=np.uint8)
+    levels = build_mip_chain(image, DATA, (32, 16))
+
+    assert [level.shape[:2] for level in levels] == [(16, 32), (8, 16), (4, 8), (2, 4), (1, 2), (1, 1)]
+    # Box filtering preserves the mean of linear data down the chain.
+    assert np.allclose(levels[-1][0, 0], image.reshape(-1, 3).mean(axis=0), atol=1.5)
+
+
+def test_processed_textures_are_served_from_the_content_cache(tmp_path, monkeypatch):
+    path = tmp_path / "tijolo.png"
+    path.write_bytes(encode_png(np.full((8, 8, 3), 120, dtype=np.uint8)))
+    cache = StageCache(tmp_path / "cache").subcache("textures")
+    processor = TextureProcessor(64, cache=cache)
+    first = processor.process_one(TextureSource("tijolo.png", DATA, path=path))
+
+    def fail(data):
+        raise AssertionError("cached textures must not be decoded again")
+
+    monkeypatch.setattr(textures, "decode_image", fail)
+    copy = tmp_path / "copia.png"
+    copy.write_bytes(path.read_bytes())
+    second = TextureProcessor(64, cache=cache).process_one(TextureSource("copia.png", DATA, path=copy))
+
+    assert second.digest == first.digest
+    assert [level.tolist() for level in second.mips] == [level.tolist() for level in first.mips]
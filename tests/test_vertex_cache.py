@@ -0,0 +1,116 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from vrhouse.core import MeshData, SceneGraph
+from vrhouse.pipeline.processors import vertex_cache
+from vrhouse.pipeline.processors.vertex_cache import (
+    VertexCacheOptimizer,
+    average_cache_miss_ratio,
+    optimize_mesh,
+    remove_degenerate_triangles,
+    tipsify,
+    weld_vertices,
+)
+
+SHM = Path("/dev/shm")
+
+
+def _grid(size=32, normals=True):
+    """A wavy ``size`` x ``size`` quad grid: no duplicate positions and no degenerate triangles."""
+
+    steps = np.linspace(0.0, 1.0, size + 1)
+    x, y = np.meshgrid(steps, steps, indexing="ij")
+    positions = np.stack((x.ravel(), y.ravel(), 0.1 * np.sin(6 * x.ravel())), axis=1).astype(np.float32)
+    quad = np.arange(size * (size + 1)).reshape(size, size + 1)[:, :-1].ravel()
+    a, b, c, d = quad, quad + size + 1, quad + size + 2, quad + 1
+    indices = np.concatenate((np.stack((a, b, c), 1), np.stack((a, c, d), 1))).astype(np.uint32)
+    up = np.tile(np.array([0, 0, 1], dtype=np.float32), (len(positions), 1))
+    return MeshData(positions=positions, indices=indices, normals=up if normals else None)
+
+
+def _soup(mesh):
+    """Every triangle with its own three vertices, as exporters without an index buffer write it."""
+
+    corners = np.asarray(mesh.indices).reshape(-1)
+    return MeshData(
+        positions=mesh.positions[corners],
+        indices=np.arange(corners.size, dtype=np.uint32).reshape(-1, 3),
+        normals=None if mesh.normals is None else mesh.normals[corners],
+    )
+
+
+def _shuffled(mesh, seed=0):
+    order = np.random.default_rng(seed).permutation(mesh.triangle_count)
+    return MeshData(positions=mesh.positions, indices=mesh.indices[order], normals=mesh.normals, uvs=mesh.uvs)
+
+
+def _triangles(mesh):
+    return np.asarray(mesh.positions, dtype=np.float64)[np.asarray(mesh.indices, dtype=np.int64)]
+
+
+def test_welding_a_triangle_soup_recovers_the_shared_vertices():
+    mesh = _grid(normals=False)
+    welded = weld_vertices(_soup(mesh))
+
+    assert welded.vertex_count == len(np.unique(mesh.positions, axis=0))
+    assert np.allclose(_triangles(welded), _triangles(mesh))
+
+
+def test_welding_keeps_seams_whose_normals_differ():
+    positions = np.zeros((2, 3), dtype=np.float32)
+    normals = np.array([[0, 0, 1], [1, 0, 0]], dtype=np.float32)
+    mesh = MeshData(positions=positions, indices=np.array([[0, 1, 0]], dtype=np.uint32), normals=normals)
+    assert weld_vertices(mesh).vertex_count == 2
+
+
+def test_degenerate_triangles_are_removed():
+    positions = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [2, 0, 0]], dtype=np.float32)
+    indices = np.array([[0, 1, 2], [0, 0, 1], [0, 1, 3]], dtype=np.uint32)  # repeated index, collinear
+    cleaned = remove_degenerate_triangles(MeshData(positions=positions, indices=indices))
+    assert cleaned.indices.tolist() == [[0, 1, 2]]
+
+
+def test_tipsify_keeps_the_triangle_set_and_lowers_the_acmr():
+    mesh = _shuffled(_grid(48))
+    ordered = tipsify(mesh.indices, mesh.vertex_count)
+
+    assert sorted(map(tuple, ordered.tolist())) == sorted(map(tuple, mesh.indices.tolist()))
+    assert average_cache_miss_ratio(ordered) < 0.75 * average_cache_miss_ratio(mesh.indices)
+
+
+def test_optimize_mesh_reports_the_acmr_drop_and_preserves_geometry():
+    mesh = _shuffled(_soup(_grid(48)))
+    optimized, stats = optimize_mesh(mesh)
+
+    assert stats.vertices_after < stats.vertices_before
+    assert stats.triangles_after == stats.triangles_before
+    assert stats.acmr_after < stats.acmr_before
+    # Vertices are renumbered in order of first use.
+    first_use = np.unique(optimized.indices.reshape(-1), return_index=True)[1]
+    assert np.all(np.diff(first_use) > 0)
+    before = {tuple(np.round(triangle, 5).ravel()) for triangle in _triangles(mesh)}
+    after = {tuple(np.round(triangle, 5).ravel()) for triangle in _triangles(optimized)}
+    assert before == after
+
+
+@pytest.mark.skipif(not SHM.is_dir(), reason="needs /dev/shm to observe shared-memory blocks")
+def test_parallel_stage_matches_inline_through_shared_memory(monkeypatch):
+    graph = SceneGraph()
+    for index, size in enumerate((40, 48, 24)):
+        node = graph.add_node(f"piso_{index}", mesh=_shuffled(_grid(size), seed=index))
+        graph.set_lods(int(graph.mesh_ids[node]), [_shuffled(_grid(size // 2), seed=index)])
+
+    inline = VertexCacheOptimizer(max_workers=1).optimize(graph)
+    monkeypatch.setattr(vertex_cache, "PARALLEL_THRESHOLD", 0)
+    before = {path.name for path in SHM.iterdir()}
+    optimizer = VertexCacheOptimizer(max_workers=2)
+    pooled = optimizer.optimize(graph)
+
+    assert {path.name for path in SHM.iterdir()} == before
+    assert pooled.metadata["vertex_cache"] == inline.metadata["vertex_cache"]
+    for mesh_id, mesh in enumerate(inline.meshes):
+        assert np.array_equal(pooled.meshes[mesh_id].indices, mesh.indices)
+        assert np.array_equal(pooled.meshes[mesh_id].positions, mesh.positions)
+        assert np.array_equal(pooled.lods[mesh_id][0].indices, inline.lods[mesh_id][0].indices)
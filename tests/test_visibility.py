@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from vrhouse.benchmarks.synthetic import generate_house, house_spec
+from vrhouse.core import BVH, MeshData, SceneGraph, SceneSpecification
+from vrhouse.pipeline.importers.ifc_importer import StepIFCImporter
+from vrhouse.pipeline.processors import visibility
+from vrhouse.pipeline.processors.batching import MaterialBatcher
+from vrhouse.pipeline.processors.visibility import VisibilityBaker
+
+
+def _box(lower, upper):
+    corners = np.where(np.array(list(np.ndindex(2, 2, 2)), dtype=bool), upper, lower)
+    faces = [
+        [0, 1, 3], [0, 3, 2], [4, 6, 7], [4, 7, 5], [0, 4, 5], [0, 5, 1],
+        [2, 3, 7], [2, 7, 6], [0, 2, 6], [0, 6, 4], [1, 5, 7], [1, 7, 3],
+    ]  # fmt: skip
+    return MeshData(positions=corners.astype(np.float32), indices=np.array(faces, dtype=np.uint32))
+
+
+def _three_rooms():
+    """Rooms A, B, C along X: glazing between A and B, a solid wall between B and C."""
+
+    graph = SceneGraph()
+    graph.add_node("piso", mesh=_box((0, 0, -0.2), (12, 4, 0)), attributes={"ifc_class": "IFCSLAB"})
+    graph.add_node("teto", mesh=_box((0, 0, 3), (12, 4, 3.2)), attributes={"ifc_class": "IFCSLAB"})
+    graph.add_node("vidro", mesh=_box((3.9, 0, 0), (4.1, 4, 3)), attributes={"ifc_class": "IFCWINDOW"})
+    graph.add_node("parede", mesh=_box((7.9, 0, 0), (8.1, 4, 3)), attributes={"ifc_class": "IFCWALL"})
+    for name, start in (("sala_a", 0.2), ("sala_b", 4.2), ("sala_c", 8.2)):
+        bounds = [[start, 0.0, 0.0], [start + 3.6, 4.0, 3.0]]
+        graph.add_node(name, attributes={"ifc_class": "IFCSPACE", "bounds": bounds})
+    return graph
+
+
+@pytest.fixture
+def parallel(monkeypatch):
+    monkeypatch.setattr(visibility, "PARALLEL_RAYS", 0)
+    monkeypatch.setattr(visibility, "_RAY_BATCH", 50)
+
+
+def test_space_bounds_become_cells_and_glazing_does_not_occlude():
+    graph = _three_rooms()
+    baked = VisibilityBaker(max_workers=1).bake(graph)
+
+    assert baked.cell_spaces.tolist() == [graph.index_of(name) for name in ("sala_a", "sala_b", "sala_c")]
+    assert baked.visible_cells(0).tolist() == [0, 1]
+    assert baked.visible_cells(2).tolist() == [2]
+    assert baked.cell_at([[2.0, 2.0, 1.5], [10.0, 2.0, 1.5], [-5.0, 0.0, 0.0]]).tolist() == [0, 2, -1]
+
+
+def test_parallel_rays_match_the_serial_bake(parallel):
+    serial = VisibilityBaker(max_workers=1).bake(_three_rooms())
+    baker = VisibilityBaker(max_workers=2)
+    pooled = baker.bake(_three_rooms())
+
+    assert baker.last_stats.rays > visibility._RAY_BATCH
+    assert np.array_equal(pooled.pvs, serial.pvs)
+
+
+def test_ifc_spaces_are_the_cells(tmp_path):
+    house = generate_house(house_spec("tiny", texture_size=0), tmp_path / "casa.ifc")
+    graph = SceneGraph.coerce(StepIFCImporter().load(SceneSpecification("casa", house.path)))
+    spaces = [node.index for node in graph.nodes() if node.get("ifc_class") == "IFCSPACE"]
+
+    baked = VisibilityBaker(max_workers=1).bake(graph)
+    assert sorted(baked.cell_spaces.tolist()) == sorted(spaces)
+
+
+def test_with_nodes_indexes_the_batched_graph(tmp_path):
+    house = generate_house(house_spec("tiny", texture_size=0), tmp_path / "casa.ifc")
+    graph = SceneGraph.coerce(StepIFCImporter().load(SceneSpecification("casa", house.path)))
+    baked = VisibilityBaker(max_workers=1).bake(graph)
+    batched = MaterialBatcher().batch(graph)
+
+    remapped = baked.with_nodes(BVH.from_scene(batched))
+    drawn = set(batched.mesh_nodes().tolist())
+    assert remapped.nodes.size and set(remapped.nodes.tolist()) <= drawn
+    assert np.array_equal(remapped.pvs, baked.pvs)
+    assert len(remapped.node_offsets) == baked.cell_count + 1